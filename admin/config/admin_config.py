@@ -20,6 +20,15 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+if FIREBASE_AVAILABLE:
+    class _EmulatorCredential(credentials.Base):
+        """Anonymous credential for the local Firestore/Auth emulators."""
+        
+        def get_credential(self):
+            from google.auth.credentials import AnonymousCredentials
+            return AnonymousCredentials()
+
+
 class AdminConfig:
     """Admin configuration manager."""
     
@@ -82,6 +91,14 @@ class AdminConfig:
                 logger.info("Using existing Firebase Admin SDK instance")
                 return True
             
+            # Local emulator (FIRESTORE_EMULATOR_HOST) - no service account needed
+            if os.getenv("FIRESTORE_EMULATOR_HOST") and not credentials_path:
+                project_id = os.getenv("GCLOUD_PROJECT") or os.getenv("FIREBASE_PROJECT_ID") or "demo-admin"
+                self.app = firebase_admin.initialize_app(_EmulatorCredential(), {"projectId": project_id})
+                self.db = firestore.client()
+                logger.info(f"Firebase Admin SDK connected to emulator at {os.getenv('FIRESTORE_EMULATOR_HOST')}")
+                return True
+            
             # Find credentials file
             cred_path = self._find_firebase_credentials(credentials_path)
             
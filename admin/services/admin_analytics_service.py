@@ -1,84 +1,383 @@
 """
 Admin analytics and statistics service.
+
+All admin metrics are computed from one analytics snapshot: a compact,
+locally persisted index of Auth users, licenses and devices built from a
+handful of listing queries (one Auth page per 1000 users, one license
+query, one device collection group query). Later refreshes only fetch
+licenses and devices changed since the snapshot's watermarks; a full
+rebuild runs periodically to pick up deletions and external writes, and
+stamps updated_at on licenses that lack it so later changes made through
+the admin services are visible to the incremental query.
 """
 
+import json
 import logging
-from typing import Dict
-from datetime import datetime, timedelta
-from admin.services.admin_user_service import admin_user_service
-from admin.services.admin_license_service import admin_license_service
-from admin.services.admin_device_service import admin_device_service
+import threading
+from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from admin.config.admin_config import admin_config
+from admin.utils.bulk_writer import FirestoreBulkWriter
+from admin.utils.constants import FIRESTORE_USER_LICENSES_COLLECTION
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_VERSION = 1
+# Snapshots older than this are refreshed (incrementally) on access
+SNAPSHOT_MAX_AGE_SECONDS = 300
+# Full rebuild interval (catches deleted documents and writes without updated_at)
+SNAPSHOT_FULL_REFRESH_SECONDS = 6 * 3600
+# Firebase Auth list_users() page size (API maximum)
+AUTH_LIST_PAGE_SIZE = 1000
+
+
+def _to_epoch(value) -> Optional[float]:
+    """Convert an ISO string, datetime or Firestore timestamp to epoch seconds."""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+    except Exception:
+        pass
+    return None
+
+
+def _iso_now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
 
 class AdminAnalyticsService:
     """Handles analytics and statistics."""
     
-    def get_user_stats(self) -> dict:
-        """Get user statistics."""
-        try:
-            users = admin_user_service.get_all_users()
-            
-            now = datetime.utcnow()
-            thirty_days_ago = now - timedelta(days=30)
-            
-            total_users = len(users)
-            active_users = sum(1 for u in users if not u.get("disabled", False))
-            
-            # Count new users (created_at is Unix timestamp in milliseconds)
-            new_users = 0
-            for u in users:
-                created_at = u.get("created_at")
-                if created_at:
-                    # Convert timestamp to datetime if needed
-                    if isinstance(created_at, (int, float)):
-                        # Firebase timestamps are in milliseconds
-                        created_dt = datetime.fromtimestamp(created_at / 1000.0)
-                    elif isinstance(created_at, datetime):
-                        created_dt = created_at
-                    else:
-                        continue
-                    
-                    if created_dt >= thirty_days_ago:
-                        new_users += 1
+    def __init__(self, snapshot_path: Optional[str] = None):
+        """
+        Initialize analytics service.
+        
+        Args:
+            snapshot_path: Snapshot file (defaults to USER_DATA_DIR/admin/analytics_snapshot.json)
+        """
+        self._snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._snapshot: Optional[dict] = None
+        self._refresh_lock = threading.Lock()
+    
+    @property
+    def snapshot_path(self) -> Path:
+        """Location of the persisted snapshot."""
+        if self._snapshot_path is None:
+            from utils.constants import USER_DATA_DIR
+            self._snapshot_path = USER_DATA_DIR / "admin" / "analytics_snapshot.json"
+        return self._snapshot_path
+    
+    def get_cached_snapshot(self) -> Optional[dict]:
+        """
+        Get the last snapshot from memory or disk without any Firebase requests.
+        
+        Returns:
+            Snapshot dict with user_stats, license_stats, device_stats,
+            activity_stats and refreshed_at, or None if no snapshot exists yet
+        """
+        snapshot = self._load_snapshot()
+        return self._public_view(snapshot) if snapshot else None
+    
+    def get_snapshot(self, max_age_seconds: int = SNAPSHOT_MAX_AGE_SECONDS) -> dict:
+        """
+        Get the analytics snapshot, refreshing it first if it is older than max_age_seconds.
+        
+        Returns:
+            Snapshot dict (see get_cached_snapshot)
+        """
+        snapshot = self._load_snapshot()
+        if snapshot is None or self._age_seconds(snapshot.get("refreshed_at")) > max_age_seconds:
+            return self.refresh_snapshot()
+        return self._public_view(snapshot)
+    
+    def refresh_snapshot(self, full: bool = False) -> dict:
+        """
+        Refresh the snapshot from Firebase and persist it.
+        
+        Args:
+            full: Force a full rebuild instead of an incremental refresh
+        
+        Returns:
+            Snapshot dict (see get_cached_snapshot)
+        """
+        with self._refresh_lock:
+            snapshot = self._load_snapshot()
+            needs_full = (
+                full
+                or snapshot is None
+                or self._age_seconds(snapshot.get("full_refreshed_at")) > SNAPSHOT_FULL_REFRESH_SECONDS
+            )
+            try:
+                if not admin_config.is_initialized() and not admin_config.initialize():
+                    raise RuntimeError("Firebase not initialized")
+                
+                if needs_full:
+                    snapshot = self._build_full_snapshot()
+                else:
+                    self._apply_incremental_changes(snapshot)
+                
+                snapshot["metrics"] = self._compute_metrics(snapshot)
+                snapshot["refreshed_at"] = _iso_now()
+                self._snapshot = snapshot
+                self._save_snapshot(snapshot)
+                logger.info(f"Analytics snapshot refreshed ({'full' if needs_full else 'incremental'})")
             
-            return {
-                "total": total_users,
-                "active": active_users,
-                "disabled": total_users - active_users,
-                "new_last_30_days": new_users,
-            }
+            except Exception as e:
+                logger.error(f"Error refreshing analytics snapshot: {e}", exc_info=True)
+                if snapshot is None:
+                    return self._public_view(self._empty_snapshot())
             
-        except Exception as e:
-            logger.error(f"Error getting user stats: {e}", exc_info=True)
-            return {
-                "total": 0,
-                "active": 0,
-                "disabled": 0,
-                "new_last_30_days": 0,
-            }
+            return self._public_view(snapshot)
+    
+    def discard_license(self, uid: str):
+        """Drop a deleted license from the snapshot (deletions are not visible to incremental refresh)."""
+        # A refresh in progress mutates the same snapshot; wait for it
+        with self._refresh_lock:
+            snapshot = self._load_snapshot()
+            if snapshot and snapshot["licenses"].pop(uid, None) is not None:
+                snapshot["metrics"] = self._compute_metrics(snapshot)
+                self._save_snapshot(snapshot)
+    
+    def get_user_stats(self) -> dict:
+        """Get user statistics."""
+        return self.get_snapshot()["user_stats"]
     
     def get_license_stats(self) -> dict:
         """Get license statistics."""
-        return admin_license_service.get_license_stats()
+        return self.get_snapshot()["license_stats"]
     
     def get_device_stats(self) -> dict:
         """Get device statistics."""
-        return admin_device_service.get_device_stats()
+        return self.get_snapshot()["device_stats"]
     
     def get_activity_stats(self) -> dict:
         """
         Get activity statistics.
-        Note: This is a placeholder - implement activity logging if needed.
+        Logins are derived from Auth last sign-in times; renewals are not tracked yet.
         """
+        return self.get_snapshot()["activity_stats"]
+    
+    def _empty_snapshot(self) -> dict:
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "refreshed_at": None,
+            "full_refreshed_at": None,
+            "license_watermark": "",
+            "device_watermark": None,
+            "tier_keys": [],
+            "users": {},      # uid -> [disabled, created_at epoch, last_sign_in epoch]
+            "licenses": {},   # uid -> [tier, expiration epoch]
+            "devices": {},    # uid -> [device ids]
+        }
+        snapshot["metrics"] = self._compute_metrics(snapshot)
+        return snapshot
+    
+    def _build_full_snapshot(self) -> dict:
+        """Rebuild the snapshot index from full listings."""
+        snapshot = self._empty_snapshot()
+        db = admin_config.get_firestore()
+        
+        snapshot["users"] = self._list_auth_users()
+        
+        # Incremental refreshes filter on updated_at, which never matches a
+        # document without the field; stamp those so they are seen from now on
+        stamp = _iso_now()
+        writer = FirestoreBulkWriter(db)
+        for doc in db.collection(FIRESTORE_USER_LICENSES_COLLECTION).stream():
+            data = doc.to_dict() or {}
+            if data.get("updated_at") is None:
+                writer.update(doc.reference, {"updated_at": stamp})
+                data["updated_at"] = stamp
+            self._index_license(snapshot, doc.id, data)
+        if writer.pending_count:
+            result = writer.commit()
+            logger.info(f"Backfilled updated_at on {result.succeeded}/{result.total} licenses")
+        
+        for doc in db.collection_group("user_devices").stream():
+            self._index_device(snapshot, doc)
+        
+        snapshot["tier_keys"] = self._list_tier_keys()
+        snapshot["full_refreshed_at"] = _iso_now()
+        return snapshot
+    
+    def _apply_incremental_changes(self, snapshot: dict):
+        """Merge users plus licenses/devices changed since the watermarks into the snapshot."""
+        db = admin_config.get_firestore()
+        
+        # Auth has no change feed; listing is one request per 1000 users
+        snapshot["users"] = self._list_auth_users()
+        
+        query = db.collection(FIRESTORE_USER_LICENSES_COLLECTION)
+        if snapshot.get("license_watermark"):
+            query = query.where("updated_at", ">", snapshot["license_watermark"])
+        for doc in query.stream():
+            self._index_license(snapshot, doc.id, doc.to_dict() or {})
+        
+        device_watermark = snapshot.get("device_watermark")
+        try:
+            query = db.collection_group("user_devices")
+            if device_watermark:
+                since = datetime.fromtimestamp(device_watermark, tz=timezone.utc)
+                query = query.where("last_login", ">", since)
+            for doc in query.stream():
+                self._index_device(snapshot, doc)
+        except Exception as e:
+            # Collection group range filters need an index; rescan devices without it
+            logger.warning(f"Incremental device query failed ({e}), rescanning devices")
+            snapshot["devices"] = {}
+            for doc in db.collection_group("user_devices").stream():
+                self._index_device(snapshot, doc)
+        
+        snapshot["tier_keys"] = self._list_tier_keys()
+    
+    def _list_auth_users(self) -> Dict[str, list]:
+        """List Firebase Auth users page by page into the compact user index."""
+        users = {}
+        page = admin_config.get_auth().list_users(max_results=AUTH_LIST_PAGE_SIZE)
+        while page:
+            for user in page.users:
+                metadata = user.user_metadata
+                users[user.uid] = [
+                    bool(user.disabled),
+                    metadata.creation_timestamp / 1000.0 if metadata and metadata.creation_timestamp else None,
+                    metadata.last_sign_in_timestamp / 1000.0 if metadata and metadata.last_sign_in_timestamp else None,
+                ]
+            page = page.get_next_page()
+        return users
+    
+    def _list_tier_keys(self) -> list:
+        try:
+            from admin.services.admin_license_tier_service import admin_license_tier_service
+            return [t.get("tier_key") for t in admin_license_tier_service.get_all_tiers() if t.get("tier_key")]
+        except Exception:
+            return []
+    
+    @staticmethod
+    def _index_license(snapshot: dict, uid: str, data: dict):
+        snapshot["licenses"][uid] = [data.get("tier", "none"), _to_epoch(data.get("expiration_date"))]
+        updated_at = data.get("updated_at")
+        if isinstance(updated_at, str) and updated_at > (snapshot.get("license_watermark") or ""):
+            snapshot["license_watermark"] = updated_at
+    
+    @staticmethod
+    def _index_device(snapshot: dict, doc):
+        parent_doc = doc.reference.parent.parent
+        if parent_doc is None or parent_doc.parent.id != FIRESTORE_USER_LICENSES_COLLECTION:
+            return
+        devices = snapshot["devices"].setdefault(parent_doc.id, [])
+        if doc.id not in devices:
+            devices.append(doc.id)
+        last_login = _to_epoch((doc.to_dict() or {}).get("last_login"))
+        if last_login and last_login > (snapshot.get("device_watermark") or 0):
+            snapshot["device_watermark"] = last_login
+    
+    def _compute_metrics(self, snapshot: dict) -> dict:
+        """Compute all admin metrics in one pass over the snapshot index."""
+        now = datetime.now(timezone.utc).timestamp()
+        thirty_days_ago = now - timedelta(days=30).total_seconds()
+        seven_days_ago = now - timedelta(days=7).total_seconds()
+        start_of_today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        
+        users = snapshot["users"]
+        total_users = len(users)
+        active_users = new_users = logins_today = logins_week = 0
+        for disabled, created_at, last_sign_in in users.values():
+            if not disabled:
+                active_users += 1
+            if created_at and created_at >= thirty_days_ago:
+                new_users += 1
+            if last_sign_in:
+                if last_sign_in >= start_of_today:
+                    logins_today += 1
+                if last_sign_in >= seven_days_ago:
+                    logins_week += 1
+        
+        license_stats = {
+            "total": len(snapshot["licenses"]),
+            "by_tier": {tier: 0 for tier in snapshot.get("tier_keys", [])},
+            "active": 0,
+            "expired": 0,
+        }
+        for tier, expiration in snapshot["licenses"].values():
+            if tier in license_stats["by_tier"]:
+                license_stats["by_tier"][tier] += 1
+            # Licenses without an (parseable) expiration date are lifetime/active
+            if expiration is not None and expiration <= now:
+                license_stats["expired"] += 1
+            else:
+                license_stats["active"] += 1
+        
+        total_devices = sum(len(devices) for devices in snapshot["devices"].values())
+        users_with_devices = sum(1 for devices in snapshot["devices"].values() if devices)
+        
         return {
-            "logins_today": 0,
-            "logins_last_7_days": 0,
-            "license_renewals_last_30_days": 0,
+            "user_stats": {
+                "total": total_users,
+                "active": active_users,
+                "disabled": total_users - active_users,
+                "new_last_30_days": new_users,
+            },
+            "license_stats": license_stats,
+            "device_stats": {
+                "total": total_devices,
+                "average_per_user": round(total_devices / total_users, 2) if total_users > 0 else 0,
+                "users_with_devices": users_with_devices,
+                "users_without_devices": max(total_users - users_with_devices, 0),
+            },
+            "activity_stats": {
+                "logins_today": logins_today,
+                "logins_last_7_days": logins_week,
+                "license_renewals_last_30_days": 0,
+            },
         }
+    
+    def _load_snapshot(self) -> Optional[dict]:
+        """Load snapshot from memory, falling back to the snapshot file."""
+        if self._snapshot is not None:
+            return self._snapshot
+        try:
+            if self.snapshot_path.exists():
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                if snapshot.get("version") == SNAPSHOT_VERSION:
+                    self._snapshot = snapshot
+        except Exception as e:
+            logger.warning(f"Could not load analytics snapshot: {e}")
+        return self._snapshot
+    
+    def _save_snapshot(self, snapshot: dict):
+        """Persist snapshot atomically."""
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            tmp_path.replace(self.snapshot_path)
+        except Exception as e:
+            logger.error(f"Error saving analytics snapshot: {e}", exc_info=True)
+    
+    @staticmethod
+    def _age_seconds(timestamp: Optional[str]) -> float:
+        epoch = _to_epoch(timestamp)
+        if epoch is None:
+            return float("inf")
+        return datetime.now(timezone.utc).timestamp() - epoch
+    
+    @staticmethod
+    def _public_view(snapshot: dict) -> dict:
+        view = dict(snapshot["metrics"])
+        view["refreshed_at"] = snapshot.get("refreshed_at")
+        return view
 
 
 # Global admin analytics service instance
 admin_analytics_service = AdminAnalyticsService()
-
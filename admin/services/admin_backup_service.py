@@ -1,11 +1,26 @@
 """
 Admin backup service for Firebase data.
+
+Backups are streamed: each collection is paged from Firestore by several
+workers at once and written as NDJSON (one document per line) to a spool
+file while its checksum is computed, then copied into its ZIP entry. Only
+one page of documents per collection is held in memory at a time.
+
+Incremental backups query collections that carry an ``updated_at`` field
+for documents updated after that collection's watermark from the previous
+backup; every other collection is backed up in full.
 """
 
+import hashlib
 import logging
 import json
+import shutil
+import tempfile
+import threading
+import time
 import zipfile
-from typing import List, Dict, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 from admin.config.admin_config import admin_config
@@ -21,6 +36,48 @@ from admin.utils.constants import (
 
 logger = logging.getLogger(__name__)
 
+BACKUP_FORMAT_VERSION = "2.1"
+BACKUP_METADATA_ENTRY = "backup_metadata.json"
+# Documents fetched per Firestore query page
+BACKUP_PAGE_SIZE = 500
+# Collections backed up concurrently
+BACKUP_MAX_WORKERS = 4
+# Firebase Auth list_users() page size (API maximum)
+AUTH_LIST_PAGE_SIZE = 1000
+
+# Collections whose documents carry an ISO-8601 updated_at (backed up incrementally)
+INCREMENTAL_COLLECTIONS = (
+    FIRESTORE_USER_LICENSES_COLLECTION,
+    FIRESTORE_LICENSE_TIERS_COLLECTION,
+)
+
+_JSON_PRIMITIVES = (str, int, float, bool)
+
+
+class _NdjsonSpool:
+    """Append-only NDJSON spool file that tracks count, size and SHA-256."""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self.bytes = 0
+        self._sha256 = hashlib.sha256()
+        self._file = open(path, "wb")
+    
+    def write(self, document: dict):
+        line = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._file.write(line)
+        self._sha256.update(line)
+        self.count += 1
+        self.bytes += len(line)
+    
+    @property
+    def checksum(self) -> str:
+        return self._sha256.hexdigest()
+    
+    def close(self):
+        self._file.close()
+
 
 class AdminBackupService:
     """Handles Firebase data backup operations."""
@@ -40,8 +97,8 @@ class AdminBackupService:
     
     def _serialize_timestamp(self, obj: Any) -> Any:
         """Convert Firestore timestamps and other objects to JSON-serializable format."""
-        if obj is None:
-            return None
+        if obj is None or isinstance(obj, _JSON_PRIMITIVES):
+            return obj
         
         # Handle Firestore timestamps
         if hasattr(obj, 'timestamp'):
@@ -71,295 +128,261 @@ class AdminBackupService:
         except (TypeError, ValueError):
             return str(obj)
     
-    def _backup_firestore_collection(self, collection_name: str) -> List[dict]:
-        """Backup a Firestore collection."""
-        if not self._ensure_initialized():
-            logger.error(f"Firebase not initialized, cannot backup {collection_name}")
-            return []
+    def _iter_query_pages(self, query, order_fields: Tuple[str, ...] = ("__name__",)) -> Iterator[Any]:
+        """Yield document snapshots from a query, fetched in cursor pages."""
+        for field in order_fields:
+            query = query.order_by(field)
+        query = query.limit(BACKUP_PAGE_SIZE)
+        last_doc = None
+        while True:
+            page_query = query.start_after(last_doc) if last_doc is not None else query
+            page = list(page_query.stream())
+            for doc in page:
+                yield doc
+            if len(page) < BACKUP_PAGE_SIZE:
+                return
+            last_doc = page[-1]
+    
+    def _stream_documents(
+        self,
+        query,
+        spool: _NdjsonSpool,
+        since: Optional[str],
+        parent_collection: Optional[str] = None,
+        on_page: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        """
+        Write documents from a query to a spool.
         
-        try:
-            docs = []
-            collection_ref = self._db.collection(collection_name)
+        Args:
+            query: Collection or collection group query
+            spool: Destination NDJSON spool
+            since: Only write documents whose updated_at is after this ISO
+                timestamp (incremental mode, queried server-side)
+            parent_collection: For collection groups, keep only documents under this parent collection
+            on_page: Optional callback(count) invoked after every page
+        
+        Returns:
+            Latest updated_at written (the collection's next watermark), or None
+        """
+        order_fields: Tuple[str, ...] = ("__name__",)
+        if since is not None:
+            # An inequality filter must be the first sort order
+            query = query.where("updated_at", ">", since)
+            order_fields = ("updated_at", "__name__")
+        
+        watermark = None
+        for doc in self._iter_query_pages(query, order_fields):
+            parent_doc = doc.reference.parent.parent
+            if parent_collection is not None:
+                if parent_doc is None or parent_doc.parent.id != parent_collection:
+                    continue
             
-            for doc in collection_ref.stream():
-                data = doc.to_dict()
-                if data is None:
-                    data = {}
-                
-                # Add document ID
-                data["_id"] = doc.id
-                
-                # Serialize timestamps
-                data = self._serialize_timestamp(data)
-                
-                docs.append(data)
+            data = self._serialize_timestamp(doc.to_dict() or {})
+            updated_at = data.get("updated_at")
+            if isinstance(updated_at, str) and (watermark is None or updated_at > watermark):
+                watermark = updated_at
             
-            logger.info(f"Backed up {len(docs)} documents from {collection_name}")
-            return docs
+            # Add document ID
+            data["_id"] = doc.id
+            if parent_collection is not None:
+                data["_parent_id"] = parent_doc.id
             
-        except Exception as e:
-            logger.error(f"Error backing up collection {collection_name}: {e}", exc_info=True)
-            return []
+            spool.write(data)
+            if on_page and spool.count % BACKUP_PAGE_SIZE == 0:
+                on_page(spool.count)
+        
+        return watermark
+    
+    def _backup_firestore_collection(
+        self,
+        collection_name: str,
+        spool: _NdjsonSpool,
+        since: Optional[str] = None,
+        on_page: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        """Stream a Firestore collection to a spool."""
+        watermark = self._stream_documents(self._db.collection(collection_name), spool, since, on_page=on_page)
+        logger.info(f"Backed up {spool.count} documents from {collection_name}")
+        return watermark
     
     def _backup_subcollection(
-        self, 
-        parent_collection: str, 
-        subcollection_name: str
-    ) -> List[dict]:
-        """Backup a subcollection from all parent documents."""
-        if not self._ensure_initialized():
-            logger.error(f"Firebase not initialized, cannot backup subcollection {subcollection_name}")
-            return []
+        self,
+        parent_collection: str,
+        subcollection_name: str,
+        spool: _NdjsonSpool,
+        since: Optional[str] = None,
+        on_page: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        """Stream a subcollection from all parent documents using one collection group query."""
+        watermark = self._stream_documents(
+            self._db.collection_group(subcollection_name),
+            spool,
+            since,
+            parent_collection=parent_collection,
+            on_page=on_page
+        )
+        logger.info(
+            f"Backed up {spool.count} documents from {parent_collection}/*/{subcollection_name}"
+        )
+        return watermark
+    
+    def _serialize_auth_user(self, user) -> dict:
+        """Convert a Firebase Auth UserRecord to a backup document."""
+        user_dict = {
+            "_id": user.uid,
+            "uid": user.uid,
+            "email": user.email if user.email else None,
+            "display_name": user.display_name if user.display_name else None,
+            "email_verified": user.email_verified if hasattr(user, 'email_verified') else None,
+            "disabled": user.disabled if hasattr(user, 'disabled') else None,
+            "phone_number": user.phone_number if user.phone_number else None,
+            "created_at": None,
+            "last_sign_in": None,
+        }
         
-        try:
-            all_subdocs = []
-            
-            # Get all parent documents
-            parent_docs = self._db.collection(parent_collection).stream()
-            
-            for parent_doc in parent_docs:
-                parent_id = parent_doc.id
-                
-                # Get subcollection
-                subcollection_ref = (
-                    self._db.collection(parent_collection)
-                    .document(parent_id)
-                    .collection(subcollection_name)
-                )
-                
-                # Get all documents in subcollection
-                for subdoc in subcollection_ref.stream():
-                    data = subdoc.to_dict()
-                    if data is None:
-                        data = {}
-                    
-                    # Add IDs
-                    data["_id"] = subdoc.id
-                    data["_parent_id"] = parent_id
-                    
-                    # Serialize timestamps
-                    data = self._serialize_timestamp(data)
-                    
-                    all_subdocs.append(data)
-            
-            logger.info(
-                f"Backed up {len(all_subdocs)} documents from {parent_collection}/*/{subcollection_name}"
-            )
-            return all_subdocs
-            
-        except Exception as e:
-            logger.error(
-                f"Error backing up subcollection {parent_collection}/*/{subcollection_name}: {e}",
-                exc_info=True
-            )
-            return []
+        # Handle metadata (timestamps are epoch milliseconds)
+        metadata = getattr(user, 'user_metadata', None)
+        if metadata:
+            for key, value in (
+                ("created_at", metadata.creation_timestamp),
+                ("last_sign_in", metadata.last_sign_in_timestamp),
+            ):
+                if value:
+                    try:
+                        user_dict[key] = datetime.utcfromtimestamp(value / 1000).isoformat() + "Z"
+                    except Exception:
+                        user_dict[key] = str(value)
+        
+        # Handle custom claims
+        user_dict["custom_claims"] = user.custom_claims if getattr(user, 'custom_claims', None) else None
+        
+        # Handle provider data
+        user_dict["provider_data"] = [
+            {
+                "uid": getattr(pd, 'uid', None),
+                "email": getattr(pd, 'email', None),
+                "display_name": getattr(pd, 'display_name', None),
+                "photo_url": getattr(pd, 'photo_url', None),
+                "provider_id": getattr(pd, 'provider_id', None),
+            }
+            for pd in (getattr(user, 'provider_data', None) or [])
+        ]
+        return user_dict
     
-    def _backup_firebase_auth_users(self) -> List[dict]:
-        """Backup Firebase Auth users."""
-        if not self._ensure_initialized():
-            logger.error("Firebase not initialized, cannot backup Auth users")
-            return []
+    def _backup_firebase_auth_users(
+        self,
+        spool: _NdjsonSpool,
+        since: Optional[str] = None,
+        on_page: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        """
+        Stream Firebase Auth users to a spool, one list_users() page at a time.
         
+        Auth users have no update time, so they are always backed up in full.
+        """
         if self._auth is None:
-            logger.error("Firebase Auth is None, cannot backup Auth users")
-            return []
+            raise RuntimeError("Firebase Auth is None, cannot backup Auth users")
         
-        try:
-            users = []
-            logger.debug("Starting Firebase Auth users backup...")
-            
-            # Try using admin_user_service first (known to work)
-            try:
-                from admin.services.admin_user_service import admin_user_service
-                logger.debug("Attempting to use admin_user_service.get_all_users() as fallback")
-                user_list = admin_user_service.get_all_users()
-                
-                if user_list:
-                    logger.info(f"Retrieved {len(user_list)} users via admin_user_service")
-                    # Transform to backup format
-                    for user_data in user_list:
-                        backup_user = {
-                            "_id": user_data.get("uid"),
-                            "uid": user_data.get("uid"),
-                            "email": user_data.get("email"),
-                            "display_name": user_data.get("display_name"),
-                            "email_verified": user_data.get("email_verified"),
-                            "disabled": user_data.get("disabled"),
-                            "phone_number": None,  # Not available from admin_user_service
-                            "created_at": self._serialize_timestamp(user_data.get("created_at")),
-                            "last_sign_in": self._serialize_timestamp(user_data.get("last_sign_in")),
-                            "custom_claims": None,  # Not available from admin_user_service
-                            "provider_data": [],  # Not available from admin_user_service
-                        }
-                        users.append(backup_user)
-                    
-                    logger.info(f"Backed up {len(users)} Firebase Auth users via admin_user_service")
-                    return users
-                else:
-                    logger.warning("admin_user_service returned empty list, trying direct method")
-            except Exception as fallback_error:
-                logger.warning(f"Fallback to admin_user_service failed: {fallback_error}, trying direct method")
-            
-            # Direct method (original approach)
-            try:
-                page = self._auth.list_users()
-                logger.debug(f"Got list_users page object: {type(page)}")
-            except Exception as e:
-                logger.error(f"Error calling list_users(): {e}", exc_info=True)
-                return users if users else []
-            
-            # Iterate through all users
-            try:
-                user_count = 0
-                for user in page.iterate_all():
-                    user_count += 1
-                    try:
-                        user_dict = {
-                            "_id": user.uid,
-                            "uid": user.uid,
-                            "email": user.email if user.email else None,
-                            "display_name": user.display_name if user.display_name else None,
-                            "email_verified": user.email_verified if hasattr(user, 'email_verified') else None,
-                            "disabled": user.disabled if hasattr(user, 'disabled') else None,
-                            "phone_number": user.phone_number if user.phone_number else None,
-                        }
-                        
-                        # Handle metadata
-                        if hasattr(user, 'user_metadata') and user.user_metadata:
-                            if user.user_metadata.creation_timestamp:
-                                try:
-                                    user_dict["created_at"] = user.user_metadata.creation_timestamp.isoformat() + "Z"
-                                except Exception:
-                                    user_dict["created_at"] = str(user.user_metadata.creation_timestamp)
-                            else:
-                                user_dict["created_at"] = None
-                            
-                            if user.user_metadata.last_sign_in_timestamp:
-                                try:
-                                    user_dict["last_sign_in"] = user.user_metadata.last_sign_in_timestamp.isoformat() + "Z"
-                                except Exception:
-                                    user_dict["last_sign_in"] = str(user.user_metadata.last_sign_in_timestamp)
-                            else:
-                                user_dict["last_sign_in"] = None
-                        else:
-                            user_dict["created_at"] = None
-                            user_dict["last_sign_in"] = None
-                        
-                        # Handle custom claims
-                        if hasattr(user, 'custom_claims') and user.custom_claims:
-                            user_dict["custom_claims"] = user.custom_claims
-                        else:
-                            user_dict["custom_claims"] = None
-                        
-                        # Handle provider data
-                        if hasattr(user, 'provider_data') and user.provider_data:
-                            user_dict["provider_data"] = [
-                                {
-                                    "uid": pd.uid if hasattr(pd, 'uid') else None,
-                                    "email": pd.email if hasattr(pd, 'email') else None,
-                                    "display_name": pd.display_name if hasattr(pd, 'display_name') else None,
-                                    "photo_url": pd.photo_url if hasattr(pd, 'photo_url') else None,
-                                    "provider_id": pd.provider_id if hasattr(pd, 'provider_id') else None,
-                                }
-                                for pd in user.provider_data
-                            ]
-                        else:
-                            user_dict["provider_data"] = []
-                        
-                        users.append(user_dict)
-                        logger.debug(f"Processed user {user_count}: {user.uid}")
-                        
-                    except Exception as user_error:
-                        logger.warning(f"Error processing user {user.uid if hasattr(user, 'uid') else 'unknown'}: {user_error}", exc_info=True)
-                        # Continue with next user
-                        continue
-                
-                logger.info(f"Backed up {len(users)} Firebase Auth users (processed {user_count} total via direct method)")
-                
-            except StopIteration:
-                logger.info(f"Finished iterating users. Backed up {len(users)} Firebase Auth users")
-            except Exception as iter_error:
-                logger.error(f"Error during user iteration: {iter_error}", exc_info=True)
-                # Return what we have so far
-                if users:
-                    logger.warning(f"Returning {len(users)} users that were successfully backed up before error")
-            
-            if not users:
-                logger.warning("No Firebase Auth users were backed up. This might indicate:")
-                logger.warning("  1. There are no users in Firebase Auth")
-                logger.warning("  2. There's an authentication/permissions issue")
-                logger.warning("  3. The Firebase Admin SDK is not properly configured")
-            
-            return users
-            
-        except Exception as e:
-            logger.error(f"Error backing up Firebase Auth users: {e}", exc_info=True)
-            return []
+        page = self._auth.list_users(max_results=AUTH_LIST_PAGE_SIZE)
+        while page:
+            for user in page.users:
+                try:
+                    spool.write(self._serialize_auth_user(user))
+                except Exception as user_error:
+                    logger.warning(f"Error processing user {getattr(user, 'uid', 'unknown')}: {user_error}")
+            if on_page:
+                on_page(spool.count)
+            page = page.get_next_page()
+        
+        if spool.count == 0:
+            logger.warning("No Firebase Auth users were backed up (no users, or a permissions issue)")
+        logger.info(f"Backed up {spool.count} Firebase Auth users")
+        return None
     
-    def _create_backup_metadata(self, collections_data: Dict[str, List[dict]]) -> dict:
-        """Create backup metadata."""
-        metadata = {
-            "backup_timestamp": datetime.utcnow().isoformat() + "Z",
-            "backup_version": "1.0",
-            "collections": {},
-            "errors": [],
-        }
+    def _get_backup_plan(self) -> List[Tuple[str, Callable]]:
+        """Get (entry name, backup function) pairs for everything included in a backup."""
+        return [
+            ("firebase_auth_users", self._backup_firebase_auth_users),
+            (FIRESTORE_USER_LICENSES_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_USER_LICENSES_COLLECTION, spool, since, on_page)),
+            ("user_devices",
+             lambda spool, since, on_page: self._backup_subcollection(FIRESTORE_USER_LICENSES_COLLECTION, "user_devices", spool, since, on_page)),
+            (FIRESTORE_LICENSE_TIERS_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_LICENSE_TIERS_COLLECTION, spool, since, on_page)),
+            (FIRESTORE_APP_UPDATES_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_APP_UPDATES_COLLECTION, spool, since, on_page)),
+            (FIRESTORE_NOTIFICATIONS_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_NOTIFICATIONS_COLLECTION, spool, since, on_page)),
+            ("user_notifications",
+             lambda spool, since, on_page: self._backup_subcollection(FIRESTORE_USER_NOTIFICATIONS_COLLECTION, "notifications", spool, since, on_page)),
+            (FIRESTORE_SCHEDULED_DELETIONS_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION, spool, since, on_page)),
+            (FIRESTORE_USER_ACTIVITIES_COLLECTION,
+             lambda spool, since, on_page: self._backup_firestore_collection(FIRESTORE_USER_ACTIVITIES_COLLECTION, spool, since, on_page)),
+        ]
+    
+    def read_backup_watermarks(self, backup_path: str) -> Dict[str, str]:
+        """
+        Read the per-collection updated_at watermarks recorded in an existing backup.
         
-        for collection_name, data in collections_data.items():
-            status = "success"
-            if data is None:
-                status = "error"
-                metadata["errors"].append(f"Failed to backup {collection_name}")
-            
-            metadata["collections"][collection_name] = {
-                "count": len(data) if data else 0,
-                "status": status,
-            }
+        Args:
+            backup_path: Path to a backup ZIP created by this service
         
-        return metadata
-    
-    def _create_zip_file(
-        self, 
-        data_files: Dict[str, List[dict]], 
-        output_path: str
-    ) -> bool:
-        """Create ZIP file with all backup data."""
+        Returns:
+            Dict of collection name to ISO watermark (empty if the backup has none)
+        """
         try:
-            output_path = Path(output_path)
-            
-            # Ensure output directory exists
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add each collection as a JSON file
-                for collection_name, data in data_files.items():
-                    if data is None:
-                        # Create empty array for failed collections
-                        data = []
-                    
-                    json_content = json.dumps(data, indent=2, ensure_ascii=False)
-                    json_filename = f"{collection_name}.json"
-                    zipf.writestr(json_filename, json_content.encode('utf-8'))
-                    logger.debug(f"Added {json_filename} to backup ZIP")
-            
-            logger.info(f"Created backup ZIP file: {output_path}")
-            return True
-            
+            with zipfile.ZipFile(backup_path, 'r') as zipf:
+                metadata = json.loads(zipf.read(BACKUP_METADATA_ENTRY).decode("utf-8"))
+            if isinstance(metadata, list):
+                metadata = metadata[0] if metadata else {}
+            watermarks = metadata.get("watermarks") or {}
+            return {name: value for name, value in watermarks.items() if isinstance(value, str) and value}
         except Exception as e:
-            logger.error(f"Error creating ZIP file: {e}", exc_info=True)
-            return False
+            logger.error(f"Error reading backup watermarks from {backup_path}: {e}", exc_info=True)
+            return {}
+    
+    @staticmethod
+    def _next_watermarks(
+        since: Dict[str, str],
+        results: Dict[str, Tuple[_NdjsonSpool, Optional[str], float, Optional[str]]]
+    ) -> Dict[str, str]:
+        """
+        Get the watermarks the next incremental backup starts from.
+        
+        A collection's watermark only advances when it was backed up successfully;
+        a failed collection keeps its previous watermark so its changes are retried.
+        """
+        watermarks = {}
+        for collection_name in INCREMENTAL_COLLECTIONS:
+            previous = since.get(collection_name)
+            result = results.get(collection_name)
+            watermark = previous
+            if result is not None and not result[3] and result[1] is not None:
+                watermark = max(result[1], previous) if previous else result[1]
+            if watermark:
+                watermarks[collection_name] = watermark
+        return watermarks
     
     def backup_all_collections(
-        self, 
+        self,
         output_path: str,
-        progress_callback: Optional[Any] = None
+        progress_callback: Optional[Any] = None,
+        since: Optional[Dict[str, str]] = None
     ) -> Tuple[bool, dict]:
         """
         Backup all Firebase collections and Auth users to a ZIP file.
         
         Args:
             output_path: Path to save the backup ZIP file
-            progress_callback: Optional callback function(collection_name, status)
+            progress_callback: Optional callback function(collection_name, status, count)
+                where status is "starting", "progress", "completed", "error",
+                "creating_zip" (count is the number of documents written so far)
+            since: Incremental mode - per-collection watermarks (see
+                read_backup_watermarks). Collections in INCREMENTAL_COLLECTIONS
+                that have a watermark only get documents updated after it; the
+                rest are backed up in full. Deletions are not captured.
         
         Returns:
             Tuple of (success: bool, metadata: dict)
@@ -368,62 +391,103 @@ class AdminBackupService:
             logger.error("Firebase not initialized, cannot perform backup")
             return False, {}
         
-        logger.info("Starting Firebase backup...")
+        incremental = since is not None
+        since = dict(since or {})
         
-        collections_data = {}
-        all_collections = [
-            ("firebase_auth_users", self._backup_firebase_auth_users),
-            (FIRESTORE_USER_LICENSES_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_USER_LICENSES_COLLECTION)),
-            ("user_devices", lambda: self._backup_subcollection(FIRESTORE_USER_LICENSES_COLLECTION, "user_devices")),
-            (FIRESTORE_LICENSE_TIERS_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_LICENSE_TIERS_COLLECTION)),
-            (FIRESTORE_APP_UPDATES_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_APP_UPDATES_COLLECTION)),
-            (FIRESTORE_NOTIFICATIONS_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_NOTIFICATIONS_COLLECTION)),
-            ("user_notifications", lambda: self._backup_subcollection(FIRESTORE_USER_NOTIFICATIONS_COLLECTION, "notifications")),
-            (FIRESTORE_SCHEDULED_DELETIONS_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION)),
-            (FIRESTORE_USER_ACTIVITIES_COLLECTION, lambda: self._backup_firestore_collection(FIRESTORE_USER_ACTIVITIES_COLLECTION)),
-        ]
+        logger.info(f"Starting {'incremental' if incremental else 'full'} Firebase backup...")
+        started = datetime.utcnow()
         
-        # Backup each collection
-        for collection_name, backup_func in all_collections:
-            if progress_callback:
-                progress_callback(collection_name, "starting")
-            
+        def report(collection_name: str, status: str, count: int = 0):
+            if not progress_callback:
+                return
             try:
-                data = backup_func()
-                collections_data[collection_name] = data
-                
-                if progress_callback:
-                    progress_callback(collection_name, "completed")
-                    
+                progress_callback(collection_name, status, count)
             except Exception as e:
-                logger.error(f"Error backing up {collection_name}: {e}", exc_info=True)
-                collections_data[collection_name] = None
-                
-                if progress_callback:
-                    progress_callback(collection_name, "error")
+                logger.error(f"Error in backup progress callback: {e}")
         
-        # Create metadata
-        metadata = self._create_backup_metadata(collections_data)
-        collections_data["backup_metadata"] = [metadata]
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        spool_dir = Path(tempfile.mkdtemp(prefix=".backup_", dir=output_path.parent))
         
-        # Create ZIP file
-        if progress_callback:
-            progress_callback("backup_metadata", "creating_zip")
+        metadata = {
+            "backup_timestamp": started.isoformat() + "Z",
+            "backup_version": BACKUP_FORMAT_VERSION,
+            "format": "ndjson",
+            "mode": "incremental" if incremental else "full",
+            "since": since or None,
+            "watermarks": {},
+            "collections": {},
+            "errors": [],
+        }
+        results: Dict[str, Tuple[_NdjsonSpool, Optional[str], float, Optional[str]]] = {}
+        results_lock = threading.Lock()
         
-        success = self._create_zip_file(collections_data, output_path)
+        def run(collection_name: str, backup_func: Callable):
+            spool = _NdjsonSpool(spool_dir / f"{collection_name}.ndjson")
+            report(collection_name, "starting")
+            start_time = time.monotonic()
+            watermark, error = None, None
+            collection_since = since.get(collection_name) if collection_name in INCREMENTAL_COLLECTIONS else None
+            try:
+                watermark = backup_func(spool, collection_since, lambda count: report(collection_name, "progress", count))
+                report(collection_name, "completed", spool.count)
+            except Exception as e:
+                logger.error(f"Error backing up {collection_name}: {e}", exc_info=True)
+                error = str(e)
+                report(collection_name, "error", spool.count)
+            finally:
+                spool.close()
+            with results_lock:
+                results[collection_name] = (spool, watermark, time.monotonic() - start_time, error)
         
-        if success:
+        success = False
+        try:
+            plan = self._get_backup_plan()
+            with ThreadPoolExecutor(max_workers=BACKUP_MAX_WORKERS, thread_name_prefix="backup") as executor:
+                for collection_name, backup_func in plan:
+                    executor.submit(run, collection_name, backup_func)
+            
+            # Build metadata
+            for collection_name, _ in plan:
+                spool, watermark, duration, error = results[collection_name]
+                if error:
+                    metadata["errors"].append(f"Failed to backup {collection_name}: {error}")
+                metadata["collections"][collection_name] = {
+                    "file": f"{collection_name}.ndjson",
+                    "count": spool.count,
+                    "bytes": spool.bytes,
+                    "sha256": spool.checksum,
+                    "status": "error" if error else "success",
+                    "watermark": watermark,
+                    "duration_seconds": round(duration, 3),
+                }
+            metadata["watermarks"] = self._next_watermarks(since, results)
+            
+            # Copy spools into the ZIP one entry at a time, then move it into place
+            report("backup_metadata", "creating_zip")
+            partial_path = output_path.with_name(output_path.name + ".part")
+            with zipfile.ZipFile(partial_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for collection_name, _ in plan:
+                    spool = results[collection_name][0]
+                    with open(spool.path, "rb") as source, zipf.open(f"{collection_name}.ndjson", "w", force_zip64=True) as entry:
+                        shutil.copyfileobj(source, entry, 1024 * 1024)
+                zipf.writestr(BACKUP_METADATA_ENTRY, json.dumps([metadata], indent=2, ensure_ascii=False).encode("utf-8"))
+            partial_path.replace(output_path)
+            success = True
+            
             logger.info(f"Backup completed successfully: {output_path}")
-            if progress_callback:
-                progress_callback("backup_metadata", "completed")
-        else:
-            logger.error("Failed to create backup ZIP file")
-            if progress_callback:
-                progress_callback("backup_metadata", "error")
+            report("backup_metadata", "completed")
+        
+        except Exception as e:
+            logger.error(f"Error creating backup ZIP file: {e}", exc_info=True)
+            metadata["errors"].append(str(e))
+            report("backup_metadata", "error")
+        
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
         
         return success, metadata
 
 
 # Global admin backup service instance
 admin_backup_service = AdminBackupService()
-
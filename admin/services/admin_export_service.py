@@ -109,10 +109,11 @@ class AdminExportService:
             story.append(date_para)
             story.append(Spacer(1, 0.3*inch))
             
-            # Get stats
-            user_stats = admin_analytics_service.get_user_stats()
-            license_stats = admin_analytics_service.get_license_stats()
-            device_stats = admin_analytics_service.get_device_stats()
+            # Get stats (one snapshot for all sections)
+            snapshot = admin_analytics_service.get_snapshot()
+            user_stats = snapshot["user_stats"]
+            license_stats = snapshot["license_stats"]
+            device_stats = snapshot["device_stats"]
             
             # User Stats
             story.append(Paragraph("User Statistics", styles['Heading2']))
@@ -71,6 +71,24 @@ class AdminLicenseService:
             logger.error(f"Error getting license for {uid}: {e}", exc_info=True)
             return None
     
+    def _invalidate_user_cache(self, uid: str) -> None:
+        """Drop the admin user list's cached join for a user after a license write."""
+        try:
+            # Lazy import to avoid circular dependency
+            from admin.services.admin_user_service import admin_user_service
+            admin_user_service.invalidate_user_cache(uid)
+        except Exception as e:
+            logger.debug(f"Could not invalidate user cache for {uid}: {e}")
+    
+    def _discard_from_analytics(self, uid: str) -> None:
+        """Remove a deleted license from the analytics snapshot."""
+        try:
+            # Lazy import to avoid circular dependency
+            from admin.services.admin_analytics_service import admin_analytics_service
+            admin_analytics_service.discard_license(uid)
+        except Exception as e:
+            logger.debug(f"Could not update analytics snapshot for {uid}: {e}")
+    
     def get_tier_definition(self, tier_key: str) -> Optional[dict]:
         """Get tier definition from Firestore."""
         try:
@@ -120,6 +138,7 @@ class AdminLicenseService:
             
             # Set defaults
             license_data.setdefault("created_at", datetime.utcnow().isoformat() + "Z")
+            license_data["updated_at"] = datetime.utcnow().isoformat() + "Z"
             license_data.setdefault("active_devices", [])
             license_data.setdefault("max_devices", 1)
             license_data.setdefault("max_groups", 1)
@@ -127,6 +146,7 @@ class AdminLicenseService:
             
             doc_ref = self._db.collection(FIRESTORE_USER_LICENSES_COLLECTION).document(uid)
             doc_ref.set(license_data)
+            self._invalidate_user_cache(uid)
             
             logger.info(f"License created for user: {uid}")
             return True
@@ -153,6 +173,8 @@ class AdminLicenseService:
             
             # Handle expiration_date deletion (None means delete field for lifetime license)
             update_data = license_data.copy()
+            # Watermark for incremental analytics refresh
+            update_data["updated_at"] = datetime.utcnow().isoformat() + "Z"
             if "expiration_date" in update_data and update_data["expiration_date"] is None:
                 if DELETE_FIELD is not None:
                     update_data["expiration_date"] = DELETE_FIELD
@@ -164,6 +186,7 @@ class AdminLicenseService:
             
             doc_ref = self._db.collection(FIRESTORE_USER_LICENSES_COLLECTION).document(uid)
             doc_ref.update(update_data)
+            self._invalidate_user_cache(uid)
             
             logger.info(f"License updated for user: {uid}")
             return True
@@ -180,6 +203,8 @@ class AdminLicenseService:
         try:
             doc_ref = self._db.collection(FIRESTORE_USER_LICENSES_COLLECTION).document(uid)
             doc_ref.delete()
+            self._invalidate_user_cache(uid)
+            self._discard_from_analytics(uid)
             
             logger.info(f"License deleted for user: {uid}")
             return True
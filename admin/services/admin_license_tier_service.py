@@ -6,10 +6,14 @@ import json
 import logging
 import re
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from datetime import datetime
 from admin.config.admin_config import admin_config
-from admin.utils.constants import FIRESTORE_LICENSE_TIERS_COLLECTION
+from admin.utils.bulk_writer import FirestoreBulkWriter
+from admin.utils.constants import (
+    FIRESTORE_LICENSE_TIERS_COLLECTION,
+    FIRESTORE_USER_LICENSES_COLLECTION
+)
 
 logger = logging.getLogger(__name__)
 
@@ -195,31 +199,57 @@ class AdminLicenseTierService:
         logger.warning("sync_tiers_from_constants() is deprecated - license tiers are now managed in the admin app")
         return False
     
-    def update_existing_licenses(self, tier_key: str, tier_data: dict) -> int:
-        """Update all user licenses using this tier with new tier values."""
+    def update_existing_licenses(
+        self,
+        tier_key: str,
+        tier_data: dict,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Update all user licenses using this tier with new tier values.
+        
+        Licenses are selected with a single tier query and rewritten through
+        the batched bulk writer rather than one update per license.
+        
+        Args:
+            tier_key: Tier whose licenses should be updated
+            tier_data: New tier values (max_groups, max_devices, max_accounts)
+            progress_callback: Optional callback(written, total)
+        
+        Returns:
+            Number of licenses updated
+        """
         if not self._ensure_initialized():
             return 0
         
         try:
-            from admin.services.admin_license_service import admin_license_service
-            licenses = admin_license_service.get_all_licenses()
+            update_data = {
+                key: tier_data[key]
+                for key in ("max_groups", "max_devices", "max_accounts")
+                if tier_data.get(key) is not None
+            }
+            if not update_data:
+                return 0
+            update_data["updated_at"] = datetime.utcnow().isoformat() + "Z"
+            
+            docs = (
+                self._db.collection(FIRESTORE_USER_LICENSES_COLLECTION)
+                .where("tier", "==", tier_key)
+                .select([])
+                .stream()
+            )
+            writer = FirestoreBulkWriter(self._db, progress_callback=progress_callback)
+            for doc in docs:
+                writer.update(doc.reference, update_data)
+            
+            result = writer.commit()
+            
+            if result.total:
+                from admin.services.admin_user_service import admin_user_service
+                admin_user_service.invalidate_user_cache()
             
-            updated_count = 0
-            for license_data in licenses:
-                if license_data.get("tier") == tier_key:
-                    # Update license with new tier values
-                    update_data = {
-                        "max_groups": tier_data.get("max_groups", license_data.get("max_groups")),
-                        "max_devices": tier_data.get("max_devices", license_data.get("max_devices")),
-                        "max_accounts": tier_data.get("max_accounts", license_data.get("max_accounts")),
-                    }
-                    
-                    uid = license_data.get("uid")
-                    if uid and admin_license_service.update_license(uid, update_data):
-                        updated_count += 1
-            
-            logger.info(f"Updated {updated_count} licenses for tier {tier_key}")
-            return updated_count
+            logger.info(f"Updated {result.succeeded}/{result.total} licenses for tier {tier_key}")
+            return result.succeeded
             
         except Exception as e:
             logger.error(f"Error updating existing licenses for tier {tier_key}: {e}", exc_info=True)
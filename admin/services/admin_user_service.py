@@ -2,14 +2,37 @@
 Admin user management service.
 """
 
+import copy
 import logging
-from typing import List, Optional, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import List, Optional, Dict, Iterable, Tuple
 from datetime import datetime, timedelta
 from admin.config.admin_config import admin_config
-from admin.utils.constants import FIRESTORE_SCHEDULED_DELETIONS_COLLECTION
+from admin.utils.bulk_writer import FirestoreBulkWriter
+from admin.utils.constants import (
+    FIRESTORE_SCHEDULED_DELETIONS_COLLECTION,
+    FIRESTORE_USER_LICENSES_COLLECTION,
+    DEFAULT_PAGE_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
+# How long joined license/scheduled-deletion documents are reused (writes invalidate earlier)
+USER_JOIN_CACHE_TTL_SECONDS = 120
+# Document references per get_all() call
+FIRESTORE_GET_ALL_CHUNK_SIZE = 300
+# Parallel get_all() calls across collections and chunks
+FIRESTORE_READ_WORKERS = 4
+# Firebase Auth delete_users() accepts at most 1000 uids per call
+AUTH_DELETE_BATCH_SIZE = 1000
+
+
+def _copy(document: Optional[dict]) -> Optional[dict]:
+    """Deep copy of a cached document (None stays None)."""
+    return copy.deepcopy(document) if document is not None else None
+
 
 class AdminUserService:
     """Handles user CRUD operations."""
@@ -17,6 +40,9 @@ class AdminUserService:
     def __init__(self):
         self._auth = None
         self._db = None
+        # uid -> (cached_at, license dict or None, scheduled deletion dict or None)
+        self._join_cache: Dict[str, Tuple[float, Optional[dict], Optional[dict]]] = {}
+        self._cache_lock = Lock()
     
     def _ensure_initialized(self) -> bool:
         """Ensure Firebase is initialized."""
@@ -28,54 +54,20 @@ class AdminUserService:
         return self._auth is not None and self._db is not None
     
     def get_all_users(self) -> List[dict]:
-        """List all Firebase users."""
+        """
+        List all Firebase users joined with license and scheduled deletion info.
+        Auth pages are joined in bulk (two batched Firestore reads per page).
+        """
         if not self._ensure_initialized():
             logger.error("Firebase not initialized")
             return []
         
         try:
             users = []
-            # List users (Firebase Auth has pagination, but we'll get first batch)
-            # Note: list_users() returns an iterator, we'll convert to list
             page = self._auth.list_users()
-            for user in page.iterate_all():
-                user_dict = {
-                    "uid": user.uid,
-                    "email": user.email,
-                    "display_name": user.display_name,
-                    "email_verified": user.email_verified,
-                    "disabled": user.disabled,
-                    "created_at": user.user_metadata.creation_timestamp,
-                    "last_sign_in": user.user_metadata.last_sign_in_timestamp,
-                }
-                # Get license info (lazy import to avoid circular dependency)
-                try:
-                    from admin.services.admin_license_service import admin_license_service
-                    license_data = admin_license_service.get_license(user.uid)
-                    if license_data:
-                        user_dict["license_tier"] = license_data.get("tier", "none")
-                        user_dict["license_expires"] = license_data.get("expiration_date")
-                    else:
-                        user_dict["license_tier"] = "none"
-                        user_dict["license_expires"] = None
-                except Exception:
-                    user_dict["license_tier"] = "none"
-                    user_dict["license_expires"] = None
-                
-                # Get scheduled deletion info
-                try:
-                    scheduled_deletion = self.get_scheduled_deletion(user.uid)
-                    if scheduled_deletion:
-                        user_dict["scheduled_deletion_date"] = scheduled_deletion.get("deletion_date")
-                        user_dict["scheduled_deletion"] = scheduled_deletion
-                    else:
-                        user_dict["scheduled_deletion_date"] = None
-                        user_dict["scheduled_deletion"] = None
-                except Exception:
-                    user_dict["scheduled_deletion_date"] = None
-                    user_dict["scheduled_deletion"] = None
-                
-                users.append(user_dict)
+            while page:
+                users.extend(self._join_users(page.users))
+                page = page.get_next_page()
             
             logger.info(f"Retrieved {len(users)} users")
             return users
@@ -84,6 +76,134 @@ class AdminUserService:
             logger.error(f"Error getting all users: {e}", exc_info=True)
             return []
     
+    def get_users_page(
+        self,
+        page_token: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get one page of users using Firebase Auth cursors.
+        
+        Args:
+            page_token: Cursor returned by the previous call (None for first page)
+            page_size: Number of users per page (max 1000)
+        
+        Returns:
+            Tuple of (joined user dicts, next page token or None when exhausted)
+        """
+        if not self._ensure_initialized():
+            logger.error("Firebase not initialized")
+            return [], None
+        
+        try:
+            page = self._auth.list_users(page_token=page_token, max_results=min(page_size, 1000))
+            return self._join_users(page.users), page.next_page_token or None
+        except Exception as e:
+            logger.error(f"Error getting users page: {e}", exc_info=True)
+            return [], None
+    
+    def invalidate_user_cache(self, uid: Optional[str] = None) -> None:
+        """
+        Drop cached license/scheduled deletion joins.
+        
+        Args:
+            uid: User to invalidate (None clears everything)
+        """
+        with self._cache_lock:
+            if uid is None:
+                self._join_cache.clear()
+            else:
+                self._join_cache.pop(uid, None)
+    
+    def _join_users(self, auth_users: Iterable) -> List[dict]:
+        """Join a batch of Firebase Auth users with their Firestore documents."""
+        auth_users = list(auth_users)
+        joined = self._get_user_joins([user.uid for user in auth_users])
+        return [
+            self._build_user_dict(user, *joined.get(user.uid, (None, None)))
+            for user in auth_users
+        ]
+    
+    def _get_user_joins(self, uids: List[str]) -> Dict[str, Tuple[Optional[dict], Optional[dict]]]:
+        """
+        Get (license, scheduled deletion) for many users, from cache or in bulk.
+        Missing documents are fetched with parallel get_all() calls.
+        """
+        now = time.monotonic()
+        result: Dict[str, Tuple[Optional[dict], Optional[dict]]] = {}
+        missing = []
+        with self._cache_lock:
+            for uid in uids:
+                cached = self._join_cache.get(uid)
+                if cached and now - cached[0] < USER_JOIN_CACHE_TTL_SECONDS:
+                    result[uid] = (_copy(cached[1]), _copy(cached[2]))
+                else:
+                    missing.append(uid)
+        
+        if not missing:
+            return result
+        
+        try:
+            licenses, deletions = self._get_documents_bulk(
+                [FIRESTORE_USER_LICENSES_COLLECTION, FIRESTORE_SCHEDULED_DELETIONS_COLLECTION],
+                missing
+            )
+        except Exception as e:
+            logger.error(f"Error bulk-loading user licenses/deletions: {e}", exc_info=True)
+            licenses, deletions = {}, {}
+        
+        with self._cache_lock:
+            for uid in missing:
+                license_data = licenses.get(uid)
+                if license_data is not None:
+                    license_data["uid"] = uid
+                deletion = deletions.get(uid)
+                self._join_cache[uid] = (now, license_data, deletion)
+                # Callers get copies so edits to a returned row never leak into the cache
+                result[uid] = (_copy(license_data), _copy(deletion))
+        return result
+    
+    def _get_documents_bulk(self, collections: List[str], doc_ids: List[str]) -> List[Dict[str, dict]]:
+        """
+        Fetch documents with the same IDs from several collections in parallel.
+        
+        Returns:
+            One {doc_id: data} dict per collection (absent documents are omitted)
+        """
+        jobs = []
+        for index, collection in enumerate(collections):
+            collection_ref = self._db.collection(collection)
+            for start in range(0, len(doc_ids), FIRESTORE_GET_ALL_CHUNK_SIZE):
+                refs = [collection_ref.document(doc_id) for doc_id in doc_ids[start:start + FIRESTORE_GET_ALL_CHUNK_SIZE]]
+                jobs.append((index, refs))
+        
+        def fetch(refs):
+            return [(snap.id, snap.to_dict()) for snap in self._db.get_all(refs) if snap.exists]
+        
+        results: List[Dict[str, dict]] = [{} for _ in collections]
+        with ThreadPoolExecutor(max_workers=FIRESTORE_READ_WORKERS) as executor:
+            futures = [(index, executor.submit(fetch, refs)) for index, refs in jobs]
+            for index, future in futures:
+                results[index].update(future.result())
+        return results
+    
+    @staticmethod
+    def _build_user_dict(user, license_data: Optional[dict], scheduled_deletion: Optional[dict]) -> dict:
+        """Build the user list row from an Auth user and its joined documents."""
+        return {
+            "uid": user.uid,
+            "email": user.email,
+            "display_name": user.display_name,
+            "email_verified": user.email_verified,
+            "disabled": user.disabled,
+            "created_at": user.user_metadata.creation_timestamp,
+            "last_sign_in": user.user_metadata.last_sign_in_timestamp,
+            "license_tier": license_data.get("tier", "none") if license_data else "none",
+            "license_expires": license_data.get("expiration_date") if license_data else None,
+            "scheduled_deletion_date": scheduled_deletion.get("deletion_date") if scheduled_deletion else None,
+            "scheduled_deletion": scheduled_deletion,
+        }
+    
     def get_user(self, uid: str) -> Optional[dict]:
         """Get user by UID."""
         if not self._ensure_initialized():
@@ -182,6 +302,7 @@ class AdminUserService:
         
         try:
             self._auth.delete_user(uid)
+            self.invalidate_user_cache(uid)
             logger.info(f"User deleted: {uid}")
             return True
             
@@ -241,6 +362,7 @@ class AdminUserService:
             
             doc_ref = self._db.collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION).document(uid)
             doc_ref.set(deletion_data)
+            self.invalidate_user_cache(uid)
             
             logger.info(f"User deletion scheduled: {uid} for {deletion_date}")
             return deletion_date
@@ -291,6 +413,7 @@ class AdminUserService:
         try:
             doc_ref = self._db.collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION).document(uid)
             doc_ref.delete()
+            self.invalidate_user_cache(uid)
             
             logger.info(f"Scheduled deletion cancelled for user: {uid}")
             return True
@@ -314,8 +437,9 @@ class AdminUserService:
             now = datetime.utcnow()
             deleted_count = 0
             
-            # Get all scheduled deletions
+            # Collect due deletions
             docs = self._db.collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION).where("status", "==", "scheduled").stream()
+            due = []  # (uid, document reference)
             
             for doc in docs:
                 data = doc.to_dict()
@@ -337,26 +461,37 @@ class AdminUserService:
                 
                 # Check if deletion is due
                 if deletion_date <= now:
-                    try:
-                        # Disable user first
-                        self.update_user(uid, disabled=True)
-                        
-                        # Delete user
-                        if self.delete_user(uid):
-                            # Update deletion status
-                            doc.reference.update({"status": "completed", "executed_at": datetime.utcnow()})
-                            deleted_count += 1
-                            logger.info(f"Executed scheduled deletion for user: {uid}")
-                        else:
-                            logger.error(f"Failed to delete user {uid} during scheduled deletion")
-                            doc.reference.update({"status": "failed", "error": "Delete operation failed"})
-                    
-                    except Exception as e:
-                        logger.error(f"Error executing scheduled deletion for {uid}: {e}", exc_info=True)
-                        try:
-                            doc.reference.update({"status": "failed", "error": str(e)})
-                        except Exception:
-                            pass
+                    due.append((uid, doc.reference))
+            
+            if not due:
+                return 0
+            
+            # Delete Auth users in batches (deleted accounts cannot sign in, so no separate disable step)
+            errors: Dict[str, str] = {}
+            for i in range(0, len(due), AUTH_DELETE_BATCH_SIZE):
+                chunk = due[i:i + AUTH_DELETE_BATCH_SIZE]
+                try:
+                    result = self._auth.delete_users([uid for uid, _ in chunk])
+                    for error in result.errors:
+                        errors[chunk[error.index][0]] = error.reason
+                except Exception as e:
+                    logger.error(f"Error deleting batch of {len(chunk)} scheduled users: {e}", exc_info=True)
+                    for uid, _ in chunk:
+                        errors[uid] = str(e)
+            
+            # Record outcomes in one bulk write
+            executed_at = datetime.utcnow()
+            writer = FirestoreBulkWriter(self._db)
+            for uid, doc_ref in due:
+                if uid in errors:
+                    logger.error(f"Failed to delete user {uid} during scheduled deletion: {errors[uid]}")
+                    writer.update(doc_ref, {"status": "failed", "error": errors[uid]})
+                else:
+                    writer.update(doc_ref, {"status": "completed", "executed_at": executed_at})
+                    deleted_count += 1
+                    logger.info(f"Executed scheduled deletion for user: {uid}")
+            writer.commit()
+            self.invalidate_user_cache()
             
             if deleted_count > 0:
                 logger.info(f"Executed {deleted_count} scheduled user deletions")
@@ -3,12 +3,19 @@ Generic data table component for admin interface.
 """
 
 import flet as ft
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Tuple
 from admin.utils.constants import DEFAULT_PAGE_SIZE
 
 
 class DataTable(ft.Container):
-    """Generic data table with pagination and search."""
+    """
+    Generic data table with pagination and search.
+    
+    When a page_loader is given, rows are fetched lazily: the table starts with
+    the first batch and calls page_loader(next_cursor) when paging past the
+    loaded rows. Searching or sorting first loads the remaining batches, since
+    the source (e.g. Firebase Auth) cannot search or sort server-side.
+    """
     
     # Dark theme colors
     BG_COLOR = "#1e1e1e"
@@ -26,6 +33,8 @@ class DataTable(ft.Container):
         on_row_click: Optional[Callable[[Dict], None]] = None,
         actions: Optional[List[Dict]] = None,  # [{"label": "Edit", "icon": ft.Icons.EDIT, "on_click": func}]
         cell_renderers: Optional[Dict[str, Callable]] = None,  # {"type": lambda row: ft.Container(...)}
+        page_loader: Optional[Callable[[Optional[str]], Tuple[List[Dict], Optional[str]]]] = None,
+        next_cursor: Optional[str] = None,  # Cursor for page_loader after the initial data
     ):
         self.columns = columns
         self.data = data
@@ -33,6 +42,8 @@ class DataTable(ft.Container):
         self.on_row_click = on_row_click
         self.actions = actions or []
         self.cell_renderers = cell_renderers or {}
+        self.page_loader = page_loader
+        self.next_cursor = next_cursor
         self.current_page = 0
         self.search_query = ""
         
@@ -85,6 +96,8 @@ class DataTable(ft.Container):
     def _on_search(self, e: ft.ControlEvent):
         """Handle search input."""
         self.search_query = e.control.value.lower()
+        if self.search_query:
+            self._load_all()
         self._filter_data()
         self.current_page = 0
         self._update_table()
@@ -124,7 +137,11 @@ class DataTable(ft.Container):
         
         # Reset to first page and update table
         self.current_page = 0
-        self._sort_data()
+        if self.sort_column and self._load_all():
+            # Filters and sorts the newly loaded rows too
+            self._filter_data()
+        else:
+            self._sort_data()
         self._update_table()
     
     def _sort_data(self):
@@ -308,15 +325,54 @@ class DataTable(ft.Container):
             border=ft.border.all(1, self.BORDER_COLOR),
         )
     
+    @property
+    def has_more(self) -> bool:
+        """Whether more rows can be fetched through the page loader."""
+        return self.page_loader is not None and self.next_cursor is not None
+    
+    def _load_more(self) -> bool:
+        """
+        Fetch the next batch of rows through the page loader.
+        
+        Returns:
+            True if rows were appended
+        """
+        if not self.has_more:
+            return False
+        rows, self.next_cursor = self.page_loader(self.next_cursor)
+        if not rows:
+            return False
+        self.data.extend(rows)
+        self._filter_data()
+        return True
+    
+    def _load_all(self) -> bool:
+        """
+        Fetch every remaining batch through the page loader (without filtering).
+        
+        Returns:
+            True if rows were appended
+        """
+        loaded = False
+        while self.has_more:
+            rows, self.next_cursor = self.page_loader(self.next_cursor)
+            if not rows:
+                break
+            self.data.extend(rows)
+            loaded = True
+        return loaded
+    
     def _create_pagination(self) -> ft.Row:
         """Create pagination controls."""
         start_idx = self.current_page * self.page_size
         end_idx = min(start_idx + self.page_size, len(self.filtered_data))
+        total_label = f"{len(self.filtered_data)}+" if self.has_more else str(len(self.filtered_data))
+        can_go_next = self.current_page < self.total_pages - 1 or self.has_more
         
         return ft.Row(
             controls=[
                 ft.Text(
-                    f"Showing {start_idx + 1}-{end_idx} of {len(self.filtered_data)}",
+                    f"Showing {start_idx + 1}-{end_idx} of {total_label}",
                     color=self.TEXT_SECONDARY,
                 ),
                 ft.Row(
@@ -328,13 +384,13 @@ class DataTable(ft.Container):
                             on_click=self._prev_page,
                         ),
                         ft.Text(
-                            f"Page {self.current_page + 1} of {self.total_pages}",
+                            f"Page {self.current_page + 1} of {self.total_pages}{'+' if self.has_more else ''}",
                             color=self.TEXT_COLOR,
                         ),
                         ft.IconButton(
                             icon=ft.Icons.CHEVRON_RIGHT,
-                            icon_color=self.TEXT_COLOR if self.current_page < self.total_pages - 1 else self.TEXT_SECONDARY,
-                            disabled=self.current_page >= self.total_pages - 1,
+                            icon_color=self.TEXT_COLOR if can_go_next else self.TEXT_SECONDARY,
+                            disabled=not can_go_next,
                             on_click=self._next_page,
                         ),
                     ],
@@ -351,7 +407,9 @@ class DataTable(ft.Container):
             self._update_table()
     
     def _next_page(self, e: ft.ControlEvent):
-        """Go to next page."""
+        """Go to next page (fetching the next batch when past the loaded rows)."""
+        if self.current_page >= self.total_pages - 1:
+            self._load_more()
         if self.current_page < self.total_pages - 1:
             self.current_page += 1
             self._update_table()
@@ -374,9 +432,10 @@ class DataTable(ft.Container):
         self.content.controls[2] = self.pagination_controls
         self.update()
     
-    def refresh_data(self, new_data: List[Dict]):
-        """Refresh table with new data."""
+    def refresh_data(self, new_data: List[Dict], next_cursor: Optional[str] = None):
+        """Refresh table with new data (and the page loader cursor that follows it)."""
         self.data = new_data
+        self.next_cursor = next_cursor
         self._filter_data()
         self.current_page = 0
         self._update_table()
@@ -3,11 +3,14 @@ Admin bulk operations page.
 """
 
 import flet as ft
+import logging
 import threading
 from datetime import datetime
 from pathlib import Path
 from admin.services.admin_backup_service import admin_backup_service
 
+logger = logging.getLogger(__name__)
+
 
 class AdminBulkOperationsPage(ft.Container):
     """Admin bulk operations page."""
@@ -24,6 +27,7 @@ class AdminBulkOperationsPage(ft.Container):
         self.page = page
         self.file_picker = None
         self.backup_button = None
+        self.incremental_checkbox = None
         self.progress_bar = None
         self.status_text = None
         self.is_backing_up = False
@@ -85,7 +89,8 @@ class AdminBulkOperationsPage(ft.Container):
         # Description
         description = ft.Text(
             "Create a complete backup of all Firebase data including Firestore collections and Firebase Auth users. "
-            "The backup will be saved as a ZIP file containing separate JSON files for each collection.",
+            "The backup will be saved as a ZIP file containing an NDJSON file (one document per line) for each collection, "
+            "with document counts and SHA-256 checksums in backup_metadata.json.",
             size=12,
             color=self.TEXT_SECONDARY,
             width=800,
@@ -101,6 +106,13 @@ class AdminBulkOperationsPage(ft.Container):
             color="#ffffff",
         )
         
+        # Incremental mode
+        self.incremental_checkbox = ft.Checkbox(
+            label="Incremental (only documents changed since the latest backup in the chosen folder)",
+            value=False,
+            label_style=ft.TextStyle(color=self.TEXT_SECONDARY, size=12),
+        )
+        
         # Progress bar
         self.progress_bar = ft.ProgressBar(
             value=0,
@@ -125,6 +137,7 @@ class AdminBulkOperationsPage(ft.Container):
                     description,
                     ft.Divider(height=20, color="transparent"),
                     self.backup_button,
+                    self.incremental_checkbox,
                     ft.Divider(height=10, color="transparent"),
                     self.progress_bar,
                     self.status_text,
@@ -169,6 +182,7 @@ class AdminBulkOperationsPage(ft.Container):
         
         self.is_backing_up = True
         self.backup_button.disabled = True
+        self.incremental_checkbox.disabled = True
         self.progress_bar.visible = True
         self.progress_bar.value = 0
         self.status_text.value = "Initializing backup..."
@@ -183,61 +197,102 @@ class AdminBulkOperationsPage(ft.Container):
         )
         thread.start()
     
+    def _find_previous_backup(self, output_path: str):
+        """Find the most recent backup ZIP next to the output path (excluding it)."""
+        output = Path(output_path)
+        candidates = [
+            path for path in output.parent.glob("firebase_backup_*.zip")
+            if path.resolve() != output.resolve()
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda path: path.stat().st_mtime)
+    
+    def _post_to_ui(self, handler, *args):
+        """Run handler(*args) on the page's event loop (backup callbacks come from worker threads)."""
+        async def apply():
+            handler(*args)
+        
+        if self.page and hasattr(self.page, 'run_task'):
+            self.page.run_task(apply)
+        else:
+            handler(*args)
+    
     def _run_backup(self, output_path: str):
         """Run backup process (called from background thread)."""
         try:
             total_collections = 9  # Total number of collections to backup
-            current_collection = 0
+            finished_collections = 0
+            
+            since = None
+            if self.incremental_checkbox.value:
+                previous_backup = self._find_previous_backup(output_path)
+                if previous_backup:
+                    since = admin_backup_service.read_backup_watermarks(str(previous_backup))
+                if not since:
+                    self._post_to_ui(
+                        self._set_status,
+                        "No previous backup with watermarks found, running full backup...",
+                        self.TEXT_SECONDARY,
+                    )
             
-            def progress_callback(collection_name: str, status: str):
-                """Progress callback for backup service."""
-                nonlocal current_collection
+            def on_progress(collection_name: str, status: str, count: int):
+                """Apply a backup progress update (runs on the UI loop, so the counter needs no lock)."""
+                nonlocal finished_collections
                 
                 if status == "starting":
-                    self.status_text.value = f"Backing up {collection_name}..."
-                    self.status_text.color = self.TEXT_SECONDARY
-                    self.page.update()
+                    self._set_status(f"Backing up {collection_name}...", self.TEXT_SECONDARY)
+                
+                elif status == "progress":
+                    self._set_status(f"Backing up {collection_name}... {count} documents", self.TEXT_SECONDARY)
                 
                 elif status == "completed":
-                    current_collection += 1
-                    progress = current_collection / total_collections
-                    self.progress_bar.value = progress
-                    self.status_text.value = f"Completed {collection_name} ({current_collection}/{total_collections})"
-                    self.status_text.color = self.TEXT_SECONDARY
-                    self.page.update()
+                    finished_collections += 1
+                    self.progress_bar.value = finished_collections / total_collections
+                    self._set_status(
+                        f"Completed {collection_name}: {count} documents ({finished_collections}/{total_collections})",
+                        self.TEXT_SECONDARY,
+                    )
                 
                 elif status == "error":
-                    current_collection += 1
-                    progress = current_collection / total_collections
-                    self.progress_bar.value = progress
-                    self.status_text.value = f"Error backing up {collection_name} (continuing...)"
-                    self.status_text.color = self.ERROR_COLOR
-                    self.page.update()
+                    finished_collections += 1
+                    self.progress_bar.value = finished_collections / total_collections
+                    self._set_status(f"Error backing up {collection_name} (continuing...)", self.ERROR_COLOR)
                 
                 elif status == "creating_zip":
-                    self.status_text.value = "Creating ZIP file..."
-                    self.status_text.color = self.TEXT_SECONDARY
-                    self.page.update()
+                    self._set_status("Creating ZIP file...", self.TEXT_SECONDARY)
+            
+            def progress_callback(collection_name: str, status: str, count: int = 0):
+                """Progress callback for backup service (called from backup worker threads)."""
+                # The ZIP's own "completed"/"error" are followed by _on_backup_complete
+                if collection_name == "backup_metadata" and status != "creating_zip":
+                    return
+                self._post_to_ui(on_progress, collection_name, status, count)
             
             # Perform backup
             success, metadata = admin_backup_service.backup_all_collections(
                 output_path,
                 progress_callback=progress_callback,
+                since=since,
             )
             
-            # Update UI (Flet's page.update() is thread-safe)
-            self._on_backup_complete(success, output_path, metadata)
+            self._post_to_ui(self._on_backup_complete, success, output_path, metadata)
             
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Error during backup: {e}", exc_info=True)
-            self._on_backup_error(str(e))
+            self._post_to_ui(self._on_backup_error, str(e))
+    
+    def _set_status(self, message: str, color: str):
+        """Show a status message (UI loop only)."""
+        self.status_text.value = message
+        self.status_text.color = color
+        self.page.update()
     
     def _on_backup_complete(self, success: bool, output_path: str, metadata: dict):
         """Handle backup completion."""
         self.is_backing_up = False
         self.backup_button.disabled = False
+        self.incremental_checkbox.disabled = False
         self.progress_bar.value = 1.0 if success else 0
         
         if success:
@@ -271,6 +326,7 @@ class AdminBulkOperationsPage(ft.Container):
         """Handle backup error."""
         self.is_backing_up = False
         self.backup_button.disabled = False
+        self.incremental_checkbox.disabled = False
         self.progress_bar.value = 0
         self.status_text.value = f"Backup error: {error_message}"
         self.status_text.color = self.ERROR_COLOR
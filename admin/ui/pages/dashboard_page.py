@@ -7,7 +7,6 @@ import asyncio
 import logging
 from admin.services.admin_analytics_service import admin_analytics_service
 from admin.ui.components.stats_cards import StatsCard
-from services.page_cache_service import page_cache_service
 from ui.components.loading_indicator import LoadingIndicator
 
 logger = logging.getLogger(__name__)
@@ -78,30 +77,36 @@ class AdminDashboardPage(ft.Container):
         else:
             asyncio.create_task(self._load_stats_async())
     
-    async def _load_stats_async(self):
-        """Load dashboard statistics asynchronously."""
+    async def _load_stats_async(self, force_refresh: bool = False):
+        """
+        Load dashboard statistics asynchronously.
+        
+        The persisted analytics snapshot is rendered immediately; a stale (or
+        forced) snapshot is then refreshed in a worker thread and re-rendered.
+        """
         try:
-            # Check cache
-            cache_key = page_cache_service.generate_key("admin_dashboard")
-            cached_stats = page_cache_service.get(cache_key)
+            cached = admin_analytics_service.get_cached_snapshot()
+            if cached:
+                self._render_stats(cached)
             
-            if cached_stats:
-                user_stats = cached_stats.get("user_stats")
-                license_stats = cached_stats.get("license_stats")
-                device_stats = cached_stats.get("device_stats")
+            if force_refresh:
+                snapshot = await asyncio.to_thread(admin_analytics_service.refresh_snapshot)
             else:
-                # Load from service (may be slow - Firebase API calls)
-                user_stats = admin_analytics_service.get_user_stats()
-                license_stats = admin_analytics_service.get_license_stats()
-                device_stats = admin_analytics_service.get_device_stats()
-                
-                # Cache for 60 seconds
-                if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key, {
-                        "user_stats": user_stats,
-                        "license_stats": license_stats,
-                        "device_stats": device_stats
-                    }, ttl=60)
+                snapshot = await asyncio.to_thread(admin_analytics_service.get_snapshot)
+            self._render_stats(snapshot)
+        
+        except Exception as e:
+            logger.error(f"Error loading dashboard stats: {e}", exc_info=True)
+            self.is_loading = False
+            if self.page:
+                self.page.update()
+    
+    def _render_stats(self, snapshot: dict):
+        """Render stats cards from an analytics snapshot."""
+        try:
+            user_stats = snapshot.get("user_stats", {})
+            license_stats = snapshot.get("license_stats", {})
+            device_stats = snapshot.get("device_stats", {})
             
             # Create stats cards
             cards = [
@@ -148,19 +153,12 @@ class AdminDashboardPage(ft.Container):
                 self.page.update()
             
         except Exception as e:
-            logger.error(f"Error loading dashboard stats: {e}", exc_info=True)
-            self.is_loading = False
-            if self.page:
-                self.page.update()
+            logger.error(f"Error rendering dashboard stats: {e}", exc_info=True)
     
     def _refresh_stats(self, e: ft.ControlEvent = None):
-        """Refresh dashboard statistics (triggers async load)."""
-        # Invalidate cache
-        page_cache_service.invalidate("page:admin_dashboard")
-        
-        # Reload stats asynchronously
+        """Refresh dashboard statistics (incremental snapshot refresh, triggers async load)."""
         if self.page and hasattr(self.page, 'run_task'):
-            self.page.run_task(self._load_stats_async)
+            self.page.run_task(self._load_stats_async, True)
         else:
-            asyncio.create_task(self._load_stats_async())
+            asyncio.create_task(self._load_stats_async(True))
 
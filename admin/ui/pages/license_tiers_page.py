@@ -712,6 +712,7 @@ class AdminLicenseTiersPage(ft.Container):
             
             if success:
                 # Update existing licenses if requested
+                updated_count = 0
                 if update_existing:
                     updated_count = admin_license_tier_service.update_existing_licenses(tier_key, tier_data)
                     if updated_count > 0:
@@ -722,7 +723,6 @@ class AdminLicenseTiersPage(ft.Container):
                 
                 update_msg = f"License tier '{tier_key}' updated successfully"
                 if update_existing:
-                    updated_count = admin_license_tier_service.update_existing_licenses(tier_key, tier_data)
                     update_msg += f" ({updated_count} licenses updated)"
                 
                 self.page.snack_bar = ft.SnackBar(
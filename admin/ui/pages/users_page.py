@@ -60,10 +60,13 @@ class AdminUsersPage(ft.Container):
         
         self._load_users()
     
+    # Users fetched per Firebase Auth page (each page is joined with two batched Firestore reads)
+    USERS_BATCH_SIZE = 100
+    
     def _load_users(self):
-        """Load users and populate table."""
+        """Load the first batch of users and populate table (more are fetched on paging)."""
         try:
-            users = admin_user_service.get_all_users()
+            table_data, next_cursor = self._load_user_rows(None)
             
             columns = [
                 {"key": "email", "label": "Email", "width": 200},
@@ -74,35 +77,6 @@ class AdminUsersPage(ft.Container):
                 {"key": "scheduled_deletion", "label": "Scheduled Deletion", "width": 180},
             ]
             
-            # Format data for table
-            table_data = []
-            for user in users:
-                # Format scheduled deletion date
-                scheduled_deletion_date = user.get("scheduled_deletion_date")
-                deletion_display = "N/A"
-                if scheduled_deletion_date:
-                    try:
-                        from datetime import datetime
-                        if isinstance(scheduled_deletion_date, str):
-                            dt = datetime.fromisoformat(scheduled_deletion_date.replace("Z", "+00:00"))
-                        elif hasattr(scheduled_deletion_date, "timestamp"):
-                            dt = scheduled_deletion_date.replace(tzinfo=None)
-                        else:
-                            dt = scheduled_deletion_date
-                        deletion_display = dt.strftime("%Y-%m-%d %H:%M UTC")
-                    except Exception:
-                        deletion_display = str(scheduled_deletion_date)
-                
-                table_data.append({
-                    "email": user.get("email", ""),
-                    "display_name": user.get("display_name", "N/A"),
-                    "uid": user.get("uid", ""),
-                    "disabled": "Disabled" if user.get("disabled") else "Active",
-                    "license_tier": user.get("license_tier", "none").capitalize(),
-                    "scheduled_deletion": deletion_display,
-                    "_user_data": user,  # Store full user data
-                })
-            
             actions = [
                 {
                     "label": "Edit",
@@ -120,6 +94,8 @@ class AdminUsersPage(ft.Container):
                 columns=columns,
                 data=table_data,
                 actions=actions,
+                page_loader=self._load_user_rows,
+                next_cursor=next_cursor,
             )
             
             self.content.controls.append(self.data_table)
@@ -132,6 +108,43 @@ class AdminUsersPage(ft.Container):
             logger = logging.getLogger(__name__)
             logger.error(f"Error loading users: {e}", exc_info=True)
     
+    def _load_user_rows(self, page_token: Optional[str]):
+        """Fetch one cursor page of users formatted as table rows."""
+        users, next_cursor = admin_user_service.get_users_page(
+            page_token=page_token,
+            page_size=self.USERS_BATCH_SIZE
+        )
+        return [self._format_user_row(user) for user in users], next_cursor
+    
+    @staticmethod
+    def _format_user_row(user: dict) -> dict:
+        """Format a user dict for the table."""
+        # Format scheduled deletion date
+        scheduled_deletion_date = user.get("scheduled_deletion_date")
+        deletion_display = "N/A"
+        if scheduled_deletion_date:
+            try:
+                from datetime import datetime
+                if isinstance(scheduled_deletion_date, str):
+                    dt = datetime.fromisoformat(scheduled_deletion_date.replace("Z", "+00:00"))
+                elif hasattr(scheduled_deletion_date, "timestamp"):
+                    dt = scheduled_deletion_date.replace(tzinfo=None)
+                else:
+                    dt = scheduled_deletion_date
+                deletion_display = dt.strftime("%Y-%m-%d %H:%M UTC")
+            except Exception:
+                deletion_display = str(scheduled_deletion_date)
+        
+        return {
+            "email": user.get("email", ""),
+            "display_name": user.get("display_name", "N/A"),
+            "uid": user.get("uid", ""),
+            "disabled": "Disabled" if user.get("disabled") else "Active",
+            "license_tier": user.get("license_tier", "none").capitalize(),
+            "scheduled_deletion": deletion_display,
+            "_user_data": user,  # Store full user data
+        }
+    
     def _on_create_user(self, e: ft.ControlEvent):
         """Handle create user button click."""
         dialog = UserFormDialog(
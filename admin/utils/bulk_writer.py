@@ -0,0 +1,191 @@
+"""
+Batched Firestore write pipeline for admin bulk operations.
+
+Queued writes are committed as WriteBatch chunks of up to 500 operations
+(the Firestore limit), several chunks in flight at once. Chunks that fail
+with a transient/contention error are retried with backoff; a chunk that
+fails permanently is replayed one write at a time so a single bad document
+(e.g. a missing doc on update) does not fail the other 499.
+"""
+
+import logging
+import random
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 5
+RETRY_BACKOFF_INITIAL = 0.5  # seconds
+RETRY_BACKOFF_MAX = 8.0  # seconds
+
+try:
+    from google.api_core import exceptions as gexc
+    RETRYABLE_ERRORS: Tuple[type, ...] = (
+        gexc.Aborted,
+        gexc.DeadlineExceeded,
+        gexc.ServiceUnavailable,
+        gexc.ResourceExhausted,
+        gexc.InternalServerError,
+    )
+except ImportError:  # pragma: no cover - google-api-core ships with firebase-admin
+    RETRYABLE_ERRORS = ()
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of a bulk write."""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    failed_paths: List[str] = field(default_factory=list)
+
+
+class FirestoreBulkWriter:
+    """
+    Collects set/update/delete operations and commits them in parallel batches.
+
+    Usage:
+        writer = FirestoreBulkWriter(db, progress_callback=lambda done, total: ...)
+        for doc in docs:
+            writer.update(doc.reference, {"status": "done"})
+        result = writer.commit()
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        Initialize bulk writer.
+
+        Args:
+            db: Firestore client
+            batch_size: Writes per batch (capped at 500)
+            max_workers: Maximum number of batches committed concurrently
+            max_retries: Retries per batch on contention/transient errors
+            progress_callback: Called with (written, total) after each batch
+        """
+        self._db = db
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.progress_callback = progress_callback
+        self._operations: List[Tuple[str, Any, Optional[dict], dict]] = []
+        self._lock = threading.Lock()
+
+    def set(self, doc_ref, data: dict, merge: bool = False):
+        """Queue a set (create/overwrite) of a document."""
+        self._operations.append(("set", doc_ref, data, {"merge": merge}))
+
+    def update(self, doc_ref, data: dict):
+        """Queue an update of an existing document."""
+        self._operations.append(("update", doc_ref, data, {}))
+
+    def delete(self, doc_ref):
+        """Queue a document deletion."""
+        self._operations.append(("delete", doc_ref, None, {}))
+
+    @property
+    def pending_count(self) -> int:
+        """Number of queued writes not yet committed."""
+        return len(self._operations)
+
+    def commit(self) -> BulkWriteResult:
+        """
+        Commit all queued writes and clear the queue.
+
+        Returns:
+            BulkWriteResult with success/failure counts
+        """
+        operations, self._operations = self._operations, []
+        result = BulkWriteResult(total=len(operations))
+        if not operations:
+            return result
+
+        chunks = [
+            operations[i:i + self.batch_size]
+            for i in range(0, len(operations), self.batch_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            futures = [executor.submit(self._commit_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                succeeded, failed_paths = future.result()
+                with self._lock:
+                    result.succeeded += succeeded
+                    result.failed += len(failed_paths)
+                    result.failed_paths.extend(failed_paths)
+                    done = result.succeeded + result.failed
+                self._report_progress(done, result.total)
+
+        if result.failed:
+            logger.warning(f"Bulk write finished with {result.failed}/{result.total} failed writes")
+        else:
+            logger.info(f"Bulk write committed {result.succeeded} writes in {len(chunks)} batches")
+        return result
+
+    def _commit_chunk(self, chunk: list) -> Tuple[int, List[str]]:
+        """Commit one chunk as a batch, falling back to single writes on permanent failure."""
+        try:
+            self._with_retry(lambda: self._build_batch(chunk).commit())
+            return len(chunk), []
+        except Exception as e:
+            logger.warning(f"Batch of {len(chunk)} writes failed ({e}), retrying writes individually")
+
+        succeeded = 0
+        failed_paths = []
+        for operation in chunk:
+            try:
+                self._with_retry(lambda op=operation: self._build_batch([op]).commit())
+                succeeded += 1
+            except Exception as e:
+                path = getattr(operation[1], "path", str(operation[1]))
+                logger.error(f"Bulk {operation[0]} failed for {path}: {e}")
+                failed_paths.append(path)
+        return succeeded, failed_paths
+
+    def _build_batch(self, operations: list):
+        """Create a WriteBatch containing the given operations."""
+        batch = self._db.batch()
+        for kind, doc_ref, data, options in operations:
+            if kind == "set":
+                batch.set(doc_ref, data, merge=options.get("merge", False))
+            elif kind == "update":
+                batch.update(doc_ref, data)
+            else:
+                batch.delete(doc_ref)
+        return batch
+
+    def _with_retry(self, func: Callable):
+        """Run func, retrying retryable errors with exponential backoff and jitter."""
+        backoff = RETRY_BACKOFF_INITIAL
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = random.uniform(0, backoff)
+                logger.debug(f"Retryable write error ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                backoff = min(backoff * 2, RETRY_BACKOFF_MAX)
+
+    def _report_progress(self, done: int, total: int):
+        """Invoke the progress callback without letting it break the write."""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(done, total)
+        except Exception as e:
+            logger.error(f"Error in bulk write progress callback: {e}")
@@ -37,6 +37,10 @@ UPDATE_POLLING_INTERVAL = 3600
 ENABLE_NOTIFICATION_POLLING = True
 ENABLE_UPDATE_POLLING = True
 
+# Database maintenance check interval in seconds (default: 300 seconds / 5 minutes)
+DB_MAINTENANCE_INTERVAL = 300
+ENABLE_DB_MAINTENANCE = True
+
 
 class Settings:
     """Application settings manager."""
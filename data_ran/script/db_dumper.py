@@ -133,7 +133,7 @@ class DatabaseDumper:
     def _clear_data(self):
         """Clear existing data from database."""
         try:
-            with self.db_manager.get_connection() as conn:
+            with self.db_manager.get_write_connection() as conn:
                 cursor = conn.cursor()
                 # Clear in reverse dependency order
                 cursor.execute("DELETE FROM message_tags")
@@ -285,7 +285,7 @@ class DatabaseDumper:
     def insert_deleted_messages(self, deleted_messages: List[Dict[str, Any]]) -> bool:
         """Insert deleted messages into database."""
         try:
-            with self.db_manager.get_connection() as conn:
+            with self.db_manager.get_write_connection() as conn:
                 for deleted_data in deleted_messages:
                     deleted_at = self._parse_datetime(deleted_data.get('deleted_at'))
                     conn.execute("""
@@ -305,7 +305,7 @@ class DatabaseDumper:
     def insert_deleted_users(self, deleted_users: List[Dict[str, Any]]) -> bool:
         """Insert deleted users into database."""
         try:
-            with self.db_manager.get_connection() as conn:
+            with self.db_manager.get_write_connection() as conn:
                 for deleted_data in deleted_users:
                     deleted_at = self._parse_datetime(deleted_data.get('deleted_at'))
                     conn.execute("""
@@ -0,0 +1,129 @@
+"""
+Per-year archive databases for cold messages, tags and reactions.
+
+ArchiveManager moves old rows out of the hot database into
+<db dir>/archive/<db name>_<year>.db and records each year in the hot
+archive_periods table. Readers whose date range reaches an archived year
+attach that file and see the archived tables through TEMP views with the
+same names, so manager queries need no changes.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default age in days after which messages are moved to the archive
+ARCHIVE_AFTER_DAYS = 365
+
+ARCHIVE_DIR_NAME = 'archive'
+
+# Tables whose cold rows are archived (messages first: the others follow their message)
+ARCHIVED_TABLES = ('messages', 'message_tags', 'reactions')
+
+
+@dataclass(frozen=True)
+class ArchivePeriod:
+    """One archived year and the date range of the messages it holds."""
+    year: int
+    path: str
+    min_date_ms: Optional[int]
+    max_date_ms: Optional[int]
+
+    @property
+    def alias(self) -> str:
+        return f"archive_{self.year}"
+
+
+_periods: Dict[str, List[ArchivePeriod]] = {}
+_periods_lock = threading.Lock()
+
+
+def archive_path(db_path: str, year: int) -> Path:
+    """Path of the archive database holding db_path's messages of year."""
+    db_file = Path(db_path)
+    return db_file.parent / ARCHIVE_DIR_NAME / f"{db_file.stem}_{year}.db"
+
+
+def get_archive_periods(db_path: str) -> List[ArchivePeriod]:
+    """Get the archived years of db_path (cached until reset_archive_periods)."""
+    with _periods_lock:
+        periods = _periods.get(db_path)
+    if periods is not None:
+        return periods
+
+    periods = []
+    try:
+        conn = sqlite3.connect(db_path, timeout=10.0)
+        try:
+            rows = conn.execute(
+                "SELECT year, file_name, min_date_ms, max_date_ms FROM archive_periods ORDER BY year"
+            ).fetchall()
+        finally:
+            conn.close()
+        archive_dir = Path(db_path).parent / ARCHIVE_DIR_NAME
+        for year, file_name, min_date_ms, max_date_ms in rows:
+            path = archive_dir / file_name
+            if path.exists():
+                periods.append(ArchivePeriod(year, str(path), min_date_ms, max_date_ms))
+            else:
+                logger.warning(f"Archive database for {year} is missing: {path}")
+    except sqlite3.OperationalError as e:
+        # Database from before archiving (no archive_periods table yet)
+        logger.debug(f"No archive periods for {db_path}: {e}")
+
+    with _periods_lock:
+        _periods[db_path] = periods
+    return periods
+
+
+def reset_archive_periods(db_path: str):
+    """Drop the cached archive periods of db_path (after archiving)."""
+    with _periods_lock:
+        _periods.pop(db_path, None)
+
+
+def archives_for_range(
+    db_path: str,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the archives a read of [start_ms, end_ms] must attach (None = unbounded).
+
+    Returns:
+        Tuple of (alias, path), empty if the range lies in the hot database
+    """
+    return tuple(
+        (period.alias, period.path)
+        for period in get_archive_periods(db_path)
+        if (start_ms is None or period.max_date_ms is None or period.max_date_ms >= start_ms)
+        and (end_ms is None or period.min_date_ms is None or period.min_date_ms <= end_ms)
+    )
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})").fetchall()]
+
+
+def create_archive_views(conn: sqlite3.Connection, aliases: Sequence[str]):
+    """
+    Shadow the archived tables on conn with TEMP views over main and the attached archives.
+
+    Unqualified names resolve to the temp schema first, so existing queries read
+    the union. Columns an older archive lacks are read as NULL.
+    """
+    for table in ARCHIVED_TABLES:
+        columns = _table_columns(conn, 'main', table)
+        selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+        for alias in aliases:
+            archived = set(_table_columns(conn, alias, table))
+            if not archived:
+                continue
+            expressions = [column if column in archived else f"NULL AS {column}" for column in columns]
+            selects.append(f"SELECT {', '.join(expressions)} FROM {alias}.{table}")
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {table} AS {' UNION ALL '.join(selects)}")
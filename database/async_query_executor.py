@@ -4,20 +4,181 @@ Async query executor for non-blocking database operations.
 
 import asyncio
 import logging
-from typing import Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from concurrent.futures import ThreadPoolExecutor, Future
 
 logger = logging.getLogger(__name__)
 
 
+class QueryPriority(Enum):
+    """Executor lanes. Each lane has its own workers, so lanes never queue behind each other."""
+    INTERACTIVE = "interactive"  # page loads, filters, anything a user is waiting on
+    BACKGROUND = "background"    # reports, refreshes the user is not blocked on
+    BULK = "bulk"                # exports and other long scans
+
+
+# Worker threads per lane
+LANE_WORKERS = {
+    QueryPriority.INTERACTIVE: 4,
+    QueryPriority.BACKGROUND: 2,
+    QueryPriority.BULK: 1,
+}
+# SQLite VM instructions between cancellation checks of a running statement
+CANCEL_CHECK_INTERVAL = 1000
+
+
+class QueryCancelledError(Exception):
+    """Raised inside a worker when its call was cancelled before or while running."""
+
+
+class QueryCancelToken:
+    """
+    Cancellation handle for one executor call.
+    SQLite connections opened by the call register here and are interrupted on cancel.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._finished = False
+        self.cancelled = False
+    
+    def register(self, conn: sqlite3.Connection):
+        """Track a connection used by the running call."""
+        with self._lock:
+            if self._finished:
+                return
+            self._connections.append(conn)
+        # interrupt() only stops a statement that is already running; the progress
+        # handler also aborts statements started after cancel() was called
+        conn.set_progress_handler(self._progress, CANCEL_CHECK_INTERVAL)
+    
+    def unregister(self, conn: sqlite3.Connection):
+        """Stop tracking a connection the call has handed back (e.g. to a reader pool)."""
+        with self._lock:
+            if conn not in self._connections:
+                return
+            self._connections.remove(conn)
+        try:
+            conn.set_progress_handler(None, 0)
+        except Exception:
+            pass
+    
+    def _progress(self) -> int:
+        return 1 if self.cancelled else 0
+    
+    def cancel(self):
+        """Mark cancelled and interrupt any statement the call is running."""
+        with self._lock:
+            if self._finished or self.cancelled:
+                self.cancelled = True
+                return
+            self.cancelled = True
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.interrupt()
+            except Exception:
+                pass
+    
+    def raise_if_cancelled(self):
+        """Cooperative check for long Python-side loops."""
+        if self.cancelled:
+            raise QueryCancelledError()
+    
+    def finish(self):
+        """Detach from connections once the call returns (pooled connections are reused)."""
+        with self._lock:
+            self._finished = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.set_progress_handler(None, 0)
+            except Exception:
+                pass
+
+
+_current = threading.local()
+
+
+def current_cancel_token() -> Optional[QueryCancelToken]:
+    """Get the cancel token of the executor call running on this thread, if any."""
+    return getattr(_current, 'token', None)
+
+
+def register_connection(conn: sqlite3.Connection):
+    """Let the executor call running on this thread (if any) interrupt this connection."""
+    token = current_cancel_token()
+    if token is not None:
+        token.register(conn)
+
+
+def unregister_connection(conn: sqlite3.Connection):
+    """Undo register_connection() for a connection that goes on to serve other calls."""
+    token = current_cancel_token()
+    if token is not None:
+        token.unregister(conn)
+
+
+@dataclass
+class _LaneStats:
+    """Counters for one lane (guarded by the executor's stats lock)."""
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    deduplicated: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    total_run: float = 0.0
+    max_run: float = 0.0
+
+
+class _Flight:
+    """One in-flight call, shared by every caller that awaits it."""
+    
+    def __init__(self, future: asyncio.Future, work: Future, token: QueryCancelToken):
+        self.future = future
+        self.work = work
+        self.token = token
+        self.waiters = 0
+    
+    def cancel(self):
+        # Not started yet: drop it from the queue; running: interrupt its SQLite statement
+        if not self.work.cancel():
+            self.token.cancel()
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call arguments into a hashable key (raises TypeError if impossible)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
 class AsyncQueryExecutor:
     """
     Executor for running synchronous database queries asynchronously.
     Prevents blocking the UI thread.
+    
+    Calls run on per-priority worker pools; identical concurrent read calls can share
+    one execution (single-flight, opt-in); cancelling every awaiting caller cancels the work,
+    interrupting its SQLite statement if it already started.
     """
     
     _instance: Optional['AsyncQueryExecutor'] = None
-    _executor: Optional[ThreadPoolExecutor] = None
+    _executors: Optional[Dict[QueryPriority, ThreadPoolExecutor]] = None
     
     def __new__(cls):
         """Singleton pattern implementation."""
@@ -31,36 +192,66 @@ class AsyncQueryExecutor:
         if self._initialized:
             return
         
-        # Create thread pool executor for database operations
-        # Use max_workers=5 to handle concurrent queries without overwhelming
-        self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="db_query")
+        # One thread pool per lane so interactive queries never wait behind bulk work
+        self._executors = {
+            priority: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"db_query_{priority.value}")
+            for priority, workers in LANE_WORKERS.items()
+        }
+        self._in_flight: Dict[Hashable, _Flight] = {}
+        self._stats = {priority: _LaneStats() for priority in QueryPriority}
+        self._stats_lock = threading.Lock()
         self._initialized = True
         logger.debug("AsyncQueryExecutor initialized")
     
-    async def execute(self, func: Callable[[], Any], *args, **kwargs) -> Any:
+    async def execute(
+        self,
+        func: Callable[[], Any],
+        *args,
+        priority: QueryPriority = QueryPriority.INTERACTIVE,
+        dedupe: bool = False,
+        **kwargs
+    ) -> Any:
         """
         Execute a function asynchronously in thread pool.
         
         Args:
             func: Function to execute
             *args: Positional arguments for function
+            priority: Lane to run on
+            dedupe: Share the result with an identical call already in flight
+                (only for read-only calls; writes must never be coalesced)
             **kwargs: Keyword arguments for function
-            
+        
         Returns:
             Result of function execution
         """
-        if not self._executor:
+        if not self._executors:
             raise RuntimeError("AsyncQueryExecutor not initialized")
         
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
+        key = self._flight_key(loop, priority, func, args, kwargs) if dedupe else None
         
-        # Wrap function with arguments
-        def wrapped_func():
-            return func(*args, **kwargs)
+        flight = self._in_flight.get(key) if key is not None else None
+        if flight is None:
+            flight = self._submit(loop, priority, func, args, kwargs)
+            if key is not None:
+                self._in_flight[key] = flight
+                flight.future.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            with self._stats_lock:
+                self._stats[priority].deduplicated += 1
         
+        flight.waiters += 1
         try:
-            result = await loop.run_in_executor(self._executor, wrapped_func)
-            return result
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.future.done():
+                flight.cancel()
+                # A new identical call must start fresh instead of joining the cancelled one
+                if key is not None:
+                    self._forget(key, flight)
+            raise
         except Exception as e:
             logger.error(f"Error executing async query: {e}", exc_info=True)
             raise
@@ -74,16 +265,17 @@ class AsyncQueryExecutor:
     ) -> Any:
         """
         Execute a function asynchronously with timeout.
+        The query is interrupted when the timeout expires.
         
         Args:
             func: Function to execute
             timeout: Timeout in seconds (default: 30s)
             *args: Positional arguments for function
-            **kwargs: Keyword arguments for function
-            
+            **kwargs: Keyword arguments for function (priority/dedupe as in execute)
+        
         Returns:
             Result of function execution
-            
+        
         Raises:
             asyncio.TimeoutError: If execution exceeds timeout
         """
@@ -97,6 +289,32 @@ class AsyncQueryExecutor:
             logger.warning(f"Query execution timed out after {timeout}s")
             raise
     
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-lane queue depth and latency metrics.
+        
+        Returns:
+            Mapping of lane name to counters plus average/max wait and run times in ms
+        """
+        metrics = {}
+        with self._stats_lock:
+            for priority, stats in self._stats.items():
+                started = stats.completed + stats.failed + stats.running
+                finished = stats.completed + stats.failed
+                metrics[priority.value] = {
+                    'queued': stats.queued,
+                    'running': stats.running,
+                    'completed': stats.completed,
+                    'failed': stats.failed,
+                    'cancelled': stats.cancelled,
+                    'deduplicated': stats.deduplicated,
+                    'avg_wait_ms': round(stats.total_wait * 1000 / started, 2) if started else 0.0,
+                    'max_wait_ms': round(stats.max_wait * 1000, 2),
+                    'avg_run_ms': round(stats.total_run * 1000 / finished, 2) if finished else 0.0,
+                    'max_run_ms': round(stats.max_run * 1000, 2),
+                }
+        return metrics
+    
     def shutdown(self, wait: bool = True):
         """
         Shutdown the thread pool executor.
@@ -104,12 +322,89 @@ class AsyncQueryExecutor:
         Args:
             wait: Whether to wait for pending tasks
         """
-        if self._executor:
-            self._executor.shutdown(wait=wait)
-            self._executor = None
+        if self._executors:
+            for flight in list(self._in_flight.values()):
+                flight.cancel()
+            for executor in self._executors.values():
+                executor.shutdown(wait=wait)
+            self._executors = None
             logger.debug("AsyncQueryExecutor shut down")
+    
+    def _submit(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        priority: QueryPriority,
+        func: Callable,
+        args: tuple,
+        kwargs: dict
+    ) -> _Flight:
+        """Queue a call on its lane and wrap it for awaiting."""
+        token = QueryCancelToken()
+        stats = self._stats[priority]
+        submitted_at = time.monotonic()
+        
+        def run():
+            started_at = time.monotonic()
+            wait = started_at - submitted_at
+            with self._stats_lock:
+                stats.queued -= 1
+                stats.running += 1
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+            
+            _current.token = token
+            try:
+                token.raise_if_cancelled()
+                return func(*args, **kwargs)
+            finally:
+                _current.token = None
+                token.finish()
+                elapsed = time.monotonic() - started_at
+                with self._stats_lock:
+                    stats.running -= 1
+                    stats.total_run += elapsed
+                    stats.max_run = max(stats.max_run, elapsed)
+        
+        def account(work: Future):
+            with self._stats_lock:
+                if work.cancelled():
+                    stats.queued -= 1
+                    stats.cancelled += 1
+                elif work.exception() is not None:
+                    if token.cancelled:
+                        stats.cancelled += 1
+                    else:
+                        stats.failed += 1
+                else:
+                    stats.completed += 1
+        
+        with self._stats_lock:
+            stats.queued += 1
+        work = self._executors[priority].submit(run)
+        work.add_done_callback(account)
+        return _Flight(asyncio.wrap_future(work, loop=loop), work, token)
+    
+    @staticmethod
+    def _flight_key(
+        loop: asyncio.AbstractEventLoop,
+        priority: QueryPriority,
+        func: Callable,
+        args: tuple,
+        kwargs: dict
+    ) -> Optional[Hashable]:
+        """Key identifying identical calls, or None if the arguments are not hashable."""
+        try:
+            key = (id(loop), priority, func, _freeze(args), _freeze(kwargs))
+            hash(key)
+            return key
+        except TypeError:
+            return None
+    
+    def _forget(self, key: Hashable, flight: _Flight):
+        """Drop a finished call from the single-flight table."""
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
 
 
 # Global singleton instance
 async_query_executor = AsyncQueryExecutor()
-
@@ -0,0 +1,198 @@
+"""
+In-process data change events emitted by the database managers.
+
+Managers publish a DataChangeEvent after every committed write so caches and
+open pages can invalidate (or patch) only the entries touched by that write
+instead of waiting for TTL expiry or reloading everything.
+"""
+
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeAction(Enum):
+    """Kind of write that produced a change event."""
+    SAVED = "saved"
+    DELETED = "deleted"
+    RESTORED = "restored"
+    ARCHIVED = "archived"
+
+
+@dataclass
+class DataChangeEvent:
+    """A committed change to one table, scoped to a group/user and message id range."""
+    table: str
+    action: ChangeAction = ChangeAction.SAVED
+    group_id: Optional[int] = None
+    user_id: Optional[int] = None
+    message_id_min: Optional[int] = None
+    message_id_max: Optional[int] = None
+    count: int = 1
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def affects_group(self, group_ids: Optional[Iterable[int]]) -> bool:
+        """
+        Check whether this change can affect data scoped to the given groups.
+
+        Args:
+            group_ids: Group IDs a consumer depends on (None/empty means all groups)
+        """
+        if self.group_id is None or not group_ids:
+            return True
+        return self.group_id in set(group_ids)
+
+    def covers_message(self, message_id: int) -> bool:
+        """Check whether a message id falls inside this event's id range."""
+        if self.message_id_min is None or self.message_id_max is None:
+            return True
+        return self.message_id_min <= message_id <= self.message_id_max
+
+    def merge(self, other: "DataChangeEvent") -> None:
+        """Widen this event to also cover another event on the same table/scope."""
+        if other.message_id_min is not None:
+            self.message_id_min = other.message_id_min if self.message_id_min is None \
+                else min(self.message_id_min, other.message_id_min)
+        if other.message_id_max is not None:
+            self.message_id_max = other.message_id_max if self.message_id_max is None \
+                else max(self.message_id_max, other.message_id_max)
+        if self.user_id != other.user_id:
+            self.user_id = None
+        self.count += other.count
+        self.timestamp = other.timestamp
+
+
+class DataChangeBus:
+    """
+    Thread-safe publish/subscribe bus for database change events.
+
+    Bound-method handlers are held weakly so pages that are discarded without
+    unsubscribing do not leak. Writers may wrap bulk work in batch() to have
+    events coalesced per (table, action, group) and published once at the end.
+    """
+
+    def __init__(self):
+        """Initialize bus with empty subscriber registry."""
+        self._subscribers: List[Tuple[Callable[[], Optional[Callable]], Optional[frozenset]]] = []
+        self._lock = threading.RLock()
+        self._batch = threading.local()
+
+    def subscribe(
+        self,
+        handler: Callable[[DataChangeEvent], None],
+        tables: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Subscribe a handler to change events.
+
+        Args:
+            handler: Callback receiving DataChangeEvent
+            tables: Only deliver events for these tables (None for all tables)
+        """
+        if hasattr(handler, "__self__") and hasattr(handler, "__func__"):
+            ref = weakref.WeakMethod(handler)
+        else:
+            ref = lambda h=handler: h
+        table_filter = frozenset(tables) if tables else None
+
+        with self._lock:
+            if any(existing() == handler for existing, _ in self._subscribers):
+                logger.warning("Handler already subscribed to data change bus")
+                return
+            self._subscribers.append((ref, table_filter))
+
+    def unsubscribe(self, handler: Callable[[DataChangeEvent], None]) -> None:
+        """Unsubscribe a handler (dead weak references are pruned as well)."""
+        with self._lock:
+            self._subscribers = [
+                (ref, tables) for ref, tables in self._subscribers
+                if ref() is not None and ref() != handler
+            ]
+
+    def publish(self, event: DataChangeEvent) -> None:
+        """
+        Publish an event, or buffer it if the calling thread is inside batch().
+
+        Args:
+            event: Change event to deliver
+        """
+        pending = getattr(self._batch, "events", None)
+        if pending is not None:
+            key = (event.table, event.action, event.group_id)
+            if key in pending:
+                pending[key].merge(event)
+            else:
+                pending[key] = event
+            return
+        self._dispatch(event)
+
+    @contextmanager
+    def batch(self):
+        """Coalesce events published by this thread until the block exits."""
+        if getattr(self._batch, "events", None) is not None:
+            # Nested batch - outer block flushes
+            yield
+            return
+        self._batch.events = {}
+        try:
+            yield
+        finally:
+            events: Dict = self._batch.events
+            self._batch.events = None
+            for event in events.values():
+                self._dispatch(event)
+
+    @contextmanager
+    def collect(self):
+        """
+        Capture events published by this thread instead of delivering them.
+
+        Yields a list that is filled with the (coalesced) events when the block
+        exits; the caller publishes them later, e.g. once the write is committed.
+        """
+        previous = getattr(self._batch, "events", None)
+        self._batch.events = {}
+        collected: List[DataChangeEvent] = []
+        try:
+            yield collected
+        finally:
+            collected.extend(self._batch.events.values())
+            self._batch.events = previous
+
+    def _dispatch(self, event: DataChangeEvent) -> None:
+        """Deliver an event to matching live handlers."""
+        with self._lock:
+            self._subscribers = [(ref, tables) for ref, tables in self._subscribers if ref() is not None]
+            targets = [
+                ref() for ref, tables in self._subscribers
+                if tables is None or event.table in tables
+            ]
+
+        for handler in targets:
+            if handler is None:
+                continue
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Error in data change handler for {event.table}: {e}", exc_info=True)
+
+    def clear(self) -> None:
+        """Remove all subscribers."""
+        with self._lock:
+            self._subscribers.clear()
+
+    def get_subscriber_count(self) -> int:
+        """Get number of live subscribers."""
+        with self._lock:
+            return sum(1 for ref, _ in self._subscribers if ref() is not None)
+
+
+# Global change bus instance
+data_change_bus = DataChangeBus()
@@ -0,0 +1,430 @@
+"""
+Single-writer service: one thread owns the write connection of a database and
+applies queued write commands, committing them in groups.
+"""
+
+import asyncio
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from database.read_snapshot import commit_lock
+
+logger = logging.getLogger(__name__)
+
+# Write commands committed together when callers queue up behind each other
+WRITE_GROUP_MAX = 64
+# Seconds the writer waits for the lock held by another process (e.g. a migration script)
+WRITE_BUSY_TIMEOUT = 30.0
+# Seconds a connection() block may hold the writer before its lease is revoked and rolled back
+WRITE_LEASE_TIMEOUT = 60.0
+
+_STOP = object()
+
+
+def _split_script(script: str) -> Iterator[str]:
+    """Split an SQL script into complete statements."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement
+            statement = ""
+    if statement.strip():
+        yield statement
+
+
+class WriteConnection:
+    """
+    Connection handed to write commands.
+
+    Each command runs inside its own savepoint of the writer's group transaction:
+    commit() is a no-op (the writer commits the group), rollback() undoes only this
+    command's changes, and close() leaves the shared connection open.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, savepoint: str, depth: int = 0, lease: Optional["_Lease"] = None):
+        self._conn = conn
+        self._savepoint = savepoint
+        self._depth = depth
+        self._lease = lease
+
+    def __getattr__(self, name: str) -> Any:
+        self._check_lease()
+        return getattr(self._conn, name)
+
+    def _check_lease(self):
+        if self._lease is not None and self._lease.revoked:
+            raise sqlite3.OperationalError(
+                f"Write connection lease expired after {WRITE_LEASE_TIMEOUT}s; the block was rolled back"
+            )
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if self._lease is not None and self._lease.revoked:
+            # The writer already rolled the command back and moved on
+            return
+        self._conn.execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+
+    def close(self):
+        pass
+
+    def executescript(self, script: str):
+        """Run a script statement by statement (sqlite3's executescript would commit the group)."""
+        self._check_lease()
+        cursor = None
+        for statement in _split_script(script):
+            cursor = self._conn.execute(statement)
+        return cursor
+
+    @contextmanager
+    def nested(self):
+        """Run a nested write on this connection in its own savepoint."""
+        self._check_lease()
+        savepoint = f"write_nested_{self._depth + 1}"
+        self._conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield WriteConnection(self._conn, savepoint, self._depth + 1, self._lease)
+        except BaseException:
+            self._conn.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            self._conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+            raise
+        self._conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        return False
+
+
+class _Lease:
+    """The write connection lent to a connection() block by the command holding the writer for it."""
+
+    def __init__(self):
+        self.granted = threading.Event()
+        self.released = threading.Event()
+        self.conn: Optional[WriteConnection] = None
+        self.error: Optional[BaseException] = None
+        self.revoked = False
+
+
+class _WriteRequest:
+    """A queued write command and the future its caller waits on."""
+
+    def __init__(self, func: Callable[[WriteConnection], Any]):
+        self.func = func
+        self.future: Future = Future()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def finish(self, commit_error: Optional[BaseException]):
+        error = self.error or commit_error
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(self.result)
+
+
+class DatabaseWriter:
+    """
+    Owns the only write connection of one database file.
+
+    Write commands are queued and applied one at a time on the writer thread.
+    Commands queued while a group is running join it and are committed together,
+    so concurrent callers share one commit. Readers use their own connections and
+    are never blocked by the queue.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+        self._stats = {'commands': 0, 'groups': 0, 'failed': 0}
+
+    def submit(self, func: Callable[[WriteConnection], Any]) -> Future:
+        """
+        Queue a write command.
+
+        Args:
+            func: Called on the writer thread with the write connection
+
+        Returns:
+            Future resolved with func's result once its group is committed
+        """
+        current = self._current_connection()
+        if current is not None:
+            # Already inside a write on this thread: run inline in a nested savepoint
+            future: Future = Future()
+            try:
+                with current.nested() as conn:
+                    future.set_result(func(conn))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        request = _WriteRequest(func)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Database writer for {self.db_path} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="db_writer", daemon=True
+                )
+                self._thread.start()
+            self._queue.put(request)
+        return request.future
+
+    def run(self, func: Callable[[WriteConnection], Any]) -> Any:
+        """
+        Apply a write command and wait until it is committed.
+
+        Args:
+            func: Called on the writer thread with the write connection
+
+        Returns:
+            func's result
+        """
+        return self.submit(func).result()
+
+    async def execute(self, func: Callable[[WriteConnection], Any]) -> Any:
+        """
+        Apply a write command without blocking the event loop.
+
+        Args:
+            func: Called on the writer thread with the write connection
+
+        Returns:
+            func's result, once committed
+        """
+        return await asyncio.wrap_future(self.submit(func))
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow the write connection for a block of code on the calling thread.
+
+        The block runs as one command of a group: it starts when the writer reaches it
+        in the queue, and the context exits only after the group is committed. The
+        writer waits idle while the block runs, so keep it short and never wait in it
+        for a write queued from another thread (that write can only run after the
+        block). Long or bulk writes should pass a function to run() or execute()
+        instead. A block still running after WRITE_LEASE_TIMEOUT seconds is
+        interrupted and rolled back, and further use of its connection raises.
+        """
+        current = self._current_connection()
+        if current is not None:
+            with current.nested() as conn:
+                yield conn
+            return
+
+        lease = _Lease()
+
+        def hold(conn: WriteConnection):
+            lease.conn = WriteConnection(conn._conn, conn._savepoint, lease=lease)
+            lease.granted.set()
+            if not lease.released.wait(WRITE_LEASE_TIMEOUT):
+                lease.revoked = True
+                conn._conn.interrupt()
+                logger.error(f"Write connection held for over {WRITE_LEASE_TIMEOUT}s; rolling the block back")
+                raise TimeoutError(f"Write connection lease expired after {WRITE_LEASE_TIMEOUT}s")
+            if lease.error is not None:
+                raise lease.error
+
+        future = self.submit(hold)
+        while not lease.granted.wait(0.1):
+            if future.done():
+                future.result()
+                raise RuntimeError("Database writer stopped before granting the connection")
+
+        self._local.conn = lease.conn
+        try:
+            yield lease.conn
+        except BaseException as e:
+            lease.error = e
+            raise
+        finally:
+            self._local.conn = None
+            lease.released.set()
+            if lease.error is None:
+                future.result()
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Stop the writer thread after the queued commands have been applied.
+
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer counters.
+
+        Returns:
+            Dictionary with applied commands, committed groups and failed commands
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _current_connection(self) -> Optional[WriteConnection]:
+        return getattr(self._local, 'conn', None)
+
+    def _open(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are managed explicitly by the group loop
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=WRITE_BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except Exception:
+            pass
+        return conn
+
+    def _run(self):
+        try:
+            conn = self._open()
+        except Exception as e:
+            logger.error(f"Error opening write connection for {self.db_path}: {e}")
+            self._fail_pending(e)
+            return
+
+        try:
+            stop = False
+            while not stop:
+                request = self._queue.get()
+                if request is _STOP:
+                    break
+
+                group = []
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                except Exception as e:
+                    logger.error(f"Error starting write transaction: {e}")
+                    request.error = e
+                    request.finish(None)
+                    continue
+
+                while request is not None:
+                    self._apply(conn, request)
+                    group.append(request)
+                    if len(group) >= WRITE_GROUP_MAX:
+                        break
+                    try:
+                        request = self._queue.get_nowait()
+                    except queue.Empty:
+                        request = None
+                    if request is _STOP:
+                        stop = True
+                        request = None
+
+                commit_error = None
+                try:
+                    # Snapshots open their readers between commits, never across one
+                    with commit_lock(self.db_path):
+                        conn.execute("COMMIT")
+                except Exception as e:
+                    logger.error(f"Error committing {len(group)} writes: {e}")
+                    commit_error = e
+                    try:
+                        conn.execute("ROLLBACK")
+                    except Exception:
+                        pass
+
+                with self._lock:
+                    self._stats['commands'] += len(group)
+                    self._stats['groups'] += 1
+                    self._stats['failed'] += sum(
+                        1 for request in group if request.error is not None or commit_error is not None
+                    )
+
+                for request in group:
+                    request.finish(commit_error)
+        finally:
+            conn.close()
+            self._fail_pending(RuntimeError(f"Database writer for {self.db_path} is closed"))
+
+    def _apply(self, conn: sqlite3.Connection, request: _WriteRequest):
+        """Run one command in its own savepoint so a failure only undoes that command."""
+        conn.execute("SAVEPOINT write_command")
+        self._local.conn = WriteConnection(conn, "write_command")
+        try:
+            request.result = request.func(self._local.conn)
+        except BaseException as e:
+            request.error = e
+        finally:
+            self._local.conn = None
+
+        if request.error is not None:
+            conn.execute("ROLLBACK TO SAVEPOINT write_command")
+        conn.execute("RELEASE SAVEPOINT write_command")
+
+    def _fail_pending(self, error: BaseException):
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _STOP:
+                request.error = error
+                request.finish(None)
+
+
+_writers: Dict[str, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_db_writer(db_path: str) -> DatabaseWriter:
+    """Get the writer owning db_path, creating it on first use."""
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = _writers[db_path] = DatabaseWriter(db_path)
+        return writer
+
+
+def close_db_writer(db_path: str):
+    """Stop the writer of db_path, e.g. before the file is moved or deleted."""
+    with _writers_lock:
+        writer = _writers.pop(db_path, None)
+    if writer is not None:
+        writer.close()
+
+
+def close_all_db_writers():
+    """Stop every writer (application shutdown)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+# Drain queued writes before the interpreter exits (writer threads are daemons)
+atexit.register(close_all_db_writers)
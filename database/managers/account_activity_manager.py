@@ -45,7 +45,7 @@ class AccountActivityManager(BaseDatabaseManager):
             # Encrypt sensitive fields
             encrypted_phone = encryption_service.encrypt_field(phone_number) if encryption_service else phone_number
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO account_activity_log 
                     (user_email, action, phone_number, action_timestamp)
@@ -0,0 +1,179 @@
+"""
+Archive manager for moving cold messages into per-year archive databases.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from database.managers.base import BaseDatabaseManager, _to_epoch_ms
+from database.change_events import ChangeAction
+from database.archive_store import ARCHIVE_AFTER_DAYS, ARCHIVED_TABLES, archive_path, reset_archive_periods
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Messages of one archived year (date range and id watermark); {alias} is the messages table alias
+_ARCHIVED_MESSAGES_SQL = "{alias}.date_sent_ms >= ? AND {alias}.date_sent_ms < ? AND {alias}.id <= ?"
+
+# Tags and reactions follow their message into the archive
+_FOLLOWER_SQL = """
+    id <= ? AND EXISTS (
+        SELECT 1 FROM {schema}messages m
+        WHERE m.message_id = {table}.message_id AND m.group_id = {table}.group_id
+        AND """ + _ARCHIVED_MESSAGES_SQL.replace("{alias}", "m") + """
+    )
+"""
+
+
+class ArchiveManager(BaseDatabaseManager):
+    """Manages moving old messages, tags and reactions out of the hot database."""
+    
+    def archive_old_data(
+        self,
+        older_than_days: int = ARCHIVE_AFTER_DAYS,
+        now: Optional[datetime] = None
+    ) -> Dict[int, int]:
+        """
+        Move messages older than older_than_days (with their tags and reactions)
+        into <db dir>/archive/<db name>_<year>.db, one database per year.
+        
+        Rows are copied and committed in the archive first, then registered in
+        archive_periods and only then deleted from the hot database, so a failed
+        run never loses data. Reads covering archived dates attach the archives
+        (see archive_store); tag analytics counters are left unchanged.
+        
+        Args:
+            older_than_days: Minimum age of archived messages
+            now: Reference time (default: current UTC time)
+        
+        Returns:
+            Dict of year -> number of messages moved (years archived before an error)
+        """
+        cutoff_ms = _to_epoch_ms((now or datetime.now(timezone.utc)) - timedelta(days=older_than_days))
+        moved = {}
+        
+        try:
+            with self.get_connection() as conn:
+                years = conn.execute("""
+                    SELECT CAST(strftime('%Y', date_sent_ms / 1000, 'unixepoch') AS INTEGER) AS year
+                    FROM messages
+                    WHERE date_sent_ms < ?
+                    GROUP BY year
+                    ORDER BY year
+                """, (cutoff_ms,)).fetchall()
+                # Rows written after this point are left for the next run
+                watermarks = tuple(
+                    conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+                    for table in ARCHIVED_TABLES
+                )
+                schema = self._get_table_schema(conn)
+        except Exception as e:
+            logger.error(f"Error finding messages to archive: {e}")
+            return moved
+        
+        for (year,) in years:
+            start_ms = _to_epoch_ms(datetime(year, 1, 1))
+            end_ms = min(_to_epoch_ms(datetime(year + 1, 1, 1)), cutoff_ms)
+            try:
+                moved[year] = self._archive_year(year, start_ms, end_ms, watermarks, schema)
+                logger.info(f"Archived {moved[year]} messages of {year}")
+            except Exception as e:
+                logger.error(f"Error archiving messages of {year}: {e}")
+                break
+        
+        if moved:
+            self._emit_change('messages', ChangeAction.ARCHIVED)
+        return moved
+    
+    @staticmethod
+    def _get_table_schema(conn: sqlite3.Connection) -> List[Tuple[str, str, str]]:
+        """Get (type, name, sql) of the archived tables and their indexes, tables first."""
+        placeholders = ",".join("?" * len(ARCHIVED_TABLES))
+        rows = conn.execute(f"""
+            SELECT type, name, sql FROM sqlite_master
+            WHERE tbl_name IN ({placeholders}) AND sql IS NOT NULL AND type IN ('table', 'index')
+            ORDER BY type = 'index'
+        """, ARCHIVED_TABLES).fetchall()
+        return [tuple(row) for row in rows]
+    
+    def _archive_year(
+        self,
+        year: int,
+        start_ms: int,
+        end_ms: int,
+        watermarks: Tuple[int, int, int],
+        schema: List[Tuple[str, str, str]]
+    ) -> int:
+        """Copy one year to its archive database, register it and delete it from the hot database."""
+        path = archive_path(self.db_path, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        message_watermark = watermarks[0]
+        range_params = (start_ms, end_ms, message_watermark)
+        
+        archive = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+        try:
+            archive.execute("PRAGMA journal_mode=WAL")
+            existing = {row[0] for row in archive.execute("SELECT name FROM sqlite_master")}
+            for _, name, sql in schema:
+                if name not in existing:
+                    archive.execute(sql)
+            
+            archive.execute("ATTACH DATABASE ? AS hot", (self.db_path,))
+            try:
+                archive.execute("BEGIN IMMEDIATE")
+                for table, watermark in zip(ARCHIVED_TABLES, watermarks):
+                    # Generated columns (e.g. date_sent_ms) can't be inserted
+                    columns = ", ".join(
+                        row[1] for row in archive.execute(f"PRAGMA main.table_xinfo({table})") if row[6] == 0
+                    )
+                    if table == 'messages':
+                        where, params = _ARCHIVED_MESSAGES_SQL.replace("{alias}", table), range_params
+                    else:
+                        where = _FOLLOWER_SQL.format(schema="hot.", table=table)
+                        params = (watermark,) + range_params
+                    archive.execute(
+                        f"INSERT OR REPLACE INTO main.{table} ({columns}) SELECT {columns} FROM hot.{table} WHERE {where}",
+                        params
+                    )
+                archive.execute("COMMIT")
+            except Exception:
+                archive.execute("ROLLBACK")
+                raise
+            finally:
+                archive.execute("DETACH DATABASE hot")
+            
+            message_count, min_date_ms, max_date_ms = archive.execute(
+                "SELECT COUNT(*), MIN(date_sent_ms), MAX(date_sent_ms) FROM messages"
+            ).fetchone()
+        finally:
+            archive.close()
+        
+        # Register the archive before deleting, so readers never miss the moved rows
+        self.run_write(lambda conn: conn.execute("""
+            INSERT INTO archive_periods (year, file_name, message_count, min_date_ms, max_date_ms)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(year) DO UPDATE SET
+                file_name = excluded.file_name,
+                message_count = excluded.message_count,
+                min_date_ms = excluded.min_date_ms,
+                max_date_ms = excluded.max_date_ms,
+                archived_at = CURRENT_TIMESTAMP
+        """, (year, path.name, message_count, min_date_ms, max_date_ms)))
+        reset_archive_periods(self.db_path)
+        
+        def delete_archived(conn) -> int:
+            # Followers first: their predicate looks up the messages being deleted
+            for table, watermark in reversed(list(zip(ARCHIVED_TABLES, watermarks))):
+                if table == 'messages':
+                    cursor = conn.execute(
+                        f"DELETE FROM messages WHERE {_ARCHIVED_MESSAGES_SQL.replace('{alias}', 'messages')}",
+                        range_params
+                    )
+                else:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE {_FOLLOWER_SQL.format(schema='', table=table)}",
+                        (watermark,) + range_params
+                    )
+            return cursor.rowcount
+        
+        return self.run_write(delete_archived)
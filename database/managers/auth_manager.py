@@ -16,7 +16,7 @@ class AuthManager(BaseDatabaseManager):
     def save_login_credential(self, email: str, encrypted_password: str) -> bool:
         """Save or update login credential."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("""
                     INSERT INTO login_credentials (email, encrypted_password)
                     VALUES (?, ?)
@@ -56,7 +56,7 @@ class AuthManager(BaseDatabaseManager):
     def delete_login_credential(self, email: Optional[str] = None) -> bool:
         """Delete login credential(s). If email is None, delete all."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 if email:
                     conn.execute("DELETE FROM login_credentials WHERE email = ?", (email,))
                 else:
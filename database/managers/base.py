@@ -5,18 +5,27 @@ Base database manager with connection management, migrations, and helper functio
 import sqlite3
 import os
 import base64
-from datetime import datetime
-from typing import Any, Optional
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Optional
 from pathlib import Path
 import logging
 
-from database.models.schema import CREATE_TABLES_SQL
+from database.models.schema import CREATE_TABLES_SQL, REBUILD_TAG_ANALYTICS_SQL, EPOCH_MS_SQL, EPOCH_MS_COLUMNS
+from database.change_events import ChangeAction, DataChangeEvent, data_change_bus
+from database.async_query_executor import register_connection
+from database.db_writer import get_db_writer
+from database.read_snapshot import (
+    ReadSnapshot, acquire_read_snapshot, pinned_read_snapshot, thread_read_connection
+)
+from database.archive_store import archives_for_range
 
 logger = logging.getLogger(__name__)
 
 # Track initialized database paths to avoid duplicate initialization logs
 _initialized_databases: set[str] = set()
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 def _safe_get_row_value(row: sqlite3.Row, key: str, default: Any = None) -> Any:
     """
@@ -41,7 +50,13 @@ def _parse_datetime(dt_value: Any) -> Optional[datetime]:
         return dt_value
     
     if isinstance(dt_value, str):
-        # First try ISO format with timezone (e.g., "2025-11-08 06:39:47+00:00" or "2025-11-08T06:39:47+00:00")
+        # Fast path: SQLite's own formats are ISO 8601 (with or without 'T', fraction or offset)
+        try:
+            return datetime.fromisoformat(dt_value)
+        except ValueError:
+            pass
+        
+        # Then try ISO format with timezone (e.g., "2025-11-08 06:39:47+00:00" or "2025-11-08T06:39:47+00:00")
         try:
             # Check if string contains timezone info (ends with +HH:MM, -HH:MM, or Z)
             has_timezone = ('+' in dt_value and ':' in dt_value.split('+')[-1]) or \
@@ -78,6 +93,22 @@ def _parse_datetime(dt_value: Any) -> Optional[datetime]:
     return None
 
 
+def _to_epoch_ms(dt_value: Any) -> Optional[int]:
+    """
+    Convert a datetime, date or timestamp string to epoch milliseconds (UTC),
+    the representation of the *_ms columns. Naive values are taken as UTC,
+    matching how SQLite reads timestamps without an offset.
+    """
+    if isinstance(dt_value, date) and not isinstance(dt_value, datetime):
+        dt_value = datetime.combine(dt_value, datetime.min.time())
+    dt = _parse_datetime(dt_value)
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
 class BaseDatabaseManager:
     """Base class for database managers with connection management and migrations."""
     
@@ -212,6 +243,10 @@ class BaseDatabaseManager:
                 raise PermissionError(f"Database directory is not writable: {db_dir}")
             
             with sqlite3.connect(normalized_path) as conn:
+                # New databases release free pages incrementally (see MaintenanceManager);
+                # no-op once tables exist
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                
                 # Enable WAL (Write-Ahead Logging) mode for better concurrency
                 # WAL mode allows multiple readers while one writer is active
                 # This significantly reduces database lock conflicts
@@ -553,7 +588,6 @@ class BaseDatabaseManager:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_tag ON message_tags(tag)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_group_id ON message_tags(group_id)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_user_id ON message_tags(user_id)")
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_date_sent ON message_tags(date_sent)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_group_tag ON message_tags(group_id, tag)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_user_group_tag ON message_tags(user_id, group_id, tag)")
                 logger.info("Created message_tags table")
@@ -578,18 +612,60 @@ class BaseDatabaseManager:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_user_groups_group_id ON user_groups(group_id)")
                 logger.info("Created user_groups table")
             
+            # Participant caches crawled before completeness was tracked count as possibly truncated
+            cursor = conn.execute("PRAGMA table_info(group_participant_cache)")
+            if 'is_complete' not in {row[1] for row in cursor.fetchall()}:
+                conn.execute("ALTER TABLE group_participant_cache ADD COLUMN is_complete BOOLEAN NOT NULL DEFAULT 0")
+                logger.info("Added is_complete column to group_participant_cache table")
+            
+            # Backfill tag analytics counters for databases tagged before they existed
+            has_tags = conn.execute("SELECT EXISTS(SELECT 1 FROM message_tags)").fetchone()[0]
+            has_tag_counts = conn.execute("SELECT EXISTS(SELECT 1 FROM tag_daily_counts)").fetchone()[0]
+            if has_tags and not has_tag_counts:
+                # executescript autocommits each statement; run the rebuild as one transaction
+                try:
+                    conn.executescript(f"BEGIN;\n{REBUILD_TAG_ANALYTICS_SQL}\nCOMMIT;")
+                except Exception:
+                    conn.rollback()
+                    raise
+                logger.info("Backfilled tag analytics counters")
+            
+            # Integer epoch-ms timestamps: range filters and sorting compare integers, not strings
+            for table, epoch_columns in EPOCH_MS_COLUMNS.items():
+                cursor = conn.execute(f"PRAGMA table_xinfo({table})")
+                table_columns = {row[1] for row in cursor.fetchall()}
+                for source, generated in epoch_columns:
+                    if generated not in table_columns:
+                        conn.execute(
+                            f"ALTER TABLE {table} ADD COLUMN {generated} INTEGER "
+                            f"GENERATED ALWAYS AS ({EPOCH_MS_SQL.format(column=source)}) VIRTUAL"
+                        )
+                        logger.info(f"Added {generated} column to {table} table")
+            conn.execute("DROP INDEX IF EXISTS idx_messages_date_sent")
+            conn.execute("DROP INDEX IF EXISTS idx_message_tags_date_sent")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_date_sent_ms ON messages(date_sent_ms)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_group_date_sent_ms ON messages(group_id, date_sent_ms)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_date_sent_ms ON message_tags(date_sent_ms)")
+            # VIRTUAL columns are computed per row read; indexes store them for the filters and sorts on them
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_user_date_sent_ms ON messages(user_id, date_sent_ms)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_message_tags_group_date_sent_ms ON message_tags(group_id, date_sent_ms)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_message_tags_tag_group_date_sent_ms ON message_tags(tag, group_id, date_sent_ms)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_reactions_group_reacted_at_ms ON reactions(group_id, reacted_at_ms)")
+            
             # Create indexes if they don't exist
             conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_message_type ON messages(message_type)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_reactions_message_id ON reactions(message_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_reactions_user_id_group_id ON reactions(user_id, group_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_reactions_message_link ON reactions(message_link)")
-            
+        
         except Exception as e:
             logger.error(f"Error running migrations: {e}")
             # Don't raise - migrations are best effort
     
     def get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
+        """Get database connection (reads; writes go through get_write_connection)."""
         # Increase timeout to 10 seconds to handle concurrent operations better
         conn = sqlite3.connect(self.db_path, timeout=10.0)
         conn.row_factory = sqlite3.Row
@@ -603,8 +679,147 @@ class BaseDatabaseManager:
             # If WAL mode fails (e.g., on some file systems), continue with default mode
             pass
         
+        # Lets a cancelled executor call interrupt the statement running on this connection
+        register_connection(conn)
         return conn
     
+    def _archives_for(self, archive_range: Optional[tuple]) -> tuple:
+        """Archives (alias, path) overlapping a (start_date, end_date) range (None for hot data only)."""
+        if archive_range is None:
+            return ()
+        start_date, end_date = archive_range
+        return archives_for_range(self.db_path, _to_epoch_ms(start_date), _to_epoch_ms(end_date))
+    
+    @contextmanager
+    def read_snapshot(self, archive_range: Optional[tuple] = None):
+        """
+        Read from a consistent snapshot of the database.
+        
+        Uses the snapshot pinned on this thread (see acquire_read_snapshot), or
+        else this thread's own reader connection in a read transaction lasting
+        for the block. Either way the connection is registered with the running
+        executor call, so cancelling the call interrupts the read. Don't write
+        through it, and don't use it for reads that must see the current write
+        command's changes.
+        
+        Args:
+            archive_range: (start_date, end_date) of a read of messages, tags or
+                reactions (either may be None); archived years overlapping it are
+                read along with the hot rows. None reads the hot database only.
+        """
+        archives = self._archives_for(archive_range)
+        snapshot = pinned_read_snapshot(self.db_path, archives)
+        if snapshot is not None:
+            with snapshot.connection() as conn:
+                yield conn
+            return
+        
+        with thread_read_connection(self.db_path, archives) as conn:
+            yield conn
+    
+    def acquire_read_snapshot(self, archive_range: Optional[tuple] = None, readers: int = 1) -> ReadSnapshot:
+        """
+        Open one snapshot for a multi-query load (e.g. every widget of a page).
+        
+        Run the load's queries through snapshot.run(func) so that their
+        read_snapshot() calls use it, and call snapshot.release() when done.
+        
+        Args:
+            archive_range: (start_date, end_date) covered by the load (see read_snapshot)
+            readers: Queries of the load that run in parallel
+        
+        Returns:
+            ReadSnapshot held by the caller
+        """
+        return acquire_read_snapshot(
+            self.db_path, archives=self._archives_for(archive_range), readers=readers
+        )
+    
+    @contextmanager
+    def get_write_connection(self):
+        """
+        Borrow the database's single write connection.
+        
+        Writes from every manager and thread are serialized through one writer
+        thread and committed in groups, so they never contend for the SQLite
+        write lock. The block runs in its own savepoint: conn.commit() is a no-op
+        and the context exits once the group is committed. Change events
+        published inside the block are delivered after that commit.
+        """
+        with data_change_bus.batch():
+            with get_db_writer(self.db_path).connection() as conn:
+                yield conn
+    
+    def run_write(self, func: Callable[[Any], Any]) -> Any:
+        """
+        Run a write command on the writer thread and wait for its commit.
+        
+        Use this rather than get_write_connection() for long or bulk writes: the
+        writer runs func itself instead of waiting idle for the caller's block.
+        
+        Args:
+            func: Called with the write connection
+        
+        Returns:
+            func's result
+        """
+        return get_db_writer(self.db_path).run(func)
+    
+    async def execute_write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Queue a write and await its commit without blocking the event loop.
+        
+        func runs on the writer thread, so manager write methods can be passed
+        directly: their get_write_connection() joins the queued command. Change
+        events they publish are delivered on the awaiting thread after the commit.
+        
+        Args:
+            func: Manager write method (or any callable doing writes)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            func's result
+        """
+        events = []
+        
+        def command(conn):
+            with data_change_bus.collect() as collected:
+                result = func(*args, **kwargs)
+            events.extend(collected)
+            return result
+        
+        result = await get_db_writer(self.db_path).execute(command)
+        for event in events:
+            data_change_bus.publish(event)
+        return result
+    
+    def _emit_change(
+        self,
+        table: str,
+        action: ChangeAction = ChangeAction.SAVED,
+        group_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        message_ids: Optional[list] = None
+    ):
+        """
+        Publish a data change event after a committed write.
+        Never raises - listeners must not be able to fail a write.
+        """
+        try:
+            ids = [m for m in (message_ids or []) if m is not None]
+            data_change_bus.publish(DataChangeEvent(
+                table=table,
+                action=action,
+                group_id=group_id,
+                user_id=user_id,
+                message_id_min=min(ids) if ids else None,
+                message_id_max=max(ids) if ids else None,
+                count=max(len(ids), 1)
+            ))
+        except Exception as e:
+            logger.debug(f"Error publishing change event for {table}: {e}")
+    
     def get_encryption_service(self):
         """
         Get or initialize field encryption service.
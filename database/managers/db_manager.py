@@ -16,7 +16,7 @@ from database.managers.telegram_credential_manager import TelegramCredentialMana
 from database.managers.group_manager import GroupManager
 from database.managers.fetch_history_manager import FetchHistoryManager
 from database.managers.user_manager import UserManager
-from database.managers.message_manager import MessageManager
+from database.managers.message_manager import MessageManager, MESSAGE_SAVE_BATCH_SIZE, REPORT_FETCH_ROWS
 from database.managers.media_manager import MediaManager
 from database.managers.reaction_manager import ReactionManager
 from database.managers.stats_manager import StatsManager
@@ -26,6 +26,10 @@ from database.managers.account_activity_manager import AccountActivityManager
 from database.managers.update_manager import UpdateManager
 from database.managers.tag_manager import TagManager
 from database.managers.user_group_manager import UserGroupManager
+from database.managers.participant_cache_manager import ParticipantCacheManager
+from database.managers.archive_manager import ArchiveManager
+from database.managers.maintenance_manager import MaintenanceManager, INCREMENTAL_VACUUM_PAGES
+from database.archive_store import ARCHIVE_AFTER_DAYS
 
 
 class DatabaseManager(BaseDatabaseManager):
@@ -70,6 +74,9 @@ class DatabaseManager(BaseDatabaseManager):
         self._update = UpdateManager(normalized_db_path)
         self._tag = TagManager(normalized_db_path)
         self._user_group = UserGroupManager(normalized_db_path)
+        self._participant_cache = ParticipantCacheManager(normalized_db_path)
+        self._archive = ArchiveManager(normalized_db_path)
+        self._maintenance = MaintenanceManager(normalized_db_path)
     
     # Delegate all methods to composed managers
     # App Settings
@@ -150,16 +157,33 @@ class DatabaseManager(BaseDatabaseManager):
     def soft_delete_user(self, user_id):
         return self._user.soft_delete_user(user_id)
     
+    def get_user_deletion_states(self, user_ids):
+        return self._user.get_user_deletion_states(user_ids)
+    
+    def import_group_members(self, users, group_id, group_name, group_username=None, restore_user_ids=None):
+        return self._user.import_group_members(users, group_id, group_name, group_username, restore_user_ids)
+    
     # Messages
     def save_message(self, message):
         return self._message.save_message(message)
     
+    def save_messages_with_tags(self, messages, batch_size=MESSAGE_SAVE_BATCH_SIZE):
+        return self._message.save_messages_with_tags(messages, batch_size)
+    
     def get_messages(self, group_id=None, group_ids=None, user_id=None, start_date=None, end_date=None,
-                     include_deleted=False, limit=None, offset=0, tags=None, message_type_filter=None):
+                     include_deleted=False, limit=None, offset=0, tags=None, message_type_filter=None, columns=None):
         return self._message.get_messages(group_id=group_id, group_ids=group_ids, user_id=user_id, 
                                          start_date=start_date, end_date=end_date,
                                          include_deleted=include_deleted, limit=limit, offset=offset, tags=tags,
-                                         message_type_filter=message_type_filter)
+                                         message_type_filter=message_type_filter, columns=columns)
+    
+    def iter_message_report_rows(self, group_id=None, group_ids=None, user_id=None, start_date=None, end_date=None,
+                                 include_deleted=False, tags=None, message_type_filter=None,
+                                 batch_size=REPORT_FETCH_ROWS):
+        return self._message.iter_message_report_rows(group_id=group_id, group_ids=group_ids, user_id=user_id,
+                                                      start_date=start_date, end_date=end_date,
+                                                      include_deleted=include_deleted, tags=tags,
+                                                      message_type_filter=message_type_filter, batch_size=batch_size)
     
     def get_message_count(self, group_id=None, user_id=None, include_deleted=False):
         return self._message.get_message_count(group_id, user_id, include_deleted)
@@ -167,6 +191,9 @@ class DatabaseManager(BaseDatabaseManager):
     def soft_delete_message(self, message_id, group_id):
         return self._message.soft_delete_message(message_id, group_id)
     
+    def get_message_ids_since(self, group_id, since, limit=None):
+        return self._message.get_message_ids_since(group_id, since, limit)
+    
     def is_message_deleted(self, message_id, group_id):
         return self._message.is_message_deleted(message_id, group_id)
     
@@ -199,6 +226,18 @@ class DatabaseManager(BaseDatabaseManager):
     def delete_reaction(self, reaction_id):
         return self._reaction.delete_reaction(reaction_id)
     
+    def save_reaction_counts(self, group_id, counts):
+        return self._reaction.save_reaction_counts(group_id, counts)
+    
+    def get_reaction_counts(self, message_id, group_id):
+        return self._reaction.get_reaction_counts(message_id, group_id)
+    
+    def get_most_reacted_messages(self, group_id=None, start_date=None, end_date=None, limit=10):
+        return self._reaction.get_most_reacted_messages(group_id, start_date, end_date, limit)
+    
+    def get_top_reaction_emojis(self, group_id=None, limit=10):
+        return self._reaction.get_top_reaction_emojis(group_id, limit)
+    
     # Statistics
     def get_top_active_users_by_group(self, group_id=None, group_ids=None, start_date=None, end_date=None, limit=10):
         return self._stats.get_top_active_users_by_group(
@@ -215,12 +254,19 @@ class DatabaseManager(BaseDatabaseManager):
     def get_dashboard_stats(self, group_ids=None, start_date=None, end_date=None):
         return self._stats.get_dashboard_stats(group_ids=group_ids, start_date=start_date, end_date=end_date)
     
+    def get_dashboard_stat(self, key, group_ids=None, start_date=None, end_date=None):
+        return self._stats.get_dashboard_stat(key, group_ids=group_ids, start_date=start_date, end_date=end_date)
+    
     def get_user_activity_stats(self, user_id, group_id=None, start_date=None, end_date=None):
         return self._stats.get_user_activity_stats(user_id, group_id, start_date, end_date)
     
     def get_message_type_breakdown(self, user_id, group_id=None):
         return self._stats.get_message_type_breakdown(user_id, group_id)
     
+    def get_activity_bins(self, by='user', ids=None, group_ids=None, start_date=None, end_date=None,
+                          utc_offset_minutes=None):
+        return self._stats.get_activity_bins(by, ids, group_ids, start_date, end_date, utc_offset_minutes)
+    
     # Auth
     def save_login_credential(self, email, encrypted_password):
         return self._auth.save_login_credential(email, encrypted_password)
@@ -300,10 +346,22 @@ class DatabaseManager(BaseDatabaseManager):
     def get_tag_counts_by_group(self, group_id):
         return self._tag.get_tag_counts_by_group(group_id)
     
+    def get_tag_daily_counts(self, group_id, tags=None, start_date=None, end_date=None):
+        return self._tag.get_tag_daily_counts(group_id, tags, start_date, end_date)
+    
+    def get_tag_cooccurrence(self, group_id, tags=None):
+        return self._tag.get_tag_cooccurrence(group_id, tags)
+    
+    def rebuild_tag_analytics(self):
+        return self._tag.rebuild_tag_analytics()
+    
     # User Groups
     def save_user_group(self, user_id, group_id, group_name, group_username=None):
         return self._user_group.save_user_group(user_id, group_id, group_name, group_username)
     
+    def save_user_group_memberships(self, user_ids, group_id, group_name, group_username=None):
+        return self._user_group.save_user_group_memberships(user_ids, group_id, group_name, group_username)
+    
     def get_user_groups(self, user_id):
         return self._user_group.get_user_groups(user_id)
     
@@ -321,4 +379,52 @@ class DatabaseManager(BaseDatabaseManager):
     
     def get_users_with_group_counts(self, group_ids=None, search_query=None):
         return self._user_group.get_users_with_group_counts(group_ids, search_query)
-
+    
+    # Group Participant Cache
+    def get_participant_cache_info(self, group_ids=None):
+        return self._participant_cache.get_participant_cache_info(group_ids)
+    
+    def replace_group_participants(self, group_id, group_name, user_ids, group_username=None):
+        return self._participant_cache.replace_group_participants(group_id, group_name, user_ids, group_username)
+    
+    def merge_group_participants(self, group_id, group_name, user_ids, group_username=None, is_complete=None):
+        return self._participant_cache.merge_group_participants(group_id, group_name, user_ids, group_username,
+                                                                is_complete)
+    
+    def get_group_participant_ids(self, group_id):
+        return self._participant_cache.get_group_participant_ids(group_id)
+    
+    def find_common_groups(self, user_ids, group_ids=None):
+        return self._participant_cache.find_common_groups(user_ids, group_ids)
+    
+    def delete_group_participants(self, group_id):
+        return self._participant_cache.delete_group_participants(group_id)
+    
+    # Archive
+    def archive_old_data(self, older_than_days=ARCHIVE_AFTER_DAYS, now=None):
+        return self._archive.archive_old_data(older_than_days, now)
+    
+    # Maintenance
+    def get_storage_stats(self):
+        return self._maintenance.get_storage_stats()
+    
+    def checkpoint(self, mode='TRUNCATE'):
+        return self._maintenance.checkpoint(mode)
+    
+    def optimize(self, full=False):
+        return self._maintenance.optimize(full)
+    
+    def incremental_vacuum(self, max_pages=INCREMENTAL_VACUUM_PAGES):
+        return self._maintenance.incremental_vacuum(max_pages)
+    
+    def quick_check(self):
+        return self._maintenance.quick_check()
+    
+    def record_maintenance(self, task, success=True, duration_ms=0, detail=None, stats=None):
+        return self._maintenance.record_maintenance(task, success, duration_ms, detail, stats)
+    
+    def get_last_maintenance(self, task, success_only=True):
+        return self._maintenance.get_last_maintenance(task, success_only)
+    
+    def get_storage_history(self, since=None, limit=1000):
+        return self._maintenance.get_storage_history(since, limit)
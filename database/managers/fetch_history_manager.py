@@ -23,7 +23,7 @@ class FetchHistoryManager(BaseDatabaseManager):
             encrypted_full_name = encryption_service.encrypt_field(history.account_full_name) if encryption_service else history.account_full_name
             encrypted_username = encryption_service.encrypt_field(history.account_username) if encryption_service else history.account_username
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO group_fetch_history 
                     (group_id, start_date, end_date, message_count, account_phone_number, 
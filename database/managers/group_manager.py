@@ -20,7 +20,7 @@ class GroupManager(BaseDatabaseManager):
             existing_group = self.get_group_by_id(group.group_id)
             is_new_group = existing_group is None
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO telegram_groups 
                     (group_id, group_name, group_username, group_photo_path, last_fetch_date, total_messages)
@@ -56,6 +56,7 @@ class GroupManager(BaseDatabaseManager):
                         logger.error(f"Error tracking group addition: {e}", exc_info=True)
                         # Don't fail if tracking fails
                 
+                self._emit_change('telegram_groups', group_id=group.group_id)
                 return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error saving group: {e}")
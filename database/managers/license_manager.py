@@ -69,7 +69,7 @@ class LicenseManager(BaseDatabaseManager):
                 logger.error("Failed to encrypt license_tier")
                 return None
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO user_license_cache 
                     (user_email, license_tier, expiration_date, max_devices, max_groups, max_accounts, max_account_actions, last_synced, is_active)
@@ -156,7 +156,7 @@ class LicenseManager(BaseDatabaseManager):
     def delete_license_cache(self, user_email: str) -> bool:
         """Delete license cache for a user."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute(
                     "DELETE FROM user_license_cache WHERE user_email = ?",
                     (user_email,)
@@ -0,0 +1,232 @@
+"""
+Maintenance manager for SQLite housekeeping (checkpoints, statistics, vacuum, integrity).
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from database.managers.base import BaseDatabaseManager, _parse_datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pages released per incremental vacuum run (bounded so the writer is not held for long)
+INCREMENTAL_VACUUM_PAGES = 2000
+
+# Free pages (as a fraction of the file) that justify the one-time VACUUM converting
+# a database created before auto_vacuum=INCREMENTAL
+VACUUM_FREELIST_RATIO = 0.25
+
+# Seconds a checkpoint or VACUUM waits for the writer and readers
+MAINTENANCE_BUSY_TIMEOUT = 30.0
+
+# Maintenance log rows older than this are pruned
+MAINTENANCE_LOG_DAYS = 90
+
+# PRAGMA auto_vacuum values
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+class MaintenanceManager(BaseDatabaseManager):
+    """Manages database maintenance tasks and the storage history."""
+    
+    def _open_maintenance_connection(self) -> sqlite3.Connection:
+        """Connection outside the writer's group transaction (checkpoint and VACUUM can't run inside one)."""
+        conn = sqlite3.connect(self.db_path, timeout=MAINTENANCE_BUSY_TIMEOUT, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {int(MAINTENANCE_BUSY_TIMEOUT * 1000)}")
+        return conn
+    
+    def get_storage_stats(self) -> Dict[str, int]:
+        """
+        Get page, freelist and file sizes of the database.
+        
+        Returns:
+            Dict with page_count, page_size, freelist_count, auto_vacuum, db_bytes
+            and wal_bytes (empty dict on error)
+        """
+        try:
+            with self.get_connection() as conn:
+                stats = {
+                    pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                    for pragma in ('page_count', 'page_size', 'freelist_count', 'auto_vacuum')
+                }
+            stats['db_bytes'] = os.path.getsize(self.db_path)
+            wal_path = f"{self.db_path}-wal"
+            stats['wal_bytes'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+            return stats
+        except Exception as e:
+            logger.error(f"Error getting storage stats: {e}")
+            return {}
+    
+    def checkpoint(self, mode: str = 'TRUNCATE') -> bool:
+        """
+        Copy the WAL into the database file and (TRUNCATE) reset the WAL to zero bytes.
+        
+        Args:
+            mode: PASSIVE, FULL, RESTART or TRUNCATE
+        
+        Returns:
+            True if the checkpoint completed, False if readers/the writer kept it busy or on error
+        """
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        try:
+            conn = self._open_maintenance_connection()
+            try:
+                busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            finally:
+                conn.close()
+            if busy:
+                logger.debug(f"WAL checkpoint ({mode}) busy: {checkpointed}/{log_frames} frames")
+            return not busy
+        except Exception as e:
+            logger.error(f"Error checkpointing WAL: {e}")
+            return False
+    
+    def optimize(self, full: bool = False) -> bool:
+        """
+        Refresh the query planner statistics.
+        
+        Args:
+            full: Run ANALYZE over every table instead of PRAGMA optimize
+                (which only analyzes tables whose statistics look stale)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.run_write(lambda conn: conn.execute("ANALYZE" if full else "PRAGMA optimize"))
+            return True
+        except Exception as e:
+            logger.error(f"Error {'analyzing' if full else 'optimizing'} database: {e}")
+            return False
+    
+    def incremental_vacuum(self, max_pages: int = INCREMENTAL_VACUUM_PAGES) -> int:
+        """
+        Return up to max_pages free pages to the file system.
+        
+        Databases created before auto_vacuum=INCREMENTAL are converted with one full
+        VACUUM once their free pages reach VACUUM_FREELIST_RATIO of the file.
+        
+        Returns:
+            Number of pages released (0 if nothing to do or on error)
+        """
+        stats = self.get_storage_stats()
+        if not stats or not stats['freelist_count']:
+            return 0
+        try:
+            if stats['auto_vacuum'] == _AUTO_VACUUM_INCREMENTAL:
+                def vacuum(conn):
+                    # sqlite3 steps a row-less statement once, and each step releases one page
+                    for _ in range(min(max_pages, stats['freelist_count'])):
+                        conn.execute("PRAGMA incremental_vacuum(1)")
+                
+                self.run_write(vacuum)
+            elif stats['freelist_count'] >= stats['page_count'] * VACUUM_FREELIST_RATIO:
+                logger.info(f"Converting database to incremental vacuum ({stats['freelist_count']} free pages)")
+                conn = self._open_maintenance_connection()
+                try:
+                    conn.execute(f"PRAGMA auto_vacuum = {_AUTO_VACUUM_INCREMENTAL}")
+                    conn.execute("VACUUM")
+                finally:
+                    conn.close()
+            else:
+                return 0
+            return max(0, stats['freelist_count'] - self.get_storage_stats().get('freelist_count', 0))
+        except Exception as e:
+            logger.error(f"Error vacuuming database: {e}")
+            return 0
+    
+    def quick_check(self) -> bool:
+        """
+        Run PRAGMA quick_check.
+        
+        Returns:
+            True if the database is intact, False if problems were found or on error
+        """
+        try:
+            with self.get_connection() as conn:
+                problems = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+            if problems != ['ok']:
+                logger.error(f"Database integrity problems in {self.db_path}: {problems[:10]}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"Error checking database integrity: {e}")
+            return False
+    
+    def record_maintenance(
+        self,
+        task: str,
+        success: bool = True,
+        duration_ms: int = 0,
+        detail: Optional[str] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Log a maintenance run (or a plain 'stats' sample) with the current storage stats.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if stats is None:
+            stats = self.get_storage_stats()
+        try:
+            with self.get_write_connection() as conn:
+                conn.execute("""
+                    INSERT INTO maintenance_log
+                    (task, success, duration_ms, detail, page_count, freelist_count, wal_bytes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    task, success, duration_ms, detail,
+                    stats.get('page_count'), stats.get('freelist_count'), stats.get('wal_bytes')
+                ))
+                conn.execute(
+                    "DELETE FROM maintenance_log WHERE ran_at < datetime('now', ?)",
+                    (f"-{MAINTENANCE_LOG_DAYS} days",)
+                )
+                conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error recording maintenance task {task}: {e}")
+            return False
+    
+    def get_last_maintenance(self, task: str, success_only: bool = True) -> Optional[datetime]:
+        """Get the (UTC) time task last ran, or None if it never did."""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    f"SELECT MAX(ran_at) FROM maintenance_log WHERE task = ?{' AND success = 1' if success_only else ''}",
+                    (task,)
+                ).fetchone()
+            return _parse_datetime(row[0]) if row and row[0] else None
+        except Exception as e:
+            logger.error(f"Error getting last maintenance run of {task}: {e}")
+            return None
+    
+    def get_storage_history(self, since: Optional[datetime] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Get logged storage stats over time, oldest first.
+        
+        Args:
+            since: Optional (UTC) start time
+            limit: Maximum number of rows (the most recent ones)
+        """
+        try:
+            query = "SELECT task, ran_at, success, duration_ms, detail, page_count, freelist_count, wal_bytes FROM maintenance_log"
+            params = []
+            if since:
+                query += " WHERE ran_at >= ?"
+                params.append(since.strftime('%Y-%m-%d %H:%M:%S'))
+            query += " ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            with self.get_connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+            return [
+                {**dict(row), 'ran_at': _parse_datetime(row['ran_at']), 'success': bool(row['success'])}
+                for row in reversed(rows)
+            ]
+        except Exception as e:
+            logger.error(f"Error getting storage history: {e}")
+            return []
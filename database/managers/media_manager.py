@@ -16,7 +16,7 @@ class MediaManager(BaseDatabaseManager):
     def save_media_file(self, media: MediaFile) -> Optional[int]:
         """Save a media file record."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO media_files 
                     (message_id, file_path, file_name, file_size_bytes, file_type, mime_type, thumbnail_path)
@@ -2,16 +2,82 @@
 Messages manager.
 """
 
-from typing import Optional, List
+from typing import Any, Iterator, Optional, List, Sequence, Tuple
 from datetime import datetime
-from database.managers.base import BaseDatabaseManager, _safe_get_row_value, _parse_datetime
-from database.models.message import Message
+import sqlite3
+from database.managers.base import BaseDatabaseManager, _parse_datetime, _to_epoch_ms
+from database.read_snapshot import ReadSnapshot
+from database.change_events import ChangeAction, data_change_bus
+from database.models.message import Message, LazyMessage, LAZY_MESSAGE_FIELDS
 from database.managers.tag_manager import TagManager
 from utils.tag_extractor import TagExtractor
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columns get_messages(columns=...) can project
+MESSAGE_COLUMNS = (
+    'id', 'message_id', 'group_id', 'user_id', 'content', 'caption', 'date_sent',
+    'has_media', 'media_type', 'media_count', 'message_link', 'message_type',
+    'has_sticker', 'has_link', 'sticker_emoji', 'is_deleted', 'created_at', 'updated_at',
+)
+
+_BOOLEAN_MESSAGE_COLUMNS = frozenset({'has_media', 'has_sticker', 'has_link', 'is_deleted'})
+_ENCRYPTED_MESSAGE_COLUMNS = frozenset({'content', 'caption', 'message_link'})
+
+# SQL conditions (on messages aliased as m) of get_messages' message_type_filter values;
+# "mention" is matched on the decrypted text instead
+_MESSAGE_TYPE_FILTERS = {
+    'voice': "m.message_type = 'voice'",
+    'audio': "m.message_type = 'audio'",
+    'photos': "m.message_type = 'photo'",
+    'videos': "m.message_type = 'video'",
+    'files': "m.message_type = 'document'",
+    'link': "m.has_link = 1",
+    'poll': "m.message_type = 'poll'",
+    'location': "m.message_type = 'location'",
+    'tag': "EXISTS (SELECT 1 FROM message_tags mt WHERE mt.message_id = m.message_id AND mt.group_id = m.group_id)",
+}
+
+# Rows fetched and decrypted per batch by iter_message_report_rows
+REPORT_FETCH_ROWS = 2000
+
+# Messages written per transaction by save_messages_with_tags
+MESSAGE_SAVE_BATCH_SIZE = 2000
+
+_UPSERT_MESSAGE_SQL = """
+    INSERT INTO messages 
+    (message_id, group_id, user_id, content, caption, date_sent, 
+     has_media, media_type, media_count, message_link,
+     message_type, has_sticker, has_link, sticker_emoji)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(message_id, group_id) DO UPDATE SET
+        content = excluded.content,
+        caption = excluded.caption,
+        has_media = excluded.has_media,
+        media_type = excluded.media_type,
+        media_count = excluded.media_count,
+        message_type = excluded.message_type,
+        has_sticker = excluded.has_sticker,
+        has_link = excluded.has_link,
+        sticker_emoji = excluded.sticker_emoji,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+class _MessageCodec:
+    """Decodes LazyMessage fields: decrypts encrypted columns and parses timestamps."""
+    
+    __slots__ = ('encryption_service',)
+    
+    def __init__(self, encryption_service):
+        self.encryption_service = encryption_service
+    
+    def decode(self, field: str, raw: Any) -> Any:
+        if field in _ENCRYPTED_MESSAGE_COLUMNS:
+            return self.encryption_service.decrypt_field(raw) if self.encryption_service else raw
+        return _parse_datetime(raw)
+
 
 class MessageManager(BaseDatabaseManager):
     """Manages messages operations."""
@@ -22,75 +88,163 @@ class MessageManager(BaseDatabaseManager):
         self._tag_manager = TagManager(db_path)
     
     def save_message(self, message: Message) -> Optional[int]:
-        """Save a message and its tags."""
+        """Save a message and its tags in one transaction."""
         try:
             encryption_service = self.get_encryption_service()
             
-            # Encrypt sensitive fields
-            encrypted_content = encryption_service.encrypt_field(message.content) if encryption_service else message.content
-            encrypted_caption = encryption_service.encrypt_field(message.caption) if encryption_service else message.caption
-            encrypted_message_link = encryption_service.encrypt_field(message.message_link) if encryption_service else message.message_link
+            # Extract tags from the plaintext before it is encrypted
+            tags = self._extract_tags(message)
             
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    INSERT INTO messages 
-                    (message_id, group_id, user_id, content, caption, date_sent, 
-                     has_media, media_type, media_count, message_link,
-                     message_type, has_sticker, has_link, sticker_emoji)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(message_id, group_id) DO UPDATE SET
-                        content = excluded.content,
-                        caption = excluded.caption,
-                        has_media = excluded.has_media,
-                        media_type = excluded.media_type,
-                        media_count = excluded.media_count,
-                        message_type = excluded.message_type,
-                        has_sticker = excluded.has_sticker,
-                        has_link = excluded.has_link,
-                        sticker_emoji = excluded.sticker_emoji,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (
-                    message.message_id,
-                    message.group_id,
-                    message.user_id,
-                    encrypted_content,
-                    encrypted_caption,
-                    message.date_sent,
-                    message.has_media,
-                    message.media_type,
-                    message.media_count,
-                    encrypted_message_link,
-                    message.message_type,
-                    message.has_sticker,
-                    message.has_link,
-                    message.sticker_emoji
-                ))
-                conn.commit()
+            with self.get_write_connection() as conn:
+                cursor = conn.execute(_UPSERT_MESSAGE_SQL, self._encrypt_message_row(message, encryption_service))
                 message_db_id = cursor.lastrowid
-                
-                # Extract and save tags (don't fail message save if tag save fails)
+                saved_tags = self._write_message_tags(conn, message, tags)
+                conn.commit()
+            
+            self._emit_change(
+                'messages',
+                group_id=message.group_id,
+                user_id=message.user_id,
+                message_ids=[message.message_id]
+            )
+            if saved_tags:
+                self._emit_change(
+                    'message_tags',
+                    group_id=message.group_id,
+                    user_id=message.user_id,
+                    message_ids=[message.message_id]
+                )
+            return message_db_id
+        except Exception as e:
+            logger.error(f"Error saving message: {e}")
+            return None
+    
+    def save_messages_with_tags(
+        self,
+        messages: List[Message],
+        batch_size: int = MESSAGE_SAVE_BATCH_SIZE
+    ) -> int:
+        """
+        Save many messages and their tags, committing once per batch.
+        
+        A batch that fails is retried message by message, so one bad row only
+        loses that message.
+        
+        Args:
+            messages: Messages to save
+            batch_size: Messages written per transaction
+            
+        Returns:
+            Number of messages saved
+        """
+        if not messages:
+            return 0
+        
+        encryption_service = self.get_encryption_service()
+        saved = 0
+        
+        with data_change_bus.batch():
+            for start in range(0, len(messages), batch_size):
+                chunk = messages[start:start + batch_size]
                 try:
-                    # Decrypt content and caption for tag extraction
-                    decrypted_content = encryption_service.decrypt_field(encrypted_content) if encryption_service else encrypted_content
-                    decrypted_caption = encryption_service.decrypt_field(encrypted_caption) if encryption_service else encrypted_caption
+                    tags_by_message = [self._extract_tags(message) for message in chunk]
+                    rows = [self._encrypt_message_row(message, encryption_service) for message in chunk]
                     
-                    tags = TagExtractor.extract_tags_from_content_and_caption(decrypted_content, decrypted_caption)
-                    if tags:
-                        self._tag_manager.save_tags(
-                            message.message_id,
-                            message.group_id,
-                            message.user_id,
-                            tags,
-                            message.date_sent
-                        )
-                except Exception as tag_error:
-                    logger.warning(f"Error saving tags for message {message.message_id}: {tag_error}")
-                    # Don't fail message save if tag save fails
+                    with self.get_write_connection() as conn:
+                        conn.executemany(_UPSERT_MESSAGE_SQL, rows)
+                        tagged = [
+                            message for message, tags in zip(chunk, tags_by_message)
+                            if tags and self._write_message_tags(conn, message, tags)
+                        ]
+                        conn.commit()
+                except Exception as e:
+                    # One bad row fails the whole batch; save the rows one by one instead
+                    logger.warning(f"Error saving message batch of {len(chunk)} at offset {start}, saving individually: {e}")
+                    saved += sum(1 for message in chunk if self.save_message(message) is not None)
+                    continue
                 
-                return message_db_id
+                saved += len(chunk)
+                for message in chunk:
+                    self._emit_change(
+                        'messages',
+                        group_id=message.group_id,
+                        user_id=message.user_id,
+                        message_ids=[message.message_id]
+                    )
+                for message in tagged:
+                    self._emit_change(
+                        'message_tags',
+                        group_id=message.group_id,
+                        user_id=message.user_id,
+                        message_ids=[message.message_id]
+                    )
+        
+        return saved
+    
+    @staticmethod
+    def _extract_tags(message: Message) -> List[str]:
+        """Extract tags from a message's plaintext content and caption."""
+        try:
+            return TagExtractor.extract_tags_from_content_and_caption(message.content, message.caption)
         except Exception as e:
-            logger.error(f"Error saving message: {e}")
-            return None
+            logger.warning(f"Error extracting tags for message {message.message_id}: {e}")
+            return []
+    
+    @staticmethod
+    def _encrypt_message_row(message: Message, encryption_service) -> tuple:
+        """Build the parameter tuple for _UPSERT_MESSAGE_SQL, encrypting sensitive fields."""
+        encrypted_content = encryption_service.encrypt_field(message.content) if encryption_service else message.content
+        encrypted_caption = encryption_service.encrypt_field(message.caption) if encryption_service else message.caption
+        encrypted_message_link = encryption_service.encrypt_field(message.message_link) if encryption_service else message.message_link
+        
+        return (
+            message.message_id,
+            message.group_id,
+            message.user_id,
+            encrypted_content,
+            encrypted_caption,
+            message.date_sent,
+            message.has_media,
+            message.media_type,
+            message.media_count,
+            encrypted_message_link,
+            message.message_type,
+            message.has_sticker,
+            message.has_link,
+            message.sticker_emoji
+        )
+    
+    def _write_message_tags(self, conn: sqlite3.Connection, message: Message, tags: List[str]) -> bool:
+        """
+        Write a message's tags inside the caller's transaction.
+        A tag failure is rolled back to a savepoint so the message itself still saves.
+        
+        Returns:
+            True if any tag was newly added
+        """
+        if not tags:
+            return False
+        try:
+            conn.execute("SAVEPOINT message_tags")
+            try:
+                inserted = self._tag_manager.write_tags(
+                    conn,
+                    message.message_id,
+                    message.group_id,
+                    message.user_id,
+                    tags,
+                    message.date_sent
+                )
+            except Exception:
+                conn.execute("ROLLBACK TO SAVEPOINT message_tags")
+                raise
+            finally:
+                conn.execute("RELEASE SAVEPOINT message_tags")
+            return bool(inserted)
+        except Exception as tag_error:
+            logger.warning(f"Error saving tags for message {message.message_id}: {tag_error}")
+            # Don't fail message save if tag save fails
+            return False
     
     def get_messages(
         self, 
@@ -103,11 +257,14 @@ class MessageManager(BaseDatabaseManager):
         limit: Optional[int] = None,
         offset: int = 0,
         tags: Optional[List[str]] = None,
-        message_type_filter: Optional[str] = None
+        message_type_filter: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
     ) -> List[Message]:
         """
         Get messages with filters.
         
+        Encrypted and datetime fields are decoded lazily, on first access.
+        
         Args:
             group_id: Filter by single group ID (for backward compatibility)
             group_ids: Filter by list of group IDs (takes precedence over group_id)
@@ -119,163 +276,191 @@ class MessageManager(BaseDatabaseManager):
             offset: Offset for pagination
             tags: List of tags to filter by (normalized, without # prefix)
             message_type_filter: Filter by message type (voice, audio, photos, videos, files, link, tag, poll, location, mention)
+            columns: Only read these MESSAGE_COLUMNS (other fields keep their defaults)
         """
-        # Determine if we need to use table alias (for tag filter or when tags are specified)
-        use_alias = False
-        if message_type_filter == "tag":
-            use_alias = True
-        
-        # If tags are specified, we need to join with message_tags table
-        if tags and len(tags) > 0:
-            # Filter by tags - get messages that have ALL specified tags
-            # We use a subquery approach to ensure all tags are present
-            normalized_tags = [t.strip().lower() for t in tags if t and t.strip()]
-            
-            if normalized_tags:
-                # For each tag, we need to ensure the message has it
-                # We'll use multiple JOINs or a subquery approach
-                query = """
-                    SELECT DISTINCT m.* FROM messages m
-                    WHERE 1=1
-                """
-                params = []
-                use_alias = True
-                
-                # Add a condition for each tag using EXISTS subqueries
-                for tag in normalized_tags:
-                    query += f"""
-                        AND EXISTS (
-                            SELECT 1 FROM message_tags mt
-                            WHERE mt.message_id = m.message_id
-                            AND mt.group_id = m.group_id
-                            AND mt.tag = ?
-                        )
-                    """
-                    params.append(tag)
-            else:
-                # No valid tags, fall back to regular query
-                if use_alias:
-                    query = "SELECT m.* FROM messages m WHERE 1=1"
-                else:
-                    query = "SELECT * FROM messages WHERE 1=1"
-                params = []
+        if columns:
+            unknown = set(columns) - set(MESSAGE_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown message columns: {sorted(unknown)}")
+            selected = list(dict.fromkeys(columns))
+            if message_type_filter == "mention":
+                # The mention filter reads the decrypted text
+                selected += [column for column in ('content', 'caption') if column not in selected]
+            select_list = ", ".join(f"m.{column}" for column in selected)
         else:
-            if use_alias:
-                query = "SELECT m.* FROM messages m WHERE 1=1"
-            else:
-                query = "SELECT * FROM messages WHERE 1=1"
-            params = []
+            select_list = "m.*"
+        
+        where_clause, params = self._message_filter_sql(
+            group_id, group_ids, user_id, start_date, end_date, include_deleted, tags, message_type_filter
+        )
+        query = f"SELECT {select_list} FROM messages m WHERE {where_clause} ORDER BY m.date_sent_ms DESC"
+        
+        if limit:
+            query += f" LIMIT {limit} OFFSET {offset}"
+        
+        codec = _MessageCodec(self.get_encryption_service())
+        
+        # Rows come from the shared read snapshot, so one page load sees one commit state;
+        # decoding happens after the snapshot is handed back
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return []
+        
+        names = rows[0].keys()
+        eager = [
+            (column, names.index(column), column in _BOOLEAN_MESSAGE_COLUMNS)
+            for column in MESSAGE_COLUMNS
+            if column in names and column not in LAZY_MESSAGE_FIELDS
+        ]
+        lazy = [names.index(column) if column in names else None for column in LAZY_MESSAGE_FIELDS]
+        
+        messages = []
+        for row in rows:
+            message = LazyMessage.from_values(
+                codec,
+                tuple(None if index is None else row[index] for index in lazy),
+                **{column: bool(row[index]) if as_bool else row[index] for column, index, as_bool in eager}
+            )
+            
+            # Handle "@ Mention" filter after decryption
+            if message_type_filter == "mention":
+                # Check if content or caption contains "@"
+                has_mention = False
+                if message.content and "@" in message.content:
+                    has_mention = True
+                if message.caption and "@" in message.caption:
+                    has_mention = True
+                if not has_mention:
+                    continue  # Skip this message
+            
+            messages.append(message)
+        return messages
+    
+    def iter_message_report_rows(
+        self,
+        group_id: Optional[int] = None,
+        group_ids: Optional[List[int]] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        include_deleted: bool = False,
+        tags: Optional[List[str]] = None,
+        message_type_filter: Optional[str] = None,
+        batch_size: int = REPORT_FETCH_ROWS
+    ) -> Iterator[List[tuple]]:
+        """
+        Stream messages with their sender's name for reports, newest first.
+        
+        The sender is joined in SQL and rows are fetched from one private read
+        snapshot in batches, so memory stays bounded for whole-group reports.
+        Filters are the same as get_messages.
+        
+        Yields:
+            Lists of up to batch_size (full_name, content, caption, date_sent, has_media,
+            media_type, message_link) tuples, decrypted; full_name is None for unknown users
+        """
+        where_clause, params = self._message_filter_sql(
+            group_id, group_ids, user_id, start_date, end_date, include_deleted, tags, message_type_filter
+        )
+        query = f"""
+            SELECT u.full_name, m.content, m.caption, m.date_sent, m.has_media, m.media_type, m.message_link
+            FROM messages m
+            LEFT JOIN telegram_users u ON u.user_id = m.user_id
+            WHERE {where_clause}
+            ORDER BY m.date_sent_ms DESC
+        """
+        encryption_service = self.get_encryption_service()
+        decrypt = encryption_service.decrypt_field if encryption_service else (lambda value: value)
+        
+        # A snapshot of its own, so the streamed export never sees half a fetch
+        snapshot = ReadSnapshot(self.db_path, self._archives_for((start_date, end_date)))
+        try:
+            with snapshot.connection() as conn:
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    batch = []
+                    for full_name, content, caption, date_sent, has_media, media_type, message_link in rows:
+                        content, caption = decrypt(content), decrypt(caption)
+                        if message_type_filter == "mention" and "@" not in (content or "") + (caption or ""):
+                            continue
+                        batch.append((
+                            decrypt(full_name) if full_name is not None else None,
+                            content, caption, _parse_datetime(date_sent), bool(has_media),
+                            media_type, decrypt(message_link)
+                        ))
+                    if batch:
+                        yield batch
+        finally:
+            snapshot.close()
+    
+    @staticmethod
+    def _message_filter_sql(
+        group_id: Optional[int] = None,
+        group_ids: Optional[List[int]] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        include_deleted: bool = False,
+        tags: Optional[List[str]] = None,
+        message_type_filter: Optional[str] = None
+    ) -> Tuple[str, list]:
+        """
+        Build the WHERE clause (on messages aliased as m) for get_messages-style filters.
+        
+        The "mention" type filter needs the decrypted text and is left to the caller.
+        
+        Returns:
+            (where_clause, params)
+        """
+        conditions = []
+        params = []
+        
+        # Filter by tags - messages must have ALL specified tags
+        normalized_tags = [t.strip().lower() for t in tags or [] if t and t.strip()]
+        for tag in normalized_tags:
+            conditions.append("""
+                EXISTS (
+                    SELECT 1 FROM message_tags mt
+                    WHERE mt.message_id = m.message_id
+                    AND mt.group_id = m.group_id
+                    AND mt.tag = ?
+                )
+            """)
+            params.append(tag)
         
         # Handle group filtering - use group_ids if provided, otherwise use group_id
-        table_prefix = "m." if use_alias else ""
         if group_ids and len(group_ids) > 0:
             placeholders = ",".join("?" * len(group_ids))
-            query += f" AND {table_prefix}group_id IN ({placeholders})"
+            conditions.append(f"m.group_id IN ({placeholders})")
             params.extend(group_ids)
         elif group_id:
-            query += f" AND {table_prefix}group_id = ?"
+            conditions.append("m.group_id = ?")
             params.append(group_id)
         
         if user_id:
-            query += f" AND {table_prefix}user_id = ?"
+            conditions.append("m.user_id = ?")
             params.append(user_id)
         
         if start_date:
-            query += f" AND {table_prefix}date_sent >= ?"
-            params.append(start_date)
+            conditions.append("m.date_sent_ms >= ?")
+            params.append(_to_epoch_ms(start_date))
         
         if end_date:
-            query += f" AND {table_prefix}date_sent <= ?"
-            params.append(end_date)
+            conditions.append("m.date_sent_ms <= ?")
+            params.append(_to_epoch_ms(end_date))
         
         if not include_deleted:
-            query += f" AND {table_prefix}is_deleted = 0"
+            conditions.append("m.is_deleted = 0")
         
         # Handle message type filtering
-        if message_type_filter:
-            if message_type_filter == "voice":
-                query += f" AND {table_prefix}message_type = 'voice'"
-            elif message_type_filter == "audio":
-                query += f" AND {table_prefix}message_type = 'audio'"
-            elif message_type_filter == "photos":
-                query += f" AND {table_prefix}message_type = 'photo'"
-            elif message_type_filter == "videos":
-                query += f" AND {table_prefix}message_type = 'video'"
-            elif message_type_filter == "files":
-                query += f" AND {table_prefix}message_type = 'document'"
-            elif message_type_filter == "link":
-                query += f" AND {table_prefix}has_link = 1"
-            elif message_type_filter == "poll":
-                query += f" AND {table_prefix}message_type = 'poll'"
-            elif message_type_filter == "location":
-                query += f" AND {table_prefix}message_type = 'location'"
-            elif message_type_filter == "tag":
-                # Filter messages that have at least one tag
-                # Ensure we use alias (should already be set, but safety check)
-                if not use_alias:
-                    # Need to rewrite query with alias
-                    query = query.replace("SELECT * FROM messages WHERE", "SELECT m.* FROM messages m WHERE")
-                    use_alias = True
-                    table_prefix = "m."
-                query += """
-                    AND EXISTS (
-                        SELECT 1 FROM message_tags mt
-                        WHERE mt.message_id = m.message_id
-                        AND mt.group_id = m.group_id
-                    )
-                """
-            # Note: "mention" filter is handled after decryption in Python
-        
-        query += f" ORDER BY {table_prefix}date_sent DESC"
-        
-        if limit:
-            query += f" LIMIT {limit} OFFSET {offset}"
-        
-        encryption_service = self.get_encryption_service()
+        if message_type_filter in _MESSAGE_TYPE_FILTERS:
+            conditions.append(_MESSAGE_TYPE_FILTERS[message_type_filter])
         
-        with self.get_connection() as conn:
-            cursor = conn.execute(query, params)
-            messages = []
-            for row in cursor.fetchall():
-                # Decrypt sensitive fields
-                content = encryption_service.decrypt_field(row['content']) if encryption_service else row['content']
-                caption = encryption_service.decrypt_field(row['caption']) if encryption_service else row['caption']
-                message_link = encryption_service.decrypt_field(row['message_link']) if encryption_service else row['message_link']
-                
-                message = Message(
-                    id=row['id'],
-                    message_id=row['message_id'],
-                    group_id=row['group_id'],
-                    user_id=row['user_id'],
-                    content=content,
-                    caption=caption,
-                    date_sent=_parse_datetime(row['date_sent']),
-                    has_media=bool(row['has_media']),
-                    media_type=row['media_type'],
-                    media_count=row['media_count'],
-                    message_link=message_link,
-                    message_type=_safe_get_row_value(row, 'message_type'),
-                    has_sticker=bool(_safe_get_row_value(row, 'has_sticker', False)),
-                    has_link=bool(_safe_get_row_value(row, 'has_link', False)),
-                    sticker_emoji=_safe_get_row_value(row, 'sticker_emoji'),
-                    is_deleted=bool(row['is_deleted']),
-                    created_at=_parse_datetime(row['created_at']),
-                    updated_at=_parse_datetime(row['updated_at'])
-                )
-                
-                # Handle "@ Mention" filter after decryption
-                if message_type_filter == "mention":
-                    # Check if content or caption contains "@"
-                    has_mention = False
-                    if content and "@" in content:
-                        has_mention = True
-                    if caption and "@" in caption:
-                        has_mention = True
-                    if not has_mention:
-                        continue  # Skip this message
-                
-                messages.append(message)
-            return messages
+        return " AND ".join(conditions) or "1=1", params
     
     def get_message_count(
         self,
@@ -298,14 +483,14 @@ class MessageManager(BaseDatabaseManager):
         if not include_deleted:
             query += " AND is_deleted = 0"
         
-        with self.get_connection() as conn:
+        with self.read_snapshot(archive_range=(None, None)) as conn:
             cursor = conn.execute(query, params)
             return cursor.fetchone()[0]
     
     def soft_delete_message(self, message_id: int, group_id: int) -> bool:
         """Soft delete a message and its tags."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute(
                     "UPDATE messages SET is_deleted = 1 WHERE message_id = ? AND group_id = ?",
                     (message_id, group_id)
@@ -323,11 +508,38 @@ class MessageManager(BaseDatabaseManager):
                     logger.warning(f"Error deleting tags for message {message_id}: {tag_error}")
                     # Don't fail message deletion if tag deletion fails
                 
+                self._emit_change(
+                    'messages',
+                    ChangeAction.DELETED,
+                    group_id=group_id,
+                    message_ids=[message_id]
+                )
                 return True
         except Exception as e:
             logger.error(f"Error soft deleting message: {e}")
             return False
     
+    def get_message_ids_since(
+        self,
+        group_id: int,
+        since: datetime,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """Get IDs of non-deleted messages sent in a group since a date, newest first."""
+        query = """
+            SELECT message_id FROM messages
+            WHERE group_id = ? AND date_sent_ms >= ? AND is_deleted = 0
+            ORDER BY date_sent_ms DESC
+        """
+        params = [group_id, _to_epoch_ms(since)]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            return [row['message_id'] for row in cursor.fetchall()]
+    
     def is_message_deleted(self, message_id: int, group_id: int) -> bool:
         """Check if a message is soft deleted."""
         with self.get_connection() as conn:
@@ -349,7 +561,7 @@ class MessageManager(BaseDatabaseManager):
     def undelete_message(self, message_id: int, group_id: int) -> bool:
         """Undelete (restore) a soft-deleted message."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 # Remove from deleted_messages table
                 conn.execute(
                     "DELETE FROM deleted_messages WHERE message_id = ? AND group_id = ?",
@@ -361,7 +573,13 @@ class MessageManager(BaseDatabaseManager):
                     (message_id, group_id)
                 )
                 conn.commit()
-                return True
+            self._emit_change(
+                'messages',
+                ChangeAction.RESTORED,
+                group_id=group_id,
+                message_ids=[message_id]
+            )
+            return True
         except Exception as e:
             logger.error(f"Error undeleting message: {e}")
             return False
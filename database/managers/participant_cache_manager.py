@@ -0,0 +1,227 @@
+"""
+Participant cache manager - persists crawled group participant lists for common-group matching.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Dict, Iterable, Set
+from database.managers.base import BaseDatabaseManager, _parse_datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps bound parameters per statement; stay well below the oldest default (999)
+_IN_CHUNK_SIZE = 500
+
+
+class ParticipantCacheManager(BaseDatabaseManager):
+    """Manages cached group participant sets."""
+    
+    def get_participant_cache_info(self, group_ids: Optional[List[int]] = None) -> Dict[int, Dict]:
+        """
+        Get cache metadata for groups.
+        
+        Args:
+            group_ids: Optional list of group IDs (None = all cached groups)
+        
+        Returns:
+            Dictionary mapping group_id to {group_name, group_username, participant_count,
+            fetched_at, is_complete}; is_complete is False if the cached set may be missing members
+        """
+        info: Dict[int, Dict] = {}
+        try:
+            with self.get_connection() as conn:
+                if group_ids is None:
+                    rows = conn.execute("SELECT * FROM group_participant_cache").fetchall()
+                else:
+                    rows = []
+                    ids = list(group_ids)
+                    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+                        chunk = ids[start:start + _IN_CHUNK_SIZE]
+                        placeholders = ','.join('?' * len(chunk))
+                        rows.extend(conn.execute(
+                            f"SELECT * FROM group_participant_cache WHERE group_id IN ({placeholders})",
+                            chunk
+                        ).fetchall())
+                for row in rows:
+                    info[row['group_id']] = {
+                        'group_name': row['group_name'],
+                        'group_username': row['group_username'],
+                        'participant_count': row['participant_count'],
+                        'fetched_at': _parse_datetime(row['fetched_at']),
+                        'is_complete': bool(row['is_complete'])
+                    }
+        except Exception as e:
+            logger.error(f"Error getting participant cache info: {e}")
+        return info
+    
+    def replace_group_participants(
+        self,
+        group_id: int,
+        group_name: str,
+        user_ids: Iterable[int],
+        group_username: Optional[str] = None
+    ) -> bool:
+        """
+        Replace the cached participant set of a group in a single transaction.
+        
+        Only for complete crawls: the group is marked complete, and members missing
+        from user_ids are dropped (see merge_group_participants for partial crawls).
+        
+        Args:
+            group_id: Telegram group ID
+            group_name: Group name
+            user_ids: Every participant user ID, from a complete crawl
+            group_username: Group username (optional)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        participant_ids = set(user_ids)
+        try:
+            with self.get_write_connection() as conn:
+                conn.execute("DELETE FROM group_participants WHERE group_id = ?", (group_id,))
+                conn.executemany(
+                    "INSERT INTO group_participants (group_id, user_id) VALUES (?, ?)",
+                    [(group_id, user_id) for user_id in participant_ids]
+                )
+                conn.execute("""
+                    INSERT INTO group_participant_cache
+                    (group_id, group_name, group_username, participant_count, fetched_at, is_complete)
+                    VALUES (?, ?, ?, ?, ?, 1)
+                    ON CONFLICT(group_id) DO UPDATE SET
+                        group_name = excluded.group_name,
+                        group_username = excluded.group_username,
+                        participant_count = excluded.participant_count,
+                        fetched_at = excluded.fetched_at,
+                        is_complete = 1
+                """, (group_id, group_name, group_username, len(participant_ids), datetime.now()))
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error caching participants for group {group_id}: {e}")
+            return False
+    
+    def merge_group_participants(
+        self,
+        group_id: int,
+        group_name: str,
+        user_ids: Iterable[int],
+        group_username: Optional[str] = None,
+        is_complete: Optional[bool] = None
+    ) -> bool:
+        """
+        Add participants from a partial crawl (truncated or incremental) to a group's cached set.
+        
+        Cached members missing from user_ids are kept.
+        
+        Args:
+            group_id: Telegram group ID
+            group_name: Group name
+            user_ids: Participant user IDs seen by the crawl
+            group_username: Group username (optional)
+            is_complete: New completeness of the cached set (None keeps the current one;
+                a group cached for the first time is then marked incomplete)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self.get_write_connection() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO group_participants (group_id, user_id) VALUES (?, ?)",
+                    [(group_id, user_id) for user_id in set(user_ids)]
+                )
+                participant_count = conn.execute(
+                    "SELECT COUNT(*) FROM group_participants WHERE group_id = ?", (group_id,)
+                ).fetchone()[0]
+                complete = None if is_complete is None else int(is_complete)
+                conn.execute("""
+                    INSERT INTO group_participant_cache
+                    (group_id, group_name, group_username, participant_count, fetched_at, is_complete)
+                    VALUES (?, ?, ?, ?, ?, COALESCE(?, 0))
+                    ON CONFLICT(group_id) DO UPDATE SET
+                        group_name = excluded.group_name,
+                        group_username = excluded.group_username,
+                        participant_count = excluded.participant_count,
+                        fetched_at = excluded.fetched_at,
+                        is_complete = COALESCE(?, group_participant_cache.is_complete)
+                """, (group_id, group_name, group_username, participant_count, datetime.now(), complete, complete))
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error merging participants for group {group_id}: {e}")
+            return False
+    
+    def get_group_participant_ids(self, group_id: int) -> Set[int]:
+        """
+        Get the cached participant user IDs of a group.
+        
+        Args:
+            group_id: Telegram group ID
+        
+        Returns:
+            Set of user IDs (empty if the group is not cached or on error)
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("SELECT user_id FROM group_participants WHERE group_id = ?", (group_id,))
+                return {row[0] for row in cursor}
+        except Exception as e:
+            logger.error(f"Error getting cached participants for group {group_id}: {e}")
+            return set()
+    
+    def find_common_groups(
+        self,
+        user_ids: List[int],
+        group_ids: Optional[List[int]] = None
+    ) -> Dict[int, List[int]]:
+        """
+        Find cached groups containing any of the given users (indexed lookup, no network).
+        
+        Args:
+            user_ids: Telegram user IDs to match
+            group_ids: Optional list of group IDs to restrict the search to
+        
+        Returns:
+            Dictionary mapping group_id to the matching user IDs
+        """
+        matches: Dict[int, List[int]] = {}
+        if not user_ids:
+            return matches
+        allowed = set(group_ids) if group_ids is not None else None
+        try:
+            with self.get_connection() as conn:
+                ids = list(set(user_ids))
+                for start in range(0, len(ids), _IN_CHUNK_SIZE):
+                    chunk = ids[start:start + _IN_CHUNK_SIZE]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(
+                        f"SELECT group_id, user_id FROM group_participants WHERE user_id IN ({placeholders})",
+                        chunk
+                    )
+                    for row in cursor:
+                        if allowed is None or row['group_id'] in allowed:
+                            matches.setdefault(row['group_id'], []).append(row['user_id'])
+        except Exception as e:
+            logger.error(f"Error finding common groups: {e}")
+        return matches
+    
+    def delete_group_participants(self, group_id: int) -> bool:
+        """
+        Drop the cached participant set of a group.
+        
+        Args:
+            group_id: Telegram group ID
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self.get_write_connection() as conn:
+                conn.execute("DELETE FROM group_participants WHERE group_id = ?", (group_id,))
+                conn.execute("DELETE FROM group_participant_cache WHERE group_id = ?", (group_id,))
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error deleting participant cache for group {group_id}: {e}")
+            return False
@@ -2,8 +2,9 @@
 Reactions manager.
 """
 
-from typing import Optional, List
-from database.managers.base import BaseDatabaseManager, _parse_datetime
+from datetime import datetime
+from typing import Optional, List, Dict
+from database.managers.base import BaseDatabaseManager, _parse_datetime, _to_epoch_ms
 from database.models.message import Reaction
 import logging
 
@@ -21,7 +22,7 @@ class ReactionManager(BaseDatabaseManager):
             # Encrypt sensitive fields
             encrypted_message_link = encryption_service.encrypt_field(reaction.message_link) if encryption_service else reaction.message_link
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO reactions 
                     (message_id, group_id, user_id, emoji, message_link, reacted_at)
@@ -107,11 +108,152 @@ class ReactionManager(BaseDatabaseManager):
     def delete_reaction(self, reaction_id: int) -> bool:
         """Delete a reaction by ID."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("DELETE FROM reactions WHERE id = ?", (reaction_id,))
                 conn.commit()
                 return True
         except Exception as e:
             logger.error(f"Error deleting reaction: {e}")
             return False
-
+    
+    def save_reaction_counts(self, group_id: int, counts: Dict[int, Dict[str, int]]) -> int:
+        """
+        Replace per-message reaction totals for a batch of messages in one transaction.
+        
+        Args:
+            group_id: Group ID
+            counts: Mapping of message_id to {emoji: count}; an empty dict clears the message's totals
+            
+        Returns:
+            Number of messages written
+        """
+        if not counts:
+            return 0
+        try:
+            now = datetime.now()
+            with self.get_write_connection() as conn:
+                conn.executemany(
+                    "DELETE FROM message_reaction_counts WHERE group_id = ? AND message_id = ?",
+                    [(group_id, message_id) for message_id in counts]
+                )
+                conn.executemany("""
+                    INSERT INTO message_reaction_counts (group_id, message_id, emoji, count, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [
+                    (group_id, message_id, emoji, count, now)
+                    for message_id, emoji_counts in counts.items()
+                    for emoji, count in emoji_counts.items()
+                    if count > 0
+                ])
+                conn.commit()
+            self._emit_change('reactions', group_id=group_id, message_ids=list(counts.keys()))
+            return len(counts)
+        except Exception as e:
+            logger.error(f"Error saving reaction counts for group {group_id}: {e}")
+            return 0
+    
+    def get_reaction_counts(self, message_id: int, group_id: int) -> Dict[str, int]:
+        """Get emoji totals for a specific message."""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT emoji, count FROM message_reaction_counts
+                WHERE group_id = ? AND message_id = ?
+                ORDER BY count DESC
+            """, (group_id, message_id))
+            return {row['emoji']: row['count'] for row in cursor.fetchall()}
+    
+    def get_most_reacted_messages(
+        self,
+        group_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Dict]:
+        """
+        Get messages with the most reactions, from stored totals (no API calls).
+        
+        Args:
+            group_id: Optional group filter
+            start_date: Optional lower bound on message date_sent
+            end_date: Optional upper bound on message date_sent
+            limit: Maximum number of messages
+            
+        Returns:
+            List of dicts with message_id, group_id, user_id, date_sent, total_reactions, reactions
+        """
+        query = """
+            SELECT rc.group_id, rc.message_id, m.user_id, m.date_sent, SUM(rc.count) AS total_reactions
+            FROM message_reaction_counts rc
+            JOIN messages m ON m.message_id = rc.message_id AND m.group_id = rc.group_id
+            WHERE m.is_deleted = 0
+        """
+        params = []
+        
+        if group_id:
+            query += " AND rc.group_id = ?"
+            params.append(group_id)
+        
+        if start_date:
+            query += " AND m.date_sent_ms >= ?"
+            params.append(_to_epoch_ms(start_date))
+        
+        if end_date:
+            query += " AND m.date_sent_ms <= ?"
+            params.append(_to_epoch_ms(end_date))
+        
+        query += " GROUP BY rc.group_id, rc.message_id ORDER BY total_reactions DESC LIMIT ?"
+        params.append(limit)
+        
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            results = [
+                {
+                    'message_id': row['message_id'],
+                    'group_id': row['group_id'],
+                    'user_id': row['user_id'],
+                    'date_sent': _parse_datetime(row['date_sent']),
+                    'total_reactions': row['total_reactions'],
+                    'reactions': {}
+                }
+                for row in rows
+            ]
+            if results:
+                by_key = {(item['group_id'], item['message_id']): item for item in results}
+                conditions = ' OR '.join('(group_id = ? AND message_id = ?)' for _ in results)
+                cursor = conn.execute(
+                    f"SELECT group_id, message_id, emoji, count FROM message_reaction_counts "
+                    f"WHERE {conditions} ORDER BY count DESC",
+                    [value for key in by_key for value in key]
+                )
+                for row in cursor.fetchall():
+                    by_key[(row['group_id'], row['message_id'])]['reactions'][row['emoji']] = row['count']
+            return results
+    
+    def get_top_reaction_emojis(self, group_id: Optional[int] = None, limit: int = 10) -> List[Dict]:
+        """
+        Get the most used reaction emojis with their total counts.
+        
+        Args:
+            group_id: Optional group filter
+            limit: Maximum number of emojis
+            
+        Returns:
+            List of dicts with emoji, count, message_count
+        """
+        query = """
+            SELECT emoji, SUM(count) AS total, COUNT(*) AS message_count
+            FROM message_reaction_counts
+        """
+        params = []
+        if group_id:
+            query += " WHERE group_id = ?"
+            params.append(group_id)
+        query += " GROUP BY emoji ORDER BY total DESC LIMIT ?"
+        params.append(limit)
+        
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            return [
+                {'emoji': row['emoji'], 'count': row['total'], 'message_count': row['message_count']}
+                for row in cursor.fetchall()
+            ]
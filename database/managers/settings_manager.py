@@ -43,7 +43,7 @@ class SettingsManager(BaseDatabaseManager):
     def update_rate_limit_warning_last_seen(self, timestamp: datetime) -> bool:
         """Update the last seen timestamp for rate limit warning."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("""
                     UPDATE app_settings 
                     SET rate_limit_warning_last_seen = ?
@@ -106,7 +106,7 @@ class SettingsManager(BaseDatabaseManager):
             encrypted_api_id = self._encrypt_field(settings.telegram_api_id)
             encrypted_api_hash = self._encrypt_field(settings.telegram_api_hash)
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("""
                     UPDATE app_settings SET
                         theme = ?,
@@ -2,13 +2,30 @@
 Statistics manager.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from database.managers.base import BaseDatabaseManager, _parse_datetime
+import sqlite3
+from database.managers.base import BaseDatabaseManager, _parse_datetime, _to_epoch_ms
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Dashboard statistics; each is an independent query (see StatsManager.get_dashboard_stat)
+DASHBOARD_STAT_KEYS = (
+    'total_messages',
+    'total_users',
+    'total_groups',
+    'total_media_size',
+    'messages_today',
+    'messages_this_month',
+)
+
+# Entity column for get_activity_bins(by=...)
+ACTIVITY_ENTITY_COLUMNS = {
+    'user': 'user_id',
+    'group': 'group_id',
+}
+
 
 class StatsManager(BaseDatabaseManager):
     """Manages statistics operations."""
@@ -26,10 +43,45 @@ class StatsManager(BaseDatabaseManager):
             start_date: Optional start date to filter by.
             end_date: Optional end date to filter by.
         """
-        with self.get_connection() as conn:
-            stats = {}
-            
-            # Build filter conditions
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
+            return {
+                key: self._query_dashboard_stat(conn, key, group_ids, start_date, end_date)
+                for key in DASHBOARD_STAT_KEYS
+            }
+    
+    def get_dashboard_stat(
+        self,
+        key: str,
+        group_ids: Optional[List[int]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Any:
+        """Get a single dashboard statistic from the shared read snapshot.
+        
+        Each key is an independent query; statistics read from the same snapshot
+        are consistent with each other even while a fetch is writing.
+        
+        Args:
+            key: One of DASHBOARD_STAT_KEYS
+            group_ids: Optional list of group IDs to filter by. If None, includes all groups.
+            start_date: Optional start date to filter by.
+            end_date: Optional end date to filter by.
+        """
+        if key not in DASHBOARD_STAT_KEYS:
+            raise ValueError(f"Unknown dashboard stat: {key}")
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
+            return self._query_dashboard_stat(conn, key, group_ids, start_date, end_date)
+    
+    def _query_dashboard_stat(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        group_ids: Optional[List[int]],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Any:
+        """Run the query behind one dashboard statistic."""
+        if key == 'total_messages':
             conditions = ["is_deleted = 0"]
             params = []
             
@@ -39,21 +91,19 @@ class StatsManager(BaseDatabaseManager):
                 params.extend(group_ids)
             
             if start_date:
-                conditions.append("date_sent >= ?")
-                params.append(start_date)
+                conditions.append("date_sent_ms >= ?")
+                params.append(_to_epoch_ms(start_date))
             
             if end_date:
-                conditions.append("date_sent <= ?")
-                params.append(end_date)
+                conditions.append("date_sent_ms <= ?")
+                params.append(_to_epoch_ms(end_date))
             
             where_clause = " AND ".join(conditions)
-            
-            # Total messages
-            query = f"SELECT COUNT(*) FROM messages WHERE {where_clause}"
-            cursor = conn.execute(query, params)
-            stats['total_messages'] = cursor.fetchone()[0]
-            
-            # Total users (distinct users from selected groups)
+            cursor = conn.execute(f"SELECT COUNT(*) FROM messages WHERE {where_clause}", params)
+            return cursor.fetchone()[0]
+        
+        if key == 'total_users':
+            # Distinct users from selected groups
             if group_ids and len(group_ids) > 0:
                 user_conditions = ["m.is_deleted = 0", "u.is_deleted = 0"]
                 user_params = []
@@ -63,12 +113,12 @@ class StatsManager(BaseDatabaseManager):
                 user_params.extend(group_ids)
                 
                 if start_date:
-                    user_conditions.append("m.date_sent >= ?")
-                    user_params.append(start_date)
+                    user_conditions.append("m.date_sent_ms >= ?")
+                    user_params.append(_to_epoch_ms(start_date))
                 
                 if end_date:
-                    user_conditions.append("m.date_sent <= ?")
-                    user_params.append(end_date)
+                    user_conditions.append("m.date_sent_ms <= ?")
+                    user_params.append(_to_epoch_ms(end_date))
                 
                 user_where = " AND ".join(user_conditions)
                 query = f"""
@@ -77,22 +127,22 @@ class StatsManager(BaseDatabaseManager):
                     WHERE {user_where}
                 """
                 cursor = conn.execute(query, user_params)
-                stats['total_users'] = cursor.fetchone()[0]
-            else:
-                cursor = conn.execute("SELECT COUNT(*) FROM telegram_users WHERE is_deleted = 0")
-                stats['total_users'] = cursor.fetchone()[0]
-            
-            # Total groups (count of selected groups or all groups)
+                return cursor.fetchone()[0]
+            cursor = conn.execute("SELECT COUNT(*) FROM telegram_users WHERE is_deleted = 0")
+            return cursor.fetchone()[0]
+        
+        if key == 'total_groups':
+            # Count of selected groups or all groups
             if group_ids and len(group_ids) > 0:
                 placeholders = ",".join("?" * len(group_ids))
                 query = f"SELECT COUNT(*) FROM telegram_groups WHERE group_id IN ({placeholders})"
                 cursor = conn.execute(query, group_ids)
-                stats['total_groups'] = cursor.fetchone()[0]
-            else:
-                cursor = conn.execute("SELECT COUNT(*) FROM telegram_groups")
-                stats['total_groups'] = cursor.fetchone()[0]
-            
-            # Total media size (from selected groups and date range)
+                return cursor.fetchone()[0]
+            cursor = conn.execute("SELECT COUNT(*) FROM telegram_groups")
+            return cursor.fetchone()[0]
+        
+        if key == 'total_media_size':
+            # Media from selected groups and date range
             media_conditions = ["m.is_deleted = 0"]
             media_params = []
             
@@ -102,12 +152,12 @@ class StatsManager(BaseDatabaseManager):
                 media_params.extend(group_ids)
             
             if start_date:
-                media_conditions.append("m.date_sent >= ?")
-                media_params.append(start_date)
+                media_conditions.append("m.date_sent_ms >= ?")
+                media_params.append(_to_epoch_ms(start_date))
             
             if end_date:
-                media_conditions.append("m.date_sent <= ?")
-                media_params.append(end_date)
+                media_conditions.append("m.date_sent_ms <= ?")
+                media_params.append(_to_epoch_ms(end_date))
             
             media_where = " AND ".join(media_conditions)
             query = f"""
@@ -117,37 +167,21 @@ class StatsManager(BaseDatabaseManager):
             """
             cursor = conn.execute(query, media_params)
             result = cursor.fetchone()[0]
-            stats['total_media_size'] = result if result else 0
-            
-            # Messages today (within date range if specified)
-            today_conditions = ["date_sent >= date('now')", "is_deleted = 0"]
-            today_params = []
-            
-            if group_ids and len(group_ids) > 0:
-                placeholders = ",".join("?" * len(group_ids))
-                today_conditions.append(f"group_id IN ({placeholders})")
-                today_params.extend(group_ids)
-            
-            today_where = " AND ".join(today_conditions)
-            query = f"SELECT COUNT(*) FROM messages WHERE {today_where}"
-            cursor = conn.execute(query, today_params)
-            stats['messages_today'] = cursor.fetchone()[0]
-            
-            # Messages this month (within date range if specified)
-            month_conditions = ["date_sent >= date('now', 'start of month')", "is_deleted = 0"]
-            month_params = []
-            
-            if group_ids and len(group_ids) > 0:
-                placeholders = ",".join("?" * len(group_ids))
-                month_conditions.append(f"group_id IN ({placeholders})")
-                month_params.extend(group_ids)
-            
-            month_where = " AND ".join(month_conditions)
-            query = f"SELECT COUNT(*) FROM messages WHERE {month_where}"
-            cursor = conn.execute(query, month_params)
-            stats['messages_this_month'] = cursor.fetchone()[0]
-            
-            return stats
+            return result if result else 0
+        
+        # messages_today / messages_this_month
+        since = "'start of day'" if key == 'messages_today' else "'start of month'"
+        conditions = [f"date_sent_ms >= strftime('%s', 'now', {since}) * 1000", "is_deleted = 0"]
+        params = []
+        
+        if group_ids and len(group_ids) > 0:
+            placeholders = ",".join("?" * len(group_ids))
+            conditions.append(f"group_id IN ({placeholders})")
+            params.extend(group_ids)
+        
+        where_clause = " AND ".join(conditions)
+        cursor = conn.execute(f"SELECT COUNT(*) FROM messages WHERE {where_clause}", params)
+        return cursor.fetchone()[0]
     
     def get_user_activity_stats(
         self,
@@ -159,7 +193,7 @@ class StatsManager(BaseDatabaseManager):
         """Get comprehensive activity statistics for a user."""
         stats = {}
         
-        with self.get_connection() as conn:
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
             # Build base query conditions
             msg_conditions = ["m.user_id = ?", "m.is_deleted = 0"]
             params = [user_id]
@@ -169,12 +203,12 @@ class StatsManager(BaseDatabaseManager):
                 params.append(group_id)
             
             if start_date:
-                msg_conditions.append("m.date_sent >= ?")
-                params.append(start_date)
+                msg_conditions.append("m.date_sent_ms >= ?")
+                params.append(_to_epoch_ms(start_date))
             
             if end_date:
-                msg_conditions.append("m.date_sent <= ?")
-                params.append(end_date)
+                msg_conditions.append("m.date_sent_ms <= ?")
+                params.append(_to_epoch_ms(end_date))
             
             where_clause = " AND ".join(msg_conditions)
             
@@ -261,7 +295,7 @@ class StatsManager(BaseDatabaseManager):
         
         where_clause = " AND ".join(conditions)
         
-        with self.get_connection() as conn:
+        with self.read_snapshot(archive_range=(None, None)) as conn:
             cursor = conn.execute(f"""
                 SELECT 
                     COALESCE(message_type, 'unknown') as msg_type,
@@ -272,6 +306,69 @@ class StatsManager(BaseDatabaseManager):
             """, params)
             return {row[0]: row[1] for row in cursor.fetchall()}
     
+    def get_activity_bins(
+        self,
+        by: str = 'user',
+        ids: Optional[List[int]] = None,
+        group_ids: Optional[List[int]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        utc_offset_minutes: Optional[int] = None
+    ) -> List[Tuple[int, str, int, int]]:
+        """Get message counts binned by entity, local day and local hour in one pass.
+        
+        Args:
+            by: 'user' or 'group' - entity the counts are grouped by
+            ids: Optional list of user/group IDs (matching by) to include. If None, includes all.
+            group_ids: Optional list of group IDs to filter by.
+            start_date: Optional start date to filter by.
+            end_date: Optional end date to filter by.
+            utc_offset_minutes: Fixed offset of the time zone to bin in. If None,
+                bins in this machine's local time zone (like the UI displays dates).
+        
+        Returns:
+            List of (entity_id, 'YYYY-MM-DD', hour, count) tuples
+        """
+        if by not in ACTIVITY_ENTITY_COLUMNS:
+            raise ValueError(f"Unknown activity entity: {by}")
+        column = ACTIVITY_ENTITY_COLUMNS[by]
+        
+        conditions = ["is_deleted = 0"]
+        params = []
+        
+        if ids:
+            placeholders = ",".join("?" * len(ids))
+            conditions.append(f"{column} IN ({placeholders})")
+            params.extend(ids)
+        
+        if group_ids:
+            placeholders = ",".join("?" * len(group_ids))
+            conditions.append(f"group_id IN ({placeholders})")
+            params.extend(group_ids)
+        
+        if start_date:
+            conditions.append("date_sent_ms >= ?")
+            params.append(_to_epoch_ms(start_date))
+        
+        if end_date:
+            conditions.append("date_sent_ms <= ?")
+            params.append(_to_epoch_ms(end_date))
+        
+        where_clause = " AND ".join(conditions)
+        zone = "localtime" if utc_offset_minutes is None else f"{int(utc_offset_minutes):+d} minutes"
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
+            cursor = conn.execute(f"""
+                SELECT
+                    {column},
+                    date(date_sent_ms / 1000, 'unixepoch', ?) as day,
+                    CAST(strftime('%H', date_sent_ms / 1000, 'unixepoch', ?) AS INTEGER) as hour,
+                    COUNT(*) as count
+                FROM messages
+                WHERE {where_clause}
+                GROUP BY {column}, day, hour
+            """, [zone, zone] + params)
+            return [tuple(row) for row in cursor.fetchall()]
+    
     def get_top_active_users_by_group(
         self,
         group_id: Optional[int] = None,
@@ -297,7 +394,7 @@ class StatsManager(BaseDatabaseManager):
         else:
             return []
         
-        with self.get_connection() as conn:
+        with self.read_snapshot(archive_range=(start_date, end_date)) as conn:
             placeholders = ",".join("?" * len(target_group_ids))
             conditions = [
                 f"m.group_id IN ({placeholders})",
@@ -307,12 +404,12 @@ class StatsManager(BaseDatabaseManager):
             params = list(target_group_ids)
             
             if start_date:
-                conditions.append("m.date_sent >= ?")
-                params.append(start_date)
+                conditions.append("m.date_sent_ms >= ?")
+                params.append(_to_epoch_ms(start_date))
             
             if end_date:
-                conditions.append("m.date_sent <= ?")
-                params.append(end_date)
+                conditions.append("m.date_sent_ms <= ?")
+                params.append(_to_epoch_ms(end_date))
             
             where_clause = " AND ".join(conditions)
             query = f"""
@@ -363,7 +460,7 @@ class StatsManager(BaseDatabaseManager):
     
     def get_group_summaries(self) -> List[Dict[str, Any]]:
         """Get summary statistics for all groups."""
-        with self.get_connection() as conn:
+        with self.read_snapshot() as conn:
             # Get all groups with their statistics
             cursor = conn.execute("""
                 SELECT 
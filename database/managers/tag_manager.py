@@ -2,10 +2,14 @@
 Tag manager for message tags operations.
 """
 
-from typing import Optional, List, Dict
-from datetime import datetime
+from itertools import combinations
+from typing import Optional, List, Dict, Iterable, Tuple, Union
+from datetime import datetime, date
+import sqlite3
 from database.managers.base import BaseDatabaseManager, _parse_datetime
+from database.change_events import ChangeAction
 from database.models.message import MessageTag
+from database.models.schema import TAG_DAY_SQL, REBUILD_TAG_ANALYTICS_SQL
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,28 +43,66 @@ class TagManager(BaseDatabaseManager):
             return True
         
         try:
-            with self.get_connection() as conn:
-                for tag in tags:
-                    if not tag or not tag.strip():
-                        continue
-                    
-                    try:
-                        conn.execute("""
-                            INSERT INTO message_tags 
-                            (message_id, group_id, user_id, tag, date_sent)
-                            VALUES (?, ?, ?, ?, ?)
-                            ON CONFLICT(message_id, group_id, tag) DO NOTHING
-                        """, (message_id, group_id, user_id, tag.strip().lower(), date_sent))
-                    except Exception as e:
-                        logger.warning(f"Error saving tag '{tag}' for message {message_id}: {e}")
-                        continue
-                
+            with self.get_write_connection() as conn:
+                self.write_tags(conn, message_id, group_id, user_id, tags, date_sent)
                 conn.commit()
-                return True
+            self._emit_change(
+                'message_tags',
+                group_id=group_id,
+                user_id=user_id,
+                message_ids=[message_id]
+            )
+            return True
         except Exception as e:
             logger.error(f"Error saving tags for message {message_id}: {e}")
             return False
     
+    def write_tags(
+        self,
+        conn: sqlite3.Connection,
+        message_id: int,
+        group_id: int,
+        user_id: int,
+        tags: List[str],
+        date_sent: datetime
+    ) -> List[str]:
+        """
+        Insert tags for a message and update analytics counters on an open connection.
+        The caller owns the transaction (commit) and the change event.
+        
+        Args:
+            conn: Open database connection
+            message_id: Telegram message ID
+            group_id: Group ID
+            user_id: User ID
+            tags: List of normalized tags (without # prefix)
+            date_sent: Message date sent timestamp
+            
+        Returns:
+            Tags that were newly added to the message
+        """
+        existing = self._get_message_tag_set(conn, message_id, group_id)
+        inserted = []
+        for tag in tags:
+            if not tag or not tag.strip():
+                continue
+            
+            try:
+                cursor = conn.execute("""
+                    INSERT INTO message_tags 
+                    (message_id, group_id, user_id, tag, date_sent)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(message_id, group_id, tag) DO NOTHING
+                """, (message_id, group_id, user_id, tag.strip().lower(), date_sent))
+                if cursor.rowcount > 0:
+                    inserted.append(tag.strip().lower())
+            except Exception as e:
+                logger.warning(f"Error saving tag '{tag}' for message {message_id}: {e}")
+                continue
+        
+        self._add_tag_analytics(conn, message_id, group_id, inserted, existing)
+        return inserted
+    
     def get_tags_by_message(self, message_id: int, group_id: int) -> List[MessageTag]:
         """
         Get all tags for a message.
@@ -126,7 +168,7 @@ class TagManager(BaseDatabaseManager):
                 query += " AND group_id = ?"
                 params.append(group_id)
             
-            query += " ORDER BY date_sent DESC"
+            query += " ORDER BY date_sent_ms DESC"
             
             if limit:
                 query += f" LIMIT {limit} OFFSET {offset}"
@@ -192,10 +234,11 @@ class TagManager(BaseDatabaseManager):
         try:
             with self.get_connection() as conn:
                 cursor = conn.execute("""
-                    SELECT tag, COUNT(*) as count
-                    FROM message_tags
+                    SELECT tag, SUM(count) as count
+                    FROM tag_daily_counts
                     WHERE group_id = ?
                     GROUP BY tag
+                    HAVING count > 0
                     ORDER BY count DESC, tag ASC
                 """, (group_id,))
                 
@@ -242,13 +285,20 @@ class TagManager(BaseDatabaseManager):
             True if successful, False otherwise
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
+                self._remove_tag_analytics(conn, message_id, group_id)
                 conn.execute("""
                     DELETE FROM message_tags
                     WHERE message_id = ? AND group_id = ?
                 """, (message_id, group_id))
                 conn.commit()
-                return True
+            self._emit_change(
+                'message_tags',
+                ChangeAction.DELETED,
+                group_id=group_id,
+                message_ids=[message_id]
+            )
+            return True
         except Exception as e:
             logger.error(f"Error deleting tags for message {message_id}: {e}")
             return False
@@ -275,4 +325,166 @@ class TagManager(BaseDatabaseManager):
         except Exception as e:
             logger.error(f"Error getting all tags for group {group_id}: {e}")
             return []
-
+    
+    def get_tag_daily_counts(
+        self,
+        group_id: int,
+        tags: Optional[List[str]] = None,
+        start_date: Optional[Union[datetime, date]] = None,
+        end_date: Optional[Union[datetime, date]] = None
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Get precomputed per-day tag counters.
+        
+        Args:
+            group_id: Group ID
+            tags: Optional list of normalized tags to restrict to
+            start_date: Optional first day (inclusive)
+            end_date: Optional last day (inclusive)
+            
+        Returns:
+            List of (day 'YYYY-MM-DD', tag, count) tuples ordered by day
+        """
+        try:
+            query = "SELECT day, tag, count FROM tag_daily_counts WHERE group_id = ? AND count > 0"
+            params: list = [group_id]
+            
+            if tags:
+                query += f" AND tag IN ({','.join('?' * len(tags))})"
+                params.extend(tag.strip().lower() for tag in tags)
+            
+            if start_date:
+                query += " AND day >= ?"
+                params.append(start_date.strftime('%Y-%m-%d'))
+            
+            if end_date:
+                query += " AND day <= ?"
+                params.append(end_date.strftime('%Y-%m-%d'))
+            
+            query += " ORDER BY day ASC"
+            
+            with self.get_connection() as conn:
+                return [tuple(row) for row in conn.execute(query, params).fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting daily tag counts for group {group_id}: {e}")
+            return []
+    
+    def get_tag_cooccurrence(
+        self,
+        group_id: int,
+        tags: Optional[List[str]] = None
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Get precomputed tag co-occurrence counts (messages carrying both tags).
+        
+        Args:
+            group_id: Group ID
+            tags: Optional list of normalized tags; only pairs within it are returned
+            
+        Returns:
+            List of (tag_a, tag_b, count) tuples with tag_a < tag_b
+        """
+        try:
+            query = "SELECT tag_a, tag_b, count FROM tag_cooccurrence WHERE group_id = ? AND count > 0"
+            params: list = [group_id]
+            
+            if tags:
+                placeholders = ','.join('?' * len(tags))
+                query += f" AND tag_a IN ({placeholders}) AND tag_b IN ({placeholders})"
+                normalized = [tag.strip().lower() for tag in tags]
+                params.extend(normalized + normalized)
+            
+            with self.get_connection() as conn:
+                return [tuple(row) for row in conn.execute(query, params).fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting tag co-occurrence for group {group_id}: {e}")
+            return []
+    
+    def rebuild_tag_analytics(self) -> bool:
+        """
+        Recompute all tag analytics counters from message_tags.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.run_write(lambda conn: conn.executescript(REBUILD_TAG_ANALYTICS_SQL))
+            self._emit_change('message_tags')
+            return True
+        except Exception as e:
+            logger.error(f"Error rebuilding tag analytics: {e}")
+            return False
+    
+    @staticmethod
+    def _get_message_tag_set(conn: sqlite3.Connection, message_id: int, group_id: int) -> set:
+        """Get the tags currently stored for a message."""
+        cursor = conn.execute(
+            "SELECT tag FROM message_tags WHERE message_id = ? AND group_id = ?",
+            (message_id, group_id)
+        )
+        return {row[0] for row in cursor.fetchall()}
+    
+    @staticmethod
+    def _add_tag_analytics(
+        conn: sqlite3.Connection,
+        message_id: int,
+        group_id: int,
+        inserted: Iterable[str],
+        existing: set
+    ):
+        """Bump day counters and pair counts for tags newly added to a message."""
+        inserted = set(inserted) - existing
+        if not inserted:
+            return
+        
+        conn.executemany(f"""
+            INSERT INTO tag_daily_counts (group_id, tag, day, count)
+            SELECT group_id, tag, {TAG_DAY_SQL}, 1
+            FROM message_tags
+            WHERE message_id = ? AND group_id = ? AND tag = ?
+            ON CONFLICT(group_id, tag, day) DO UPDATE SET count = count + 1
+        """, [(message_id, group_id, tag) for tag in inserted])
+        
+        all_tags = existing | inserted
+        pairs = {
+            tuple(sorted((new_tag, other)))
+            for new_tag in inserted
+            for other in all_tags
+            if other != new_tag
+        }
+        conn.executemany("""
+            INSERT INTO tag_cooccurrence (group_id, tag_a, tag_b, count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(group_id, tag_a, tag_b) DO UPDATE SET count = count + 1
+        """, [(group_id, tag_a, tag_b) for tag_a, tag_b in pairs])
+    
+    @staticmethod
+    def _remove_tag_analytics(conn: sqlite3.Connection, message_id: int, group_id: int):
+        """Decrement day counters and pair counts for all tags of a message about to be deleted."""
+        rows = conn.execute(f"""
+            SELECT tag, {TAG_DAY_SQL} AS day
+            FROM message_tags
+            WHERE message_id = ? AND group_id = ?
+        """, (message_id, group_id)).fetchall()
+        if not rows:
+            return
+        
+        day_keys = [(group_id, row[0], row[1]) for row in rows]
+        conn.executemany(
+            "UPDATE tag_daily_counts SET count = count - 1 WHERE group_id = ? AND tag = ? AND day = ?",
+            day_keys
+        )
+        conn.executemany(
+            "DELETE FROM tag_daily_counts WHERE group_id = ? AND tag = ? AND day = ? AND count <= 0",
+            day_keys
+        )
+        
+        pair_keys = [(group_id, tag_a, tag_b) for tag_a, tag_b in combinations(sorted(row[0] for row in rows), 2)]
+        conn.executemany(
+            "UPDATE tag_cooccurrence SET count = count - 1 WHERE group_id = ? AND tag_a = ? AND tag_b = ?",
+            pair_keys
+        )
+        conn.executemany(
+            "DELETE FROM tag_cooccurrence WHERE group_id = ? AND tag_a = ? AND tag_b = ? AND count <= 0",
+            pair_keys
+        )
@@ -22,7 +22,7 @@ class TelegramCredentialManager(BaseDatabaseManager):
             encrypted_phone = encryption_service.encrypt_field(credential.phone_number) if encryption_service else credential.phone_number
             encrypted_session = encryption_service.encrypt_field(credential.session_string) if encryption_service else credential.session_string
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 # If set as default, unset all others
                 if credential.is_default:
                     conn.execute("UPDATE telegram_credentials SET is_default = 0")
@@ -115,7 +115,7 @@ class TelegramCredentialManager(BaseDatabaseManager):
             True if deleted successfully, False otherwise
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute(
                     "DELETE FROM telegram_credentials WHERE id = ?",
                     (credential_id,)
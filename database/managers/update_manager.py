@@ -31,7 +31,7 @@ class UpdateManager(BaseDatabaseManager):
             True if successful, False otherwise
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("""
                     INSERT OR IGNORE INTO app_update_history 
                     (user_email, version, download_path, installed_at)
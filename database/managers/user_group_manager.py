@@ -27,12 +27,12 @@ class UserGroupManager(BaseDatabaseManager):
             group_id: Telegram group ID
             group_name: Group name
             group_username: Group username (optional)
-            
+        
         Returns:
             Database ID if successful, None otherwise
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO user_groups 
                     (user_id, group_id, group_name, group_username)
@@ -47,18 +47,57 @@ class UserGroupManager(BaseDatabaseManager):
                     group_username
                 ))
                 conn.commit()
-                return cursor.lastrowid
+            self._emit_change('user_groups', group_id=group_id, user_id=user_id)
+            return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error saving user group: {e}")
             return None
     
+    def save_user_group_memberships(
+        self,
+        user_ids: List[int],
+        group_id: int,
+        group_name: str,
+        group_username: Optional[str] = None
+    ) -> int:
+        """
+        Save or update user-group relationships for many users of one group in a single transaction.
+        
+        Args:
+            user_ids: Telegram user IDs
+            group_id: Telegram group ID
+            group_name: Group name
+            group_username: Group username (optional)
+        
+        Returns:
+            Number of relationships written
+        """
+        if not user_ids:
+            return 0
+        try:
+            with self.get_write_connection() as conn:
+                conn.executemany("""
+                    INSERT INTO user_groups 
+                    (user_id, group_id, group_name, group_username)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(user_id, group_id) DO UPDATE SET
+                        group_name = excluded.group_name,
+                        group_username = excluded.group_username
+                """, [(user_id, group_id, group_name, group_username) for user_id in user_ids])
+                conn.commit()
+            self._emit_change('user_groups', group_id=group_id)
+            return len(user_ids)
+        except Exception as e:
+            logger.error(f"Error saving user group memberships for group {group_id}: {e}")
+            return 0
+    
     def get_user_groups(self, user_id: int) -> List[Dict]:
         """
         Get all groups for a user.
         
         Args:
             user_id: Telegram user ID
-            
+        
         Returns:
             List of group dictionaries with group_id, group_name, group_username
         """
@@ -85,7 +124,7 @@ class UserGroupManager(BaseDatabaseManager):
         
         Args:
             group_id: Telegram group ID
-            
+        
         Returns:
             List of user IDs
         """
@@ -102,7 +141,7 @@ class UserGroupManager(BaseDatabaseManager):
         
         Args:
             user_id: Telegram user ID
-            
+        
         Returns:
             Number of groups the user has joined
         """
@@ -122,12 +161,12 @@ class UserGroupManager(BaseDatabaseManager):
         Args:
             user_id: Telegram user ID
             group_id: Telegram group ID
-            
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 conn.execute("""
                     DELETE FROM user_groups
                     WHERE user_id = ? AND group_id = ?
@@ -144,7 +183,7 @@ class UserGroupManager(BaseDatabaseManager):
         
         Args:
             group_ids: Optional list of group IDs to filter by
-            
+        
         Returns:
             List of dictionaries with group_id, group_name, group_username, user_count
         """
@@ -196,7 +235,7 @@ class UserGroupManager(BaseDatabaseManager):
         Args:
             group_ids: Optional list of group IDs to filter by
             search_query: Optional search query to filter users by name/username
-            
+        
         Returns:
             List of dictionaries with user_id, full_name, username, group_count
         """
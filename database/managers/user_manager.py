@@ -2,8 +2,9 @@
 Telegram users manager.
 """
 
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
 from database.managers.base import BaseDatabaseManager, _parse_datetime
+from database.change_events import ChangeAction
 from database.models.telegram import TelegramUser
 import logging
 
@@ -26,7 +27,7 @@ class UserManager(BaseDatabaseManager):
             encrypted_phone = encryption_service.encrypt_field(user.phone) if encryption_service else user.phone
             encrypted_bio = encryption_service.encrypt_field(user.bio) if encryption_service else user.bio
             
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.execute("""
                     INSERT INTO telegram_users 
                     (user_id, username, first_name, last_name, full_name, phone, bio, profile_photo_path)
@@ -51,11 +52,114 @@ class UserManager(BaseDatabaseManager):
                     user.profile_photo_path
                 ))
                 conn.commit()
-                return cursor.lastrowid
+            self._emit_change('telegram_users', user_id=user.user_id)
+            return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error saving user: {e}")
             return None
     
+    def get_user_deletion_states(self, user_ids: Iterable[int]) -> Dict[int, bool]:
+        """
+        Look up which users exist and whether they are soft-deleted, in one query.
+        
+        Args:
+            user_ids: Telegram user IDs (one page of participants)
+            
+        Returns:
+            Dict of user_id -> is_deleted for users that exist (missing IDs are new)
+        """
+        ids = list(dict.fromkeys(user_ids))
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT user_id, is_deleted FROM telegram_users WHERE user_id IN ({placeholders})",
+                ids
+            )
+            return {row['user_id']: bool(row['is_deleted']) for row in cursor.fetchall()}
+    
+    def import_group_members(
+        self,
+        users: List[TelegramUser],
+        group_id: int,
+        group_name: str,
+        group_username: Optional[str] = None,
+        restore_user_ids: Optional[Iterable[int]] = None
+    ) -> int:
+        """
+        Bulk upsert users and their membership of a group in one transaction.
+        
+        Args:
+            users: Users to save or update
+            group_id: Telegram group ID the users belong to
+            group_name: Group name
+            group_username: Group username (optional)
+            restore_user_ids: Soft-deleted users to restore
+            
+        Returns:
+            Number of users saved (0 on failure - the whole batch is rolled back)
+        """
+        if not users:
+            return 0
+        try:
+            encryption_service = self.get_encryption_service()
+            encrypt = encryption_service.encrypt_field if encryption_service else (lambda value: value)
+            
+            user_rows = [
+                (
+                    user.user_id,
+                    encrypt(user.username),
+                    encrypt(user.first_name),
+                    encrypt(user.last_name),
+                    encrypt(user.full_name),
+                    encrypt(user.phone),
+                    encrypt(user.bio),
+                    user.profile_photo_path
+                )
+                for user in users
+            ]
+            restore_ids = [(user_id,) for user_id in (restore_user_ids or [])]
+            
+            with self.get_write_connection() as conn:
+                conn.executemany("""
+                    INSERT INTO telegram_users 
+                    (user_id, username, first_name, last_name, full_name, phone, bio, profile_photo_path)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET
+                        username = excluded.username,
+                        first_name = excluded.first_name,
+                        last_name = excluded.last_name,
+                        full_name = excluded.full_name,
+                        phone = excluded.phone,
+                        bio = excluded.bio,
+                        profile_photo_path = excluded.profile_photo_path,
+                        updated_at = CURRENT_TIMESTAMP
+                """, user_rows)
+                if restore_ids:
+                    conn.executemany(
+                        "UPDATE telegram_users SET is_deleted = 0 WHERE user_id = ?",
+                        restore_ids
+                    )
+                conn.executemany("""
+                    INSERT INTO user_groups 
+                    (user_id, group_id, group_name, group_username)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(user_id, group_id) DO UPDATE SET
+                        group_name = excluded.group_name,
+                        group_username = excluded.group_username
+                """, [(user.user_id, group_id, group_name, group_username) for user in users])
+                conn.commit()
+            
+            self._emit_change('telegram_users', group_id=group_id)
+            if restore_ids:
+                self._emit_change('telegram_users', ChangeAction.RESTORED, group_id=group_id)
+            self._emit_change('user_groups', group_id=group_id)
+            return len(users)
+        except Exception as e:
+            logger.error(f"Error importing {len(users)} members of group {group_id}: {e}")
+            return 0
+    
     def get_all_users(self, include_deleted: bool = False) -> List[TelegramUser]:
         """Get all Telegram users."""
         encryption_service = self.get_encryption_service()
@@ -301,7 +405,7 @@ class UserManager(BaseDatabaseManager):
     def soft_delete_user(self, user_id: int) -> bool:
         """Soft delete a user."""
         try:
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 # Mark user as deleted
                 conn.execute(
                     "UPDATE telegram_users SET is_deleted = 1 WHERE user_id = ?",
@@ -317,7 +421,9 @@ class UserManager(BaseDatabaseManager):
                     (user_id,)
                 )
                 conn.commit()
-                return True
+            self._emit_change('telegram_users', ChangeAction.DELETED, user_id=user_id)
+            self._emit_change('messages', ChangeAction.DELETED, user_id=user_id)
+            return True
         except Exception as e:
             logger.error(f"Error soft deleting user: {e}")
             return False
@@ -2,12 +2,12 @@
 Message and reaction models.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Message model."""
     id: Optional[int] = None
@@ -30,7 +30,7 @@ class Message:
     updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Reaction:
     """Reaction model for tracking user reactions to messages."""
     id: Optional[int] = None
@@ -43,7 +43,7 @@ class Reaction:
     created_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageTag:
     """Message tag model."""
     id: Optional[int] = None
@@ -54,3 +54,62 @@ class MessageTag:
     date_sent: Optional[datetime] = None
     created_at: Optional[datetime] = None
 
+
+
+# Message fields decoded on first access by LazyMessage (decryption / datetime parsing)
+LAZY_MESSAGE_FIELDS = ('content', 'caption', 'message_link', 'date_sent', 'created_at', 'updated_at')
+
+
+class LazyMessage(Message):
+    """
+    Message read from the database whose encrypted and datetime fields are
+    decoded on first attribute access.
+
+    The raw column values are kept in _raw (aligned with LAZY_MESSAGE_FIELDS)
+    and decoded by a codec shared by all rows of one query, whose
+    decode(field, raw) returns the field value.
+    """
+    __slots__ = ('_raw', '_codec')
+
+    @classmethod
+    def from_values(cls, codec: Any, raw: Tuple[Any, ...], **values) -> "LazyMessage":
+        """
+        Build a message without decoding its lazy fields.
+
+        Args:
+            codec: Object with decode(field, raw) used for the lazy fields
+            raw: Raw values of LAZY_MESSAGE_FIELDS
+            **values: Eager field values (missing fields get their defaults)
+        """
+        message = cls.__new__(cls)
+        message._codec = codec
+        message._raw = raw
+        for name, default in _EAGER_MESSAGE_DEFAULTS:
+            setattr(message, name, values.get(name, default))
+        return message
+
+
+def _lazy_message_field(name: str, index: int) -> property:
+    """Property that decodes a lazy field into Message's slot on first read."""
+    slot = Message.__dict__[name]
+
+    def get(self):
+        try:
+            return slot.__get__(self, Message)
+        except AttributeError:
+            value = self._codec.decode(name, self._raw[index])
+            slot.__set__(self, value)
+            return value
+
+    def set(self, value):
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+for _index, _name in enumerate(LAZY_MESSAGE_FIELDS):
+    setattr(LazyMessage, _name, _lazy_message_field(_name, _index))
+
+_EAGER_MESSAGE_DEFAULTS = tuple(
+    (field.name, field.default) for field in fields(Message) if field.name not in LAZY_MESSAGE_FIELDS
+)
@@ -107,6 +107,16 @@ CREATE TABLE IF NOT EXISTS reactions (
     FOREIGN KEY (user_id) REFERENCES telegram_users(user_id)
 );
 
+-- Reaction Counts Table (per-message emoji totals taken from the downloaded message objects)
+CREATE TABLE IF NOT EXISTS message_reaction_counts (
+    group_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    emoji TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (group_id, message_id, emoji)
+) WITHOUT ROWID;
+
 -- Media Files Table
 CREATE TABLE IF NOT EXISTS media_files (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -184,6 +194,23 @@ CREATE TABLE IF NOT EXISTS message_tags (
     FOREIGN KEY (user_id) REFERENCES telegram_users(user_id)
 );
 
+-- Tag Analytics (counters maintained by TagManager on tag save/delete)
+CREATE TABLE IF NOT EXISTS tag_daily_counts (
+    group_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    day TEXT NOT NULL,  -- YYYY-MM-DD of message_tags.date_sent
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, tag, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tag_cooccurrence (
+    group_id INTEGER NOT NULL,
+    tag_a TEXT NOT NULL,  -- tag_a < tag_b
+    tag_b TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, tag_a, tag_b)
+) WITHOUT ROWID;
+
 -- User Groups Table (tracks which groups users have joined)
 CREATE TABLE IF NOT EXISTS user_groups (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -196,10 +223,48 @@ CREATE TABLE IF NOT EXISTS user_groups (
     FOREIGN KEY (user_id) REFERENCES telegram_users(user_id)
 );
 
+-- Group Participant Cache (last crawled participant list per group, used for common-group matching)
+CREATE TABLE IF NOT EXISTS group_participant_cache (
+    group_id INTEGER PRIMARY KEY,
+    group_name TEXT NOT NULL,
+    group_username TEXT,
+    participant_count INTEGER NOT NULL DEFAULT 0,
+    fetched_at TIMESTAMP NOT NULL,
+    is_complete BOOLEAN NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS group_participants (
+    group_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+) WITHOUT ROWID;
+
+-- Archive Periods (years moved to <db dir>/archive/ by ArchiveManager)
+CREATE TABLE IF NOT EXISTS archive_periods (
+    year INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    min_date_ms INTEGER,
+    max_date_ms INTEGER,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Maintenance Log (database maintenance runs and storage stats over time)
+CREATE TABLE IF NOT EXISTS maintenance_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,  -- checkpoint, optimize, analyze, vacuum, quick_check, archive or stats
+    ran_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    success BOOLEAN NOT NULL DEFAULT 1,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    detail TEXT,
+    page_count INTEGER,
+    freelist_count INTEGER,
+    wal_bytes INTEGER
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_messages_group_id ON messages(group_id);
 CREATE INDEX IF NOT EXISTS idx_messages_user_id ON messages(user_id);
-CREATE INDEX IF NOT EXISTS idx_messages_date_sent ON messages(date_sent);
 CREATE INDEX IF NOT EXISTS idx_messages_deleted ON messages(is_deleted);
 CREATE INDEX IF NOT EXISTS idx_messages_message_type ON messages(message_type);
 CREATE INDEX IF NOT EXISTS idx_media_files_message_id ON media_files(message_id);
@@ -209,6 +274,7 @@ CREATE INDEX IF NOT EXISTS idx_deleted_users_user_id ON deleted_users(user_id);
 CREATE INDEX IF NOT EXISTS idx_reactions_message_id ON reactions(message_id);
 CREATE INDEX IF NOT EXISTS idx_reactions_user_id_group_id ON reactions(user_id, group_id);
 CREATE INDEX IF NOT EXISTS idx_reactions_message_link ON reactions(message_link);
+CREATE INDEX IF NOT EXISTS idx_message_reaction_counts_emoji ON message_reaction_counts(emoji, group_id);
 CREATE INDEX IF NOT EXISTS idx_user_license_cache_email ON user_license_cache(user_email);
 CREATE INDEX IF NOT EXISTS idx_user_license_cache_active ON user_license_cache(is_active);
 CREATE INDEX IF NOT EXISTS idx_account_activity_user_email ON account_activity_log(user_email);
@@ -216,10 +282,42 @@ CREATE INDEX IF NOT EXISTS idx_account_activity_timestamp ON account_activity_lo
 CREATE INDEX IF NOT EXISTS idx_message_tags_tag ON message_tags(tag);
 CREATE INDEX IF NOT EXISTS idx_message_tags_group_id ON message_tags(group_id);
 CREATE INDEX IF NOT EXISTS idx_message_tags_user_id ON message_tags(user_id);
-CREATE INDEX IF NOT EXISTS idx_message_tags_date_sent ON message_tags(date_sent);
 CREATE INDEX IF NOT EXISTS idx_message_tags_group_tag ON message_tags(group_id, tag);
 CREATE INDEX IF NOT EXISTS idx_message_tags_user_group_tag ON message_tags(user_id, group_id, tag);
+CREATE INDEX IF NOT EXISTS idx_tag_daily_counts_group_day ON tag_daily_counts(group_id, day);
 CREATE INDEX IF NOT EXISTS idx_user_groups_user_id ON user_groups(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_groups_group_id ON user_groups(group_id);
+CREATE INDEX IF NOT EXISTS idx_group_participants_user_id ON group_participants(user_id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_log_task_ran_at ON maintenance_log(task, ran_at);
 """
 
+# Epoch milliseconds (UTC) of a TIMESTAMP column; NULL if the value cannot be parsed.
+# Offsets in the stored strings are honoured, values without one are taken as UTC.
+EPOCH_MS_SQL = "CAST(strftime('%s', {column}) AS INTEGER) * 1000 + CAST(substr(strftime('%f', {column}), 4) AS INTEGER)"
+
+# Integer epoch-ms columns generated from TIMESTAMP columns: table -> ((source, generated), ...).
+# Added by the migrations (ALTER TABLE can add VIRTUAL generated columns) and indexed there.
+EPOCH_MS_COLUMNS = {
+    'messages': (('date_sent', 'date_sent_ms'),),
+    'message_tags': (('date_sent', 'date_sent_ms'),),
+    'reactions': (('reacted_at', 'reacted_at_ms'),),
+}
+
+# Day bucket of a message_tags row, shared by the incremental counters and the rebuild
+TAG_DAY_SQL = "COALESCE(DATE(date_sent), SUBSTR(date_sent, 1, 10))"
+
+# Recompute tag analytics counters from message_tags
+REBUILD_TAG_ANALYTICS_SQL = f"""
+DELETE FROM tag_daily_counts;
+DELETE FROM tag_cooccurrence;
+INSERT INTO tag_daily_counts (group_id, tag, day, count)
+SELECT group_id, tag, {TAG_DAY_SQL}, COUNT(*)
+FROM message_tags
+GROUP BY group_id, tag, {TAG_DAY_SQL};
+INSERT INTO tag_cooccurrence (group_id, tag_a, tag_b, count)
+SELECT a.group_id, a.tag, b.tag, COUNT(*)
+FROM message_tags a
+JOIN message_tags b
+    ON b.message_id = a.message_id AND b.group_id = a.group_id AND a.tag < b.tag
+GROUP BY a.group_id, a.tag, b.tag;
+"""
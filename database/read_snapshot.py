@@ -0,0 +1,278 @@
+"""
+Reader connections and consistent read snapshots.
+
+Plain reads use a reader connection owned by the calling thread, inside a
+read transaction that lasts for one read block. A multi-query load (e.g.
+every widget of a page) instead acquires its own ReadSnapshot: a small set
+of reader connections whose read transactions were all opened between the
+same two commits, so queries running on them in parallel agree with each
+other while the writer keeps committing.
+
+Reader connections are registered with the executor call using them (see
+async_query_executor.register_connection) while they are borrowed, so a
+cancelled call interrupts only its own statement.
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from database.archive_store import create_archive_views
+from database.async_query_executor import register_connection, unregister_connection
+
+logger = logging.getLogger(__name__)
+
+# Reader connections per snapshot (queries beyond this wait for a free reader)
+READ_SNAPSHOT_MAX_READERS = 4
+
+Archives = Tuple[Tuple[str, str], ...]
+
+_pinned = threading.local()
+_thread_readers = threading.local()
+
+_commit_locks: Dict[str, threading.Lock] = {}
+_commit_locks_lock = threading.Lock()
+
+# Every per-thread reader, so close_read_connections() can reach other threads' connections
+_all_readers: List[Tuple[str, sqlite3.Connection]] = []
+_all_readers_lock = threading.Lock()
+
+
+def commit_lock(db_path: str) -> threading.Lock:
+    """
+    Lock held by the writer around each COMMIT of db_path.
+
+    Snapshots open their readers' transactions under it, so they never straddle a commit.
+    """
+    with _commit_locks_lock:
+        lock = _commit_locks.get(db_path)
+        if lock is None:
+            lock = _commit_locks[db_path] = threading.Lock()
+        return lock
+
+
+def _open_reader(db_path: str, archives: Archives) -> sqlite3.Connection:
+    """Open a read-only connection with the archives attached and shadowed by TEMP views."""
+    conn = sqlite3.connect(db_path, timeout=10.0, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    if archives:
+        # ATTACH and the TEMP views must come before query_only
+        for alias, path in archives:
+            conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+        create_archive_views(conn, [alias for alias, _ in archives])
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _begin_read(conn: sqlite3.Connection):
+    conn.execute("BEGIN")
+    # The WAL snapshot is taken by the first read of the transaction
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+
+def _end_read(conn: sqlite3.Connection):
+    try:
+        # Ending the read transaction lets checkpoints move past it
+        conn.execute("COMMIT")
+    except Exception:
+        pass
+
+
+@contextmanager
+def _borrowed(conn: sqlite3.Connection):
+    """Register conn with the calling executor call (if any) while it is in use."""
+    register_connection(conn)
+    try:
+        yield conn
+    finally:
+        unregister_connection(conn)
+
+
+class ReadSnapshot:
+    """
+    A consistent snapshot of one database for one load.
+
+    Holds up to `readers` connections, each in a read transaction opened
+    between the same two commits. Queries borrow a free connection, so up to
+    `readers` of them run in parallel and all see the same state. A thread
+    that already holds a connection of the snapshot reuses it for nested reads.
+    Closed when the last holder releases it.
+
+    With archives (alias, path) given, they are attached and the archived
+    tables are shadowed by TEMP views that UNION the hot and archived rows.
+    """
+
+    def __init__(self, db_path: str, archives: Archives = (), readers: int = 1):
+        self.db_path = db_path
+        self.archives = archives
+        self._condition = threading.Condition()
+        self._refs = 1
+        self._closed = False
+        self._holders = threading.local()
+        self._connections = [_open_reader(db_path, archives) for _ in range(max(1, readers))]
+        try:
+            with commit_lock(db_path):
+                for conn in self._connections:
+                    _begin_read(conn)
+        except Exception:
+            for conn in self._connections:
+                conn.close()
+            raise
+        self._idle = list(self._connections)
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed
+
+    @contextmanager
+    def connection(self):
+        """Borrow one of the snapshot's connections for a block of queries."""
+        held = getattr(self._holders, 'conn', None)
+        if held is not None:
+            yield held
+            return
+
+        with self._condition:
+            while not self._idle and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                raise sqlite3.ProgrammingError("Read snapshot is closed")
+            conn = self._idle.pop()
+        self._holders.conn = conn
+        try:
+            with _borrowed(conn):
+                yield conn
+        finally:
+            self._holders.conn = None
+            with self._condition:
+                self._idle.append(conn)
+                self._condition.notify()
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call func with this snapshot pinned on the calling thread, so manager reads
+        made by func (on any manager of the same database) use it.
+
+        Args:
+            func: Function doing reads
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            func's result
+        """
+        self.retain()
+        previous = getattr(_pinned, 'snapshot', None)
+        _pinned.snapshot = self
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _pinned.snapshot = previous
+            self.release()
+
+    def retain(self):
+        with self._condition:
+            self._refs += 1
+
+    def release(self):
+        with self._condition:
+            self._refs -= 1
+            close = self._refs <= 0
+        if close:
+            self.close()
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        for conn in self._connections:
+            _end_read(conn)
+            conn.close()
+
+
+def acquire_read_snapshot(
+    db_path: str,
+    archives: Archives = (),
+    readers: int = 1
+) -> ReadSnapshot:
+    """
+    Open a snapshot of db_path for one load. Release it when done.
+
+    Args:
+        db_path: Database file
+        archives: (alias, path) of archive databases to attach (see archive_store)
+        readers: Queries of the load that may run in parallel (capped at READ_SNAPSHOT_MAX_READERS)
+
+    Returns:
+        ReadSnapshot held once by the caller
+    """
+    return ReadSnapshot(db_path, archives, min(max(1, readers), READ_SNAPSHOT_MAX_READERS))
+
+
+def pinned_read_snapshot(db_path: str, archives: Archives = ()) -> Optional[ReadSnapshot]:
+    """Get the snapshot pinned on this thread by ReadSnapshot.run(), if it is for db_path and has the archives."""
+    snapshot = getattr(_pinned, 'snapshot', None)
+    if (
+        snapshot is not None and snapshot.db_path == db_path and not snapshot.is_closed
+        and set(archives) <= set(snapshot.archives)
+    ):
+        return snapshot
+    return None
+
+
+@contextmanager
+def thread_read_connection(db_path: str, archives: Archives = ()):
+    """
+    Read through the calling thread's own reader connection of db_path.
+
+    The block runs in one read transaction (nested blocks share it), so its
+    queries are consistent with each other and see every commit made before it.
+    """
+    readers = getattr(_thread_readers, 'readers', None)
+    if readers is None:
+        readers = _thread_readers.readers = {}
+    key = (db_path, archives)
+    entry = readers.get(key)
+    if entry is None:
+        conn = _open_reader(db_path, archives)
+        entry = readers[key] = [conn, 0]
+        with _all_readers_lock:
+            _all_readers.append((db_path, conn))
+    conn = entry[0]
+
+    if entry[1]:
+        entry[1] += 1
+        try:
+            yield conn
+        finally:
+            entry[1] -= 1
+        return
+
+    _begin_read(conn)
+    entry[1] = 1
+    try:
+        with _borrowed(conn):
+            yield conn
+    finally:
+        entry[1] = 0
+        _end_read(conn)
+
+
+def close_read_connections(db_path: str):
+    """Close every thread's idle reader connections of db_path (e.g. before the file is removed)."""
+    with _all_readers_lock:
+        closing = [conn for path, conn in _all_readers if path == db_path]
+        _all_readers[:] = [(path, conn) for path, conn in _all_readers if path != db_path]
+    for conn in closing:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    readers = getattr(_thread_readers, 'readers', None)
+    if readers:
+        for key in [key for key in readers if key[0] == db_path]:
+            del readers[key]
@@ -7,6 +7,7 @@ import sys
 import os
 import argparse
 import atexit
+import multiprocessing
 import platform
 import flet as ft
 from pathlib import Path
@@ -122,5 +123,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # PDF report workers are spawned processes; in the frozen app they re-enter here
+    multiprocessing.freeze_support()
     main()
 
@@ -0,0 +1,166 @@
+"""
+Activity time-series analytics for users and groups.
+
+Messages are binned by (entity, local day, local hour) in a single SQL pass and
+scattered into dense NumPy arrays, from which hour x weekday heatmaps,
+daily/weekly series and rolling averages are derived without per-row
+Python loops.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+import numpy as np
+from database.db_manager import DatabaseManager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 1970-01-01 was a Thursday; shifts epoch days so Monday is weekday 0
+_EPOCH_WEEKDAY = 3
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    """Weekday (Monday=0) of datetime64[D] values."""
+    return (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+
+
+@dataclass
+class ActivitySeries:
+    """
+    Dense activity arrays for a set of users or groups.
+    
+    Row i of every array belongs to ids[i]; daily columns follow days.
+    """
+    ids: np.ndarray  # int64, shape (n,)
+    days: np.ndarray  # datetime64[D], shape (d,)
+    daily: np.ndarray  # int64, shape (n, d)
+    heatmap: np.ndarray  # int64, shape (n, 7, 24) - weekday (Monday=0) x hour
+    
+    @property
+    def totals(self) -> np.ndarray:
+        """Total messages per entity."""
+        return self.daily.sum(axis=1)
+    
+    def weekly(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sum the daily series into Monday-based weeks.
+        
+        Returns:
+            (week_starts datetime64[D] of shape (w,), counts of shape (n, w))
+        """
+        if self.days.size == 0:
+            return self.days, self.daily
+        week_starts = self.days - _weekdays(self.days).astype('timedelta64[D]')
+        boundaries = np.flatnonzero(np.r_[True, week_starts[1:] != week_starts[:-1]])
+        return week_starts[boundaries], np.add.reduceat(self.daily, boundaries, axis=1)
+    
+    def rolling_mean(self, window: int = 7) -> np.ndarray:
+        """
+        Trailing rolling average of the daily series (partial windows at the start).
+        
+        Args:
+            window: Window length in days
+        
+        Returns:
+            float64 array of shape (n, d)
+        """
+        window = max(1, window)
+        cumulative = np.zeros((self.daily.shape[0], self.daily.shape[1] + 1), dtype=np.float64)
+        np.cumsum(self.daily, axis=1, out=cumulative[:, 1:])
+        end = np.arange(1, self.daily.shape[1] + 1)
+        start = np.maximum(end - window, 0)
+        return (cumulative[:, end] - cumulative[:, start]) / (end - start)
+    
+    def select(self, ids: List[int]) -> "ActivitySeries":
+        """Get the rows of the given ids, in that order (unknown ids are all zero)."""
+        position = {entity_id: i for i, entity_id in enumerate(self.ids.tolist())}
+        rows = np.array([position.get(entity_id, -1) for entity_id in ids], dtype=np.int64)
+        known = rows >= 0
+        daily = np.zeros((len(ids), self.daily.shape[1]), dtype=np.int64)
+        heatmap = np.zeros((len(ids), 7, 24), dtype=np.int64)
+        daily[known] = self.daily[rows[known]]
+        heatmap[known] = self.heatmap[rows[known]]
+        return ActivitySeries(np.array(ids, dtype=np.int64), self.days, daily, heatmap)
+
+
+class ActivityAnalyticsService:
+    """Service for activity heatmaps and time series of users and groups."""
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize activity analytics service.
+        
+        Args:
+            db_manager: Database manager instance
+        """
+        self.db_manager = db_manager
+    
+    def get_activity_series(
+        self,
+        by: str = 'user',
+        ids: Optional[List[int]] = None,
+        group_ids: Optional[List[int]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        utc_offset_minutes: Optional[int] = None
+    ) -> ActivitySeries:
+        """
+        Get daily series and hour x weekday heatmaps for users or groups.
+        
+        Args:
+            by: 'user' or 'group'
+            ids: User/group IDs to include (None for all active ones)
+            group_ids: Optional group filter (e.g. users' activity within these groups)
+            start_date: Optional start date; the daily axis starts here (default: first activity)
+            end_date: Optional end date; the daily axis ends here (default: last activity)
+            limit: Keep only the most active entities (ordered by total, descending)
+            utc_offset_minutes: Time zone of the days and hours (None for this machine's local time)
+        
+        Returns:
+            ActivitySeries (empty arrays if there is no activity or on error)
+        """
+        try:
+            rows = self.db_manager.get_activity_bins(by, ids, group_ids, start_date, end_date, utc_offset_minutes)
+            series = self._build_series(rows, start_date, end_date)
+            
+            if ids:
+                series = series.select(list(ids))
+            if limit is not None:
+                order = np.argsort(-series.totals, kind='stable')[:limit]
+                series = ActivitySeries(series.ids[order], series.days, series.daily[order], series.heatmap[order])
+            return series
+        except Exception as e:
+            logger.error(f"Error getting activity series by {by}: {e}")
+            return self._build_series([], None, None)
+    
+    @staticmethod
+    def _build_series(
+        rows: List[Tuple[int, str, int, int]],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> ActivitySeries:
+        """Scatter (entity, day, hour, count) bins into dense arrays."""
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return ActivitySeries(
+                empty, np.zeros(0, dtype='datetime64[D]'),
+                np.zeros((0, 0), dtype=np.int64), np.zeros((0, 7, 24), dtype=np.int64)
+            )
+        
+        entity_column, day_column, hour_column, count_column = zip(*rows)
+        ids, entity_index = np.unique(np.array(entity_column, dtype=np.int64), return_inverse=True)
+        days = np.array(day_column, dtype='datetime64[D]')
+        hours = np.array(hour_column, dtype=np.int64)
+        counts = np.array(count_column, dtype=np.int64)
+        
+        first_day = np.datetime64(start_date.date(), 'D') if start_date else days.min()
+        last_day = np.datetime64(end_date.date(), 'D') if end_date else days.max()
+        axis = np.arange(first_day, last_day + np.timedelta64(1, 'D'), dtype='datetime64[D]')
+        
+        daily = np.zeros((ids.size, axis.size), dtype=np.int64)
+        heatmap = np.zeros((ids.size, 7, 24), dtype=np.int64)
+        np.add.at(daily, (entity_index, (days - first_day).astype(np.int64)), counts)
+        np.add.at(heatmap, (entity_index, _weekdays(days), hours), counts)
+        return ActivitySeries(ids, axis, daily, heatmap)
@@ -0,0 +1,311 @@
+"""
+Avatar rendering for certificate exports.
+
+Avatars are either the user's profile photo masked to a circle or a
+two-colour gradient with the name's initial. Gradients are built as NumPy
+arrays, and rendered avatars are cached in memory and as PNG files on disk
+keyed by (user_id, photo mtime, size, style), so repeated exports and the
+podium slots of one certificate never re-open or re-resize a photo.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.constants import USER_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Rendered avatars kept in memory (least recently used are dropped first)
+AVATAR_MEMORY_CACHE_SIZE = 256
+
+# Rendered avatar PNGs kept on disk (oldest are pruned after a batch)
+AVATAR_DISK_CACHE_MAX_FILES = 2000
+
+AVATAR_CACHE_DIR = USER_DATA_DIR / "cache" / "avatars"
+
+# Threads for batch rendering (PIL releases the GIL while decoding and resizing)
+AVATAR_RENDER_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+# Photo masked to a circle on white
+STYLE_CIRCLE = "circle"
+
+# Gradient colour pairs, picked by the initial's position in the alphabet
+GRADIENT_PAIRS = (
+    ("#60A5FA", "#A78BFA"),  # Blue to Purple
+    ("#F472B6", "#EF4444"),  # Pink to Red
+    ("#34D399", "#14B8A6"),  # Green to Teal
+    ("#FB923C", "#FBBF24"),  # Orange to Amber
+    ("#22D3EE", "#3B82F6"),  # Cyan to Blue
+    ("#818CF8", "#A78BFA"),  # Indigo to Purple
+    ("#EF4444", "#F472B6"),  # Red to Pink
+    ("#34D399", "#22D3EE"),  # Green to Cyan
+    ("#A78BFA", "#F472B6"),  # Purple to Pink
+    ("#22D3EE", "#2563EB"),  # Cyan to Blue
+    ("#10B981", "#34D399"),  # Green
+    ("#FCD34D", "#FB923C"),  # Yellow to Orange
+    ("#EF4444", "#FB923C"),  # Red to Orange
+    ("#A78BFA", "#6366F1"),  # Purple to Indigo
+    ("#2563EB", "#06B6D4"),  # Blue to Cyan
+    ("#14B8A6", "#34D399"),  # Teal to Green
+    ("#FBBF24", "#FCD34D"),  # Amber to Yellow
+    ("#F472B6", "#DC2626"),  # Pink to Red
+    ("#6366F1", "#2563EB"),  # Indigo to Blue
+    ("#10B981", "#14B8A6"),  # Green to Teal
+    ("#FB923C", "#DC2626"),  # Orange to Red
+    ("#A78BFA", "#F472B6"),  # Purple to Pink
+    ("#06B6D4", "#2563EB"),  # Cyan to Blue
+    ("#DC2626", "#FB923C"),  # Red to Orange
+    ("#10B981", "#22D3EE"),  # Green to Cyan
+    ("#A78BFA", "#2563EB"),  # Purple to Blue
+)
+
+# (user_id, photo mtime in ns or 0, size, style, initial)
+AvatarKey = Tuple[object, int, int, str, str]
+
+
+def get_gradient_colors_for_letter(letter: str) -> Tuple[str, str]:
+    """Get consistent gradient colors based on first letter of name."""
+    letter_num = ord(letter.upper()) - ord('A') if letter and letter.isalpha() else 0
+    return GRADIENT_PAIRS[letter_num % len(GRADIENT_PAIRS)]
+
+
+def _hex_to_rgb(color: str) -> np.ndarray:
+    return np.array([int(color[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float64)
+
+
+def render_gradient(size: int, start_color: str, end_color: str) -> Image.Image:
+    """Left-to-right gradient of size x size pixels, built as one array."""
+    ratio = np.arange(size, dtype=np.float64)[:, None] / size
+    start = _hex_to_rgb(start_color)
+    row = (start + (_hex_to_rgb(end_color) - start) * ratio).astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(row, (size, size, 3))), 'RGB')
+
+
+@lru_cache(maxsize=32)
+def _circle_mask(size: int) -> Image.Image:
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    return mask
+
+
+@lru_cache(maxsize=32)
+def _initial_font(size: int):
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except Exception:
+        try:
+            return ImageFont.load_default()
+        except Exception:
+            return None
+
+
+def _user_initial(user: Dict) -> str:
+    full_name = user.get('full_name') or "Unknown"
+    return full_name[0].upper()
+
+
+def _photo_mtime_ns(user: Dict) -> int:
+    """mtime of the user's profile photo in ns, or 0 if there is none."""
+    profile_photo_path = user.get('profile_photo_path')
+    if not profile_photo_path:
+        return 0
+    try:
+        return os.stat(profile_photo_path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+class AvatarRenderService:
+    """Renders and caches user avatars."""
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = AVATAR_CACHE_DIR,
+        memory_cache_size: int = AVATAR_MEMORY_CACHE_SIZE,
+        workers: int = AVATAR_RENDER_WORKERS
+    ):
+        """
+        Initialize avatar render service.
+        
+        Args:
+            cache_dir: Directory of the on-disk cache (None disables it)
+            memory_cache_size: Avatars kept in memory
+            workers: Threads used by render_many
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_cache_size = memory_cache_size
+        self.workers = max(1, workers)
+        self._memory: "OrderedDict[AvatarKey, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def avatar_key(self, user: Dict, size: int, style: str = STYLE_CIRCLE) -> AvatarKey:
+        """
+        Cache key of a user's avatar.
+        
+        The initial is part of the key because gradient avatars change with the name.
+        """
+        user_ref = user.get('user_id') or user.get('full_name') or "Unknown"
+        return (user_ref, _photo_mtime_ns(user), size, style, _user_initial(user))
+    
+    def get_avatar(self, user: Dict, size: int = 100, style: str = STYLE_CIRCLE) -> Image.Image:
+        """
+        Get a user's avatar (photo or gradient with initial), from cache if possible.
+        
+        Args:
+            user: User dict with user_id, full_name and profile_photo_path
+            size: Width and height in pixels
+            style: Avatar style
+        
+        Returns:
+            RGB image owned by the caller
+        """
+        key = self.avatar_key(user, size, style)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                return cached.copy()
+        
+        img = self._load_from_disk(key)
+        if img is None:
+            img = self._render(user, size, key[1] != 0)
+            self._save_to_disk(key, img)
+        
+        with self._lock:
+            self._memory[key] = img
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_cache_size:
+                self._memory.popitem(last=False)
+        return img.copy()
+    
+    def render_many(self, users: Iterable[Dict], size: int = 100, style: str = STYLE_CIRCLE) -> List[Image.Image]:
+        """
+        Get the avatars of many users, rendering uncached ones in a thread pool.
+        
+        Args:
+            users: User dicts (duplicates are rendered once)
+            size: Width and height in pixels
+            style: Avatar style
+        
+        Returns:
+            Avatars in the order of users
+        """
+        users = list(users)
+        if len(users) <= 1 or self.workers == 1:
+            avatars = [self.get_avatar(user, size, style) for user in users]
+        else:
+            unique: Dict[AvatarKey, Dict] = {}
+            keys = []
+            for user in users:
+                key = self.avatar_key(user, size, style)
+                unique.setdefault(key, user)
+                keys.append(key)
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(unique))) as pool:
+                rendered = dict(zip(unique, pool.map(lambda u: self.get_avatar(u, size, style), unique.values())))
+            avatars = [rendered[key].copy() for key in keys]
+        self.prune_disk_cache()
+        return avatars
+    
+    def clear(self, disk: bool = False) -> None:
+        """Drop the in-memory cache (and the on-disk one if disk is True)."""
+        with self._lock:
+            self._memory.clear()
+        if disk and self.cache_dir and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.png"):
+                path.unlink(missing_ok=True)
+    
+    def prune_disk_cache(self, max_files: int = AVATAR_DISK_CACHE_MAX_FILES) -> int:
+        """
+        Delete the oldest cached PNGs beyond max_files.
+        
+        Returns:
+            Number of files deleted
+        """
+        if not self.cache_dir or not self.cache_dir.exists():
+            return 0
+        try:
+            files = list(self.cache_dir.glob("*.png"))
+            if len(files) <= max_files:
+                return 0
+            files.sort(key=lambda path: path.stat().st_mtime)
+            for path in files[:len(files) - max_files]:
+                path.unlink(missing_ok=True)
+            return len(files) - max_files
+        except Exception as e:
+            logger.warning(f"Error pruning avatar cache: {e}")
+            return 0
+    
+    def _cache_path(self, key: AvatarKey) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.png"
+    
+    def _load_from_disk(self, key: AvatarKey) -> Optional[Image.Image]:
+        path = self._cache_path(key)
+        if not path or not path.exists():
+            return None
+        try:
+            with Image.open(path) as img:
+                return img.convert('RGB')
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached avatar {path}: {e}")
+            return None
+    
+    def _save_to_disk(self, key: AvatarKey, img: Image.Image) -> None:
+        path = self._cache_path(key)
+        if not path:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent renders never read a partial file
+            temp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp")
+            img.save(temp_path, format='PNG')
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to cache avatar: {e}")
+    
+    def _render(self, user: Dict, size: int, has_photo: bool) -> Image.Image:
+        """Render an avatar (photo or gradient with initial)."""
+        if has_photo:
+            try:
+                with Image.open(user['profile_photo_path']) as photo:
+                    # Let JPEG decode at a reduced scale when the photo is much larger
+                    photo.draft('RGB', (size, size))
+                    photo = photo.convert('RGB').resize((size, size), Image.Resampling.LANCZOS)
+                output = Image.new('RGB', (size, size), (255, 255, 255))
+                output.paste(photo, (0, 0), _circle_mask(size))
+                return output
+            except Exception as e:
+                logger.warning(f"Failed to load profile photo: {e}")
+        
+        # Gradient avatar with initial
+        first_letter = _user_initial(user)
+        img = render_gradient(size, *get_gradient_colors_for_letter(first_letter))
+        draw = ImageDraw.Draw(img)
+        
+        font = _initial_font(size // 2)
+        if font:
+            bbox = draw.textbbox((0, 0), first_letter, font=font)
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+        else:
+            text_width = size // 3
+            text_height = size // 3
+        
+        draw.text(((size - text_width) // 2, (size - text_height) // 2), first_letter, fill=(255, 255, 255), font=font)
+        return img
+
+
+# Global avatar render service instance
+avatar_render_service = AvatarRenderService()
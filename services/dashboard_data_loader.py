@@ -0,0 +1,149 @@
+"""
+Dashboard data loader - runs the dashboard's independent queries concurrently.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+from database.async_query_executor import async_query_executor
+from database.managers.stats_manager import DASHBOARD_STAT_KEYS
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardDataLoader:
+    """
+    Fans dashboard queries out to the query executor and reports each result
+    as soon as it arrives. Starting a new load cancels the previous one, and
+    results from a superseded load are never delivered.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._tasks: List[asyncio.Task] = []
+        self._generation = 0
+    
+    def build_queries(
+        self,
+        group_ids: List[int],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, Callable[[], Any]]:
+        """
+        Build the independent queries for one filter state.
+        
+        Args:
+            group_ids: Selected group IDs (empty = all groups)
+            start_date: Start of the date filter
+            end_date: End of the date filter
+        
+        Returns:
+            Mapping of result key to a zero-argument callable
+        """
+        ids = list(group_ids) if group_ids else None
+        queries: Dict[str, Callable[[], Any]] = {
+            key: partial(self.db_manager.get_dashboard_stat, key, ids, start_date, end_date)
+            for key in DASHBOARD_STAT_KEYS
+        }
+        queries['recent_messages'] = partial(
+            self.db_manager.get_messages,
+            group_ids=ids,
+            start_date=start_date,
+            end_date=end_date,
+            limit=10
+        )
+        if ids:
+            queries['active_users'] = partial(
+                self.db_manager.get_top_active_users_by_group,
+                group_ids=ids,
+                start_date=start_date,
+                end_date=end_date,
+                limit=10
+            )
+        return queries
+    
+    def cancel(self):
+        """Cancel the in-flight load; its remaining results are dropped."""
+        self._generation += 1
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        self._tasks = []
+    
+    async def load(
+        self,
+        group_ids: List[int],
+        start_date: datetime,
+        end_date: datetime,
+        on_result: Callable[[str, Any], None],
+        on_error: Optional[Callable[[str, Exception], None]] = None
+    ) -> bool:
+        """
+        Run all dashboard queries on one read snapshot, calling on_result(key, value)
+        per query in completion order.
+        
+        Args:
+            group_ids: Selected group IDs (empty = all groups)
+            start_date: Start of the date filter
+            end_date: End of the date filter
+            on_result: Called with each result while this load is current
+            on_error: Optional callback for a failed query
+        
+        Returns:
+            True if every query finished without being superseded by a newer load
+        """
+        self.cancel()
+        generation = self._generation
+        
+        async def run(key: str, func: Callable[[], Any]):
+            try:
+                return key, await async_query_executor.execute(func), None
+            except Exception as e:
+                return key, None, e
+        
+        queries = self.build_queries(group_ids, start_date, end_date)
+        # Every query of this load reads the same snapshot, so the widgets agree with
+        # each other even while a fetch is committing messages; each query gets its
+        # own reader of it, so they run in parallel on the executor's workers
+        snapshot = self.db_manager.acquire_read_snapshot(
+            archive_range=(start_date, end_date), readers=len(queries)
+        )
+        self._tasks = [
+            asyncio.ensure_future(run(key, partial(snapshot.run, func)))
+            for key, func in queries.items()
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(self._tasks):
+                try:
+                    key, value, error = await next_result
+                except asyncio.CancelledError:
+                    # Task.cancelling() is Python 3.11+
+                    current = asyncio.current_task()
+                    task_cancelled = bool(current and getattr(current, 'cancelling', None) and current.cancelling())
+                    if generation != self._generation and not task_cancelled:
+                        # A newer load cancelled this load's queries
+                        return False
+                    # The task running this load was cancelled: stop its queries and propagate
+                    if generation == self._generation:
+                        self.cancel()
+                    raise
+                
+                if generation != self._generation:
+                    return False
+                
+                if error is not None:
+                    logger.error(f"Dashboard query '{key}' failed: {error}")
+                    if on_error:
+                        on_error(key, error)
+                    continue
+                
+                on_result(key, value)
+        finally:
+            snapshot.release()
+        
+        return generation == self._generation
@@ -78,7 +78,7 @@ class DeviceRevocationHandler:
                     db_manager = getattr(settings, 'db_manager', None)
                 
                 if db_manager:
-                    db_manager.delete_login_credential()
+                    await db_manager.execute_write(db_manager.delete_login_credential)
                     logger.info("Deleted saved credentials due to device revocation")
             except Exception as e:
                 logger.error(f"Error deleting credentials on revocation: {e}", exc_info=True)
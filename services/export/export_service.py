@@ -3,12 +3,13 @@ Export service facade for generating PDF and Excel reports.
 """
 
 import logging
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from database.db_manager import DatabaseManager
 from database.models import Message, TelegramUser
 from services.export.exporters.messages_exporter import MessagesExporter
 from services.export.exporters.users_exporter import UsersExporter
 from services.export.exporters.user_data_exporter import UserDataExporter
+from services.export.exporters.columnar_exporter import ColumnarExporter
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class ExportService:
         self.messages_exporter = MessagesExporter(db_manager)
         self.users_exporter = UsersExporter()
         self.user_data_exporter = UserDataExporter()
+        self.columnar_exporter = ColumnarExporter(db_manager)
     
     def export_messages_to_excel(
         self,
@@ -47,6 +49,20 @@ class ExportService:
         """
         return self.messages_exporter.export_to_pdf(messages, output_path, title, include_stats)
     
+    def export_messages_report_to_pdf(
+        self,
+        output_path: str,
+        title: str = "Messages Report",
+        include_stats: bool = True,
+        **filters
+    ) -> bool:
+        """
+        Export every message matching get_messages-style filters to PDF,
+        streamed from the database and rendered in worker processes.
+        Returns True if successful.
+        """
+        return self.messages_exporter.export_report_to_pdf(output_path, title, include_stats, **filters)
+    
     def export_users_to_excel(
         self,
         users: List[TelegramUser],
@@ -95,4 +111,16 @@ class ExportService:
         Returns True if successful.
         """
         return self.user_data_exporter.export_to_pdf(user, messages, stats, output_path)
-
+    
+    def export_tables_to_columnar(
+        self,
+        output_dir: str,
+        format_type: str = 'parquet',
+        tables: Optional[Iterable[str]] = None,
+        partition: bool = False
+    ) -> Optional[Dict[str, int]]:
+        """
+        Export messages, users, tags, reactions and rollup tables to Parquet or Arrow IPC files.
+        Returns rows written per table, or None on error.
+        """
+        return self.columnar_exporter.export_tables(output_dir, format_type, tables, partition)
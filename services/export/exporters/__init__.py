@@ -5,6 +5,7 @@ Exporters package for specific export types.
 from services.export.exporters.messages_exporter import MessagesExporter
 from services.export.exporters.users_exporter import UsersExporter
 from services.export.exporters.user_data_exporter import UserDataExporter
+from services.export.exporters.columnar_exporter import ColumnarExporter
 
-__all__ = ['MessagesExporter', 'UsersExporter', 'UserDataExporter']
+__all__ = ['MessagesExporter', 'UsersExporter', 'UserDataExporter', 'ColumnarExporter']
 
@@ -3,7 +3,6 @@ Certificate exporter for top users certificate in PDF and image formats.
 """
 
 import logging
-import os
 from typing import List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
@@ -20,10 +19,18 @@ from reportlab.lib.utils import ImageReader
 from PIL import Image, ImageDraw, ImageFont
 import io
 
+from services.avatar_render_service import avatar_render_service
 from services.export.base_exporter import BaseExporter
 
 logger = logging.getLogger(__name__)
 
+# Avatar sizes (pixels) in PDF and image certificates
+PDF_AVATAR_SIZE = 100
+IMAGE_AVATAR_SIZE = 120
+
+# Users shown on a certificate
+CERTIFICATE_TOP_USERS = 5
+
 
 class CertificateExporter(BaseExporter):
     """Exports top users certificate to PDF and image formats."""
@@ -73,111 +80,32 @@ class CertificateExporter(BaseExporter):
             logger.error(f"Unsupported format: {format_type}")
             return False
     
-    def _get_gradient_colors_for_letter(self, letter: str) -> tuple:
-        """Get consistent gradient colors based on first letter of name."""
-        letter_num = ord(letter.upper()) - ord('A') if letter and letter.isalpha() else 0
-        
-        gradient_pairs = [
-            ("#60A5FA", "#A78BFA"),  # Blue to Purple
-            ("#F472B6", "#EF4444"),  # Pink to Red
-            ("#34D399", "#14B8A6"),  # Green to Teal
-            ("#FB923C", "#FBBF24"),  # Orange to Amber
-            ("#22D3EE", "#3B82F6"),  # Cyan to Blue
-            ("#818CF8", "#A78BFA"),  # Indigo to Purple
-            ("#EF4444", "#F472B6"),  # Red to Pink
-            ("#34D399", "#22D3EE"),  # Green to Cyan
-            ("#A78BFA", "#F472B6"),  # Purple to Pink
-            ("#22D3EE", "#2563EB"),  # Cyan to Blue
-            ("#10B981", "#34D399"),  # Green
-            ("#FCD34D", "#FB923C"),  # Yellow to Orange
-            ("#EF4444", "#FB923C"),  # Red to Orange
-            ("#A78BFA", "#6366F1"),  # Purple to Indigo
-            ("#2563EB", "#06B6D4"),  # Blue to Cyan
-            ("#14B8A6", "#34D399"),  # Teal to Green
-            ("#FBBF24", "#FCD34D"),  # Amber to Yellow
-            ("#F472B6", "#DC2626"),  # Pink to Red
-            ("#6366F1", "#2563EB"),  # Indigo to Blue
-            ("#10B981", "#14B8A6"),  # Green to Teal
-            ("#FB923C", "#DC2626"),  # Orange to Red
-            ("#A78BFA", "#F472B6"),  # Purple to Pink
-            ("#06B6D4", "#2563EB"),  # Cyan to Blue
-            ("#DC2626", "#FB923C"),  # Red to Orange
-            ("#10B981", "#22D3EE"),  # Green to Cyan
-            ("#A78BFA", "#2563EB"),  # Purple to Blue
-        ]
-        
-        color_pair = gradient_pairs[letter_num % len(gradient_pairs)]
-        return color_pair
-    
-    def _create_avatar_image(self, user: Dict, size: int = 100) -> Image.Image:
-        """Create avatar image (photo or gradient with initial)."""
-        profile_photo_path = user.get('profile_photo_path')
-        full_name = user.get('full_name') or "Unknown"
-        
-        # Try to load profile photo
-        if profile_photo_path and os.path.exists(profile_photo_path):
-            try:
-                img = Image.open(profile_photo_path)
-                img = img.convert('RGB')
-                img = img.resize((size, size), Image.Resampling.LANCZOS)
-                
-                # Create circular mask
-                mask = Image.new('L', (size, size), 0)
-                draw = ImageDraw.Draw(mask)
-                draw.ellipse((0, 0, size, size), fill=255)
-                
-                # Apply mask
-                output = Image.new('RGB', (size, size), (255, 255, 255))
-                output.paste(img, (0, 0), mask)
-                return output
-            except Exception as e:
-                logger.warning(f"Failed to load profile photo: {e}")
-        
-        # Create gradient avatar with initial
-        first_letter = full_name[0].upper() if full_name and len(full_name) > 0 else "?"
-        gradient_colors = self._get_gradient_colors_for_letter(first_letter)
-        
-        # Create gradient image
-        img = Image.new('RGB', (size, size))
-        draw = ImageDraw.Draw(img)
-        
-        # Simple gradient (top-left to bottom-right)
-        for i in range(size):
-            ratio = i / size
-            r1, g1, b1 = tuple(int(gradient_colors[0][j:j+2], 16) for j in (1, 3, 5))
-            r2, g2, b2 = tuple(int(gradient_colors[1][j:j+2], 16) for j in (1, 3, 5))
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            draw.line([(i, 0), (i, size)], fill=(r, g, b))
-        
-        # Draw initial
-        try:
-            # Try to use a larger font
-            font_size = size // 2
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
-        
-        # Get text bounding box
-        if font:
-            bbox = draw.textbbox((0, 0), first_letter, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-        else:
-            text_width = size // 3
-            text_height = size // 3
+    def export_many(self, certificates: List[Dict], format_type: str = 'pdf') -> List[bool]:
+        """
+        Export certificates of many groups at once.
         
-        # Center text
-        x = (size - text_width) // 2
-        y = (size - text_height) // 2
+        The avatars of every certificate are rendered up front in one batch on the
+        avatar service's worker pool, so each export only reads them from cache.
         
-        draw.text((x, y), first_letter, fill=(255, 255, 255), font=font)
+        Args:
+            certificates: Dicts with 'users' and 'output_path', plus the export
+                options of export() (group_name, date_range, title_en, title_km, image_size)
+            format_type: 'pdf' or 'image'
+            
+        Returns:
+            Success of each certificate, in order
+        """
+        avatar_size = PDF_AVATAR_SIZE if format_type == 'pdf' else IMAGE_AVATAR_SIZE
+        avatar_render_service.render_many(
+            (user for certificate in certificates for user in certificate['users'][:CERTIFICATE_TOP_USERS]),
+            size=avatar_size
+        )
         
-        return img
+        results = []
+        for certificate in certificates:
+            options = {k: v for k, v in certificate.items() if k not in ('users', 'output_path')}
+            results.append(self.export(certificate['users'], certificate['output_path'], format_type, **options))
+        return results
     
     def export_to_pdf(
         self,
@@ -194,7 +122,7 @@ class CertificateExporter(BaseExporter):
                 return False
             
             # Limit to top 5 users
-            users = users[:5]
+            users = users[:CERTIFICATE_TOP_USERS]
             
             if not users:
                 logger.error("No users to export")
@@ -265,14 +193,12 @@ class CertificateExporter(BaseExporter):
             elements.append(Spacer(1, 0.3 * inch))
             
             # User entries
+            avatars = avatar_render_service.render_many(users, size=PDF_AVATAR_SIZE)
             user_entries = []
-            for idx, user in enumerate(users, 1):
+            for idx, (user, avatar_img) in enumerate(zip(users, avatars), 1):
                 full_name = user.get('full_name') or "Unknown"
                 message_count = user.get('message_count', 0)
                 
-                # Create avatar
-                avatar_img = self._create_avatar_image(user, size=100)
-                
                 # Save avatar to bytes
                 avatar_bytes = io.BytesIO()
                 avatar_img.save(avatar_bytes, format='PNG')
@@ -290,7 +216,7 @@ class CertificateExporter(BaseExporter):
                 
                 # User entry
                 user_data = [
-                    [RLImage(avatar_bytes, width=100, height=100)],
+                    [RLImage(avatar_bytes, width=PDF_AVATAR_SIZE, height=PDF_AVATAR_SIZE)],
                     [Paragraph(f"<b>TOP {idx}</b>", ParagraphStyle(
                         'RankBadge',
                         parent=self.styles['Normal'],
@@ -419,7 +345,7 @@ class CertificateExporter(BaseExporter):
                 return False
             
             # Limit to top 5 users
-            users = users[:5]
+            users = users[:CERTIFICATE_TOP_USERS]
             
             if not users:
                 logger.error("No users to export")
@@ -523,19 +449,21 @@ class CertificateExporter(BaseExporter):
             # Row 2: TOP 2 and TOP 3 (justified/evenly spaced)
             # Row 3: TOP 4 and TOP 5 (justified/evenly spaced)
             
-            avatar_size = 120
+            avatar_size = IMAGE_AVATAR_SIZE
             row_spacing = 80
             user_spacing = 200  # Spacing between users in same row
+            avatars = avatar_render_service.render_many(users, size=avatar_size)
             
             # Row 1: TOP 1 (centered)
             if len(users) >= 1:
-                user = users[0]
+                user_idx = 0
+                user = users[user_idx]
                 full_name = user.get('full_name') or "Unknown"
                 message_count = user.get('message_count', 0)
                 x_pos = width // 2
                 
                 # Create and paste avatar
-                avatar_img = self._create_avatar_image(user, size=avatar_size)
+                avatar_img = avatars[user_idx]
                 avatar_with_border = Image.new('RGB', (avatar_size + 10, avatar_size + 10), color='white')
                 avatar_with_border.paste(avatar_img, (5, 5))
                 img.paste(avatar_with_border, (x_pos - avatar_size // 2 - 5, y_offset))
@@ -585,7 +513,7 @@ class CertificateExporter(BaseExporter):
                     x_pos = row2_x_positions[i]
                     
                     # Create and paste avatar
-                    avatar_img = self._create_avatar_image(user, size=avatar_size)
+                    avatar_img = avatars[user_idx]
                     avatar_with_border = Image.new('RGB', (avatar_size + 10, avatar_size + 10), color='white')
                     avatar_with_border.paste(avatar_img, (5, 5))
                     img.paste(avatar_with_border, (x_pos - avatar_size // 2 - 5, y_offset))
@@ -627,13 +555,14 @@ class CertificateExporter(BaseExporter):
                 y_offset += avatar_size + 100 + row_spacing
             elif len(users) == 2:
                 # Only 2 users, show TOP 2 in second row (centered)
-                user = users[1]
+                user_idx = 1
+                user = users[user_idx]
                 full_name = user.get('full_name') or "Unknown"
                 message_count = user.get('message_count', 0)
                 x_pos = width // 2
                 
                 # Create and paste avatar
-                avatar_img = self._create_avatar_image(user, size=avatar_size)
+                avatar_img = avatars[user_idx]
                 avatar_with_border = Image.new('RGB', (avatar_size + 10, avatar_size + 10), color='white')
                 avatar_with_border.paste(avatar_img, (5, 5))
                 img.paste(avatar_with_border, (x_pos - avatar_size // 2 - 5, y_offset))
@@ -683,7 +612,7 @@ class CertificateExporter(BaseExporter):
                     x_pos = row3_x_positions[i]
                     
                     # Create and paste avatar
-                    avatar_img = self._create_avatar_image(user, size=avatar_size)
+                    avatar_img = avatars[user_idx]
                     avatar_with_border = Image.new('RGB', (avatar_size + 10, avatar_size + 10), color='white')
                     avatar_with_border.paste(avatar_img, (5, 5))
                     img.paste(avatar_with_border, (x_pos - avatar_size // 2 - 5, y_offset))
@@ -722,13 +651,14 @@ class CertificateExporter(BaseExporter):
                     )
             elif len(users) == 4:
                 # Only 4 users, show TOP 4 in third row (centered)
-                user = users[3]
+                user_idx = 3
+                user = users[user_idx]
                 full_name = user.get('full_name') or "Unknown"
                 message_count = user.get('message_count', 0)
                 x_pos = width // 2
                 
                 # Create and paste avatar
-                avatar_img = self._create_avatar_image(user, size=avatar_size)
+                avatar_img = avatars[user_idx]
                 avatar_with_border = Image.new('RGB', (avatar_size + 10, avatar_size + 10), color='white')
                 avatar_with_border.paste(avatar_img, (5, 5))
                 img.paste(avatar_with_border, (x_pos - avatar_size // 2 - 5, y_offset))
@@ -0,0 +1,336 @@
+"""
+Columnar exporter streaming database tables to Parquet or Arrow IPC files.
+
+Rows are read from one private read snapshot (so all tables are mutually
+consistent) in record batches of EXPORT_BATCH_ROWS, decrypted per batch and
+written with dictionary-encoded group/user/type columns. Optionally the
+output is partitioned hive-style by group and month.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from database.read_snapshot import ReadSnapshot
+from services.export.base_exporter import BaseExporter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow library not installed - columnar export disabled")
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched, decrypted and written per record batch
+EXPORT_BATCH_ROWS = 50000
+
+# Compression codec for Parquet files and Arrow IPC streams
+EXPORT_COMPRESSION = 'zstd'
+
+FORMAT_EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrows',  # Arrow IPC stream format (allows a new dictionary per batch)
+}
+
+
+@dataclass(frozen=True)
+class _TableSpec:
+    """Columns and export options of one exported table."""
+    columns: Tuple[Tuple[str, str], ...]  # (name, kind) with kind in int/float/str/bool/timestamp
+    encrypted: Tuple[str, ...] = ()
+    dictionary: Tuple[str, ...] = ()
+    group_column: Optional[str] = None
+    date_column: Optional[str] = None
+    epoch_columns: Tuple[str, ...] = ()  # timestamps read from their integer <name>_ms column
+
+
+EXPORT_TABLES: Dict[str, _TableSpec] = {
+    'messages': _TableSpec(
+        columns=(
+            ('message_id', 'int'), ('group_id', 'int'), ('user_id', 'int'),
+            ('content', 'str'), ('caption', 'str'), ('date_sent', 'timestamp'),
+            ('has_media', 'bool'), ('media_type', 'str'), ('media_count', 'int'),
+            ('message_link', 'str'), ('message_type', 'str'), ('has_sticker', 'bool'),
+            ('has_link', 'bool'), ('sticker_emoji', 'str'), ('is_deleted', 'bool'),
+        ),
+        encrypted=('content', 'caption', 'message_link'),
+        dictionary=('group_id', 'user_id', 'media_type', 'message_type'),
+        group_column='group_id',
+        date_column='date_sent',
+        epoch_columns=('date_sent',),
+    ),
+    'telegram_users': _TableSpec(
+        columns=(
+            ('user_id', 'int'), ('username', 'str'), ('first_name', 'str'),
+            ('last_name', 'str'), ('full_name', 'str'), ('phone', 'str'), ('bio', 'str'),
+            ('is_deleted', 'bool'), ('created_at', 'timestamp'), ('updated_at', 'timestamp'),
+        ),
+        encrypted=('username', 'first_name', 'last_name', 'full_name', 'phone', 'bio'),
+    ),
+    'message_tags': _TableSpec(
+        columns=(
+            ('message_id', 'int'), ('group_id', 'int'), ('user_id', 'int'),
+            ('tag', 'str'), ('date_sent', 'timestamp'),
+        ),
+        dictionary=('group_id', 'user_id', 'tag'),
+        group_column='group_id',
+        date_column='date_sent',
+        epoch_columns=('date_sent',),
+    ),
+    'reactions': _TableSpec(
+        columns=(
+            ('message_id', 'int'), ('group_id', 'int'), ('user_id', 'int'),
+            ('emoji', 'str'), ('message_link', 'str'), ('reacted_at', 'timestamp'),
+        ),
+        encrypted=('message_link',),
+        dictionary=('group_id', 'user_id', 'emoji'),
+        group_column='group_id',
+        date_column='reacted_at',
+        epoch_columns=('reacted_at',),
+    ),
+    'message_reaction_counts': _TableSpec(
+        columns=(('group_id', 'int'), ('message_id', 'int'), ('emoji', 'str'), ('count', 'int')),
+        dictionary=('group_id', 'emoji'),
+        group_column='group_id',
+    ),
+    'tag_daily_counts': _TableSpec(
+        columns=(('group_id', 'int'), ('tag', 'str'), ('day', 'str'), ('count', 'int')),
+        dictionary=('group_id', 'tag'),
+        group_column='group_id',
+        date_column='day',
+    ),
+    'tag_cooccurrence': _TableSpec(
+        columns=(('group_id', 'int'), ('tag_a', 'str'), ('tag_b', 'str'), ('count', 'int')),
+        dictionary=('group_id', 'tag_a', 'tag_b'),
+        group_column='group_id',
+    ),
+}
+
+
+def _arrow_type(kind: str):
+    """Map a column kind to its Arrow type."""
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'str': pa.string(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('ms'),
+    }[kind]
+
+
+class ColumnarExporter(BaseExporter):
+    """Exports messages, users, tags, reactions and rollup tables to Parquet or Arrow IPC."""
+    
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+    
+    def export(
+        self,
+        data: Optional[Iterable[str]],
+        output_path: str,
+        format_type: str = 'parquet',
+        **kwargs
+    ) -> bool:
+        """
+        Export tables to a directory.
+        
+        Args:
+            data: Table names to export (None for all EXPORT_TABLES)
+            output_path: Output directory
+            format_type: 'parquet' or 'arrow'
+            **kwargs: Additional options (partition, batch_rows)
+        
+        Returns:
+            True if successful
+        """
+        return self.export_tables(output_path, format_type, tables=data, **kwargs) is not None
+    
+    def export_tables(
+        self,
+        output_dir: str,
+        format_type: str = 'parquet',
+        tables: Optional[Iterable[str]] = None,
+        partition: bool = False,
+        batch_rows: int = EXPORT_BATCH_ROWS
+    ) -> Optional[Dict[str, int]]:
+        """
+        Stream tables into columnar files under output_dir.
+        
+        Unpartitioned tables are written to <table><ext>; with partition=True
+        tables having a group column are written to
+        <table>/group=<id>/month=<YYYY-MM>/part-0<ext> (month only for tables
+        with a date column).
+        
+        Args:
+            output_dir: Output directory
+            format_type: 'parquet' or 'arrow'
+            tables: Table names to export (None for all EXPORT_TABLES)
+            partition: Partition output by group and month
+            batch_rows: Rows per record batch
+        
+        Returns:
+            Dict of table name to rows written, or None on error
+        """
+        if not PYARROW_AVAILABLE:
+            logger.error("pyarrow is required for Parquet/Arrow export")
+            return None
+        if format_type not in FORMAT_EXTENSIONS:
+            logger.error(f"Unsupported format: {format_type}")
+            return None
+        
+        names = list(tables) if tables else list(EXPORT_TABLES)
+        unknown = [name for name in names if name not in EXPORT_TABLES]
+        if unknown:
+            logger.error(f"Unsupported export tables: {unknown}")
+            return None
+        
+        snapshot = None
+        try:
+            output = Path(output_dir)
+            output.mkdir(parents=True, exist_ok=True)
+            encryption_service = self.db_manager.get_encryption_service()
+            
+            # One snapshot, so the tables are consistent with each other
+            snapshot = ReadSnapshot(self.db_manager.db_path)
+            counts = {}
+            with snapshot.connection() as conn:
+                for name in names:
+                    counts[name] = self._export_table(
+                        conn, name, EXPORT_TABLES[name], output, format_type,
+                        partition, batch_rows, encryption_service
+                    )
+            
+            logger.info(f"Exported {sum(counts.values())} rows ({format_type}) to {output_dir}: {counts}")
+            return counts
+        
+        except Exception as e:
+            logger.error(f"Error exporting tables to {format_type}: {e}", exc_info=True)
+            return None
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+    
+    def _export_table(
+        self,
+        conn,
+        name: str,
+        spec: _TableSpec,
+        output: Path,
+        format_type: str,
+        partition: bool,
+        batch_rows: int,
+        encryption_service
+    ) -> int:
+        """Stream one table into its file(s). Returns rows written."""
+        schema = pa.schema([
+            (column, pa.dictionary(pa.int32(), _arrow_type(kind)) if column in spec.dictionary else _arrow_type(kind))
+            for column, kind in spec.columns
+        ])
+        column_names = [column for column, _ in spec.columns]
+        select = [f"{column}_ms AS {column}" if column in spec.epoch_columns else column for column in column_names]
+        query = f"SELECT {', '.join(select)} FROM {name}"
+        
+        partitioned = partition and spec.group_column is not None
+        if partitioned:
+            # Sorted so each partition is written in one run and only one file is open at a time
+            order = [spec.group_column] + ([spec.date_column] if spec.date_column else [])
+            query += f" ORDER BY {', '.join(order)}"
+            group_index = column_names.index(spec.group_column)
+            date_index = column_names.index(spec.date_column) if spec.date_column else None
+        
+        extension = FORMAT_EXTENSIONS[format_type]
+        writer = None
+        current_key = None
+        written = 0
+        cursor = conn.execute(query)
+        try:
+            if not partitioned:
+                writer = self._open_writer(output / f"{name}{extension}", schema, format_type)
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                
+                if not partitioned:
+                    writer.write_batch(self._build_batch(rows, spec, schema, encryption_service))
+                    written += len(rows)
+                    continue
+                
+                for key, run in groupby(rows, key=lambda row: self._partition_key(row, group_index, date_index)):
+                    run = list(run)
+                    if key != current_key:
+                        if writer is not None:
+                            writer.close()
+                        writer = self._open_writer(
+                            self._partition_path(output / name, key, extension), schema, format_type
+                        )
+                        current_key = key
+                    writer.write_batch(self._build_batch(run, spec, schema, encryption_service))
+                    written += len(run)
+        finally:
+            cursor.close()
+            if writer is not None:
+                writer.close()
+        
+        return written
+    
+    @staticmethod
+    def _partition_key(row, group_index: int, date_index: Optional[int]) -> Tuple:
+        """Partition (group, month) of a row; dates are epoch ms or ISO strings (month is their prefix)."""
+        if date_index is None:
+            return (row[group_index],)
+        value = row[date_index]
+        if isinstance(value, int):
+            month = datetime.fromtimestamp(value / 1000, timezone.utc).strftime('%Y-%m')
+        else:
+            month = str(value)[:7] if value else 'unknown'
+        return (row[group_index], month)
+    
+    @staticmethod
+    def _partition_path(table_dir: Path, key: Tuple, extension: str) -> Path:
+        """Hive-style directory of a partition key."""
+        path = table_dir / f"group={key[0]}"
+        if len(key) > 1:
+            path = path / f"month={key[1]}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path / f"part-0{extension}"
+    
+    @staticmethod
+    def _open_writer(path: Path, schema, format_type: str):
+        """Open a Parquet or Arrow IPC stream writer for path."""
+        if format_type == 'parquet':
+            return pq.ParquetWriter(str(path), schema, compression=EXPORT_COMPRESSION)
+        options = pa.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION)
+        return pa.ipc.new_stream(str(path), schema, options=options)
+    
+    @staticmethod
+    def _build_batch(rows: List, spec: _TableSpec, schema, encryption_service):
+        """Turn fetched rows into a record batch, decrypting encrypted columns in bulk."""
+        arrays = []
+        for index, (column, kind) in enumerate(spec.columns):
+            values = [row[index] for row in rows]
+            if column in spec.encrypted and encryption_service:
+                values = [encryption_service.decrypt_field(value) for value in values]
+            
+            if column in spec.epoch_columns:
+                array = pa.array(values, type=pa.int64()).cast(pa.timestamp('ms'))
+            elif kind == 'timestamp':
+                parsed = pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601', errors='coerce')
+                array = pa.Array.from_pandas(parsed).cast(pa.timestamp('ms'), safe=False)
+            elif kind == 'bool':
+                array = pa.array([None if value is None else bool(value) for value in values], type=pa.bool_())
+            else:
+                array = pa.array(values, type=_arrow_type(kind))
+            
+            if column in spec.dictionary:
+                array = array.dictionary_encode()
+            arrays.append(array)
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
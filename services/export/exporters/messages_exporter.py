@@ -3,17 +3,16 @@ Messages exporter for Excel and PDF formats.
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 import pandas as pd
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.pagesizes import A4
 
 from database.models import Message
 from database.db_manager import DatabaseManager
 from services.export.base_exporter import BaseExporter
 from services.export.formatters.excel_formatter import ExcelFormatter
 from services.export.formatters.pdf_formatter import PDFFormatter
-from services.export.formatters.data_formatter import DataFormatter
+from services.export.formatters.data_formatter import DataFormatter, PDF_MESSAGE_HEADER
+from services.export.formatters.pdf_report_renderer import ChunkedPDFRenderer, PDFTableReport
 from utils.constants import DATETIME_FORMAT
 from datetime import datetime
 
@@ -124,88 +123,99 @@ class MessagesExporter(BaseExporter):
         messages: List[Message],
         output_path: str,
         title: str = "Messages Report",
-        include_stats: bool = True
+        include_stats: bool = True,
+        workers: Optional[int] = None
     ) -> bool:
-        """Export messages to PDF file."""
+        """Export messages to PDF file (all of them, in page-sized tables)."""
         try:
             if not self._validate_output_path(output_path):
                 return False
             
-            # Create PDF
-            doc = SimpleDocTemplate(
-                output_path,
-                pagesize=A4,
-                rightMargin=30,
-                leftMargin=30,
-                topMargin=30,
-                bottomMargin=30
+            # Format messages for PDF (header row dropped: the renderer repeats it per table)
+            table_data = self.data_formatter.format_messages_for_pdf(messages, self.db_manager, limit=None)
+            count = ChunkedPDFRenderer(workers).render(
+                output_path, self._create_report(title, include_stats), [table_data[1:]]
             )
             
-            elements = []
-            
-            # Title
-            title_style = self.pdf_formatter.create_title_style()
-            elements.append(self.pdf_formatter.create_paragraph(title, title_style))
-            elements.append(self.pdf_formatter.create_spacer())
-            
-            # Statistics
-            if include_stats:
-                stats = self.db_manager.get_dashboard_stats()
-                heading_style = self.pdf_formatter.create_heading_style()
-                elements.append(self.pdf_formatter.create_paragraph("Statistics", heading_style))
-                
-                from utils.constants import format_bytes
-                stats_data = [
-                    ['Metric', 'Value'],
-                    ['Total Messages', str(stats['total_messages'])],
-                    ['Total Users', str(stats['total_users'])],
-                    ['Total Groups', str(stats['total_groups'])],
-                    ['Total Media Size', format_bytes(stats['total_media_size'])],
-                    ['Export Date', datetime.now().strftime(DATETIME_FORMAT)]
-                ]
-                
-                stats_table = self.pdf_formatter.create_table(
-                    stats_data,
-                    col_widths=[3, 2],
-                    style=self.pdf_formatter.create_table_style(body_bg_color='beige')
-                )
-                elements.append(stats_table)
-                elements.append(self.pdf_formatter.create_spacer(height=20))
+            logger.info(f"Exported {count} messages to PDF: {output_path}")
+            return True
             
-            # Messages
-            heading_style = self.pdf_formatter.create_heading_style()
-            elements.append(self.pdf_formatter.create_paragraph("Messages", heading_style))
+        except Exception as e:
+            logger.error(f"Error exporting messages to PDF: {e}", exc_info=True)
+            return False
+    
+    def export_report_to_pdf(
+        self,
+        output_path: str,
+        title: str = "Messages Report",
+        include_stats: bool = True,
+        workers: Optional[int] = None,
+        **filters
+    ) -> bool:
+        """
+        Export every message matching filters to PDF, streamed from the database.
+        
+        Senders are joined in SQL and rows are read in batches, so whole-group
+        reports of tens of thousands of messages never sit in memory at once;
+        sections are rendered by worker processes and merged.
+        
+        Args:
+            output_path: Output file path
+            title: Report title
+            include_stats: Include the statistics table
+            workers: Worker processes (default PDF_MAX_WORKERS)
+            **filters: get_messages filters (group_id, group_ids, user_id, start_date,
+                end_date, include_deleted, tags, message_type_filter)
             
-            # Format messages for PDF
-            table_data = self.data_formatter.format_messages_for_pdf(messages, self.db_manager, limit=100)
+        Returns:
+            True if successful
+        """
+        try:
+            if not self._validate_output_path(output_path):
+                return False
             
-            # Create table
-            msg_table = self.pdf_formatter.create_table(
-                table_data,
-                col_widths=[0.4, 1.5, 3, 1.3, 0.6],
-                style=self.pdf_formatter.create_table_style(
-                    grid_color='grey',
-                    font_size=8,
-                    header_font_size=10
-                )
+            def row_batches():
+                start_index = 1
+                for batch in self.db_manager.iter_message_report_rows(**filters):
+                    yield self.data_formatter.format_message_rows_for_pdf(
+                        ((full_name, content, date_sent, has_media)
+                         for full_name, content, _, date_sent, has_media, _, _ in batch),
+                        start_index
+                    )
+                    start_index += len(batch)
+            
+            count = ChunkedPDFRenderer(workers).render(
+                output_path, self._create_report(title, include_stats), row_batches()
             )
-            elements.append(msg_table)
-            
-            # Add note if messages were limited
-            if len(messages) > 100:
-                elements.append(self.pdf_formatter.create_spacer())
-                note = self.pdf_formatter.create_paragraph(
-                    f"<i>Note: Showing first 100 of {len(messages)} messages. Export to Excel for full data.</i>"
-                )
-                elements.append(note)
             
-            # Build PDF
-            doc.build(elements)
-            
-            logger.info(f"Exported messages to PDF: {output_path}")
+            logger.info(f"Exported {count} messages to PDF: {output_path}")
             return True
             
         except Exception as e:
-            logger.error(f"Error exporting messages to PDF: {e}", exc_info=True)
+            logger.error(f"Error exporting messages report to PDF: {e}", exc_info=True)
             return False
-
+    
+    def _create_report(self, title: str, include_stats: bool) -> PDFTableReport:
+        """Layout of the messages PDF, with the statistics table if requested."""
+        intro_tables = ()
+        if include_stats:
+            stats = self.db_manager.get_dashboard_stats()
+            
+            from utils.constants import format_bytes
+            stats_data = (
+                ('Metric', 'Value'),
+                ('Total Messages', str(stats['total_messages'])),
+                ('Total Users', str(stats['total_users'])),
+                ('Total Groups', str(stats['total_groups'])),
+                ('Total Media Size', format_bytes(stats['total_media_size'])),
+                ('Export Date', datetime.now().strftime(DATETIME_FORMAT))
+            )
+            intro_tables = (("Statistics", stats_data, (3, 2)),)
+        
+        return PDFTableReport(
+            title=title,
+            heading="Messages",
+            header=PDF_MESSAGE_HEADER,
+            col_widths=(0.4, 1.5, 3, 1.3, 0.6),
+            intro_tables=intro_tables
+        )
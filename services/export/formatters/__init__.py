@@ -5,6 +5,7 @@ Formatters package for export formatting.
 from services.export.formatters.excel_formatter import ExcelFormatter
 from services.export.formatters.pdf_formatter import PDFFormatter
 from services.export.formatters.data_formatter import DataFormatter
+from services.export.formatters.pdf_report_renderer import ChunkedPDFRenderer, PDFTableReport
 
-__all__ = ['ExcelFormatter', 'PDFFormatter', 'DataFormatter']
+__all__ = ['ExcelFormatter', 'PDFFormatter', 'DataFormatter', 'ChunkedPDFRenderer', 'PDFTableReport']
 
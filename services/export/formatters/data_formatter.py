@@ -3,7 +3,7 @@ Data transformation utilities for exports.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
 from database.models import Message, TelegramUser
 from utils.helpers import format_datetime
@@ -11,6 +11,9 @@ from utils.constants import DATETIME_FORMAT, format_bytes
 
 logger = logging.getLogger(__name__)
 
+# Header row of the PDF messages table
+PDF_MESSAGE_HEADER = ('No', 'User', 'Message', 'Date', 'Media')
+
 
 class DataFormatter:
     """Handles data transformation for exports."""
@@ -69,23 +72,49 @@ class DataFormatter:
         Returns:
             List of rows (each row is a list of strings)
         """
-        table_data = [['No', 'User', 'Message', 'Date', 'Media']]
+        table_data = [list(PDF_MESSAGE_HEADER)]
         
-        for idx, msg in enumerate(messages[:limit], start_index):
-            user = db_manager.get_user_by_id(msg.user_id)
-            user_name = user.full_name if user else 'Unknown'
+        # One lookup per sender, not per message
+        user_names = {}
+        for msg in messages[:limit]:
+            if msg.user_id not in user_names:
+                user = db_manager.get_user_by_id(msg.user_id)
+                user_names[msg.user_id] = user.full_name if user else None
+        
+        table_data.extend(DataFormatter.format_message_rows_for_pdf(
+            ((user_names[msg.user_id], msg.content, msg.date_sent, msg.has_media) for msg in messages[:limit]),
+            start_index
+        ))
+        return table_data
+    
+    @staticmethod
+    def format_message_rows_for_pdf(
+        rows: Iterable[tuple],
+        start_index: int = 1
+    ) -> List[List[str]]:
+        """
+        Format pre-joined message rows for the PDF messages table (without header row).
+        
+        Args:
+            rows: (full_name, content, date_sent, has_media) tuples
+            start_index: Starting row number
             
+        Returns:
+            List of rows (each row is a list of strings)
+        """
+        table_data = []
+        for idx, (full_name, content, date_sent, has_media) in enumerate(rows, start_index):
             # Truncate message
-            message_text = msg.content or ''
+            message_text = content or ''
             if len(message_text) > 100:
                 message_text = message_text[:100] + '...'
             
             table_data.append([
                 str(idx),
-                user_name,
+                full_name or 'Unknown',
                 message_text,
-                format_datetime(msg.date_sent, '%Y-%m-%d %H:%M'),
-                'Yes' if msg.has_media else 'No'
+                format_datetime(date_sent, '%Y-%m-%d %H:%M'),
+                'Yes' if has_media else 'No'
             ])
         
         return table_data
@@ -176,7 +176,8 @@ class PDFFormatter:
         self,
         data: List[List[str]],
         col_widths: List[float],
-        style: List[tuple] = None
+        style: List[tuple] = None,
+        repeat_rows: int = 0
     ) -> Table:
         """
         Create a formatted table.
@@ -185,11 +186,12 @@ class PDFFormatter:
             data: Table data (list of rows)
             col_widths: Column widths in inches
             style: Custom table style (uses default if None)
+            repeat_rows: Leading rows repeated when the table is split across pages
             
         Returns:
             Formatted Table object
         """
-        table = Table(data, colWidths=[w * inch for w in col_widths])
+        table = Table(data, colWidths=[w * inch for w in col_widths], repeatRows=repeat_rows)
         
         if style is None:
             style = self.create_table_style()
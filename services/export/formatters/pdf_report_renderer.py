@@ -0,0 +1,204 @@
+"""
+Chunked, multi-process rendering of large PDF table reports.
+
+ReportLab lays out a Table flowable as a whole and re-splits the remainder
+at every page break, so one table of N rows gets slower with every page.
+Rows are therefore rendered as page-sized tables of PDF_TABLE_CHUNK_ROWS.
+Large reports are cut into sections of PDF_SECTION_ROWS rows that worker
+processes render to temporary PDFs, which are merged in order with pypdf.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+
+from services.export.formatters.pdf_formatter import PDFFormatter
+
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+    logging.warning("pypdf library not installed - PDF reports are rendered in a single process")
+
+logger = logging.getLogger(__name__)
+
+# Rows per Table flowable (about one A4 page at font size 8)
+PDF_TABLE_CHUNK_ROWS = 40
+
+# Rows per section rendered by one worker process
+PDF_SECTION_ROWS = 2000
+
+# Worker processes for multi-section reports
+PDF_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+PDF_PAGE_MARGIN = 30
+
+
+@dataclass(frozen=True)
+class PDFTableReport:
+    """Layout of a table report; plain data so it can be sent to worker processes."""
+    title: str
+    heading: str
+    header: Tuple[str, ...]
+    col_widths: Tuple[float, ...]  # inches
+    # (heading, rows incl. header row, col widths) tables printed before the main table
+    intro_tables: Tuple[Tuple[str, Tuple[Tuple[str, ...], ...], Tuple[float, ...]], ...] = ()
+    font_size: int = 8
+    header_font_size: int = 10
+
+
+def build_report_flowables(report: PDFTableReport, rows: List[List[str]], first: bool) -> list:
+    """
+    Build the flowables of one section: the title and intro tables (first section
+    only) followed by rows as page-sized tables that repeat the header row.
+    """
+    formatter = PDFFormatter()
+    elements = []
+    if first:
+        elements.append(formatter.create_paragraph(report.title, formatter.create_title_style()))
+        elements.append(formatter.create_spacer())
+        heading_style = formatter.create_heading_style()
+        for heading, table_rows, col_widths in report.intro_tables:
+            elements.append(formatter.create_paragraph(heading, heading_style))
+            elements.append(formatter.create_table(
+                [list(row) for row in table_rows],
+                col_widths=list(col_widths),
+                style=formatter.create_table_style(body_bg_color='beige')
+            ))
+            elements.append(formatter.create_spacer(height=20))
+        elements.append(formatter.create_paragraph(report.heading, heading_style))
+    
+    style = formatter.create_table_style(
+        grid_color='grey',
+        font_size=report.font_size,
+        header_font_size=report.header_font_size
+    )
+    header = list(report.header)
+    for start in range(0, len(rows), PDF_TABLE_CHUNK_ROWS):
+        elements.append(formatter.create_table(
+            [header] + rows[start:start + PDF_TABLE_CHUNK_ROWS],
+            col_widths=list(report.col_widths),
+            style=style,
+            repeat_rows=1
+        ))
+    return elements
+
+
+def _build_document(path: str, elements: list):
+    SimpleDocTemplate(
+        path,
+        pagesize=A4,
+        rightMargin=PDF_PAGE_MARGIN,
+        leftMargin=PDF_PAGE_MARGIN,
+        topMargin=PDF_PAGE_MARGIN,
+        bottomMargin=PDF_PAGE_MARGIN
+    ).build(elements)
+
+
+def render_report_section(path: str, report: PDFTableReport, rows: List[List[str]], first: bool) -> int:
+    """Render one section to path (runs in a worker process). Returns the number of rows."""
+    _build_document(path, build_report_flowables(report, rows, first))
+    return len(rows)
+
+
+def _sections(row_batches: Iterable[List[List[str]]], section_rows: int) -> Iterator[List[List[str]]]:
+    """Regroup row batches into sections of section_rows (always at least one, possibly empty)."""
+    section: List[List[str]] = []
+    emitted = False
+    for batch in row_batches:
+        for row in batch:
+            section.append(row)
+            if len(section) >= section_rows:
+                yield section
+                section, emitted = [], True
+    if section or not emitted:
+        yield section
+
+
+class ChunkedPDFRenderer:
+    """Renders PDFTableReports from streamed rows, in parallel when pypdf is available."""
+    
+    def __init__(self, workers: Optional[int] = None, section_rows: int = PDF_SECTION_ROWS):
+        """
+        Initialize renderer.
+        
+        Args:
+            workers: Worker processes (default PDF_MAX_WORKERS; 1 renders in this process)
+            section_rows: Rows per section
+        """
+        self.workers = PDF_MAX_WORKERS if workers is None else max(1, workers)
+        self.section_rows = max(PDF_TABLE_CHUNK_ROWS, section_rows)
+    
+    def render(self, output_path: str, report: PDFTableReport, row_batches: Iterable[List[List[str]]]) -> int:
+        """
+        Render report with the rows of row_batches to output_path.
+        
+        Args:
+            output_path: Output PDF file
+            report: Report layout
+            row_batches: Iterable of row lists (e.g. streamed from a database cursor)
+        
+        Returns:
+            Number of rows rendered
+        """
+        sections = _sections(row_batches, self.section_rows)
+        first = next(sections)
+        second = next(sections, None)
+        if second is None:
+            # A single section is not worth starting worker processes for
+            return self._render_in_process(output_path, report, iter([first]))
+        sections = chain([first, second], sections)
+        if self.workers == 1 or not PYPDF_AVAILABLE:
+            return self._render_in_process(output_path, report, sections)
+        return self._render_in_workers(output_path, report, sections)
+    
+    @staticmethod
+    def _render_in_process(output_path: str, report: PDFTableReport, sections: Iterator[List[List[str]]]) -> int:
+        elements = []
+        total = 0
+        for index, rows in enumerate(sections):
+            elements.extend(build_report_flowables(report, rows, first=index == 0))
+            total += len(rows)
+        _build_document(output_path, elements)
+        return total
+    
+    def _render_in_workers(self, output_path: str, report: PDFTableReport, sections: Iterator[List[List[str]]]) -> int:
+        temp_dir = tempfile.mkdtemp(prefix="pdf_report_")
+        try:
+            writer = PdfWriter()
+            total = 0
+            # Spawned workers don't inherit the app's threads and open connections
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                pending: Deque = deque()
+                for index, rows in enumerate(sections):
+                    path = os.path.join(temp_dir, f"section_{index:05d}.pdf")
+                    pending.append((path, pool.submit(render_report_section, path, report, rows, index == 0)))
+                    # Bound the sections in flight so memory stays flat; merge them in order
+                    while len(pending) > self.workers * 2:
+                        total += self._merge_next(writer, pending)
+                while pending:
+                    total += self._merge_next(writer, pending)
+            with open(output_path, 'wb') as output:
+                writer.write(output)
+            return total
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _merge_next(writer, pending: Deque) -> int:
+        path, future = pending.popleft()
+        rows = future.result()
+        writer.append(path)
+        return rows
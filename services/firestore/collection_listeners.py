@@ -3,8 +3,9 @@ Collection-specific listeners for Firestore real-time updates.
 Provides high-level listeners for common collections.
 """
 
+import asyncio
 import logging
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List, Tuple, Type
 from dataclasses import dataclass
 
 from services.firestore.grpc_watch_service import FirestoreGRPCWatchService, grpc_watch_service
@@ -18,6 +19,7 @@ except ImportError:
     ENABLE_REALTIME_WATCH_SERVICES = False
 from services.firestore.events import (
     firestore_event_bus,
+    FirestoreEvent,
     DocumentAddedEvent,
     DocumentUpdatedEvent,
     DocumentDeletedEvent
@@ -31,6 +33,41 @@ from utils.constants import (
 logger = logging.getLogger(__name__)
 
 
+def _subscribe_callback(
+    subscriptions: List[Tuple[Type[FirestoreEvent], Callable]],
+    event_type: Type[FirestoreEvent],
+    callback: Optional[Callable],
+    collection_path: str,
+    document_id: Optional[str] = None
+) -> None:
+    """
+    Deliver a listener callback through the event bus, i.e. on the attached loop
+    instead of the stream callback thread. Deleted callbacks receive the document
+    ID, the others the document data.
+    """
+    if not callback:
+        return
+    
+    def handler(event: FirestoreEvent):
+        if event.collection_path != collection_path:
+            return None
+        if document_id is not None and event.document_id != document_id:
+            return None
+        if isinstance(event, DocumentDeletedEvent):
+            return callback(event.document_id)
+        return callback(event.document_data)
+    
+    firestore_event_bus.subscribe(event_type, handler)
+    subscriptions.append((event_type, handler))
+
+
+def _unsubscribe_callbacks(subscriptions: List[Tuple[Type[FirestoreEvent], Callable]]) -> None:
+    """Remove the bus subscriptions made by _subscribe_callback."""
+    for event_type, handler in subscriptions:
+        firestore_event_bus.unsubscribe(event_type, handler)
+    subscriptions.clear()
+
+
 @dataclass
 class NotificationCallbacks:
     """Callbacks for notification events."""
@@ -85,6 +122,7 @@ class NotificationListener:
         self.listener_id: Optional[str] = None
         self.user_id: Optional[str] = None
         self.callbacks: Optional[NotificationCallbacks] = None
+        self._subscriptions: List[Tuple[Type[FirestoreEvent], Callable]] = []
     
     async def start(self, user_id: str, callbacks: NotificationCallbacks) -> bool:
         """
@@ -97,6 +135,9 @@ class NotificationListener:
         Returns:
             True if started successfully, False otherwise
         """
+        # Deliver bus events on this loop, never on the stream callback thread
+        firestore_event_bus.attach_loop(asyncio.get_running_loop())
+        
         if self.listener_id:
             logger.warning("Notification listener already started")
             return False
@@ -115,13 +156,6 @@ class NotificationListener:
             target_users = doc.get("target_users")
             if target_users is None or (isinstance(target_users, list) and user_id in target_users):
                 # This notification is relevant to the user
-                if callbacks.on_added:
-                    try:
-                        callbacks.on_added(doc)
-                    except Exception as e:
-                        logger.error(f"Error in notification on_added callback: {e}")
-                
-                # Publish event
                 event = DocumentAddedEvent(
                     collection_path=FIRESTORE_NOTIFICATIONS_COLLECTION,
                     document_id=doc.get("document_id", ""),
@@ -133,13 +167,6 @@ class NotificationListener:
             """Handle notification updated."""
             target_users = doc.get("target_users")
             if target_users is None or (isinstance(target_users, list) and user_id in target_users):
-                if callbacks.on_updated:
-                    try:
-                        callbacks.on_updated(doc)
-                    except Exception as e:
-                        logger.error(f"Error in notification on_updated callback: {e}")
-                
-                # Publish event
                 event = DocumentUpdatedEvent(
                     collection_path=FIRESTORE_NOTIFICATIONS_COLLECTION,
                     document_id=doc.get("document_id", ""),
@@ -149,13 +176,6 @@ class NotificationListener:
         
         def on_deleted(doc_id: str):
             """Handle notification deleted."""
-            if callbacks.on_deleted:
-                try:
-                    callbacks.on_deleted(doc_id)
-                except Exception as e:
-                    logger.error(f"Error in notification on_deleted callback: {e}")
-            
-            # Publish event
             event = DocumentDeletedEvent(
                 collection_path=FIRESTORE_NOTIFICATIONS_COLLECTION,
                 document_id=doc_id,
@@ -168,6 +188,11 @@ class NotificationListener:
             logger.debug("Watch service not available - will use polling fallback")
             return False
         
+        # Callbacks run from the bus, never on the stream thread
+        _subscribe_callback(self._subscriptions, DocumentAddedEvent, callbacks.on_added, FIRESTORE_NOTIFICATIONS_COLLECTION)
+        _subscribe_callback(self._subscriptions, DocumentUpdatedEvent, callbacks.on_updated, FIRESTORE_NOTIFICATIONS_COLLECTION)
+        _subscribe_callback(self._subscriptions, DocumentDeletedEvent, callbacks.on_deleted, FIRESTORE_NOTIFICATIONS_COLLECTION)
+        
         # Start watch stream
         self.listener_id = await self.watch_service.watch_collection(
             collection_path=FIRESTORE_NOTIFICATIONS_COLLECTION,
@@ -180,6 +205,7 @@ class NotificationListener:
             logger.info(f"Notification listener started for user {user_id}")
             return True
         else:
+            _unsubscribe_callbacks(self._subscriptions)
             logger.debug("Failed to start notification listener - will use polling fallback")
             return False
     
@@ -198,6 +224,7 @@ class NotificationListener:
             self.listener_id = None
             self.user_id = None
             self.callbacks = None
+            _unsubscribe_callbacks(self._subscriptions)
             logger.info("Notification listener stopped")
         
         return success
@@ -237,6 +264,7 @@ class UserProfileListener:
         self.listener_id: Optional[str] = None
         self.user_id: Optional[str] = None
         self.callbacks: Optional[UserProfileCallbacks] = None
+        self._subscriptions: List[Tuple[Type[FirestoreEvent], Callable]] = []
     
     async def start(self, user_id: str, callbacks: UserProfileCallbacks) -> bool:
         """
@@ -249,6 +277,9 @@ class UserProfileListener:
         Returns:
             True if started successfully, False otherwise
         """
+        # Deliver bus events on this loop, never on the stream callback thread
+        firestore_event_bus.attach_loop(asyncio.get_running_loop())
+        
         if self.listener_id:
             logger.warning("User profile listener already started")
             return False
@@ -258,13 +289,6 @@ class UserProfileListener:
         
         def on_updated(doc: dict):
             """Handle profile updated."""
-            if callbacks.on_updated:
-                try:
-                    callbacks.on_updated(doc)
-                except Exception as e:
-                    logger.error(f"Error in user profile on_updated callback: {e}")
-            
-            # Publish event
             event = DocumentUpdatedEvent(
                 collection_path="user_profile",
                 document_id=doc.get("document_id", ""),
@@ -272,6 +296,9 @@ class UserProfileListener:
             )
             firestore_event_bus.publish(event)
         
+        # Callbacks run from the bus, never on the stream thread
+        _subscribe_callback(self._subscriptions, DocumentUpdatedEvent, callbacks.on_updated, "user_profile", user_id)
+        
         # Watch specific document
         document_path = f"user_profile/{user_id}"
         self.listener_id = await self.watch_service.watch_document(
@@ -283,6 +310,7 @@ class UserProfileListener:
             logger.info(f"User profile listener started for user {user_id}")
             return True
         else:
+            _unsubscribe_callbacks(self._subscriptions)
             logger.error("Failed to start user profile listener")
             return False
     
@@ -296,6 +324,7 @@ class UserProfileListener:
             self.listener_id = None
             self.user_id = None
             self.callbacks = None
+            _unsubscribe_callbacks(self._subscriptions)
             logger.info("User profile listener stopped")
         
         return success
@@ -335,6 +364,7 @@ class LicenseListener:
         self.listener_id: Optional[str] = None
         self.user_id: Optional[str] = None
         self.callbacks: Optional[LicenseCallbacks] = None
+        self._subscriptions: List[Tuple[Type[FirestoreEvent], Callable]] = []
     
     async def start(self, user_id: str, callbacks: LicenseCallbacks) -> bool:
         """
@@ -347,6 +377,9 @@ class LicenseListener:
         Returns:
             True if started successfully, False otherwise
         """
+        # Deliver bus events on this loop, never on the stream callback thread
+        firestore_event_bus.attach_loop(asyncio.get_running_loop())
+        
         if self.listener_id:
             logger.warning("License listener already started")
             return False
@@ -356,13 +389,6 @@ class LicenseListener:
         
         def on_updated(doc: dict):
             """Handle license updated."""
-            if callbacks.on_updated:
-                try:
-                    callbacks.on_updated(doc)
-                except Exception as e:
-                    logger.error(f"Error in license on_updated callback: {e}")
-            
-            # Publish event
             event = DocumentUpdatedEvent(
                 collection_path="user_licenses",
                 document_id=doc.get("document_id", ""),
@@ -375,6 +401,9 @@ class LicenseListener:
             logger.debug("Watch service not available - will use polling fallback")
             return False
         
+        # Callbacks run from the bus, never on the stream thread
+        _subscribe_callback(self._subscriptions, DocumentUpdatedEvent, callbacks.on_updated, "user_licenses", user_id)
+        
         # Watch specific document
         document_path = f"user_licenses/{user_id}"
         self.listener_id = await self.watch_service.watch_document(
@@ -386,6 +415,7 @@ class LicenseListener:
             logger.info(f"License listener started for user {user_id}")
             return True
         else:
+            _unsubscribe_callbacks(self._subscriptions)
             logger.debug("Failed to start license listener - will use polling fallback")
             return False
     
@@ -399,6 +429,7 @@ class LicenseListener:
             self.listener_id = None
             self.user_id = None
             self.callbacks = None
+            _unsubscribe_callbacks(self._subscriptions)
             logger.info("License listener stopped")
         
         return success
@@ -437,6 +468,7 @@ class AppUpdateListener:
                     self.watch_service = firestore_watch_service
         self.listener_id: Optional[str] = None
         self.callbacks: Optional[AppUpdateCallbacks] = None
+        self._subscriptions: List[Tuple[Type[FirestoreEvent], Callable]] = []
     
     async def start(self, callbacks: AppUpdateCallbacks) -> bool:
         """
@@ -448,6 +480,9 @@ class AppUpdateListener:
         Returns:
             True if started successfully, False otherwise
         """
+        # Deliver bus events on this loop, never on the stream callback thread
+        firestore_event_bus.attach_loop(asyncio.get_running_loop())
+        
         if self.listener_id:
             logger.warning("App update listener already started")
             return False
@@ -456,13 +491,6 @@ class AppUpdateListener:
         
         def on_updated(doc: dict):
             """Handle app update updated."""
-            if callbacks.on_updated:
-                try:
-                    callbacks.on_updated(doc)
-                except Exception as e:
-                    logger.error(f"Error in app update on_updated callback: {e}")
-            
-            # Publish event
             event = DocumentUpdatedEvent(
                 collection_path=FIREBASE_APP_UPDATES_COLLECTION,
                 document_id=doc.get("document_id", ""),
@@ -475,6 +503,12 @@ class AppUpdateListener:
             logger.debug("Watch service not available - will use polling fallback")
             return False
         
+        # Callbacks run from the bus, never on the stream thread
+        _subscribe_callback(
+            self._subscriptions, DocumentUpdatedEvent, callbacks.on_updated,
+            FIREBASE_APP_UPDATES_COLLECTION, FIREBASE_APP_UPDATES_DOCUMENT
+        )
+        
         # Watch specific document
         document_path = f"{FIREBASE_APP_UPDATES_COLLECTION}/{FIREBASE_APP_UPDATES_DOCUMENT}"
         self.listener_id = await self.watch_service.watch_document(
@@ -486,6 +520,7 @@ class AppUpdateListener:
             logger.info("App update listener started")
             return True
         else:
+            _unsubscribe_callbacks(self._subscriptions)
             logger.debug("Failed to start app update listener - will use polling fallback")
             return False
     
@@ -498,6 +533,7 @@ class AppUpdateListener:
         if success:
             self.listener_id = None
             self.callbacks = None
+            _unsubscribe_callbacks(self._subscriptions)
             logger.info("App update listener stopped")
         
         return success
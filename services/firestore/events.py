@@ -2,10 +2,15 @@
 Event system for Firestore real-time updates.
 """
 
+import asyncio
+import inspect
 import logging
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Type, Callable, Dict, List, Optional
+from typing import Any, Type, Callable, Dict, List, Optional
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -61,33 +66,92 @@ class DocumentDeletedEvent(FirestoreEvent):
     document_data: dict = field(default_factory=dict)
 
 
+class _Subscription:
+    """A handler with its own coalescing delivery queue and metrics."""
+    
+    def __init__(self, event_type: Type[FirestoreEvent], handler: Callable, backlog_warning_size: int):
+        self.event_type = event_type
+        self.handler = handler
+        self.backlog_warning_size = backlog_warning_size
+        # [event, enqueued_at] entries in publish order
+        self.queue: "deque[list]" = deque()
+        # (collection, document id) -> queued entry of a pending update, which later updates replace
+        self.pending_updates: Dict[tuple, list] = {}
+        self.draining = False
+        self.backlog_warned = False
+        self.delivered = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_queue_wait = 0.0
+    
+    @property
+    def name(self) -> str:
+        handler_name = getattr(self.handler, "__qualname__", repr(self.handler))
+        return f"{self.event_type.__name__}:{handler_name}"
+
+
 class FirestoreEventBus:
     """
     Event bus for decoupled communication between Firestore listeners and subscribers.
     Supports multiple subscribers per event type.
+    
+    Once an asyncio loop is attached, publish() never runs handlers on the
+    calling thread (e.g. the gRPC snapshot callback thread): each subscriber has
+    a queue in which a pending update of a document is replaced by newer updates
+    of it, and queues are drained on the loop. Adds and deletes are never
+    coalesced or dropped. Without a loop, handlers run synchronously.
     """
     
+    DEFAULT_BACKLOG_WARNING_SIZE = 100
+    
     def __init__(self):
         """Initialize event bus with empty subscriber registry."""
-        self._subscribers: Dict[Type[FirestoreEvent], List[Callable]] = {}
+        self._subscribers: Dict[Type[FirestoreEvent], List[_Subscription]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._logger = logging.getLogger(__name__)
     
-    def subscribe(self, event_type: Type[FirestoreEvent], handler: Callable[[FirestoreEvent], None]) -> None:
+    def attach_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Attach the asyncio loop handlers are delivered on.
+        
+        Args:
+            loop: Event loop (defaults to the currently running loop)
+        """
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+        self._loop = loop
+    
+    def subscribe(
+        self,
+        event_type: Type[FirestoreEvent],
+        handler: Callable[[FirestoreEvent], Any],
+        backlog_warning_size: int = DEFAULT_BACKLOG_WARNING_SIZE
+    ) -> None:
         """
         Subscribe a handler to an event type.
         
         Args:
             event_type: Event class to subscribe to
-            handler: Callback function that receives the event
+            handler: Callback (sync or async) that receives the event
+            backlog_warning_size: Pending events for this handler above which a warning is logged
         """
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
+        if self._loop is None:
+            self.attach_loop()
         
-        if handler not in self._subscribers[event_type]:
-            self._subscribers[event_type].append(handler)
-            self._logger.debug(f"Subscribed handler to {event_type.__name__}")
-        else:
-            self._logger.warning(f"Handler already subscribed to {event_type.__name__}")
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(event_type, [])
+            if any(sub.handler == handler for sub in subscriptions):
+                self._logger.warning(f"Handler already subscribed to {event_type.__name__}")
+                return
+            subscriptions.append(_Subscription(event_type, handler, backlog_warning_size))
+        self._logger.debug(f"Subscribed handler to {event_type.__name__}")
     
     def unsubscribe(self, event_type: Type[FirestoreEvent], handler: Callable[[FirestoreEvent], None]) -> None:
         """
@@ -97,16 +161,19 @@ class FirestoreEventBus:
             event_type: Event class to unsubscribe from
             handler: Callback function to remove
         """
-        if event_type in self._subscribers:
-            if handler in self._subscribers[event_type]:
-                self._subscribers[event_type].remove(handler)
-                self._logger.debug(f"Unsubscribed handler from {event_type.__name__}")
-            else:
+        with self._lock:
+            subscriptions = self._subscribers.get(event_type, [])
+            remaining = [sub for sub in subscriptions if sub.handler != handler]
+            if len(remaining) == len(subscriptions):
                 self._logger.warning(f"Handler not found in subscribers for {event_type.__name__}")
+                return
+            self._subscribers[event_type] = remaining
+        self._logger.debug(f"Unsubscribed handler from {event_type.__name__}")
     
     def publish(self, event: FirestoreEvent) -> None:
         """
         Publish an event to all subscribed handlers.
+        Safe to call from any thread; only enqueues when a loop is attached.
         
         Args:
             event: Event instance to publish
@@ -114,27 +181,147 @@ class FirestoreEventBus:
         event_type = type(event)
         
         # Get all subscribers for this event type and its base classes
-        handlers = []
-        for cls in event_type.__mro__:
-            if cls in self._subscribers:
-                handlers.extend(self._subscribers[cls])
+        with self._lock:
+            subscriptions = []
+            for cls in event_type.__mro__:
+                subscriptions.extend(self._subscribers.get(cls, []))
         
-        if not handlers:
+        if not subscriptions:
             self._logger.debug(f"No subscribers for {event_type.__name__}")
             return
         
-        self._logger.debug(f"Publishing {event_type.__name__} to {len(handlers)} handler(s)")
+        self._logger.debug(f"Publishing {event_type.__name__} to {len(subscriptions)} handler(s)")
         
-        # Call all handlers
-        for handler in handlers:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # No loop attached - deliver synchronously
+            for subscription in subscriptions:
+                self._deliver_sync(subscription, event, time.monotonic())
+            return
+        
+        key = (event.collection_path, event.document_id)
+        is_update = isinstance(event, DocumentUpdatedEvent)
+        now = time.monotonic()
+        for subscription in subscriptions:
+            schedule = False
+            backlog = 0
+            with self._lock:
+                pending = subscription.pending_updates.get(key)
+                if is_update and pending is not None:
+                    # Newer state of the same document replaces the pending update
+                    pending[0] = event
+                    subscription.coalesced += 1
+                else:
+                    entry = [event, now]
+                    subscription.queue.append(entry)
+                    if is_update:
+                        subscription.pending_updates[key] = entry
+                    else:
+                        # Updates after this add/delete must be delivered after it
+                        subscription.pending_updates.pop(key, None)
+                    depth = len(subscription.queue)
+                    subscription.max_queue_depth = max(subscription.max_queue_depth, depth)
+                    if depth > subscription.backlog_warning_size and not subscription.backlog_warned:
+                        subscription.backlog_warned = True
+                        backlog = depth
+                if not subscription.draining:
+                    subscription.draining = True
+                    schedule = True
+            if backlog:
+                self._logger.warning(
+                    f"Event queue of {subscription.name} has {backlog} pending events "
+                    f"(warning size {subscription.backlog_warning_size})"
+                )
+            if schedule:
+                try:
+                    loop.call_soon_threadsafe(self._start_drain, subscription)
+                except RuntimeError:
+                    # Loop closed between check and schedule
+                    subscription.draining = False
+    
+    def _start_drain(self, subscription: _Subscription) -> None:
+        """Start draining a subscription queue (runs on the loop)."""
+        asyncio.ensure_future(self._drain(subscription))
+    
+    async def _drain(self, subscription: _Subscription) -> None:
+        """Deliver queued events to one handler, in order, on the loop."""
+        while True:
+            with self._lock:
+                if not subscription.queue:
+                    subscription.draining = False
+                    subscription.backlog_warned = False
+                    return
+                entry = subscription.queue.popleft()
+                event, enqueued_at = entry
+                key = (event.collection_path, event.document_id)
+                if subscription.pending_updates.get(key) is entry:
+                    del subscription.pending_updates[key]
+            
+            started = time.monotonic()
             try:
-                handler(event)
+                result = subscription.handler(event)
+                if inspect.isawaitable(result):
+                    await result
             except Exception as e:
-                self._logger.error(f"Error in event handler for {event_type.__name__}: {e}", exc_info=True)
+                subscription.errors += 1
+                self._logger.error(f"Error in event handler for {type(event).__name__}: {e}", exc_info=True)
+            self._record_latency(subscription, enqueued_at, started)
+            # Yield so one busy handler cannot starve the loop
+            await asyncio.sleep(0)
+    
+    def _deliver_sync(self, subscription: _Subscription, event: FirestoreEvent, enqueued_at: float) -> None:
+        """Call a handler directly on the publishing thread."""
+        started = time.monotonic()
+        try:
+            result = subscription.handler(event)
+            if inspect.isawaitable(result):
+                # Async handler without a loop to run it on
+                result.close()
+                self._logger.warning(f"Async handler {subscription.name} skipped - no event loop attached")
+        except Exception as e:
+            subscription.errors += 1
+            self._logger.error(f"Error in event handler for {type(event).__name__}: {e}", exc_info=True)
+        self._record_latency(subscription, enqueued_at, started)
+    
+    @staticmethod
+    def _record_latency(subscription: _Subscription, enqueued_at: float, started: float) -> None:
+        """Record handler run time and queue wait for metrics."""
+        finished = time.monotonic()
+        latency = finished - started
+        subscription.delivered += 1
+        subscription.total_latency += latency
+        subscription.max_latency = max(subscription.max_latency, latency)
+        subscription.total_queue_wait += started - enqueued_at
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-handler delivery metrics.
+        
+        Returns:
+            Dict keyed by "<EventType>:<handler>" with delivered/coalesced/error counts,
+            current and maximum queue depth and average/max latency in milliseconds
+        """
+        metrics = {}
+        with self._lock:
+            for subscriptions in self._subscribers.values():
+                for sub in subscriptions:
+                    delivered = sub.delivered or 1
+                    metrics[sub.name] = {
+                        "delivered": sub.delivered,
+                        "coalesced": sub.coalesced,
+                        "errors": sub.errors,
+                        "queue_depth": len(sub.queue),
+                        "max_queue_depth": sub.max_queue_depth,
+                        "avg_latency_ms": round(sub.total_latency / delivered * 1000, 3),
+                        "max_latency_ms": round(sub.max_latency * 1000, 3),
+                        "avg_queue_wait_ms": round(sub.total_queue_wait / delivered * 1000, 3),
+                    }
+        return metrics
     
     def clear(self) -> None:
         """Clear all subscribers."""
-        self._subscribers.clear()
+        with self._lock:
+            self._subscribers.clear()
         self._logger.debug("Event bus cleared")
     
     def get_subscriber_count(self, event_type: Type[FirestoreEvent]) -> int:
@@ -147,7 +334,8 @@ class FirestoreEventBus:
         Returns:
             Number of subscribers
         """
-        return len(self._subscribers.get(event_type, []))
+        with self._lock:
+            return len(self._subscribers.get(event_type, []))
 
 
 # Global event bus instance
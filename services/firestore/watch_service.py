@@ -6,6 +6,8 @@ import logging
 import asyncio
 import json
 import uuid
+import random
+import itertools
 from typing import Optional, Callable, Dict, List, Any
 from datetime import datetime
 
@@ -30,18 +32,27 @@ except ImportError:
 
 FIRESTORE_WATCH_URL = f"https://firestore.googleapis.com/v1/projects/{FIREBASE_PROJECT_ID}/databases/(default)/documents:watch"
 
+# Reconnect backoff (seconds) - retries are unbounded, delay is jittered and capped
+RECONNECT_BACKOFF_INITIAL = 1.0
+RECONNECT_BACKOFF_MAX = 60.0
+
 
 class FirestoreWatchService:
     """
     Generic Firestore watch service for real-time document updates.
     Uses Firestore REST API Watch Streams with HTTP/2.
+    
+    All listeners share one HTTP/2 client, so their streams are multiplexed
+    over a single connection. Each listener tracks the last resumeToken and
+    readTime of its target so a reconnect only receives changes since then.
     """
     
     def __init__(self):
         """Initialize watch service."""
         self.project_id = FIREBASE_PROJECT_ID
         self._listeners: Dict[str, Dict[str, Any]] = {}
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._target_ids = itertools.count(1)
         
         # Check if watch services are enabled via configuration
         if not ENABLE_REALTIME_WATCH_SERVICES:
@@ -80,6 +91,44 @@ class FirestoreWatchService:
             logger.error(f"Error getting ID token: {e}")
             return None
     
+    def _get_client(self) -> "httpx.AsyncClient":
+        """
+        Get the shared HTTP/2 client, creating it on first use.
+        Watch streams are long-lived, so reads never time out.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(30.0, read=None)
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Stop all listeners and close the shared HTTP/2 client."""
+        self.stop_all_listeners()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    @staticmethod
+    def _next_backoff(current: float) -> float:
+        """Exponential backoff with full jitter, capped at RECONNECT_BACKOFF_MAX."""
+        upper = min(RECONNECT_BACKOFF_MAX, current * 2)
+        return random.uniform(RECONNECT_BACKOFF_INITIAL, upper)
+    
+    def _build_resumed_target(self, listener: Dict[str, Any]) -> dict:
+        """
+        Build the addTarget payload for a (re)connect.
+        Uses resumeToken when known, otherwise readTime, so Firestore sends only deltas.
+        """
+        target = dict(listener["target"])
+        target["targetId"] = listener["target_id"]
+        if listener.get("resume_token"):
+            target["resumeToken"] = listener["resume_token"]
+        elif listener.get("read_time"):
+            target["readTime"] = listener["read_time"]
+        return target
+    
     def _parse_firestore_document(self, doc: dict) -> Optional[dict]:
         """
         Parse Firestore document format to Python dict.
@@ -268,6 +317,10 @@ class FirestoreWatchService:
             "on_added": on_added,
             "on_updated": on_updated,
             "on_deleted": on_deleted,
+            "target": target,
+            "target_id": next(self._target_ids),
+            "resume_token": None,
+            "read_time": None,
             "task": None,
             "active": False
         }
@@ -320,6 +373,10 @@ class FirestoreWatchService:
         self._listeners[listener_id] = {
             "document_path": document_path,
             "on_updated": on_updated,
+            "target": target,
+            "target_id": next(self._target_ids),
+            "resume_token": None,
+            "read_time": None,
             "task": None,
             "active": False
         }
@@ -336,11 +393,12 @@ class FirestoreWatchService:
     async def _watch_stream(self, listener_id: str, target: dict, id_token: str):
         """
         Internal method to handle watch stream connection.
+        Reconnects indefinitely with jittered backoff, resuming from the last token.
         
         Args:
             listener_id: Unique listener identifier
             target: Watch target configuration
-            id_token: Firebase ID token
+            id_token: Firebase ID token (refreshed from auth on reconnect when available)
         """
         listener = self._listeners.get(listener_id)
         if not listener:
@@ -348,11 +406,17 @@ class FirestoreWatchService:
             return
         
         listener["active"] = True
-        max_retries = 3
-        retry_count = 0
-        backoff_seconds = 1
-        
-        while retry_count < max_retries and listener["active"]:
+        backoff_seconds = RECONNECT_BACKOFF_INITIAL
+        attempt = 0
+        
+        while listener["active"]:
+            if attempt > 0:
+                await asyncio.sleep(backoff_seconds)
+                backoff_seconds = self._next_backoff(backoff_seconds)
+                # Token may have been refreshed while we were disconnected
+                id_token = self._get_id_token() or id_token
+            attempt += 1
+            
             try:
                 headers = {
                     "Authorization": f"Bearer {id_token}",
@@ -361,59 +425,52 @@ class FirestoreWatchService:
                 
                 body = {
                     "database": f"projects/{self.project_id}/databases/(default)",
-                    "addTarget": target
+                    "addTarget": self._build_resumed_target(listener)
                 }
                 
-                # Use httpx for HTTP/2 streaming
-                async with httpx.AsyncClient(http2=True, timeout=30.0) as client:
-                    async with client.stream("POST", FIRESTORE_WATCH_URL, headers=headers, json=body) as response:
-                        if response.status_code != 200:
-                            # Read response content before accessing .text for streaming responses
-                            try:
-                                error_text = await response.aread()
-                                error_message = error_text.decode('utf-8') if error_text else "No error message"
-                            except Exception as e:
-                                error_message = f"Error reading response: {e}"
-                            logger.error(f"Watch stream error: {response.status_code} - {error_message}")
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                await asyncio.sleep(backoff_seconds)
-                                backoff_seconds *= 2  # Exponential backoff
-                            continue
-                        
-                        # Reset retry count on successful connection
-                        retry_count = 0
-                        backoff_seconds = 1
+                client = self._get_client()
+                async with client.stream("POST", FIRESTORE_WATCH_URL, headers=headers, json=body) as response:
+                    if response.status_code != 200:
+                        # Read response content before accessing .text for streaming responses
+                        try:
+                            error_text = await response.aread()
+                            error_message = error_text.decode('utf-8') if error_text else "No error message"
+                        except Exception as e:
+                            error_message = f"Error reading response: {e}"
+                        logger.error(f"Watch stream error: {response.status_code} - {error_message}")
+                        continue
+                    
+                    # Reset backoff on successful connection
+                    backoff_seconds = RECONNECT_BACKOFF_INITIAL
+                    
+                    logger.debug(
+                        f"Watch stream connected for listener {listener_id} "
+                        f"(resumed: {bool(listener.get('resume_token') or listener.get('read_time'))})"
+                    )
+                    
+                    async for line in response.aiter_lines():
+                        if not listener["active"]:
+                            break
                         
-                        logger.debug(f"Watch stream connected for listener {listener_id}")
+                        if not line.strip():
+                            continue
                         
-                        async for line in response.aiter_lines():
-                            if not listener["active"]:
-                                break
-                            
-                            if not line.strip():
-                                continue
-                            
-                            try:
-                                data = json.loads(line)
-                                await self._process_watch_response(listener_id, data, id_token)
-                            except json.JSONDecodeError:
-                                continue
-                            except Exception as e:
-                                logger.error(f"Error processing watch stream line: {e}")
+                        try:
+                            data = json.loads(line)
+                            await self._process_watch_response(listener_id, data, id_token)
+                        except json.JSONDecodeError:
+                            continue
+                        except Exception as e:
+                            logger.error(f"Error processing watch stream line: {e}")
                 
             except asyncio.CancelledError:
                 logger.info(f"Watch stream cancelled for listener {listener_id}")
                 break
             except Exception as e:
-                logger.error(f"Error in watch stream for listener {listener_id}: {e}", exc_info=True)
-                retry_count += 1
-                if retry_count < max_retries and listener["active"]:
-                    await asyncio.sleep(backoff_seconds)
-                    backoff_seconds *= 2
-                else:
-                    logger.error(f"Max retries reached for listener {listener_id}")
-                    break
+                logger.warning(
+                    f"Watch stream for listener {listener_id} disconnected: {e} "
+                    f"- reconnecting in ~{backoff_seconds:.1f}s"
+                )
         
         listener["active"] = False
         logger.info(f"Watch stream stopped for listener {listener_id}")
@@ -437,8 +494,21 @@ class FirestoreWatchService:
                 change = data["targetChange"]
                 change_type = change.get("targetChangeType")
                 
+                # Track resume position; an empty targetIds list means the token
+                # is consistent for every target on the stream
+                target_ids = change.get("targetIds") or []
+                if not target_ids or listener.get("target_id") in target_ids:
+                    if change.get("resumeToken"):
+                        listener["resume_token"] = change["resumeToken"]
+                    if change.get("readTime"):
+                        listener["read_time"] = change["readTime"]
+                
                 if change_type == "REMOVE":
                     logger.warning(f"Watch target removed for listener {listener_id}, will reconnect")
+                    if change.get("cause"):
+                        # Resume position rejected by the server - next connect starts fresh
+                        listener["resume_token"] = None
+                        listener["read_time"] = None
                     # The stream will reconnect automatically
                 elif change_type == "CURRENT":
                     logger.debug(f"Watch stream current for listener {listener_id}")
@@ -45,7 +45,7 @@ class MediaService:
         
         # Save media files to database
         for media_file in media_files:
-            self.manager.save_media_file(media_file)
+            await self.manager.db_manager.execute_write(self.manager.save_media_file, media_file)
         
         return media_files
     
@@ -4,20 +4,23 @@ Configurable page caching service with TTL support.
 
 import logging
 import time
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Iterable, FrozenSet
 from threading import Lock
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from database.change_events import DataChangeEvent, data_change_bus
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class CacheEntry:
-    """Cache entry with data and expiration time."""
+    """Cache entry with data, expiration time and data dependencies."""
     data: Any
     expires_at: float
     created_at: float
+    tables: Optional[FrozenSet[str]] = None  # Tables the data was derived from (None: TTL only)
+    group_ids: Optional[FrozenSet[int]] = None  # Groups the data is scoped to (None: all groups)
 
 
 class PageCacheService:
@@ -47,8 +50,12 @@ class PageCacheService:
         self._enabled = True
         self._default_ttl = 300  # 5 minutes default
         self._lock = Lock()
+        self._change_invalidations = 0
         self._initialized = True
         
+        # Invalidate dependent entries when the database managers commit changes
+        data_change_bus.subscribe(self._on_data_change)
+        
         # Load settings from config (will be called after settings are available)
         self._load_settings()
     
@@ -108,7 +115,14 @@ class PageCacheService:
             
             return entry.data
     
-    def set(self, key: str, data: Any, ttl: Optional[int] = None) -> bool:
+    def set(
+        self,
+        key: str,
+        data: Any,
+        ttl: Optional[int] = None,
+        tables: Optional[Iterable[str]] = None,
+        group_ids: Optional[Iterable[int]] = None
+    ) -> bool:
         """
         Set cached data with TTL.
         
@@ -116,6 +130,9 @@ class PageCacheService:
             key: Cache key
             data: Data to cache
             ttl: Time to live in seconds (uses default if None)
+            tables: Database tables the data depends on; a change event for
+                    any of them invalidates the entry before its TTL expires
+            group_ids: Groups the data is scoped to (None/empty means all groups)
             
         Returns:
             True if cached, False if caching is disabled
@@ -130,7 +147,9 @@ class PageCacheService:
             self._cache[key] = CacheEntry(
                 data=data,
                 expires_at=expires_at,
-                created_at=time.time()
+                created_at=time.time(),
+                tables=frozenset(tables) if tables else None,
+                group_ids=frozenset(group_ids) if group_ids else None
             )
         
         logger.debug(f"Cached data for key: {key} (TTL: {ttl}s)")
@@ -182,6 +201,38 @@ class PageCacheService:
         """
         self.clear(pattern=pattern)
     
+    def invalidate_for_change(self, event: DataChangeEvent) -> int:
+        """
+        Invalidate entries that depend on the table and group of a change event.
+        Entries cached without table dependencies are left to their TTL.
+        
+        Args:
+            event: Data change event
+            
+        Returns:
+            Number of invalidated entries
+        """
+        with self._lock:
+            keys_to_delete = [
+                key for key, entry in self._cache.items()
+                if entry.tables and event.table in entry.tables
+                and event.affects_group(entry.group_ids)
+            ]
+            for key in keys_to_delete:
+                del self._cache[key]
+            self._change_invalidations += len(keys_to_delete)
+        
+        if keys_to_delete:
+            logger.debug(
+                f"Invalidated {len(keys_to_delete)} cache entries for {event.table} change "
+                f"(group={event.group_id})"
+            )
+        return len(keys_to_delete)
+    
+    def _on_data_change(self, event: DataChangeEvent):
+        """Data change bus handler."""
+        self.invalidate_for_change(event)
+    
     def cleanup_expired(self):
         """Remove expired cache entries."""
         current_time = time.time()
@@ -217,6 +268,7 @@ class PageCacheService:
                 "total_entries": total_entries,
                 "expired_entries": expired_count,
                 "active_entries": total_entries - expired_count,
+                "change_invalidations": self._change_invalidations,
                 "default_ttl": self._default_ttl
             }
     
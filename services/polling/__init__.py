@@ -7,11 +7,13 @@ from services.polling.base_polling_service import BasePollingService
 from services.polling.notification_polling_service import NotificationPollingService
 from services.polling.update_polling_service import UpdatePollingService
 from services.polling.device_revocation_polling_service import DeviceRevocationPollingService
+from services.polling.database_maintenance_service import DatabaseMaintenanceService
 
 __all__ = [
     "BasePollingService",
     "NotificationPollingService",
     "UpdatePollingService",
     "DeviceRevocationPollingService",
+    "DatabaseMaintenanceService",
 ]
 
@@ -0,0 +1,137 @@
+"""
+Database maintenance polling service for background SQLite housekeeping.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from services.polling.base_polling_service import BasePollingService
+from config.settings import (
+    DB_MAINTENANCE_INTERVAL,
+    ENABLE_DB_MAINTENANCE
+)
+from database.change_events import DataChangeEvent, data_change_bus
+from database.db_manager import DatabaseManager
+from services.fetch_state_manager import fetch_state_manager
+
+logger = logging.getLogger(__name__)
+
+# WAL size that triggers a checkpoint even without a finished fetch
+CHECKPOINT_WAL_BYTES = 64 * 1024 * 1024
+
+# Seconds without data changes before idle-window tasks may run
+IDLE_AFTER_SECONDS = 120
+
+# Minimum time between runs of each task (tasks run in this order)
+TASK_INTERVALS = {
+    'stats': timedelta(hours=1),
+    'optimize': timedelta(hours=6),
+    'analyze': timedelta(days=7),
+    'vacuum': timedelta(days=1),
+    'quick_check': timedelta(days=7),
+    'archive': timedelta(days=1),
+}
+
+# Tasks that only run in idle windows
+IDLE_TASKS = ('analyze', 'vacuum', 'quick_check', 'archive')
+
+
+class DatabaseMaintenanceService(BasePollingService):
+    """
+    Polling service for database maintenance.
+    Checkpoints the WAL after large ingests, keeps planner statistics fresh,
+    releases free pages and checks integrity, logging storage stats over time.
+    Nothing runs while a fetch is in progress.
+    """
+    
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        interval_seconds: float = DB_MAINTENANCE_INTERVAL,
+        is_busy: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Initialize database maintenance polling service.
+        
+        Args:
+            db_manager: Database manager instance
+            interval_seconds: Polling interval in seconds
+            is_busy: Optional extra check; maintenance is skipped while it returns True
+        """
+        super().__init__(
+            interval_seconds=interval_seconds,
+            enabled=ENABLE_DB_MAINTENANCE,
+            name="DatabaseMaintenance"
+        )
+        self.db_manager = db_manager
+        self._is_busy = is_busy
+        self._was_fetching = False
+        self._last_change = time.monotonic()
+        self._tasks = {
+            'stats': lambda: True,
+            'optimize': lambda: self.db_manager.optimize(),
+            'analyze': lambda: self.db_manager.optimize(full=True),
+            'vacuum': lambda: self.db_manager.incremental_vacuum() >= 0,
+            'quick_check': self.db_manager.quick_check,
+            'archive': lambda: self.db_manager.archive_old_data() is not None,
+        }
+        data_change_bus.subscribe(self._on_data_change)
+    
+    def _check_config_enabled(self) -> bool:
+        """Check if database maintenance is enabled via configuration."""
+        return ENABLE_DB_MAINTENANCE
+    
+    def _on_data_change(self, event: DataChangeEvent) -> None:
+        self._last_change = time.monotonic()
+    
+    def _is_fetching(self) -> bool:
+        return fetch_state_manager.is_fetching or bool(self._is_busy and self._is_busy())
+    
+    @property
+    def is_idle(self) -> bool:
+        """True if no fetch is running and nothing was written for IDLE_AFTER_SECONDS."""
+        return not self._is_fetching() and time.monotonic() - self._last_change >= IDLE_AFTER_SECONDS
+    
+    async def _poll(self) -> None:
+        """Run the maintenance tasks that are due."""
+        try:
+            if self._is_fetching():
+                self._was_fetching = True
+                logger.debug("DatabaseMaintenance: Fetch in progress, skipping poll")
+                return
+            
+            # A finished fetch (large ingest) or an oversized WAL gets a checkpoint right away
+            stats = await asyncio.to_thread(self.db_manager.get_storage_stats)
+            ingest_finished, self._was_fetching = self._was_fetching, False
+            if ingest_finished or stats.get('wal_bytes', 0) >= CHECKPOINT_WAL_BYTES:
+                await self._run_task('checkpoint', self.db_manager.checkpoint)
+                if ingest_finished:
+                    await self._run_task('optimize', self.db_manager.optimize)
+            
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            for task, interval in TASK_INTERVALS.items():
+                if self._is_fetching() or (task in IDLE_TASKS and not self.is_idle):
+                    continue
+                last_run = await asyncio.to_thread(self.db_manager.get_last_maintenance, task)
+                if last_run is None or now - last_run >= interval:
+                    await self._run_task(task, self._tasks[task])
+        
+        except Exception as e:
+            logger.error(f"DatabaseMaintenance: Error during poll: {e}", exc_info=True)
+            # Don't re-raise - let base class handle retry logic
+    
+    async def _run_task(self, task: str, func: Callable[[], bool]) -> bool:
+        """Run one task off the event loop and log it with the storage stats after it."""
+        started = time.monotonic()
+        try:
+            success = bool(await asyncio.to_thread(func))
+        except Exception as e:
+            logger.error(f"DatabaseMaintenance: Error running {task}: {e}", exc_info=True)
+            success = False
+        duration_ms = int((time.monotonic() - started) * 1000)
+        if task != 'stats':
+            logger.info(f"DatabaseMaintenance: {task} {'done' if success else 'failed'} in {duration_ms} ms")
+        await asyncio.to_thread(self.db_manager.record_maintenance, task, success, duration_ms)
+        return success
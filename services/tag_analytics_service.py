@@ -1,9 +1,11 @@
 """
-Tag analytics service for future analytics features.
+Tag analytics service backed by the precomputed tag counters.
 """
 
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 from database.db_manager import DatabaseManager
 from database.managers.tag_manager import TagManager
 import logging
@@ -72,26 +74,6 @@ class TagAnalyticsService:
             List of dictionaries with 'user_id' and 'count' keys
         """
         try:
-            # Get all messages with this tag
-            message_ids = self._tag_manager.get_messages_by_tag(
-                tag.strip().lower(),
-                group_id=group_id
-            )
-            
-            # Count by user_id
-            user_counts: Dict[int, int] = {}
-            for message_id, msg_group_id in message_ids:
-                # Get message to find user_id
-                messages = self.db_manager.get_messages(
-                    group_id=msg_group_id,
-                    limit=1
-                )
-                # This is a simplified approach - in production, you'd want to
-                # query the message_tags table directly for user_id
-                # For now, we'll use a different approach
-                pass
-            
-            # Better approach: query message_tags directly
             with self._tag_manager.get_connection() as conn:
                 cursor = conn.execute("""
                     SELECT user_id, COUNT(*) as count
@@ -129,30 +111,8 @@ class TagAnalyticsService:
             List of dictionaries with 'date' and 'count' keys
         """
         try:
-            query = """
-                SELECT DATE(date_sent) as date, COUNT(*) as count
-                FROM message_tags
-                WHERE group_id = ? AND tag = ?
-            """
-            params = [group_id, tag.strip().lower()]
-            
-            if start_date:
-                query += " AND date_sent >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                query += " AND date_sent <= ?"
-                params.append(end_date)
-            
-            query += " GROUP BY DATE(date_sent) ORDER BY date ASC"
-            
-            with self._tag_manager.get_connection() as conn:
-                cursor = conn.execute(query, params)
-                
-                return [
-                    {'date': row['date'], 'count': row['count']}
-                    for row in cursor.fetchall()
-                ]
+            rows = self._tag_manager.get_tag_daily_counts(group_id, [tag], start_date, end_date)
+            return [{'date': day, 'count': count} for day, _, count in rows]
         except Exception as e:
             logger.error(f"Error getting tag usage by date for tag '{tag}': {e}")
             return []
@@ -201,4 +161,137 @@ class TagAnalyticsService:
                 'top_tags': [],
                 'all_tags': {}
             }
-
+    
+    def get_tag_timeseries(
+        self,
+        group_id: int,
+        tags: Optional[List[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        freq: str = 'D'
+    ) -> pd.DataFrame:
+        """
+        Get tag usage as a time series table.
+        
+        Args:
+            group_id: Group ID
+            tags: Optional list of tags (None = all tags)
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            freq: Pandas resample frequency ('D', 'W', 'MS', ...)
+            
+        Returns:
+            DataFrame indexed by period start with one column per tag (missing days are 0)
+        """
+        try:
+            rows = self._tag_manager.get_tag_daily_counts(group_id, tags, start_date, end_date)
+            if not rows:
+                return pd.DataFrame()
+            
+            frame = pd.DataFrame(rows, columns=['day', 'tag', 'count'])
+            frame['day'] = pd.to_datetime(frame['day'])
+            table = frame.pivot_table(index='day', columns='tag', values='count', aggfunc='sum', fill_value=0)
+            table = table.asfreq('D', fill_value=0)
+            if freq != 'D':
+                table = table.resample(freq).sum()
+            return table
+        except Exception as e:
+            logger.error(f"Error getting tag time series for group {group_id}: {e}")
+            return pd.DataFrame()
+    
+    def get_trending_tags(
+        self,
+        group_id: int,
+        limit: int = 10,
+        window_days: int = 7,
+        baseline_days: int = 28,
+        min_count: int = 2,
+        as_of: Optional[datetime] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Get tags whose recent usage rises most above their baseline rate.
+        
+        Score is (recent + 1) / (expected + 1), where expected is the baseline
+        count scaled to the recent window length.
+        
+        Args:
+            group_id: Group ID
+            limit: Maximum number of tags to return
+            window_days: Length of the recent window in days (ending at as_of)
+            baseline_days: Length of the baseline window preceding the recent window
+            min_count: Minimum uses in the recent window for a tag to qualify
+            as_of: Last day of the recent window (default: today)
+            
+        Returns:
+            List of dictionaries with 'tag', 'recent', 'baseline' and 'score' keys
+        """
+        try:
+            end_day = pd.Timestamp((as_of or datetime.now()).date())
+            start_day = end_day - timedelta(days=window_days + baseline_days - 1)
+            rows = self._tag_manager.get_tag_daily_counts(group_id, None, start_day, end_day)
+            if not rows:
+                return []
+            
+            frame = pd.DataFrame(rows, columns=['day', 'tag', 'count'])
+            codes, tags = pd.factorize(frame['tag'])
+            counts = frame['count'].to_numpy(dtype=np.float64)
+            ages = (end_day - pd.to_datetime(frame['day'])).dt.days.to_numpy()
+            in_window = ages < window_days
+            
+            recent = np.bincount(codes, weights=counts * in_window, minlength=len(tags))
+            baseline = np.bincount(codes, weights=counts * ~in_window, minlength=len(tags))
+            expected = baseline * (window_days / baseline_days) if baseline_days > 0 else np.zeros_like(baseline)
+            scores = (recent + 1.0) / (expected + 1.0)
+            
+            candidates = np.flatnonzero(recent >= min_count)
+            order = candidates[np.lexsort((-recent[candidates], -scores[candidates]))][:limit]
+            
+            return [
+                {
+                    'tag': tags[i],
+                    'recent': int(recent[i]),
+                    'baseline': int(baseline[i]),
+                    'score': round(float(scores[i]), 3)
+                }
+                for i in order
+            ]
+        except Exception as e:
+            logger.error(f"Error getting trending tags for group {group_id}: {e}")
+            return []
+    
+    def get_cooccurrence_matrix(
+        self,
+        group_id: int,
+        top_n: int = 20
+    ) -> pd.DataFrame:
+        """
+        Get a symmetric co-occurrence matrix for the group's most used tags.
+        
+        Args:
+            group_id: Group ID
+            top_n: Number of most used tags included in the matrix
+            
+        Returns:
+            DataFrame with tags as index and columns; the diagonal holds each tag's total count
+        """
+        try:
+            tag_counts = self._tag_manager.get_tag_counts_by_group(group_id)
+            tags = list(tag_counts)[:top_n]
+            if not tags:
+                return pd.DataFrame()
+            
+            position = {tag: i for i, tag in enumerate(tags)}
+            matrix = np.zeros((len(tags), len(tags)), dtype=np.int64)
+            pairs = self._tag_manager.get_tag_cooccurrence(group_id, tags)
+            if pairs:
+                rows = np.array([position[tag_a] for tag_a, _, _ in pairs])
+                cols = np.array([position[tag_b] for _, tag_b, _ in pairs])
+                values = np.array([count for _, _, count in pairs], dtype=np.int64)
+                np.add.at(matrix, (rows, cols), values)
+                matrix += matrix.T
+            np.fill_diagonal(matrix, [tag_counts[tag] for tag in tags])
+            
+            return pd.DataFrame(matrix, index=tags, columns=tags)
+        except Exception as e:
+            logger.error(f"Error getting tag co-occurrence matrix for group {group_id}: {e}")
+            return pd.DataFrame()
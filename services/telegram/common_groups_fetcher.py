@@ -4,18 +4,48 @@ Common groups fetcher service for discovering groups shared between authenticate
 
 import asyncio
 import logging
-from typing import Optional, Callable, Tuple, List
+import time
+from typing import Optional, Callable, Tuple, List, Dict, Set
 from datetime import datetime, timedelta
 
+from database.async_query_executor import async_query_executor
 from database.db_manager import DatabaseManager
 from database.models import TelegramCredential
 from services.telegram.client_utils import ClientUtils
 from services.telegram.group_manager import GroupManager
 from telethon.errors import FloodWaitError
-from telethon.tl.types import Channel, Chat
+from telethon.tl.types import Channel, ChannelParticipantsRecent, Chat
 
 logger = logging.getLogger(__name__)
 
+# Participants fetched per group (Telegram only exposes the first ~10k anyway)
+COMMON_GROUPS_PARTICIPANT_LIMIT = 1000
+# Cached participant sets younger than this are reused instead of refreshed
+COMMON_GROUPS_CACHE_TTL = timedelta(hours=24)
+# A refresh of a cached group stops after this many consecutive already-cached
+# participants (newest joiners come first, so the rest are cached too)
+COMMON_GROUPS_KNOWN_RUN = 200
+# Groups crawled at the same time; starts are still spaced by rate_limit
+COMMON_GROUPS_CONCURRENCY = 3
+
+
+class _StartLimiter:
+    """Spaces task starts at least `interval` seconds apart across concurrent workers."""
+    
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+    
+    async def wait(self):
+        if self.interval <= 0:
+            return
+        async with self._lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + self.interval
+
 
 class CommonGroupsFetcher:
     """Fetches common groups between authenticated account and selected users."""
@@ -33,6 +63,36 @@ class CommonGroupsFetcher:
         """Cancel the fetch operation."""
         self._cancelled = True
     
+    def find_common_groups_cached(self, user_ids: List[int]) -> List[Dict]:
+        """
+        Answer a common-groups query from the local participant cache (no Telegram calls).
+        
+        Args:
+            user_ids: List of user IDs to check for common groups
+        
+        Returns:
+            List of dicts with group_id, group_name, group_username, user_ids, fetched_at and
+            is_complete (False if the group's cached participants may be truncated, so other
+            selected users could be members too)
+        """
+        matches = self.db_manager.find_common_groups(user_ids)
+        if not matches:
+            return []
+        info = self.db_manager.get_participant_cache_info(list(matches.keys()))
+        results = []
+        for group_id, matched_ids in matches.items():
+            group_info = info.get(group_id, {})
+            results.append({
+                'group_id': group_id,
+                'group_name': group_info.get('group_name') or "Unknown Group",
+                'group_username': group_info.get('group_username'),
+                'user_ids': matched_ids,
+                'fetched_at': group_info.get('fetched_at'),
+                'is_complete': group_info.get('is_complete', False)
+            })
+        results.sort(key=lambda item: (-len(item['user_ids']), item['group_name']))
+        return results
+    
     async def fetch_common_groups(
         self,
         credential: TelegramCredential,
@@ -40,19 +100,31 @@ class CommonGroupsFetcher:
         rate_limit: float = 1.0,
         time_limit_minutes: Optional[int] = None,
         on_progress: Optional[Callable[[int, int, str], None]] = None,
-        cancellation_flag: Optional[Callable[[], bool]] = None
+        cancellation_flag: Optional[Callable[[], bool]] = None,
+        force_refresh: bool = False,
+        max_concurrency: int = COMMON_GROUPS_CONCURRENCY
     ) -> Tuple[bool, int, Optional[str]]:
         """
         Fetch common groups between authenticated account and selected users.
         
+        Participant lists are cached per group; only groups whose cache is missing or
+        older than COMMON_GROUPS_CACHE_TTL are crawled (concurrently), the rest are
+        matched from the local cache. An expired cache is refreshed incrementally:
+        the newest joiners are fetched until COMMON_GROUPS_KNOWN_RUN cached ones in a
+        row are seen, and added to it (members who left are only dropped by
+        force_refresh). Crawls cut at COMMON_GROUPS_PARTICIPANT_LIMIT mark the cache
+        incomplete instead of replacing it.
+        
         Args:
             credential: Telegram credential for authenticated account
             user_ids: List of user IDs to check for common groups
-            rate_limit: Delay in seconds between group checks
+            rate_limit: Minimum delay in seconds between starting two group crawls
             time_limit_minutes: Maximum time in minutes (None = no limit)
             on_progress: Callback(processed_groups, found_groups, current_group_name)
             cancellation_flag: Callable that returns True if operation should be cancelled
-            
+            force_refresh: Fully re-crawl every group even if its cached participants are fresh
+            max_concurrency: Number of groups crawled at the same time
+        
         Returns:
             (success, fetched_count, error_message)
         """
@@ -65,26 +137,23 @@ class CommonGroupsFetcher:
             if not temp_client:
                 return False, 0, "Failed to connect or session expired"
             
-            # Initialize counters
-            processed_groups = 0
-            found_groups = 0
+            selected: Set[int] = set(user_ids)
             
             # Calculate end time if time limit is set
             end_time = None
             if time_limit_minutes:
                 end_time = datetime.now() + timedelta(minutes=time_limit_minutes)
             
-            # Get all dialogs (groups/channels) from authenticated account
+            def should_stop() -> bool:
+                if self._cancelled or (cancellation_flag and cancellation_flag()):
+                    return True
+                return bool(end_time and datetime.now() >= end_time)
+            
+            # Get all groups from authenticated account's dialogs
+            groups = []
             try:
                 async for dialog in temp_client.iter_dialogs():
-                    # Check cancellation
-                    if self._cancelled or (cancellation_flag and cancellation_flag()):
-                        logger.info("Common groups fetch cancelled by user")
-                        break
-                    
-                    # Check time limit
-                    if end_time and datetime.now() >= end_time:
-                        logger.info("Common groups fetch stopped: time limit reached")
+                    if should_stop():
                         break
                     
                     # Only process groups/channels (not private chats)
@@ -96,62 +165,133 @@ class CommonGroupsFetcher:
                     if isinstance(entity, Channel) and entity.broadcast:
                         continue
                     
-                    # Get group info
-                    group_id = abs(entity.id)
-                    group_name = getattr(entity, 'title', None) or "Unknown Group"
-                    group_username = getattr(entity, 'username', None)
-                    
-                    processed_groups += 1
-                    
-                    # Update progress
-                    if on_progress:
-                        on_progress(processed_groups, found_groups, group_name)
-                    
-                    # Check if any of the selected users are members of this group
+                    groups.append((
+                        entity,
+                        abs(entity.id),
+                        getattr(entity, 'title', None) or "Unknown Group",
+                        getattr(entity, 'username', None)
+                    ))
+            except FloodWaitError as e:
+                error_msg = f"Rate limit: wait {e.seconds} seconds"
+                logger.warning(error_msg)
+                return False, 0, error_msg
+            except Exception as e:
+                logger.error(f"Error fetching common groups: {e}")
+                return False, 0, str(e)
+            
+            # Split into groups answerable from cache and groups that need a crawl
+            cache_info = self.db_manager.get_participant_cache_info([g[1] for g in groups])
+            cutoff = datetime.now() - COMMON_GROUPS_CACHE_TTL
+            fresh, stale = [], []
+            for group in groups:
+                fetched_at = (cache_info.get(group[1]) or {}).get('fetched_at')
+                if not force_refresh and fetched_at and fetched_at.replace(tzinfo=None) >= cutoff:
+                    fresh.append(group)
+                else:
+                    stale.append(group)
+            logger.info(f"Common groups: {len(fresh)} cached, {len(stale)} to crawl")
+            
+            matches: Dict[int, Tuple[str, Optional[str], Set[int]]] = {}
+            names = {group_id: (name, username) for _, group_id, name, username in fresh}
+            for group_id, matched_ids in self.db_manager.find_common_groups(
+                list(selected), list(names.keys())
+            ).items():
+                matches[group_id] = (*names[group_id], set(matched_ids))
+            
+            processed_groups = len(fresh)
+            if on_progress and fresh:
+                on_progress(processed_groups, len(matches), fresh[-1][2])
+            
+            # Crawl stale groups concurrently; the limiter keeps the start rate within rate_limit
+            limiter = _StartLimiter(rate_limit)
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            flood_wait: List[int] = []
+            
+            async def crawl(entity, group_id: int, group_name: str, group_username: Optional[str]):
+                nonlocal processed_groups
+                async with semaphore:
+                    if flood_wait or should_stop():
+                        return
+                    await limiter.wait()
+                    if flood_wait or should_stop():
+                        return
+                    refresh = not force_refresh and group_id in cache_info
                     try:
-                        # Get participants for this group
-                        participants = []
-                        async for participant in temp_client.iter_participants(entity, limit=1000):
-                            participants.append(participant.id)
-                        
-                        # Check if any selected user is in this group
-                        common_users = [uid for uid in user_ids if uid in participants]
-                        
-                        if common_users:
-                            # Save user-group relationships for all common users
-                            for user_id in common_users:
-                                try:
-                                    self.db_manager.save_user_group(
-                                        user_id=user_id,
-                                        group_id=group_id,
-                                        group_name=group_name,
-                                        group_username=group_username
-                                    )
-                                except Exception as e:
-                                    logger.warning(f"Failed to save user-group relationship for user {user_id} in group {group_id}: {e}")
-                            
-                            found_groups += 1
-                            logger.debug(f"Found common group: {group_name} ({len(common_users)} users)")
-                    
+                        cached: Set[int] = set()
+                        if refresh:
+                            cached = await async_query_executor.execute(
+                                self.db_manager.get_group_participant_ids, group_id
+                            )
+                        participants: Set[int] = set()
+                        known_run = 0
+                        caught_up = False
+                        iterator = temp_client.iter_participants(
+                            entity, limit=COMMON_GROUPS_PARTICIPANT_LIMIT, filter=ChannelParticipantsRecent
+                        )
+                        async for participant in iterator:
+                            participants.add(participant.id)
+                            if refresh:
+                                known_run = known_run + 1 if participant.id in cached else 0
+                                if known_run >= COMMON_GROUPS_KNOWN_RUN:
+                                    caught_up = True
+                                    break
+                    except FloodWaitError as e:
+                        flood_wait.append(e.seconds)
+                        return
                     except Exception as e:
                         logger.warning(f"Error checking participants for group {group_name}: {e}")
-                        # Continue with next group
+                        return
                     
-                    # Apply rate limiting
-                    if rate_limit > 0:
-                        await asyncio.sleep(rate_limit)
-                
-            except FloodWaitError as e:
-                wait_time = e.seconds
-                error_msg = f"Rate limit: wait {wait_time} seconds"
+                    total = getattr(iterator, 'total', None)
+                    complete = not caught_up and (
+                        len(participants) < COMMON_GROUPS_PARTICIPANT_LIMIT
+                        or (total is not None and len(participants) >= total)
+                    )
+                    if complete:
+                        await self.db_manager.execute_write(
+                            self.db_manager.replace_group_participants,
+                            group_id, group_name, participants, group_username
+                        )
+                    else:
+                        if not caught_up:
+                            logger.info(
+                                f"Participants of {group_name} truncated at {len(participants)}; "
+                                "common groups with it may be missed"
+                            )
+                        # An incremental refresh keeps the cache's completeness; a truncated crawl can't vouch for it
+                        await self.db_manager.execute_write(
+                            self.db_manager.merge_group_participants,
+                            group_id, group_name, participants, group_username,
+                            None if caught_up else False
+                        )
+                    common_users = selected & (participants | cached)
+                    if common_users:
+                        matches[group_id] = (group_name, group_username, common_users)
+                        logger.debug(f"Found common group: {group_name} ({len(common_users)} users)")
+                    
+                    processed_groups += 1
+                    if on_progress:
+                        on_progress(processed_groups, len(matches), group_name)
+            
+            await asyncio.gather(*(crawl(*group) for group in stale))
+            
+            # Save user-group relationships, one transaction per group
+            for group_id, (group_name, group_username, common_users) in matches.items():
+                await self.db_manager.execute_write(
+                    self.db_manager.save_user_group_memberships,
+                    sorted(common_users), group_id, group_name, group_username
+                )
+            
+            if flood_wait:
+                error_msg = f"Rate limit: wait {max(flood_wait)} seconds"
                 logger.warning(error_msg)
-                return False, found_groups, error_msg
-            except Exception as e:
-                logger.error(f"Error fetching common groups: {e}")
-                return False, found_groups, str(e)
+                return False, len(matches), error_msg
             
-            return True, found_groups, None
+            if should_stop():
+                logger.info("Common groups fetch stopped early (cancelled or time limit reached)")
             
+            return True, len(matches), None
+        
         except Exception as e:
             logger.error(f"Error in fetch_common_groups: {e}")
             return False, 0, str(e)
@@ -162,4 +302,3 @@ class CommonGroupsFetcher:
                     await temp_client.disconnect()
                 except Exception as e:
                     logger.error(f"Error disconnecting temporary client: {e}")
-
@@ -4,9 +4,10 @@ Member fetcher service for importing Telegram group members.
 
 import asyncio
 import logging
-from typing import Optional, Callable, Tuple
+from typing import Dict, List, Optional, Callable, Tuple
 from datetime import datetime, timedelta
 
+from database.async_query_executor import async_query_executor
 from database.db_manager import DatabaseManager
 from database.models import TelegramCredential, TelegramUser
 from services.telegram.client_utils import ClientUtils
@@ -16,6 +17,9 @@ from telethon.errors import FloodWaitError
 
 logger = logging.getLogger(__name__)
 
+# Participants per import batch (Telegram returns up to 200 participants per request)
+MEMBER_IMPORT_PAGE_SIZE = 200
+
 
 class MemberFetcher:
     """Fetches and imports Telegram group members."""
@@ -34,6 +38,103 @@ class MemberFetcher:
         """Cancel the fetch operation."""
         self._cancelled = True
     
+    async def _import_page(
+        self,
+        page: List[object],
+        group,
+        skip_deleted: bool,
+        counts: Dict[str, int],
+        on_progress: Optional[Callable[[int, int, int, int], None]],
+        on_member: Optional[Callable[[object, str], None]]
+    ) -> None:
+        """
+        Import one page of participants.
+        
+        Existence/deletion state is looked up with a single query and new or
+        restored users are saved with their group membership in one transaction,
+        both off the event loop. Users of a page that fails to save are reported
+        to on_member as 'failed'.
+        """
+        if not page:
+            return
+        
+        try:
+            states = await async_query_executor.execute(
+                self.db_manager.get_user_deletion_states, [user.id for user in page]
+            )
+        except Exception as e:
+            logger.error(f"Error looking up member states: {e}", exc_info=True)
+            return
+        
+        to_save = []
+        restore_ids = []
+        statuses = []
+        for user in page:
+            is_deleted = states.get(user.id)
+            if is_deleted is None:
+                to_save.append(user)
+                statuses.append((user, 'fetched'))
+            elif is_deleted:
+                if skip_deleted:
+                    statuses.append((user, 'skipped_deleted'))
+                    continue
+                # Restore deleted user
+                to_save.append(user)
+                restore_ids.append(user.id)
+                statuses.append((user, 'fetched'))
+            else:
+                statuses.append((user, 'skipped_exist'))
+        
+        telegram_users = [self._build_telegram_user(user) for user in to_save]
+        saved = 0
+        if telegram_users:
+            try:
+                saved = await self.db_manager.execute_write(
+                    self.db_manager.import_group_members,
+                    telegram_users,
+                    group_id=group.group_id,
+                    group_name=group.group_name,
+                    group_username=group.group_username,
+                    restore_user_ids=restore_ids
+                )
+            except Exception as e:
+                logger.error(f"Error saving members: {e}", exc_info=True)
+        if to_save and not saved:
+            # The page is saved in one transaction, so none of its users were saved
+            logger.warning(f"Failed to save page of {len(to_save)} members")
+            statuses = [(user, 'failed' if status == 'fetched' else status) for user, status in statuses]
+        else:
+            logger.debug(f"Saved {saved} members ({len(restore_ids)} restored)")
+        
+        counts["fetched"] += saved
+        for user, status in statuses:
+            if status in ('skipped_exist', 'skipped_deleted'):
+                counts[status] += 1
+            if on_member:
+                on_member(user, status)
+        
+        # Update progress
+        if on_progress:
+            on_progress(counts["fetched"], counts["skipped_exist"], counts["skipped_deleted"], counts["total"])
+    
+    @staticmethod
+    def _build_telegram_user(user) -> TelegramUser:
+        """Build a TelegramUser from a Telethon participant."""
+        # Build full name
+        first_name = getattr(user, 'first_name', None) or ""
+        last_name = getattr(user, 'last_name', None) or ""
+        full_name = f"{first_name} {last_name}".strip() or "Unknown User"
+        
+        return TelegramUser(
+            user_id=user.id,
+            username=getattr(user, 'username', None),
+            first_name=first_name,
+            last_name=last_name if last_name else None,
+            full_name=full_name,
+            phone=getattr(user, 'phone', None),
+            bio=getattr(user, 'about', None)
+        )
+    
     async def fetch_members(
         self,
         group_id: int,
@@ -50,12 +151,13 @@ class MemberFetcher:
         
         Args:
             group_id: Telegram group ID
-            rate_limit: Delay in seconds between fetches
+            rate_limit: Delay in seconds between pages of participants
             fetch_limit: Maximum number of members to fetch (None = no limit)
             time_limit_minutes: Maximum time in minutes (None = no limit)
             skip_deleted: Skip users that are marked as deleted
             on_progress: Callback(fetched_count, skipped_exist_count, skipped_deleted_count, total_count)
             on_member: Callback(telegram_user, status) where status is 'fetched', 'skipped_exist', 'skipped_deleted'
+                or 'failed' (the user's page could not be saved)
             
         Returns:
             (success, fetched_count, skipped_exist_count, skipped_deleted_count, error_message)
@@ -88,17 +190,15 @@ class MemberFetcher:
                 return False, 0, 0, 0, f"Failed to access group: {str(e)}"
             
             # Initialize counters
-            fetched_count = 0
-            skipped_exist_count = 0
-            skipped_deleted_count = 0
-            total_count = 0
+            counts = {"fetched": 0, "skipped_exist": 0, "skipped_deleted": 0, "total": 0}
+            page = []
             
             # Calculate end time if time limit is set
             end_time = None
             if time_limit_minutes:
                 end_time = datetime.now() + timedelta(minutes=time_limit_minutes)
             
-            # Fetch members using iter_participants with aggressive mode
+            # Fetch members using iter_participants with aggressive mode, importing one API page at a time
             try:
                 async for user in temp_client.iter_participants(entity, aggressive=True):
                     # Check cancellation
@@ -112,112 +212,40 @@ class MemberFetcher:
                         break
                     
                     # Check fetch limit
-                    if fetch_limit and total_count >= fetch_limit:
+                    if fetch_limit and counts["total"] >= fetch_limit:
                         logger.info("Member fetch stopped: fetch limit reached")
                         break
                     
-                    total_count += 1
+                    counts["total"] += 1
                     
                     # Skip bots (optional - you can make this configurable)
                     if getattr(user, 'bot', False):
                         continue
                     
-                    # Process user
-                    existing = self.db_manager.get_user_by_id(user.id)
-                    
-                    # Check if user is deleted
-                    user_was_deleted = False
-                    if existing and existing.is_deleted:
-                        if skip_deleted:
-                            skipped_deleted_count += 1
-                            if on_member:
-                                on_member(user, 'skipped_deleted')
-                            if on_progress:
-                                on_progress(fetched_count, skipped_exist_count, skipped_deleted_count, total_count)
-                            # Apply rate limit
-                            if rate_limit > 0:
-                                await asyncio.sleep(rate_limit)
-                            continue
-                        else:
-                            # Mark that we need to restore this user
-                            user_was_deleted = True
-                    
-                    # Check if user already exists (and not deleted) - skip if already exists and not deleted
-                    if existing and not existing.is_deleted and not user_was_deleted:
-                        skipped_exist_count += 1
-                        if on_member:
-                            on_member(user, 'skipped_exist')
-                    else:
-                        # Process and save new user (or update existing/restored user)
-                        try:
-                            # Build full name
-                            first_name = getattr(user, 'first_name', None) or ""
-                            last_name = getattr(user, 'last_name', None) or ""
-                            full_name = f"{first_name} {last_name}".strip() or "Unknown User"
-                            
-                            telegram_user = TelegramUser(
-                                user_id=user.id,
-                                username=getattr(user, 'username', None),
-                                first_name=first_name,
-                                last_name=last_name if last_name else None,
-                                full_name=full_name,
-                                phone=getattr(user, 'phone', None),
-                                bio=getattr(user, 'about', None)
-                            )
-                            
-                            # Save or update user
-                            result = self.db_manager.save_user(telegram_user)
-                            if result:
-                                # If user was deleted, restore it
-                                if user_was_deleted:
-                                    with self.db_manager.get_connection() as conn:
-                                        conn.execute(
-                                            "UPDATE telegram_users SET is_deleted = 0 WHERE user_id = ?",
-                                            (user.id,)
-                                        )
-                                        conn.commit()
-                                    logger.debug(f"Restored and saved user {user.id}: {full_name}")
-                                
-                                # Record user-group relationship
-                                try:
-                                    self.db_manager.save_user_group(
-                                        user_id=user.id,
-                                        group_id=group.group_id,
-                                        group_name=group.group_name,
-                                        group_username=group.group_username
-                                    )
-                                except Exception as e:
-                                    logger.warning(f"Failed to save user-group relationship: {e}")
-                                else:
-                                    logger.debug(f"Saved user {user.id}: {full_name}")
-                                
-                                fetched_count += 1
-                            else:
-                                logger.warning(f"Failed to save user {user.id}: {full_name}")
-                            
-                            if on_member:
-                                on_member(user, 'fetched')
-                        except Exception as e:
-                            logger.error(f"Error processing member {user.id}: {e}", exc_info=True)
-                            # Continue with next user
-                    
-                    # Update progress
-                    if on_progress:
-                        on_progress(fetched_count, skipped_exist_count, skipped_deleted_count, total_count)
-                    
-                    # Apply rate limiting
-                    if rate_limit > 0:
-                        await asyncio.sleep(rate_limit)
+                    page.append(user)
+                    if len(page) >= MEMBER_IMPORT_PAGE_SIZE:
+                        await self._import_page(page, group, skip_deleted, counts, on_progress, on_member)
+                        page = []
+                        # Apply rate limiting per API page
+                        if rate_limit > 0:
+                            await asyncio.sleep(rate_limit)
+                
+                await self._import_page(page, group, skip_deleted, counts, on_progress, on_member)
                 
             except FloodWaitError as e:
+                await self._import_page(page, group, skip_deleted, counts, on_progress, on_member)
                 wait_time = e.seconds
                 error_msg = f"Rate limit: wait {wait_time} seconds"
                 logger.warning(error_msg)
-                return False, fetched_count, skipped_exist_count, skipped_deleted_count, error_msg
+                return False, counts["fetched"], counts["skipped_exist"], counts["skipped_deleted"], error_msg
             except Exception as e:
+                await self._import_page(page, group, skip_deleted, counts, on_progress, on_member)
                 logger.error(f"Error fetching members: {e}")
-                return False, fetched_count, skipped_exist_count, skipped_deleted_count, str(e)
+                return False, counts["fetched"], counts["skipped_exist"], counts["skipped_deleted"], str(e)
             
+            fetched_count = counts["fetched"]
+            skipped_exist_count = counts["skipped_exist"]
+            skipped_deleted_count = counts["skipped_deleted"]
             return True, fetched_count, skipped_exist_count, skipped_deleted_count, None
             
         except Exception as e:
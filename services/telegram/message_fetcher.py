@@ -4,7 +4,7 @@ Message fetcher for fetching messages from Telegram groups.
 
 import logging
 import asyncio
-from typing import Optional, Callable, Tuple
+from typing import Optional, Callable, List, Tuple
 from datetime import datetime, timezone
 
 try:
@@ -26,6 +26,9 @@ from services.telegram.client_utils import ClientUtils
 
 logger = logging.getLogger(__name__)
 
+# Messages buffered before they are saved (with their tags) in one write
+FETCH_SAVE_BATCH_SIZE = 200
+
 
 def _normalize_to_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """
@@ -68,6 +71,39 @@ class MessageFetcher:
         self.message_processor = message_processor
         self.client_utils = client_utils
     
+    async def _save_pending_messages(
+        self,
+        pending_messages: List[Message],
+        message_count: int,
+        message_callback: Optional[Callable[[Message], None]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Save buffered messages and their tags in one write, then report them.
+        
+        Args:
+            pending_messages: Buffered messages (emptied)
+            message_count: Messages reported so far
+            message_callback: Optional message callback
+            progress_callback: Optional progress callback
+        
+        Returns:
+            Updated message count
+        """
+        if not pending_messages:
+            return message_count
+        batch = list(pending_messages)
+        pending_messages.clear()
+        await self.db_manager.execute_write(self.db_manager.save_messages_with_tags, batch)
+        
+        for message in batch:
+            message_count += 1
+            if message_callback:
+                message_callback(message)
+            if progress_callback:
+                progress_callback(message_count, -1)
+        return message_count
+    
     async def fetch_messages(
         self,
         group_id: int,
@@ -98,6 +134,8 @@ class MessageFetcher:
             # Continue with fetch if check fails
         
         temp_client = None
+        temp_reaction_processor = None
+        pending_messages: List[Message] = []
         try:
             # Get default credential
             credential = self.db_manager.get_default_credential()
@@ -122,7 +160,7 @@ class MessageFetcher:
             if not success:
                 return False, 0, error
             
-            temp_group_manager.save_group(group)
+            await self.db_manager.execute_write(temp_group_manager.save_group, group)
             
             # Get account info (static copy to avoid losing reference if account deleted)
             account_full_name = None
@@ -213,7 +251,8 @@ class MessageFetcher:
                         
                         # Record user-group relationship
                         try:
-                            self.db_manager.save_user_group(
+                            await self.db_manager.execute_write(
+                                self.db_manager.save_user_group,
                                 user_id=telegram_msg.sender.id,
                                 group_id=group_id,
                                 group_name=group.group_name,
@@ -229,8 +268,7 @@ class MessageFetcher:
                     )
                     
                     if message:
-                        self.db_manager.save_message(message)
-                        message_count += 1
+                        pending_messages.append(message)
                         
                         # Count media files
                         if message.has_media:
@@ -272,11 +310,12 @@ class MessageFetcher:
                                 message.message_link
                             )
                         
-                        if message_callback:
-                            message_callback(message)
-                        
-                        if progress_callback:
-                            progress_callback(message_count, -1)
+                        # With a per-message delay the writes are not the bottleneck; save
+                        # right away so progress keeps up with the fetch
+                        if fetch_delay > 0 or len(pending_messages) >= FETCH_SAVE_BATCH_SIZE:
+                            message_count = await self._save_pending_messages(
+                                pending_messages, message_count, message_callback, progress_callback
+                            )
                     
                     if fetch_delay > 0:
                         # Show countdown if callback provided
@@ -299,6 +338,11 @@ class MessageFetcher:
                     )
                     continue
             
+            # Save messages still buffered from the loop
+            message_count = await self._save_pending_messages(
+                pending_messages, message_count, message_callback, progress_callback
+            )
+            
             logger.debug(
                 f"Fetch iteration complete: processed={processed_count}, "
                 f"saved={message_count}, skipped={skipped_count}, "
@@ -306,7 +350,7 @@ class MessageFetcher:
             )
             
             total_messages = self.db_manager.get_message_count(group_id)
-            temp_group_manager.update_group_stats(group, total_messages)
+            await self.db_manager.execute_write(temp_group_manager.update_group_stats, group, total_messages)
             
             # Save fetch history with account info and summary
             if start_date and end_date:
@@ -329,7 +373,7 @@ class MessageFetcher:
                     total_audio=audio_count,
                     total_links=link_count
                 )
-                self.db_manager.save_fetch_history(fetch_history)
+                await self.db_manager.execute_write(self.db_manager.save_fetch_history, fetch_history)
             
             logger.info(f"Fetched {message_count} messages from group {group_id} (processed: {processed_count}, skipped: {skipped_count})")
             # Return (success, message_count, error_message, skipped_count)
@@ -339,6 +383,20 @@ class MessageFetcher:
             logger.error(f"Error fetching messages: {e}")
             return False, 0, str(e), 0
         finally:
+            # Save messages buffered before an error or cancellation
+            if pending_messages:
+                try:
+                    await self._save_pending_messages(pending_messages, 0)
+                except Exception as e:
+                    logger.error(f"Error saving buffered messages: {e}")
+            
+            # Write reaction totals still buffered from the loop, even if it was interrupted
+            if temp_reaction_processor:
+                try:
+                    await temp_reaction_processor.flush()
+                except Exception as e:
+                    logger.error(f"Error writing buffered reaction totals: {e}")
+            
             # Always disconnect temporary client
             if temp_client:
                 try:
@@ -372,6 +430,8 @@ class MessageFetcher:
             (success, message_count, error_message)
         """
         temp_client = None
+        temp_reaction_processor = None
+        pending_messages: List[Message] = []
         try:
             # Create temporary client
             temp_client = await self.client_utils.create_temporary_client(credential)
@@ -391,7 +451,7 @@ class MessageFetcher:
             if not success:
                 return False, 0, error
             
-            temp_group_manager.save_group(group)
+            await self.db_manager.execute_write(temp_group_manager.save_group, group)
             
             # Get account info (static copy to avoid losing reference if account deleted)
             account_full_name = None
@@ -486,7 +546,8 @@ class MessageFetcher:
                         
                         # Record user-group relationship
                         try:
-                            self.db_manager.save_user_group(
+                            await self.db_manager.execute_write(
+                                self.db_manager.save_user_group,
                                 user_id=telegram_msg.sender.id,
                                 group_id=group_id,
                                 group_name=group.group_name,
@@ -502,8 +563,7 @@ class MessageFetcher:
                     )
                     
                     if message:
-                        self.db_manager.save_message(message)
-                        message_count += 1
+                        pending_messages.append(message)
                         
                         # Count media files
                         if message.has_media:
@@ -545,11 +605,12 @@ class MessageFetcher:
                                 message.message_link
                             )
                         
-                        if message_callback:
-                            message_callback(message)
-                        
-                        if progress_callback:
-                            progress_callback(message_count, -1)
+                        # With a per-message delay the writes are not the bottleneck; save
+                        # right away so progress keeps up with the fetch
+                        if fetch_delay > 0 or len(pending_messages) >= FETCH_SAVE_BATCH_SIZE:
+                            message_count = await self._save_pending_messages(
+                                pending_messages, message_count, message_callback, progress_callback
+                            )
                     
                     if fetch_delay > 0:
                         # Show countdown if callback provided
@@ -572,6 +633,11 @@ class MessageFetcher:
                     )
                     continue
             
+            # Save messages still buffered from the loop
+            message_count = await self._save_pending_messages(
+                pending_messages, message_count, message_callback, progress_callback
+            )
+            
             logger.debug(
                 f"Fetch iteration complete: processed={processed_count}, "
                 f"saved={message_count}, skipped={skipped_count}, "
@@ -579,7 +645,7 @@ class MessageFetcher:
             )
             
             total_messages = self.db_manager.get_message_count(group_id)
-            temp_group_manager.update_group_stats(group, total_messages)
+            await self.db_manager.execute_write(temp_group_manager.update_group_stats, group, total_messages)
             
             # Save fetch history with account info and summary
             if start_date and end_date:
@@ -601,7 +667,7 @@ class MessageFetcher:
                     total_audio=audio_count,
                     total_links=link_count
                 )
-                self.db_manager.save_fetch_history(fetch_history)
+                await self.db_manager.execute_write(self.db_manager.save_fetch_history, fetch_history)
             
             logger.info(f"Fetched {message_count} messages from group {group_id} using account {credential.phone_number} (processed: {processed_count}, skipped: {skipped_count})")
             # Return (success, message_count, error_message, skipped_count)
@@ -611,6 +677,20 @@ class MessageFetcher:
             logger.error(f"Error fetching messages with account: {e}")
             return False, 0, str(e), 0
         finally:
+            # Save messages buffered before an error or cancellation
+            if pending_messages:
+                try:
+                    await self._save_pending_messages(pending_messages, 0)
+                except Exception as e:
+                    logger.error(f"Error saving buffered messages: {e}")
+            
+            # Write reaction totals still buffered from the loop, even if it was interrupted
+            if temp_reaction_processor:
+                try:
+                    await temp_reaction_processor.flush()
+                except Exception as e:
+                    logger.error(f"Error writing buffered reaction totals: {e}")
+            
             # Clean up temporary client
             if temp_client:
                 try:
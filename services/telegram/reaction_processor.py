@@ -4,7 +4,8 @@ Reaction processor for handling Telegram message reactions.
 
 import logging
 import asyncio
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Callable
 
 try:
     from telethon.errors import FloodWaitError, BadRequestError
@@ -18,6 +19,11 @@ from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Messages buffered before their reaction totals are written in one transaction
+REACTION_FLUSH_SIZE = 200
+# Message IDs per get_messages call when re-polling reaction counts (Telegram's per-request cap)
+REACTION_REFRESH_BATCH_SIZE = 100
+
 
 class ReactionProcessor:
     """Processes Telegram message reactions."""
@@ -26,6 +32,50 @@ class ReactionProcessor:
         self.db_manager = db_manager
         self.client = client
         self.user_processor = user_processor
+        self._pending: Dict[int, Dict[int, Dict[str, int]]] = {}
+        self._pending_count = 0
+    
+    @staticmethod
+    def extract_reaction_counts(telegram_msg: 'TelethonMessage') -> Dict[str, int]:
+        """
+        Extract emoji -> count totals from an already-downloaded message.
+        
+        Args:
+            telegram_msg: Telethon message object
+        
+        Returns:
+            Dictionary mapping emoji (or custom_<document_id>) to reaction count
+        """
+        reactions = getattr(telegram_msg, 'reactions', None)
+        if not reactions:
+            return {}
+        
+        # MessageReactions has a 'results' list of ReactionCount (older layers used 'reactions')
+        results = getattr(reactions, 'results', None)
+        if results is None:
+            results = getattr(reactions, 'reactions', None)
+        if results is None and isinstance(reactions, list):
+            results = reactions
+        if not results:
+            return {}
+        
+        counts: Dict[str, int] = {}
+        for reaction_count in results:
+            reaction = getattr(reaction_count, 'reaction', reaction_count)
+            if getattr(reaction, 'emoticon', None):
+                emoji = reaction.emoticon
+            elif getattr(reaction, 'document_id', None):
+                emoji = f"custom_{reaction.document_id}"
+            elif getattr(reaction, 'custom_emoji_id', None):
+                emoji = f"custom_{reaction.custom_emoji_id}"
+            elif type(reaction).__name__ == 'ReactionPaid':
+                emoji = "paid"
+            else:
+                continue
+            count = getattr(reaction_count, 'count', 0) or 0
+            if count > 0:
+                counts[emoji] = counts.get(emoji, 0) + count
+        return counts
     
     async def process_reactions(
         self,
@@ -35,133 +85,121 @@ class ReactionProcessor:
         message_link: str
     ) -> int:
         """
-        Process reactions for a message.
+        Collect reaction totals for a message; they are written in batches.
+        
+        No API calls are made: totals come from the message object itself.
+        A message without reactions is buffered too, so totals stored for it
+        earlier are cleared. Call flush() once the fetch loop is done to write
+        the remaining batch.
         
         Args:
             telegram_msg: Telethon message object
             group_id: Group ID
             group_username: Group username (optional)
             message_link: Message link
-            
+        
         Returns:
-            Number of reactions processed
+            Number of reactions on the message
         """
         if not settings.settings.track_reactions:
             return 0
         
+        try:
+            counts = self.extract_reaction_counts(telegram_msg)
+            self._pending.setdefault(group_id, {})[telegram_msg.id] = counts
+            self._pending_count += 1
+            if self._pending_count >= REACTION_FLUSH_SIZE:
+                await self.flush()
+            return sum(counts.values())
+        
+        except Exception as e:
+            logger.error(f"Error processing reactions for message {telegram_msg.id}: {e}")
+            return 0
+    
+    async def flush(self) -> int:
+        """
+        Write all buffered reaction totals.
+        
+        Returns:
+            Number of messages written
+        """
+        pending, self._pending, self._pending_count = self._pending, {}, 0
+        written = 0
+        for group_id, counts in pending.items():
+            written += await self.db_manager.execute_write(
+                self.db_manager.save_reaction_counts, group_id, counts
+            )
+        return written
+    
+    async def refresh_reaction_counts(
+        self,
+        group_id: int,
+        message_ids: Optional[List[int]] = None,
+        days: int = 7,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Re-poll reaction totals for recent messages, 100 message IDs per request.
+        
+        Args:
+            group_id: Group ID
+            message_ids: Message IDs to refresh (None = messages from the last `days` days)
+            days: Look-back window when message_ids is not given
+            on_progress: Callback(refreshed_messages, total_messages)
+        
+        Returns:
+            Number of messages whose totals were refreshed
+        """
         if not self.client:
             return 0
         
+        if message_ids is None:
+            message_ids = self.db_manager.get_message_ids_since(
+                group_id, datetime.now() - timedelta(days=days)
+            )
+        if not message_ids:
+            return 0
+        
         try:
-            # Check if message has reactions
-            if not hasattr(telegram_msg, 'reactions') or not telegram_msg.reactions:
-                return 0
-            
-            reaction_count = 0
-            reaction_delay = settings.settings.reaction_fetch_delay
-            
-            # Get the actual list of reactions from MessageReactions object
-            # MessageReactions has a 'reactions' attribute (or 'results' in some versions)
-            reactions_list = None
-            if hasattr(telegram_msg.reactions, 'reactions'):
-                reactions_list = telegram_msg.reactions.reactions
-            elif hasattr(telegram_msg.reactions, 'results'):
-                reactions_list = telegram_msg.reactions.results
-            elif isinstance(telegram_msg.reactions, list):
-                # Already a list (shouldn't happen, but handle it)
-                reactions_list = telegram_msg.reactions
-            else:
-                logger.warning(f"Could not extract reactions list from MessageReactions object for message {telegram_msg.id}")
-                return 0
-            
-            if not reactions_list:
-                return 0
-            
-            # Process each reaction type
-            for reaction_obj in reactions_list:
+            entity = await self.client.get_entity(group_id)
+        except Exception as e:
+            logger.error(f"Error resolving group {group_id} for reaction refresh: {e}")
+            return 0
+        
+        refreshed = 0
+        batch_delay = settings.settings.reaction_fetch_delay
+        total = len(message_ids)
+        
+        for start in range(0, total, REACTION_REFRESH_BATCH_SIZE):
+            chunk = message_ids[start:start + REACTION_REFRESH_BATCH_SIZE]
+            try:
                 try:
-                    # Get emoji from reaction object
-                    # ReactionCount objects have a 'reaction' attribute with the actual reaction
-                    emoji = "👍"  # Default
-                    
-                    # Try to get the actual reaction object (might be nested in ReactionCount)
-                    actual_reaction = reaction_obj
-                    if hasattr(reaction_obj, 'reaction'):
-                        actual_reaction = reaction_obj.reaction
-                    
-                    # Extract emoji from the reaction
-                    if hasattr(actual_reaction, 'emoticon'):
-                        emoji = actual_reaction.emoticon
-                    elif hasattr(actual_reaction, 'emoji'):
-                        emoji = actual_reaction.emoji
-                    elif hasattr(actual_reaction, 'custom_emoji_id'):
-                        # Custom emoji - store the ID as string
-                        emoji = f"custom_{actual_reaction.custom_emoji_id}"
-                    elif hasattr(reaction_obj, 'emoji'):
-                        # Fallback: try direct attribute
-                        emoji = reaction_obj.emoji
-                    elif hasattr(reaction_obj, 'custom_emoji_id'):
-                        # Fallback: try direct attribute
-                        emoji = f"custom_{reaction_obj.custom_emoji_id}"
-                    
-                    # Try to get users who reacted with this emoji
-                    try:
-                        # Get all reactions for this message
-                        # Telethon stores reactions in message.reactions attribute
-                        reacted_users = []
-                        try:
-                            # In Telethon, reactions are stored in message.reactions
-                            # We need to get reaction users differently
-                            if hasattr(telegram_msg, 'reactions') and telegram_msg.reactions:
-                                # Telethon reactions structure is different
-                                # reactions is a MessageReactions object with results list
-                                reactions_obj = telegram_msg.reactions
-                                if hasattr(reactions_obj, 'results'):
-                                    for reaction_count in reactions_obj.results:
-                                        # Check if this reaction matches our emoji
-                                        reaction = reaction_count.reaction if hasattr(reaction_count, 'reaction') else None
-                                        if reaction:
-                                            reaction_emoji = None
-                                            if hasattr(reaction, 'emoticon'):
-                                                reaction_emoji = reaction.emoticon
-                                            elif hasattr(reaction, 'document_id'):
-                                                reaction_emoji = f"custom_{reaction.document_id}"
-                                            
-                                            if reaction_emoji == emoji:
-                                                # Get users who reacted - Telethon doesn't have direct API for this
-                                                # We'll need to use the count from reaction_count.count
-                                                # For now, we'll process based on the reaction count
-                                                # Note: Telethon doesn't provide easy access to individual reaction users
-                                                # Note: Telethon's reaction API structure
-                                                pass
-                        except AttributeError:
-                            logger.debug(f"Reactions not available for message {telegram_msg.id}")
-                            continue
-                        except BadRequestError as e:
-                            logger.debug(f"Could not fetch reactions for message {telegram_msg.id}: {e}")
-                            continue
-                        except FloodWaitError as e:
-                            logger.warning(f"FloodWait when fetching reactions: waiting {e.seconds} seconds")
-                            await asyncio.sleep(e.seconds)
-                            continue
-                        
-                        # Note: Telethon doesn't provide easy access to individual reaction users
-                        # For now, we'll skip individual user reaction tracking
-                        # The reaction counts are still available in message.reactions
-                        # TODO: Implement reaction user fetching if needed via alternative methods
-                        logger.debug(f"Reaction tracking for individual users not fully supported for message {telegram_msg.id}")
-                    
-                    except Exception as e:
-                        logger.warning(f"Error fetching reactions for message {telegram_msg.id}: {e}")
-                        continue
-                
-                except Exception as e:
-                    logger.warning(f"Error processing reaction: {e}")
-                    continue
+                    messages = await self.client.get_messages(entity, ids=chunk)
+                except FloodWaitError as e:
+                    logger.warning(f"FloodWait when refreshing reactions: waiting {e.seconds} seconds")
+                    await asyncio.sleep(e.seconds)
+                    messages = await self.client.get_messages(entity, ids=chunk)
+            except BadRequestError as e:
+                logger.debug(f"Could not refresh reactions for group {group_id}: {e}")
+                continue
+            except Exception as e:
+                logger.warning(f"Error refreshing reactions for group {group_id}: {e}")
+                continue
             
-            return reaction_count
+            # Messages deleted on Telegram come back as None; leave their stored totals alone
+            counts = {
+                telegram_msg.id: self.extract_reaction_counts(telegram_msg)
+                for telegram_msg in messages if telegram_msg is not None
+            }
+            refreshed += await self.db_manager.execute_write(
+                self.db_manager.save_reaction_counts, group_id, counts
+            )
             
-        except Exception as e:
-            logger.error(f"Error processing reactions for message {telegram_msg.id}: {e}")
-            return 0
-
+            if on_progress:
+                on_progress(min(start + len(chunk), total), total)
+            
+            if batch_delay > 0 and start + REACTION_REFRESH_BATCH_SIZE < total:
+                await asyncio.sleep(batch_delay)
+        
+        logger.info(f"Refreshed reaction counts for {refreshed} messages in group {group_id}")
+        return refreshed
@@ -51,7 +51,7 @@ class SessionManager:
                 session_string=str(session_file_path),
                 is_default=True
             )
-            self.db_manager.save_telegram_credential(credential)
+            await self.db_manager.execute_write(self.db_manager.save_telegram_credential, credential)
             
             # Track account authentication
             try:
@@ -113,7 +113,7 @@ class SessionManager:
                 session_string=str(session_file_path),
                 is_default=True
             )
-            self.db_manager.save_telegram_credential(credential)
+            await self.db_manager.execute_write(self.db_manager.save_telegram_credential, credential)
             logger.info(f"Saved QR login credential for {phone_number} with session: {session_file_path}")
             
             # Track account authentication
@@ -166,6 +166,42 @@ class TelegramService:
             return (*result, 0)  # Add skipped_count=0 for backward compatibility
         return result
     
+    async def refresh_reaction_counts(
+        self,
+        group_id: int,
+        days: int = 7,
+        credential: Optional[TelegramCredential] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """
+        Re-poll reaction totals for a group's recent messages using a temporary client.
+        
+        Args:
+            group_id: Group ID
+            days: Refresh messages sent within this many days
+            credential: Account to use (default account if None)
+            on_progress: Optional callback(refreshed_messages, total_messages)
+            
+        Returns:
+            Number of messages whose totals were refreshed
+        """
+        credential = credential or self.db_manager.get_default_credential()
+        if not credential:
+            return 0
+        
+        temp_client = await self.client_utils.create_temporary_client(credential)
+        if not temp_client:
+            return 0
+        
+        try:
+            processor = ReactionProcessor(self.db_manager, temp_client, self.user_processor)
+            return await processor.refresh_reaction_counts(group_id, days=days, on_progress=on_progress)
+        finally:
+            try:
+                await temp_client.disconnect()
+            except Exception as e:
+                logger.error(f"Error disconnecting temporary client: {e}")
+    
     async def check_account_status(
         self,
         credential: TelegramCredential,
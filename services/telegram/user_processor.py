@@ -47,7 +47,7 @@ class UserProcessor:
             if existing and existing.is_deleted:
                 return None  # Skip deleted users
             
-            self.db_manager.save_user(user)
+            await self.db_manager.execute_write(self.db_manager.save_user, user)
             return user
             
         except Exception as e:
@@ -1,41 +1,226 @@
 """
 Update downloader for downloading and verifying updates.
+
+Downloads run on the event loop with httpx: the file is split into byte
+ranges fetched by several concurrent segments into a preallocated
+``.part`` file, whose segment map (``.part.json``) lets an interrupted
+download resume where each segment stopped. The SHA-256 is computed while
+the download progresses, and a shared rate limiter caps bandwidth so
+update downloads do not starve Telegram fetches.
 """
 
+import asyncio
+import json
 import logging
 import hashlib
+import os
 import platform
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 
 try:
-    import requests
-    REQUESTS_AVAILABLE = True
+    import httpx
+    HTTPX_AVAILABLE = True
 except ImportError:
-    REQUESTS_AVAILABLE = False
-    logging.warning("requests library not installed")
+    HTTPX_AVAILABLE = False
+    logging.warning("httpx library not installed")
 
 from utils.constants import (
     UPDATES_DIR_NAME,
+    UPDATE_DOWNLOAD_SEGMENTS,
+    UPDATE_DOWNLOAD_MAX_BYTES_PER_SECOND,
     USER_DATA_DIR
 )
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the response per iteration
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Segment map is persisted after this many bytes per segment
+SEGMENT_MAP_SAVE_INTERVAL = 1024 * 1024
+# Files smaller than this are downloaded as one segment
+MIN_SEGMENT_SIZE = 1024 * 1024
+# Retries per segment before the download is abandoned (progress is kept)
+SEGMENT_MAX_RETRIES = 3
+SEGMENT_RETRY_DELAY = 1.0  # seconds, doubled per retry
+
+
+class _RateLimiter:
+    """Token bucket shared by all segments of a download."""
+    
+    def __init__(self, bytes_per_second: int):
+        self.rate = bytes_per_second
+        self._allowance = float(bytes_per_second)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def consume(self, amount: int):
+        """Wait until amount bytes may be transferred (no-op when unlimited)."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= amount
+            if self._allowance < 0:
+                await asyncio.sleep(-self._allowance / self.rate)
+
+
+class _Segment:
+    """A byte range [start, end] of the download and how much of it is done."""
+    
+    def __init__(self, start: int, end: int, done: int = 0):
+        self.start = start
+        self.end = end
+        self.done = done
+    
+    @property
+    def offset(self) -> int:
+        return self.start + self.done
+    
+    @property
+    def complete(self) -> bool:
+        return self.offset > self.end
+    
+    def to_list(self) -> list:
+        return [self.start, self.end, self.done]
+
+
+class _DownloadState:
+    """Segment map persisted next to the .part file."""
+    
+    def __init__(self, map_path: Path, url: str, size: int, validator: Optional[str], segments: List[_Segment]):
+        self.map_path = map_path
+        self.url = url
+        self.size = size
+        self.validator = validator
+        self.segments = segments
+    
+    @classmethod
+    def load(cls, map_path: Path, url: str, size: int, validator: Optional[str]) -> Optional["_DownloadState"]:
+        """Load a segment map if it belongs to the same remote file."""
+        try:
+            with open(map_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("url") != url or data.get("size") != size or data.get("validator") != validator:
+                return None
+            segments = [_Segment(*item) for item in data["segments"]]
+            return cls(map_path, url, size, validator, segments)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def save(self):
+        tmp_path = self.map_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": self.url,
+                "size": self.size,
+                "validator": self.validator,
+                "segments": [segment.to_list() for segment in self.segments],
+            }, f)
+        tmp_path.replace(self.map_path)
+    
+    @property
+    def downloaded(self) -> int:
+        return sum(segment.done for segment in self.segments)
+    
+    def contiguous_end(self) -> int:
+        """Offset up to which the file has no gaps."""
+        for segment in self.segments:
+            if not segment.complete:
+                return segment.offset
+        return self.size
+
+
+class _StreamingHasher:
+    """
+    SHA-256 over a file being written out of order.
+    
+    Bytes written at the hash frontier are hashed directly; when the
+    frontier reaches data already written by later segments, that region
+    is read back (from the page cache) and hashed, so no second full pass
+    is needed after the download.
+    """
+    
+    def __init__(self, part_path: Path):
+        self.part_path = part_path
+        self.hashed_upto = 0
+        self._sha256 = hashlib.sha256()
+        self._lock = asyncio.Lock()
+    
+    async def feed(self, offset: int, data: bytes, state: _DownloadState):
+        async with self._lock:
+            if offset == self.hashed_upto:
+                self._sha256.update(data)
+                self.hashed_upto += len(data)
+            frontier = state.contiguous_end()
+            if frontier > self.hashed_upto:
+                await asyncio.to_thread(self._hash_file_range, self.hashed_upto, frontier)
+                self.hashed_upto = frontier
+    
+    async def catch_up(self, state: _DownloadState):
+        await self.feed(-1, b"", state)
+    
+    def _hash_file_range(self, start: int, end: int):
+        with open(self.part_path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = f.read(min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                self._sha256.update(block)
+                remaining -= len(block)
+    
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
 
 class UpdateDownloader:
     """Handles downloading and verifying update files."""
     
-    def __init__(self):
-        self._updates_dir = Path(USER_DATA_DIR) / UPDATES_DIR_NAME
+    def __init__(
+        self,
+        updates_dir: Optional[Path] = None,
+        segments: int = UPDATE_DOWNLOAD_SEGMENTS,
+        max_bytes_per_second: int = UPDATE_DOWNLOAD_MAX_BYTES_PER_SECOND
+    ):
+        """
+        Initialize update downloader.
+        
+        Args:
+            updates_dir: Download directory (defaults to USER_DATA_DIR/updates)
+            segments: Number of parallel range segments
+            max_bytes_per_second: Bandwidth cap across all segments (0 for unlimited)
+        """
+        self._updates_dir = Path(updates_dir) if updates_dir else Path(USER_DATA_DIR) / UPDATES_DIR_NAME
         self._updates_dir.mkdir(parents=True, exist_ok=True)
+        self.segments = max(1, segments)
+        self.max_bytes_per_second = max_bytes_per_second
+    
+    def _get_download_path(self, version: str) -> Path:
+        """Get the final file path for a version."""
+        # Determine file extension based on platform
+        system = platform.system()
+        if system == "Windows":
+            ext = ".exe"
+        elif system == "Darwin":
+            ext = ".dmg"
+        else:
+            ext = ""
+        
+        filename = f"TelegramUserTracking-v{version}{ext}"
+        return self._updates_dir / filename
     
     async def download_update(
         self,
         url: str,
         version: str,
         expected_checksum: Optional[str] = None,
-        expected_size: Optional[int] = None
+        expected_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Optional[Path]:
         """
         Download update file.
@@ -45,31 +230,25 @@ class UpdateDownloader:
             version: Version string
             expected_checksum: Expected SHA256 checksum
             expected_size: Expected file size in bytes
+            progress_callback: Optional callback(downloaded_bytes, total_bytes)
         
         Returns:
-            Path to downloaded file or None if failed
+            Path to downloaded file or None if failed (a partial download is
+            kept and resumed on the next call)
         """
-        if not REQUESTS_AVAILABLE:
-            logger.error("requests library not available for downloading updates")
+        if not HTTPX_AVAILABLE:
+            logger.error("httpx library not available for downloading updates")
             return None
         
+        download_path = self._get_download_path(version)
+        part_path = download_path.with_name(download_path.name + ".part")
+        map_path = download_path.with_name(download_path.name + ".part.json")
+        
         try:
-            # Determine file extension based on platform
-            system = platform.system()
-            if system == "Windows":
-                ext = ".exe"
-            elif system == "Darwin":
-                ext = ".dmg"
-            else:
-                ext = ""
-            
-            filename = f"TelegramUserTracking-v{version}{ext}"
-            download_path = self._updates_dir / filename
-            
             # Skip if already downloaded and verified
             if download_path.exists():
                 if expected_checksum:
-                    if self.verify_checksum(download_path, expected_checksum):
+                    if await asyncio.to_thread(self.verify_checksum, download_path, expected_checksum):
                         logger.info(f"Update already downloaded: {download_path}")
                         return download_path
                     else:
@@ -79,42 +258,202 @@ class UpdateDownloader:
             
             logger.info(f"Downloading update from {url}")
             
-            # Download file
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            # Check file size if provided
-            if expected_size:
-                content_length = response.headers.get('Content-Length')
-                if content_length and int(content_length) != expected_size:
-                    logger.warning(
-                        f"File size mismatch: expected {expected_size}, got {content_length}"
+            timeout = httpx.Timeout(30.0, read=60.0)
+            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+                size, validator, accepts_ranges = await self._probe(client, url)
+                
+                if expected_size and size and size != expected_size:
+                    logger.warning(f"File size mismatch: expected {expected_size}, got {size}")
+                
+                limiter = _RateLimiter(self.max_bytes_per_second)
+                if size and accepts_ranges:
+                    checksum = await self._download_segmented(
+                        client, url, size, validator, part_path, map_path, limiter, progress_callback
+                    )
+                else:
+                    checksum = await self._download_single(
+                        client, url, part_path, map_path, limiter, progress_callback
                     )
             
-            # Write file
-            total_size = 0
-            with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        total_size += len(chunk)
-            
-            logger.info(f"Downloaded {total_size} bytes to {download_path}")
+            if checksum is None:
+                return None
             
-            # Verify checksum if provided
+            # Verify checksum computed during the download
             if expected_checksum:
-                if not self.verify_checksum(download_path, expected_checksum):
-                    logger.error("Checksum verification failed")
-                    download_path.unlink()
+                if checksum.lower() != expected_checksum.lower():
+                    logger.error(f"Checksum verification failed: expected {expected_checksum}, got {checksum}")
+                    part_path.unlink(missing_ok=True)
+                    map_path.unlink(missing_ok=True)
                     return None
                 logger.info("Checksum verification passed")
             
+            os.replace(part_path, download_path)
+            map_path.unlink(missing_ok=True)
+            logger.info(f"Downloaded update to {download_path}")
             return download_path
-            
+        
         except Exception as e:
             logger.error(f"Error downloading update: {e}", exc_info=True)
             return None
     
+    async def _probe(self, client: "httpx.AsyncClient", url: str):
+        """
+        Get remote size, validator (ETag/Last-Modified) and range support.
+        
+        Returns:
+            Tuple of (size or None, validator or None, accepts_ranges)
+        """
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
+        async with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rsplit("/", 1)[-1]
+                if total.isdigit():
+                    return int(total), validator, True
+            length = response.headers.get("Content-Length")
+            return (int(length) if length and length.isdigit() else None), validator, False
+    
+    def _plan_segments(self, size: int) -> List[_Segment]:
+        """Split size bytes into up to self.segments ranges."""
+        count = max(1, min(self.segments, size // MIN_SEGMENT_SIZE))
+        segment_size = -(-size // count)
+        return [
+            _Segment(start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+    
+    async def _download_segmented(
+        self,
+        client: "httpx.AsyncClient",
+        url: str,
+        size: int,
+        validator: Optional[str],
+        part_path: Path,
+        map_path: Path,
+        limiter: _RateLimiter,
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Optional[str]:
+        """Download with parallel range requests, resuming from the segment map."""
+        state = None
+        if part_path.exists() and part_path.stat().st_size == size:
+            state = _DownloadState.load(map_path, url, size, validator)
+        if state is None:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+            state = _DownloadState(map_path, url, size, validator, self._plan_segments(size))
+            state.save()
+        else:
+            logger.info(f"Resuming update download at {state.downloaded}/{size} bytes")
+        
+        hasher = _StreamingHasher(part_path)
+        await hasher.catch_up(state)
+        
+        def report():
+            if progress_callback:
+                try:
+                    progress_callback(state.downloaded, size)
+                except Exception as e:
+                    logger.debug(f"Error in download progress callback: {e}")
+        
+        async def run_segment(segment: _Segment):
+            delay = SEGMENT_RETRY_DELAY
+            for attempt in range(SEGMENT_MAX_RETRIES + 1):
+                try:
+                    await self._fetch_segment(client, url, segment, part_path, state, hasher, limiter, report)
+                    return
+                except (httpx.HTTPError, OSError) as e:
+                    state.save()
+                    if attempt >= SEGMENT_MAX_RETRIES:
+                        raise
+                    logger.warning(f"Segment {segment.start}-{segment.end} failed ({e}), retrying in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        
+        # Let healthy segments finish even if one fails, so a retry resumes with less to fetch
+        pending = [segment for segment in state.segments if not segment.complete]
+        results = await asyncio.gather(*(run_segment(segment) for segment in pending), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            state.save()
+            logger.error(f"Update download interrupted at {state.downloaded}/{size} bytes: {errors[0]}")
+            return None
+        
+        state.save()
+        await hasher.catch_up(state)
+        report()
+        return hasher.hexdigest()
+    
+    async def _fetch_segment(
+        self,
+        client: "httpx.AsyncClient",
+        url: str,
+        segment: _Segment,
+        part_path: Path,
+        state: _DownloadState,
+        hasher: _StreamingHasher,
+        limiter: _RateLimiter,
+        report: Callable[[], None]
+    ):
+        """Fetch the remaining bytes of one segment into the .part file."""
+        if segment.complete:
+            return
+        headers = {"Range": f"bytes={segment.offset}-{segment.end}", "Accept-Encoding": "identity"}
+        async with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise httpx.HTTPError(f"Server ignored range request (status {response.status_code})")
+            
+            unsaved = 0
+            with open(part_path, "r+b") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    chunk = chunk[:segment.end - segment.offset + 1]
+                    if not chunk:
+                        break
+                    await limiter.consume(len(chunk))
+                    offset = segment.offset
+                    f.seek(offset)
+                    f.write(chunk)
+                    f.flush()
+                    segment.done += len(chunk)
+                    await hasher.feed(offset, chunk, state)
+                    unsaved += len(chunk)
+                    if unsaved >= SEGMENT_MAP_SAVE_INTERVAL:
+                        state.save()
+                        unsaved = 0
+                        report()
+        
+        if not segment.complete:
+            raise httpx.HTTPError(f"Segment {segment.start}-{segment.end} ended early at {segment.offset}")
+    
+    async def _download_single(
+        self,
+        client: "httpx.AsyncClient",
+        url: str,
+        part_path: Path,
+        map_path: Path,
+        limiter: _RateLimiter,
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> Optional[str]:
+        """Download without range support (one stream, not resumable)."""
+        map_path.unlink(missing_ok=True)
+        sha256_hash = hashlib.sha256()
+        total_size = 0
+        async with client.stream("GET", url, headers={"Accept-Encoding": "identity"}) as response:
+            response.raise_for_status()
+            length = int(response.headers.get("Content-Length") or 0)
+            with open(part_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await limiter.consume(len(chunk))
+                    f.write(chunk)
+                    sha256_hash.update(chunk)
+                    total_size += len(chunk)
+                    if progress_callback:
+                        progress_callback(total_size, length or total_size)
+        logger.info(f"Downloaded {total_size} bytes to {part_path}")
+        return sha256_hash.hexdigest()
+    
     def verify_checksum(self, file_path: Path, expected_checksum: str) -> bool:
         """
         Verify file SHA256 checksum.
@@ -129,7 +468,7 @@ class UpdateDownloader:
         try:
             sha256_hash = hashlib.sha256()
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
                     sha256_hash.update(chunk)
             
             actual_checksum = sha256_hash.hexdigest()
@@ -144,4 +483,3 @@ class UpdateDownloader:
         except Exception as e:
             logger.error(f"Error verifying checksum: {e}")
             return False
-
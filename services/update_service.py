@@ -120,21 +120,25 @@ class UpdateService:
         url: str,
         version: str,
         expected_checksum: Optional[str] = None,
-        expected_size: Optional[int] = None
+        expected_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> Optional[Path]:
         """
-        Download update file.
+        Download update file (resumes a previously interrupted download).
         
         Args:
             url: Download URL
             version: Version string
             expected_checksum: Expected SHA256 checksum
             expected_size: Expected file size in bytes
+            progress_callback: Optional callback(downloaded_bytes, total_bytes)
         
         Returns:
             Path to downloaded file or None if failed
         """
-        return await self.downloader.download_update(url, version, expected_checksum, expected_size)
+        return await self.downloader.download_update(
+            url, version, expected_checksum, expected_size, progress_callback
+        )
     
     def verify_checksum(self, file_path: Path, expected_checksum: str) -> bool:
         """
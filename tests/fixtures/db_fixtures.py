@@ -7,6 +7,8 @@ import tempfile
 from pathlib import Path
 from typing import Optional
 from database.managers.db_manager import DatabaseManager
+from database.db_writer import close_db_writer
+from database.read_snapshot import close_read_connections
 from database.models.schema import CREATE_TABLES_SQL
 
 
@@ -57,6 +59,8 @@ def cleanup_temp_db(db_path: str):
     """
     try:
         if db_path and db_path != ":memory:":
+            close_db_writer(db_path)
+            close_read_connections(db_path)
             path = Path(db_path)
             if path.exists():
                 path.unlink()
@@ -0,0 +1,66 @@
+"""
+Integration tests for the admin user list against the Firebase emulators.
+
+Run with the Auth and Firestore emulators started, e.g.
+FIREBASE_AUTH_EMULATOR_HOST=localhost:9099 FIRESTORE_EMULATOR_HOST=localhost:8080
+"""
+
+import os
+import uuid
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not (os.getenv("FIRESTORE_EMULATOR_HOST") and os.getenv("FIREBASE_AUTH_EMULATOR_HOST")),
+    reason="Firebase Auth and Firestore emulators not configured"
+)
+
+
+class TestAdminUsersEmulator:
+    """Exercise the batched license/scheduled deletion join end to end."""
+
+    @pytest.fixture
+    def service(self):
+        from admin.config.admin_config import admin_config
+        from admin.services.admin_user_service import AdminUserService
+        assert admin_config.initialize()
+        return AdminUserService()
+
+    @pytest.fixture
+    def users(self, service):
+        from admin.utils.constants import (
+            FIRESTORE_SCHEDULED_DELETIONS_COLLECTION,
+            FIRESTORE_USER_LICENSES_COLLECTION,
+        )
+        service._ensure_initialized()
+        run = uuid.uuid4().hex[:8]
+        uids = [f"emu-{run}-{i}" for i in range(5)]
+        for i, uid in enumerate(uids):
+            service._auth.create_user(uid=uid, email=f"{uid}@example.com")
+            if i % 2 == 0:
+                service._db.collection(FIRESTORE_USER_LICENSES_COLLECTION).document(uid).set({"tier": "gold"})
+        service._db.collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION).document(uids[1]).set(
+            {"deletion_date": "2030-01-01T00:00:00Z"}
+        )
+        yield uids
+        service._auth.delete_users(uids)
+        for uid in uids:
+            service._db.collection(FIRESTORE_USER_LICENSES_COLLECTION).document(uid).delete()
+            service._db.collection(FIRESTORE_SCHEDULED_DELETIONS_COLLECTION).document(uid).delete()
+
+    def test_pages_join_licenses_and_deletions(self, service, users):
+        rows, token = [], None
+        while True:
+            page, token = service.get_users_page(page_token=token, page_size=2)
+            rows.extend(page)
+            if not token:
+                break
+
+        by_uid = {row["uid"]: row for row in rows if row["uid"] in users}
+        assert set(by_uid) == set(users)
+        assert [by_uid[uid]["license_tier"] for uid in users] == ["gold", "none", "gold", "none", "gold"]
+        assert by_uid[users[1]]["scheduled_deletion_date"] == "2030-01-01T00:00:00Z"
+
+        # Rows are copies: editing one doesn't change what the join cache returns next
+        by_uid[users[1]]["scheduled_deletion"]["deletion_date"] = "edited"
+        again = {row["uid"]: row for row in service.get_all_users()}
+        assert again[users[1]]["scheduled_deletion_date"] == "2030-01-01T00:00:00Z"
@@ -0,0 +1,63 @@
+"""
+Unit tests for activity heatmaps and time series.
+"""
+
+from datetime import datetime
+import numpy as np
+import pytest
+from database.models.message import Message
+from services.activity_analytics_service import ActivityAnalyticsService
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestActivityAnalytics:
+    """Test SQL binning and the derived NumPy series."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        sent = [
+            (7, datetime(2025, 3, 3, 9)),   # Monday
+            (7, datetime(2025, 3, 3, 9)),
+            (7, datetime(2025, 3, 5, 22)),  # Wednesday
+            (7, datetime(2025, 3, 10, 9)),  # next Monday
+            (8, datetime(2025, 3, 4, 13)),
+        ]
+        db_manager.save_messages_with_tags([
+            Message(message_id=i, group_id=-100, user_id=user_id, content="hi", date_sent=date_sent)
+            for i, (user_id, date_sent) in enumerate(sent, 1)
+        ])
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_daily_series_and_heatmap(self, db_manager):
+        series = ActivityAnalyticsService(db_manager).get_activity_series('user', utc_offset_minutes=0)
+
+        assert series.ids.tolist() == [7, 8]
+        assert series.days[0] == np.datetime64('2025-03-03') and series.days.size == 8
+        assert series.daily[0].tolist() == [2, 0, 1, 0, 0, 0, 0, 1]
+        assert series.heatmap[0, 0, 9] == 3 and series.heatmap[0, 2, 22] == 1
+        assert series.heatmap[1].sum() == 1 and series.heatmap[1, 1, 13] == 1
+
+    def test_weekly_rolling_and_limit(self, db_manager):
+        service = ActivityAnalyticsService(db_manager)
+        series = service.get_activity_series('user', utc_offset_minutes=0)
+
+        week_starts, weekly = series.weekly()
+        assert week_starts.tolist() == [np.datetime64('2025-03-03').item(), np.datetime64('2025-03-10').item()]
+        assert weekly.tolist() == [[3, 1], [1, 0]]
+        assert series.rolling_mean(2)[0, :3].tolist() == [2.0, 1.0, 0.5]
+
+        top = service.get_activity_series('user', limit=1, utc_offset_minutes=0)
+        assert top.ids.tolist() == [7] and top.totals.tolist() == [4]
+        groups = service.get_activity_series(
+            'group', start_date=datetime(2025, 3, 1), end_date=datetime(2025, 3, 31), utc_offset_minutes=0
+        )
+        assert groups.ids.tolist() == [-100] and groups.days.size == 31 and groups.totals.tolist() == [5]
+
+    def test_bins_in_the_given_time_zone(self, db_manager):
+        series = ActivityAnalyticsService(db_manager).get_activity_series('user', ids=[7], utc_offset_minutes=120)
+
+        # Monday 09:00 UTC is 11:00 local; Wednesday 22:00 UTC is already Thursday 00:00
+        assert series.heatmap[0, 0, 11] == 3 and series.heatmap[0, 3, 0] == 1
+        assert series.daily[0].tolist() == [2, 0, 0, 1, 0, 0, 0, 1]
@@ -0,0 +1,142 @@
+"""
+Unit tests for the incremental admin analytics snapshot.
+"""
+
+import threading
+import time
+import pytest
+from admin.services import admin_analytics_service as analytics_module
+from admin.services.admin_analytics_service import AdminAnalyticsService
+
+
+class _Ref:
+    def __init__(self, db, doc_id):
+        self._db, self.id, self.path = db, doc_id, f"user_licenses/{doc_id}"
+
+
+class _Doc:
+    def __init__(self, db, doc_id):
+        self._db, self.id, self.reference = db, doc_id, _Ref(db, doc_id)
+
+    def to_dict(self):
+        return dict(self._db.licenses[self.id])
+
+
+class _Batch:
+    def __init__(self, db):
+        self._db, self._ops = db, []
+
+    def update(self, ref, data):
+        self._ops.append((ref.id, data))
+
+    def commit(self):
+        for doc_id, data in self._ops:
+            self._db.licenses[doc_id].update(data)
+
+
+class _Query:
+    def __init__(self, db, filters=()):
+        self._db, self._filters = db, filters
+
+    def where(self, field, op, value):
+        assert op == ">"
+        return _Query(self._db, self._filters + ((field, value),))
+
+    def stream(self):
+        self._db.queries.append(self._filters)
+        return iter([
+            _Doc(self._db, doc_id) for doc_id, data in list(self._db.licenses.items())
+            if all(data.get(field) is not None and data[field] > value for field, value in self._filters)
+        ])
+
+
+class _FakeDb:
+    def __init__(self):
+        self.licenses = {}
+        self.queries = []
+
+    def collection(self, name):
+        assert name == "user_licenses"
+        return _Query(self)
+
+    def collection_group(self, name):
+        return type("_EmptyQuery", (), {"stream": lambda self: iter([]), "where": lambda self, *a: self})()
+
+    def batch(self):
+        return _Batch(self)
+
+
+class _FakeConfig:
+    def __init__(self, db):
+        self._db = db
+        self._auth = type("_Auth", (), {
+            "list_users": lambda self, max_results: type("_Page", (), {"users": [], "get_next_page": lambda self: None})()
+        })()
+
+    def is_initialized(self):
+        return True
+
+    def get_firestore(self):
+        return self._db
+
+    def get_auth(self):
+        return self._auth
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    db = _FakeDb()
+    monkeypatch.setattr(analytics_module, "admin_config", _FakeConfig(db))
+    service = AdminAnalyticsService(snapshot_path=str(tmp_path / "snapshot.json"))
+    monkeypatch.setattr(service, "_list_tier_keys", lambda: ["gold", "silver"])
+    return service, db
+
+
+class TestAnalyticsSnapshot:
+
+    def test_incremental_refresh_reads_only_changed_licenses(self, service):
+        service, db = service
+        db.licenses["a"] = {"tier": "gold", "updated_at": "2025-01-01T00:00:00Z"}
+        db.licenses["b"] = {"tier": "silver"}  # written without updated_at
+
+        snapshot = service.refresh_snapshot(full=True)
+        assert snapshot["license_stats"]["by_tier"] == {"gold": 1, "silver": 1}
+        # The license without updated_at was backfilled so incremental queries can see it
+        backfilled = db.licenses["b"]["updated_at"]
+        assert backfilled > "2025-01-01T00:00:00Z"
+
+        db.licenses["b"].update(tier="gold", updated_at="2099-01-01T00:00:00Z")
+        db.queries.clear()
+        snapshot = service.refresh_snapshot()
+
+        assert db.queries == [(("updated_at", backfilled),)]
+        assert snapshot["license_stats"]["by_tier"] == {"gold": 2, "silver": 0}
+
+        # The persisted snapshot survives a restart
+        restarted = AdminAnalyticsService(snapshot_path=str(service.snapshot_path))
+        assert restarted.get_cached_snapshot()["license_stats"]["total"] == 2
+
+    def test_discard_license_waits_for_refresh(self, service, monkeypatch):
+        service, db = service
+        db.licenses["a"] = {"tier": "gold", "updated_at": "2025-01-01T00:00:00Z"}
+        service.refresh_snapshot(full=True)
+
+        started = threading.Event()
+        seen_during_refresh = []
+        original = service._apply_incremental_changes
+
+        def slow_incremental(snapshot):
+            started.set()
+            time.sleep(0.2)
+            seen_during_refresh.append("a" in snapshot["licenses"])
+            original(snapshot)
+
+        monkeypatch.setattr(service, "_apply_incremental_changes", slow_incremental)
+        refresh = threading.Thread(target=service.refresh_snapshot)
+        refresh.start()
+        started.wait(1)
+        service.discard_license("a")
+        refresh.join()
+
+        assert seen_during_refresh == [True]
+        assert service.get_cached_snapshot()["license_stats"]["total"] == 0
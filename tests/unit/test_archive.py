@@ -0,0 +1,58 @@
+"""
+Unit tests for archiving cold messages into per-year databases.
+"""
+
+from datetime import datetime
+import pytest
+from database.archive_store import archive_path
+from database.models.message import Message
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+_NOW = datetime(2025, 6, 1)
+
+
+class TestArchive:
+    """Test moving old messages to archives and reading them back."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        db_manager.save_messages_with_tags([
+            Message(message_id=i, group_id=-100, user_id=7, content=f"#old{i}",
+                    date_sent=date_sent, message_type="text")
+            for i, date_sent in ((1, datetime(2023, 3, 1)), (2, datetime(2023, 9, 1)), (3, datetime(2025, 5, 1)))
+        ])
+        yield db_manager
+        path = archive_path(db_manager.db_path, 2023)
+        for suffix in ('', '-wal', '-shm'):
+            path.with_name(path.name + suffix).unlink(missing_ok=True)
+        if path.parent.exists():
+            path.parent.rmdir()
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_old_rows_move_to_year_archive(self, db_manager):
+        assert db_manager.archive_old_data(older_than_days=365, now=_NOW) == {2023: 2}
+
+        with db_manager.get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM message_tags").fetchone()[0] == 1
+            period = conn.execute("SELECT year, message_count FROM archive_periods").fetchone()
+        assert tuple(period) == (2023, 2)
+        assert archive_path(db_manager.db_path, 2023).exists()
+
+        # Nothing left to move
+        assert db_manager.archive_old_data(older_than_days=365, now=_NOW) == {}
+
+    def test_reads_include_archived_range(self, db_manager):
+        db_manager.archive_old_data(older_than_days=365, now=_NOW)
+
+        in_2023 = db_manager.get_messages(start_date=datetime(2023, 1, 1), end_date=datetime(2023, 12, 31))
+        assert [m.message_id for m in in_2023] == [2, 1]
+        assert in_2023[0].content == "#old2"
+        assert [m.message_id for m in db_manager.get_messages()] == [3, 2, 1]
+        assert db_manager.get_message_count() == 3
+
+        # A recent range reads the hot database only
+        recent = db_manager.get_messages(start_date=datetime(2025, 1, 1), columns=['message_id'])
+        assert [m.message_id for m in recent] == [3]
+        assert db_manager._archives_for((datetime(2025, 1, 1), None)) == ()
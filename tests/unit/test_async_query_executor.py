@@ -0,0 +1,104 @@
+"""
+Unit tests for AsyncQueryExecutor lanes, single-flight and cancellation.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import pytest
+from database.async_query_executor import async_query_executor, register_connection, QueryPriority
+
+
+class TestAsyncQueryExecutor:
+    """Test priority lanes, deduplication and query interruption."""
+
+    def test_identical_calls_share_one_execution(self):
+        calls = []
+        release = threading.Event()
+
+        def query(group_id):
+            calls.append(group_id)
+            release.wait(5)
+            return group_id * 2
+
+        async def scenario():
+            first = asyncio.ensure_future(async_query_executor.execute(query, 7, dedupe=True))
+            second = asyncio.ensure_future(async_query_executor.execute(query, 7, dedupe=True))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        assert asyncio.run(scenario()) == [14, 14]
+        assert calls == [7]
+
+    def test_bulk_lane_does_not_block_interactive(self):
+        release = threading.Event()
+
+        async def scenario():
+            bulk = asyncio.ensure_future(
+                async_query_executor.execute(release.wait, 5, priority=QueryPriority.BULK)
+            )
+            await asyncio.sleep(0.05)
+            result = await asyncio.wait_for(async_query_executor.execute(lambda: "fast"), timeout=2)
+            release.set()
+            await bulk
+            return result
+
+        assert asyncio.run(scenario()) == "fast"
+
+    def test_calls_are_not_deduplicated_by_default(self):
+        calls = []
+
+        async def scenario():
+            await asyncio.gather(
+                async_query_executor.execute(calls.append, 1),
+                async_query_executor.execute(calls.append, 1)
+            )
+
+        asyncio.run(scenario())
+        assert calls == [1, 1]
+
+    @pytest.mark.parametrize("cancel_before_statement", [False, True])
+    def test_cancel_interrupts_query(self, cancel_before_statement):
+        registered = threading.Event()
+        go = threading.Event()
+        finished = threading.Event()
+        outcome = {}
+
+        def slow_query():
+            conn = sqlite3.connect(":memory:")
+            register_connection(conn)
+            registered.set()
+            if cancel_before_statement:
+                # cancel() lands before the statement starts
+                go.wait(5)
+            try:
+                conn.execute("""
+                    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n)
+                    SELECT count(*) FROM n
+                """).fetchone()
+                outcome['error'] = None
+            except sqlite3.OperationalError as e:
+                outcome['error'] = e
+            finally:
+                conn.close()
+                finished.set()
+
+        async def scenario():
+            # BULK has a single worker, so the follow-up call needs the interrupted one to return
+            task = asyncio.ensure_future(
+                async_query_executor.execute(slow_query, priority=QueryPriority.BULK)
+            )
+            await asyncio.get_running_loop().run_in_executor(None, registered.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            go.set()
+            return await asyncio.wait_for(
+                async_query_executor.execute(lambda: "done", priority=QueryPriority.BULK),
+                timeout=5
+            )
+
+        assert asyncio.run(scenario()) == "done"
+        assert finished.is_set()
+        assert isinstance(outcome['error'], sqlite3.OperationalError)
@@ -0,0 +1,53 @@
+"""
+Unit tests for avatar rendering and caching.
+"""
+
+import os
+import pytest
+from PIL import Image
+from services.avatar_render_service import AvatarRenderService, avatar_render_service, render_gradient
+from services.export.exporters.certificate_exporter import CertificateExporter
+
+
+class TestAvatarRender:
+    """Test gradient rendering, the avatar caches and batch certificate export."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return AvatarRenderService(cache_dir=tmp_path / "avatars", workers=2)
+
+    def test_gradient_matches_column_interpolation(self):
+        img = render_gradient(50, "#60A5FA", "#A78BFA")
+        for x in (0, 17, 49):
+            ratio = x / 50
+            expected = tuple(int(a + (b - a) * ratio) for a, b in zip((0x60, 0xA5, 0xFA), (0xA7, 0x8B, 0xFA)))
+            assert img.getpixel((x, 0)) == img.getpixel((x, 49)) == expected
+
+    def test_avatars_are_cached_by_photo_mtime(self, service, tmp_path):
+        photo = tmp_path / "photo.png"
+        Image.new('RGB', (400, 400), (200, 10, 10)).save(photo)
+        user = {'user_id': 7, 'full_name': "Ann", 'profile_photo_path': str(photo)}
+
+        first = service.get_avatar(user, size=64)
+        assert first.getpixel((32, 32)) == (200, 10, 10) and first.getpixel((0, 0)) == (255, 255, 255)
+        assert len(list((tmp_path / "avatars").glob("*.png"))) == 1
+
+        # A new instance (empty memory cache) reads the rendered PNG from disk
+        fresh = AvatarRenderService(cache_dir=tmp_path / "avatars")
+        fresh._render = None
+        assert fresh.get_avatar(user, size=64).getpixel((32, 32)) == (200, 10, 10)
+
+        Image.new('RGB', (400, 400), (10, 10, 200)).save(photo)
+        os.utime(photo, ns=(1, 10 ** 18))
+        assert service.get_avatar(user, size=64).getpixel((32, 32)) == (10, 10, 200)
+
+    def test_export_many(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(avatar_render_service, "cache_dir", tmp_path / "avatars")
+        users = [{'user_id': i, 'full_name': name, 'message_count': 10 - i}
+                 for i, name in enumerate(["Ann", "Bo", "Cy", "Di", "Ed"])]
+        certificates = [
+            {'users': users, 'output_path': str(tmp_path / f"group_{i}.png"), 'group_name': f"Group {i}"}
+            for i in range(3)
+        ]
+        assert CertificateExporter().export_many(certificates, format_type='image') == [True] * 3
+        assert all(os.path.exists(c['output_path']) for c in certificates)
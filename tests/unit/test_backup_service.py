@@ -0,0 +1,165 @@
+"""
+Unit tests for the streamed Firebase backup (NDJSON spools and incremental watermarks).
+"""
+
+import hashlib
+import json
+import zipfile
+import pytest
+from admin.services import admin_backup_service as backup_module
+from admin.services.admin_backup_service import AdminBackupService, _NdjsonSpool
+
+
+class _Ref:
+    def __init__(self, doc_id, collection_id):
+        self.id = doc_id
+        self.parent = type("_CollectionRef", (), {"id": collection_id, "parent": None})()
+
+
+class _Doc:
+    def __init__(self, collection_id, doc_id, data):
+        self.id = doc_id
+        self.reference = _Ref(doc_id, collection_id)
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Query:
+    """Collection query supporting the where/order_by/limit/start_after calls the backup makes."""
+
+    def __init__(self, db, name, filters=(), order=(), limit=None, after=None):
+        self.db, self.name = db, name
+        self.filters, self.order, self._limit, self.after = filters, order, limit, after
+
+    def _copy(self, **changes):
+        args = dict(filters=self.filters, order=self.order, limit=self._limit, after=self.after)
+        args.update(changes)
+        return _Query(self.db, self.name, **args)
+
+    def where(self, field, op, value):
+        assert op == ">"
+        return self._copy(filters=self.filters + ((field, value),))
+
+    def order_by(self, field):
+        return self._copy(order=self.order + (field,))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, doc):
+        return self._copy(after=doc)
+
+    def _key(self, doc):
+        return tuple(doc.id if field == "__name__" else doc.to_dict()[field] for field in self.order)
+
+    def stream(self):
+        if self.name in self.db.failing:
+            raise RuntimeError("permission denied")
+        self.db.queries.append((self.name, self.filters))
+        docs = [
+            doc for doc in self.db.collections.get(self.name, [])
+            if all(field in doc.to_dict() and doc.to_dict()[field] > value for field, value in self.filters)
+        ]
+        docs.sort(key=self._key)
+        if self.after is not None:
+            docs = [doc for doc in docs if self._key(doc) > self._key(self.after)]
+        return iter(docs[:self._limit])
+
+
+class _FakeDb:
+    def __init__(self):
+        self.collections = {}
+        self.failing = set()
+        self.queries = []
+
+    def add(self, name, doc_id, **data):
+        self.collections.setdefault(name, []).append(_Doc(name, doc_id, data))
+
+    def collection(self, name):
+        return _Query(self, name)
+
+    def collection_group(self, name):
+        return _Query(self, f"group:{name}")
+
+
+class _FakeAuth:
+    def list_users(self, max_results):
+        return type("_Page", (), {"users": [], "get_next_page": lambda self: None})()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = AdminBackupService()
+    service._db = _FakeDb()
+    service._auth = _FakeAuth()
+    monkeypatch.setattr(service, "_ensure_initialized", lambda: True)
+    monkeypatch.setattr(backup_module, "BACKUP_PAGE_SIZE", 2)
+    return service
+
+
+def _read_entry(path, name):
+    with zipfile.ZipFile(path) as zipf:
+        return [json.loads(line) for line in zipf.read(name).decode("utf-8").splitlines()]
+
+
+class TestNdjsonSpool:
+
+    def test_tracks_count_bytes_and_checksum(self, tmp_path):
+        spool = _NdjsonSpool(tmp_path / "spool.ndjson")
+        spool.write({"_id": "a", "name": "Ünï"})
+        spool.write({"_id": "b", "tags": [1, 2]})
+        spool.close()
+
+        content = (tmp_path / "spool.ndjson").read_bytes()
+        assert [json.loads(line) for line in content.splitlines()] == [
+            {"_id": "a", "name": "Ünï"}, {"_id": "b", "tags": [1, 2]}
+        ]
+        assert spool.count == 2
+        assert spool.bytes == len(content)
+        assert spool.checksum == hashlib.sha256(content).hexdigest()
+
+
+class TestBackupWatermarks:
+
+    def test_full_then_incremental_backup(self, service, tmp_path):
+        db = service._db
+        for i in range(5):
+            db.add("user_licenses", f"u{i}", updated_at=f"2025-01-0{i + 1}T00:00:00Z")
+        db.add("notifications", "n1", title="hi")
+
+        full_path = tmp_path / "firebase_backup_1.zip"
+        success, metadata = service.backup_all_collections(str(full_path))
+        assert success and metadata["mode"] == "full"
+        assert len(_read_entry(full_path, "user_licenses.ndjson")) == 5
+        assert service.read_backup_watermarks(str(full_path)) == {"user_licenses": "2025-01-05T00:00:00Z"}
+
+        db.add("user_licenses", "u9", updated_at="2025-02-01T00:00:00Z")
+        db.queries.clear()
+        since = service.read_backup_watermarks(str(full_path))
+        incremental_path = tmp_path / "firebase_backup_2.zip"
+        success, metadata = service.backup_all_collections(str(incremental_path), since=since)
+
+        assert success and metadata["mode"] == "incremental"
+        assert [doc["_id"] for doc in _read_entry(incremental_path, "user_licenses.ndjson")] == ["u9"]
+        # Filtered server-side; collections without updated_at are still backed up in full
+        assert ("user_licenses", (("updated_at", "2025-01-05T00:00:00Z"),)) in db.queries
+        assert len(_read_entry(incremental_path, "notifications.ndjson")) == 1
+        assert metadata["watermarks"] == {"user_licenses": "2025-02-01T00:00:00Z"}
+
+    def test_failed_collection_keeps_previous_watermark(self, service, tmp_path):
+        db = service._db
+        db.add("user_licenses", "u1", updated_at="2025-03-01T00:00:00Z")
+        db.add("license_tiers", "t1", updated_at="2025-03-01T00:00:00Z")
+        db.failing.add("license_tiers")
+
+        since = {"user_licenses": "2025-01-01T00:00:00Z", "license_tiers": "2025-01-01T00:00:00Z"}
+        success, metadata = service.backup_all_collections(str(tmp_path / "backup.zip"), since=since)
+
+        assert success
+        assert metadata["collections"]["license_tiers"]["status"] == "error"
+        assert metadata["watermarks"] == {
+            "user_licenses": "2025-03-01T00:00:00Z",
+            "license_tiers": "2025-01-01T00:00:00Z",
+        }
@@ -0,0 +1,84 @@
+"""
+Unit tests for the admin Firestore bulk writer.
+"""
+
+from google.api_core import exceptions as gexc
+from admin.utils import bulk_writer
+from admin.utils.bulk_writer import FirestoreBulkWriter
+
+
+class _FakeRef:
+    def __init__(self, path: str):
+        self.path = path
+
+
+class _FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(ref.path)
+
+    def update(self, ref, data):
+        self._ops.append(ref.path)
+
+    def delete(self, ref):
+        self._ops.append(ref.path)
+
+    def commit(self):
+        self._db.commit_sizes.append(len(self._ops))
+        if self._db.transient_failures:
+            self._db.transient_failures -= 1
+            raise gexc.Aborted("contention")
+        if any(path in self._db.missing for path in self._ops):
+            raise gexc.NotFound("missing document")
+        self._db.written.extend(self._ops)
+
+
+class _FakeDb:
+    def __init__(self, missing=(), transient_failures=0):
+        self.missing = set(missing)
+        self.transient_failures = transient_failures
+        self.commit_sizes = []
+        self.written = []
+
+    def batch(self):
+        return _FakeBatch(self)
+
+
+class TestFirestoreBulkWriter:
+    """Test chunking, retry and failure isolation."""
+
+    def test_chunks_at_batch_limit_and_reports_progress(self):
+        db = _FakeDb()
+        progress = []
+        writer = FirestoreBulkWriter(db, progress_callback=lambda done, total: progress.append((done, total)))
+        for i in range(1200):
+            writer.update(_FakeRef(f"licenses/{i}"), {"max_groups": 5})
+
+        result = writer.commit()
+
+        assert (result.total, result.succeeded, result.failed) == (1200, 1200, 0)
+        assert sorted(db.commit_sizes) == [200, 500, 500]
+        assert progress[-1] == (1200, 1200)
+        assert writer.pending_count == 0
+
+    def test_retries_contention(self, monkeypatch):
+        monkeypatch.setattr(bulk_writer.time, "sleep", lambda _: None)
+        db = _FakeDb(transient_failures=2)
+        writer = FirestoreBulkWriter(db)
+        writer.delete(_FakeRef("a/1"))
+
+        assert writer.commit().succeeded == 1
+
+    def test_permanent_failure_isolated_to_one_write(self):
+        db = _FakeDb(missing={"licenses/3"})
+        writer = FirestoreBulkWriter(db, batch_size=10)
+        for i in range(10):
+            writer.update(_FakeRef(f"licenses/{i}"), {})
+
+        result = writer.commit()
+
+        assert result.succeeded == 9
+        assert result.failed_paths == ["licenses/3"]
@@ -0,0 +1,63 @@
+"""
+Unit tests for the Parquet/Arrow columnar exporter.
+"""
+
+from datetime import datetime
+import pytest
+from database.models.message import Message
+from database.models.telegram import TelegramUser
+from services.export.exporters.columnar_exporter import ColumnarExporter
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class TestColumnarExporter:
+    """Test batched, dictionary-encoded and partitioned columnar export."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        db_manager.save_user(TelegramUser(user_id=7, full_name="Alice"))
+        messages = [
+            Message(message_id=i, group_id=group_id, user_id=7, content=f"post {i} #news",
+                    date_sent=datetime(2025, month, 1, 12), message_type="text")
+            for i, (group_id, month) in enumerate([(-1, 1), (-1, 1), (-1, 2), (-2, 1), (-2, 3)], 1)
+        ]
+        db_manager.save_messages_with_tags(messages)
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_export_round_trips_in_batches(self, db_manager, tmp_path):
+        counts = ColumnarExporter(db_manager).export_tables(
+            str(tmp_path), 'parquet', tables=['messages', 'telegram_users'], batch_rows=2
+        )
+
+        assert counts == {'messages': 5, 'telegram_users': 1}
+        table = pq.read_table(tmp_path / "messages.parquet")
+        assert sorted(table.column('content').to_pylist()) == [f"post {i} #news" for i in range(1, 6)]
+        assert pa.types.is_dictionary(table.schema.field('message_type').type)
+        group_chunk = pq.ParquetFile(tmp_path / "messages.parquet").metadata.row_group(0).column(1)
+        assert group_chunk.path_in_schema == 'group_id' and group_chunk.dictionary_page_offset is not None
+        assert table.column('date_sent').type == pa.timestamp('ms')
+        assert pq.read_table(tmp_path / "telegram_users.parquet").column('full_name').to_pylist() == ["Alice"]
+
+    def test_partitioned_export_by_group_and_month(self, db_manager, tmp_path):
+        counts = ColumnarExporter(db_manager).export_tables(
+            str(tmp_path), 'arrow', tables=['messages', 'message_tags'], partition=True
+        )
+
+        assert counts == {'messages': 5, 'message_tags': 5}
+        parts = sorted(p.relative_to(tmp_path / "messages").as_posix() for p in (tmp_path / "messages").rglob("*.arrows"))
+        assert parts == [
+            "group=-1/month=2025-01/part-0.arrows",
+            "group=-1/month=2025-02/part-0.arrows",
+            "group=-2/month=2025-01/part-0.arrows",
+            "group=-2/month=2025-03/part-0.arrows",
+        ]
+        with pa.ipc.open_stream(tmp_path / "messages" / "group=-1" / "month=2025-01" / "part-0.arrows") as reader:
+            assert reader.read_all().column('message_id').to_pylist() == [1, 2]
+
+    def test_unknown_table_is_rejected(self, db_manager, tmp_path):
+        assert ColumnarExporter(db_manager).export_tables(str(tmp_path), tables=['app_settings']) is None
@@ -0,0 +1,112 @@
+"""
+Unit tests for the concurrent dashboard data loader.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+import pytest
+from services.dashboard_data_loader import DashboardDataLoader
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestDashboardDataLoader:
+    """Test progressive delivery and cancellation of dashboard queries."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_single_stat_matches_full_stats(self, db_manager):
+        stats = db_manager.get_dashboard_stats()
+
+        for key, value in stats.items():
+            assert db_manager.get_dashboard_stat(key) == value
+
+    @pytest.mark.asyncio
+    async def test_results_arrive_in_completion_order(self, db_manager, monkeypatch):
+        loader = DashboardDataLoader(db_manager)
+        monkeypatch.setattr(loader, "build_queries", lambda *args: {
+            "slow": lambda: time.sleep(0.3) or "slow",
+            "fast": lambda: "fast",
+        })
+        seen = []
+
+        assert await loader.load([], None, None, lambda key, value: seen.append(key))
+        assert seen == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_queries_overlap_on_one_snapshot(self, db_manager, monkeypatch):
+        loader = DashboardDataLoader(db_manager)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def query():
+            with db_manager.read_snapshot() as conn:
+                # Both queries must hold a reader of the snapshot at the same time
+                barrier.wait()
+                return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+        monkeypatch.setattr(loader, "build_queries", lambda *args: {"first": query, "second": query})
+        seen = {}
+
+        assert await loader.load([], None, None, seen.__setitem__)
+        assert seen == {"first": 0, "second": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancel_interrupts_running_statement(self, db_manager, monkeypatch):
+        loader = DashboardDataLoader(db_manager)
+        started = threading.Event()
+        errors = []
+
+        def endless():
+            with db_manager.read_snapshot() as conn:
+                started.set()
+                try:
+                    conn.execute(
+                        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+                    ).fetchone()
+                except sqlite3.OperationalError as e:
+                    errors.append(e)
+
+        monkeypatch.setattr(loader, "build_queries", lambda *args: {"stat": endless})
+
+        task = asyncio.ensure_future(loader.load([], None, None, lambda k, v: None))
+        assert await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        for _ in range(50):
+            if errors:
+                break
+            await asyncio.sleep(0.1)
+        assert len(errors) == 1
+
+    @pytest.mark.asyncio
+    async def test_new_load_supersedes_previous(self, db_manager, monkeypatch):
+        loader = DashboardDataLoader(db_manager)
+        monkeypatch.setattr(loader, "build_queries", lambda *args: {"stat": lambda: time.sleep(0.2) or args[0]})
+        seen = []
+
+        first = asyncio.ensure_future(loader.load(["old"], None, None, lambda k, v: seen.append(v)))
+        await asyncio.sleep(0.05)
+        assert await loader.load(["new"], None, None, lambda k, v: seen.append(v))
+
+        assert await first is False
+        assert seen == [["new"]]
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_load_propagates(self, db_manager, monkeypatch):
+        loader = DashboardDataLoader(db_manager)
+        monkeypatch.setattr(loader, "build_queries", lambda *args: {"stat": lambda: time.sleep(0.2)})
+
+        task = asyncio.ensure_future(loader.load([], None, None, lambda k, v: None))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert loader._tasks == []
@@ -0,0 +1,102 @@
+"""
+Unit tests for data change events and change-driven cache invalidation.
+"""
+
+import pytest
+from datetime import datetime
+from database.change_events import ChangeAction, DataChangeBus, DataChangeEvent, data_change_bus
+from database.models.message import Message
+from database.models.telegram import TelegramUser
+from services.page_cache_service import page_cache_service
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestDataChangeBus:
+    """Test the change event bus itself."""
+
+    def test_table_filter(self):
+        """Handlers only receive events for their tables."""
+        bus = DataChangeBus()
+        received = []
+        bus.subscribe(received.append, tables=['messages'])
+
+        bus.publish(DataChangeEvent(table='telegram_users'))
+        bus.publish(DataChangeEvent(table='messages', group_id=1))
+
+        assert [e.table for e in received] == ['messages']
+
+    def test_batch_coalesces_message_ranges(self):
+        """Events inside batch() are merged per table/action/group."""
+        bus = DataChangeBus()
+        received = []
+        bus.subscribe(received.append)
+
+        with bus.batch():
+            for message_id in (5, 2, 9):
+                bus.publish(DataChangeEvent(
+                    table='messages', group_id=1, message_id_min=message_id, message_id_max=message_id
+                ))
+            assert received == []
+
+        assert len(received) == 1
+        assert (received[0].message_id_min, received[0].message_id_max, received[0].count) == (2, 9, 3)
+
+    def test_bound_methods_are_weak(self):
+        """Discarded subscribers are dropped without unsubscribing."""
+        bus = DataChangeBus()
+
+        class Listener:
+            def on_change(self, event):
+                pass
+
+        listener = Listener()
+        bus.subscribe(listener.on_change)
+        assert bus.get_subscriber_count() == 1
+        del listener
+        assert bus.get_subscriber_count() == 0
+
+
+class TestManagerChangeEvents:
+    """Test that manager writes publish change events and invalidate the page cache."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    @pytest.fixture
+    def events(self):
+        received = []
+        handler = received.append
+        data_change_bus.subscribe(handler)
+        yield received
+        data_change_bus.unsubscribe(handler)
+
+    def test_save_and_delete_message_emit(self, db_manager, events):
+        message = Message(message_id=42, group_id=7, user_id=3, content="hi #tag", date_sent=datetime.now())
+        db_manager.save_message(message)
+        db_manager.soft_delete_message(42, 7)
+
+        message_events = [e for e in events if e.table == 'messages']
+        assert [e.action for e in message_events] == [ChangeAction.SAVED, ChangeAction.DELETED]
+        assert message_events[0].group_id == 7
+        assert message_events[0].covers_message(42)
+        assert any(e.table == 'message_tags' for e in events)
+
+    def test_save_user_emits(self, db_manager, events):
+        db_manager.save_user(TelegramUser(user_id=11, full_name="Test"))
+        assert any(e.table == 'telegram_users' and e.user_id == 11 for e in events)
+
+    def test_page_cache_invalidates_only_dependent_entries(self, db_manager):
+        page_cache_service.configure(enabled=True, default_ttl=300)
+        page_cache_service.set("page:test:group7", {"n": 1}, tables=['messages'], group_ids=[7])
+        page_cache_service.set("page:test:group8", {"n": 2}, tables=['messages'], group_ids=[8])
+        page_cache_service.set("page:test:ttl_only", {"n": 3})
+
+        db_manager.save_message(Message(message_id=1, group_id=7, user_id=3, date_sent=datetime.now()))
+
+        assert page_cache_service.get("page:test:group7") is None
+        assert page_cache_service.get("page:test:group8") == {"n": 2}
+        assert page_cache_service.get("page:test:ttl_only") == {"n": 3}
+        page_cache_service.clear("page:test")
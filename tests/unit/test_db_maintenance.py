@@ -0,0 +1,55 @@
+"""
+Unit tests for database maintenance tasks and the maintenance polling service.
+"""
+
+import asyncio
+from datetime import datetime
+import pytest
+from database.models.message import Message
+from services.fetch_state_manager import fetch_state_manager
+from services.polling.database_maintenance_service import DatabaseMaintenanceService
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestDatabaseMaintenance:
+    """Test checkpoint, vacuum, statistics and the maintenance log."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        db_manager.save_messages_with_tags([
+            Message(message_id=i, group_id=-100, user_id=7, content="x" * 2000,
+                    date_sent=datetime(2025, 1, 1), message_type="text")
+            for i in range(1, 301)
+        ])
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_checkpoint_and_incremental_vacuum(self, db_manager):
+        with db_manager.get_write_connection() as conn:
+            conn.execute("DELETE FROM messages")
+
+        stats = db_manager.get_storage_stats()
+        assert stats['auto_vacuum'] == 2 and stats['wal_bytes'] > 0 and stats['freelist_count'] > 0
+
+        assert db_manager.incremental_vacuum() == stats['freelist_count']
+        assert db_manager.checkpoint() is True
+        assert db_manager.get_storage_stats()['wal_bytes'] == 0
+        assert db_manager.optimize(full=True) and db_manager.quick_check()
+
+    def test_service_skips_fetch_and_logs_tasks(self, db_manager):
+        service = DatabaseMaintenanceService(db_manager, interval_seconds=60)
+        fetch_state_manager.start_fetch(group_id=-100)
+        try:
+            asyncio.run(service._poll())
+        finally:
+            fetch_state_manager.stop_fetch()
+        assert db_manager.get_storage_history() == []
+
+        asyncio.run(service._poll())
+
+        # After the fetch: checkpoint + optimize (which counts as the periodic one), then stats
+        tasks = [row['task'] for row in db_manager.get_storage_history()]
+        assert tasks == ['checkpoint', 'optimize', 'stats']
+        assert db_manager.get_last_maintenance('stats') is not None
+        assert db_manager.get_last_maintenance('analyze') is None
@@ -0,0 +1,116 @@
+"""
+Unit tests for the single-writer service.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import pytest
+from database import db_writer as writer_module
+from database.db_writer import DatabaseWriter
+from database.models.telegram import TelegramUser
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db, create_temp_db_file
+
+
+class TestDatabaseWriter:
+    """Test group commit, savepoint isolation, nesting and shutdown."""
+
+    @pytest.fixture
+    def writer(self):
+        db_path = create_temp_db_file()
+        writer = DatabaseWriter(db_path)
+        writer.run(lambda conn: conn.execute("CREATE TABLE items (value INTEGER UNIQUE)"))
+        yield writer
+        writer.close()
+        cleanup_temp_db(db_path)
+
+    @staticmethod
+    def _values(writer):
+        return writer.run(lambda conn: [row[0] for row in conn.execute("SELECT value FROM items ORDER BY value")])
+
+    def test_concurrent_writes_share_commits(self, writer):
+        gate = threading.Event()
+        first = writer.submit(lambda conn: gate.wait(5))
+
+        # Queued from several threads while the writer is busy with the first command
+        threads = [
+            threading.Thread(target=writer.run, args=(lambda conn, i=i: conn.execute("INSERT INTO items VALUES (?)", (i,)),))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        while writer._queue.qsize() < 20:
+            threading.Event().wait(0.01)
+        groups_before = writer.get_stats()['groups']
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+        first.result(5)
+
+        stats = writer.get_stats()
+        assert self._values(writer) == list(range(20))
+        assert stats['groups'] - groups_before == 1
+
+    def test_failed_command_rolls_back_only_itself(self, writer):
+        gate = threading.Event()
+        writer.submit(lambda conn: gate.wait(5))
+        ok = writer.submit(lambda conn: conn.execute("INSERT INTO items VALUES (1)"))
+
+        def partial_then_fail(conn):
+            conn.execute("INSERT INTO items VALUES (2)")
+            conn.execute("INSERT INTO items VALUES (1)")  # UNIQUE violation
+
+        failed = writer.submit(partial_then_fail)
+        later = writer.submit(lambda conn: conn.execute("INSERT INTO items VALUES (3)"))
+        gate.set()
+
+        ok.result(5)
+        later.result(5)
+        with pytest.raises(Exception):
+            failed.result(5)
+        assert self._values(writer) == [1, 3]
+
+    def test_nested_write_connection_on_same_thread(self):
+        db_manager = create_test_db_manager()
+        try:
+            with db_manager.get_write_connection() as conn:
+                conn.execute("INSERT INTO telegram_groups (group_id, group_name) VALUES (-1, 'Outer')")
+                # Would deadlock if the nested call queued behind the outer lease
+                db_manager.save_user(TelegramUser(user_id=1, full_name="Nested"))
+            assert db_manager.get_user_by_id(1).full_name == "Nested"
+            assert db_manager.get_group_by_id(-1) is not None
+
+            saved = asyncio.run(db_manager.execute_write(
+                db_manager.save_user, TelegramUser(user_id=2, full_name="Queued")
+            ))
+            assert saved is not None
+            assert db_manager.get_user_by_id(2).full_name == "Queued"
+        finally:
+            cleanup_temp_db(db_manager.db_path)
+
+    def test_close_drains_queue(self, writer):
+        gate = threading.Event()
+        writer.submit(lambda conn: gate.wait(5))
+        futures = [writer.submit(lambda conn, i=i: conn.execute("INSERT INTO items VALUES (?)", (i,))) for i in range(5)]
+        threading.Timer(0.05, gate.set).start()
+        writer.close()
+
+        assert all(future.done() and future.exception() is None for future in futures)
+        with pytest.raises(RuntimeError):
+            writer.submit(lambda conn: None)
+
+    def test_expired_lease_is_rolled_back(self, writer, monkeypatch):
+        monkeypatch.setattr(writer_module, "WRITE_LEASE_TIMEOUT", 0.2)
+
+        with pytest.raises(TimeoutError):
+            with writer.connection() as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+                # Waiting on another thread's write inside the block would deadlock without the lease timeout
+                other = threading.Thread(target=writer.run, args=(lambda c: c.execute("INSERT INTO items VALUES (2)"),))
+                other.start()
+                other.join(5)
+                assert not other.is_alive()
+                with pytest.raises(sqlite3.OperationalError):
+                    conn.execute("INSERT INTO items VALUES (3)")
+
+        assert self._values(writer) == [2]
@@ -0,0 +1,73 @@
+"""
+Unit tests for the integer epoch-millisecond timestamp columns.
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from database.managers.base import _to_epoch_ms
+from database.models.schema import CREATE_TABLES_SQL
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db, create_temp_db_file
+
+# 2025-11-08 06:39:47 UTC
+_EXPECTED_MS = 1762583987000
+
+
+class TestEpochTimestamps:
+    """Test the migration, conversion and range filtering on *_ms columns."""
+
+    @pytest.fixture
+    def db_manager(self):
+        # A database created before the epoch columns existed
+        db_path = create_temp_db_file()
+        conn = sqlite3.connect(db_path)
+        conn.executescript(CREATE_TABLES_SQL)
+        conn.executemany(
+            "INSERT INTO messages (message_id, group_id, user_id, content, date_sent) VALUES (?, -100, 7, 'x', ?)",
+            [(1, "2025-11-08 06:39:47+00:00"), (2, "2025-11-08T13:39:47.250+07:00"), (3, "2025-11-09 00:00:00")]
+        )
+        conn.commit()
+        conn.close()
+
+        db_manager = create_test_db_manager(db_path)
+        yield db_manager
+        cleanup_temp_db(db_path)
+
+    def test_migration_adds_indexed_epoch_columns(self, db_manager):
+        with db_manager.get_connection() as conn:
+            values = conn.execute("SELECT message_id, date_sent_ms FROM messages ORDER BY message_id").fetchall()
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM messages WHERE group_id = ? AND date_sent_ms >= ? ORDER BY date_sent_ms",
+                (-100, 0)
+            ).fetchall()
+
+        assert [tuple(row) for row in values] == [(1, _EXPECTED_MS), (2, _EXPECTED_MS + 250), (3, 1762646400000)]
+        assert any("date_sent_ms" in row[3] for row in plan)
+
+    def test_tag_and_reaction_epoch_columns_are_indexed(self, db_manager):
+        with db_manager.get_connection() as conn:
+            tag_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT message_id FROM message_tags WHERE tag = ? AND group_id = ? "
+                "ORDER BY date_sent_ms DESC",
+                ("news", -100)
+            ).fetchall()
+            reaction_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM reactions WHERE group_id = ? AND reacted_at_ms >= ?",
+                (-100, 0)
+            ).fetchall()
+
+        assert any("idx_message_tags_tag_group_date_sent_ms" in row[3] for row in tag_plan)
+        assert any("idx_reactions_group_reacted_at_ms" in row[3] for row in reaction_plan)
+
+    def test_range_filter_and_order_use_epoch_ms(self, db_manager):
+        start = datetime(2025, 11, 8, 13, 39, 47, tzinfo=timezone(timedelta(hours=7)))
+        messages = db_manager.get_messages(group_id=-100, start_date=start, columns=['message_id'])
+
+        assert [m.message_id for m in messages] == [3, 2, 1]
+        assert db_manager.get_dashboard_stat('total_messages', start_date=datetime(2025, 11, 8, 6, 39, 48)) == 1
+
+    def test_to_epoch_ms(self):
+        assert _to_epoch_ms(datetime(2025, 11, 8, 6, 39, 47)) == _EXPECTED_MS
+        assert _to_epoch_ms("2025-11-08T06:39:47Z") == _EXPECTED_MS
+        assert _to_epoch_ms(date(1970, 1, 2)) == 86400000
+        assert _to_epoch_ms(None) is None
@@ -0,0 +1,149 @@
+"""
+Unit tests for asynchronous Firestore event bus dispatch.
+"""
+
+import asyncio
+import threading
+import pytest
+from services.firestore.events import (
+    FirestoreEventBus,
+    DocumentUpdatedEvent,
+    DocumentAddedEvent,
+    DocumentDeletedEvent,
+    FirestoreEvent
+)
+
+
+def _updated(doc_id: str, version: int) -> DocumentUpdatedEvent:
+    return DocumentUpdatedEvent(
+        collection_path="notifications",
+        document_id=doc_id,
+        document_data={"version": version}
+    )
+
+
+class TestFirestoreEventBus:
+    """Test queueing, coalescing and loop delivery."""
+
+    def test_sync_delivery_without_loop(self):
+        """Without an attached loop handlers run synchronously (legacy behaviour)."""
+        bus = FirestoreEventBus()
+        received = []
+        bus.subscribe(DocumentAddedEvent, received.append)
+
+        bus.publish(DocumentAddedEvent(collection_path="c", document_id="1", document_data={}))
+
+        assert len(received) == 1
+
+    @pytest.mark.asyncio
+    async def test_publish_from_thread_delivers_on_loop_and_coalesces(self):
+        """Events from a foreign thread are queued, coalesced per document and run on the loop."""
+        bus = FirestoreEventBus()
+        bus.attach_loop(asyncio.get_running_loop())
+        loop_thread = threading.get_ident()
+        received = []
+
+        async def handler(event):
+            received.append((threading.get_ident(), event.document_id, event.document_data["version"]))
+
+        bus.subscribe(DocumentUpdatedEvent, handler)
+
+        def stream_thread():
+            for version in range(5):
+                bus.publish(_updated("doc-a", version))
+            bus.publish(_updated("doc-b", 0))
+
+        thread = threading.Thread(target=stream_thread)
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.05)
+
+        assert [(doc, version) for _, doc, version in received] == [("doc-a", 4), ("doc-b", 0)]
+        assert all(ident == loop_thread for ident, _, _ in received)
+        metrics = next(iter(bus.get_metrics().values()))
+        assert metrics["delivered"] == 2
+        assert metrics["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_only_updates_are_coalesced(self):
+        """Adds and deletes are always delivered, in order; only pending updates are replaced."""
+        bus = FirestoreEventBus()
+        bus.attach_loop(asyncio.get_running_loop())
+        received = []
+        bus.subscribe(FirestoreEvent, lambda e: received.append((type(e).__name__, e.document_id)))
+
+        bus.publish(DocumentAddedEvent(collection_path="notifications", document_id="1", document_data={}))
+        bus.publish(_updated("1", 1))
+        bus.publish(_updated("1", 2))
+        bus.publish(DocumentDeletedEvent(collection_path="notifications", document_id="1"))
+        bus.publish(_updated("1", 3))
+        await asyncio.sleep(0.05)
+
+        assert received == [
+            ("DocumentAddedEvent", "1"), ("DocumentUpdatedEvent", "1"),
+            ("DocumentDeletedEvent", "1"), ("DocumentUpdatedEvent", "1"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_backlog_never_drops_adds(self, caplog):
+        """A burst beyond the warning size is logged, and every add is still delivered."""
+        bus = FirestoreEventBus()
+        bus.attach_loop(asyncio.get_running_loop())
+        received = []
+        bus.subscribe(DocumentAddedEvent, lambda e: received.append(e.document_id), backlog_warning_size=2)
+
+        for doc_id in ("a", "b", "c"):
+            bus.publish(DocumentAddedEvent(collection_path="notifications", document_id=doc_id, document_data={}))
+        await asyncio.sleep(0.05)
+
+        assert received == ["a", "b", "c"]
+        assert next(iter(bus.get_metrics().values()))["max_queue_depth"] == 3
+        assert "has 3 pending events" in caplog.text
+
+
+class _FakeWatchService:
+    """Captures the stream callbacks a listener registers."""
+
+    def __init__(self):
+        self.stream_callbacks = {}
+
+    async def watch_collection(self, collection_path, on_added, on_updated=None, on_deleted=None, **kwargs):
+        self.stream_callbacks = {"added": on_added, "updated": on_updated, "deleted": on_deleted}
+        return "listener-1"
+
+    def stop_listener(self, listener_id):
+        return True
+
+
+class TestNotificationListener:
+    """Test that listener callbacks are delivered through the bus."""
+
+    @pytest.mark.asyncio
+    async def test_callbacks_run_on_loop_and_unsubscribe_on_stop(self):
+        from services.firestore.collection_listeners import NotificationListener, NotificationCallbacks
+        from services.firestore.events import firestore_event_bus
+
+        loop_thread = threading.get_ident()
+        added, deleted = [], []
+        watch = _FakeWatchService()
+        listener = NotificationListener(watch_service=watch)
+        assert await listener.start("u1", NotificationCallbacks(
+            on_added=lambda doc: added.append((threading.get_ident(), doc["document_id"])),
+            on_deleted=deleted.append
+        ))
+
+        def stream_thread():
+            watch.stream_callbacks["added"]({"document_id": "n1", "target_users": None})
+            watch.stream_callbacks["added"]({"document_id": "n2", "target_users": ["someone-else"]})
+            watch.stream_callbacks["deleted"]("n3")
+
+        thread = threading.Thread(target=stream_thread)
+        thread.start()
+        thread.join()
+        assert added == []  # nothing ran on the stream thread
+        await asyncio.sleep(0.05)
+        assert added == [(loop_thread, "n1")] and deleted == ["n3"]
+
+        listener.stop()
+        assert firestore_event_bus.get_subscriber_count(DocumentAddedEvent) == 0
+        assert firestore_event_bus.get_subscriber_count(DocumentDeletedEvent) == 0
@@ -0,0 +1,48 @@
+"""
+Unit tests for slotted, lazily decoded message rows and column projection.
+"""
+
+from datetime import datetime
+import pytest
+from database.models.message import Message, LazyMessage
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestLazyMessage:
+    """Test lazy field decoding and get_messages(columns=...)."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        db_manager.save_messages_with_tags([
+            Message(message_id=i, group_id=-100, user_id=7, content=f"hi @{i}", caption=None,
+                    date_sent=datetime(2025, 1, i, 12), has_media=(i == 2), message_type="text")
+            for i in (1, 2)
+        ])
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_fields_decode_on_first_access(self, db_manager):
+        messages = db_manager.get_messages(group_id=-100)
+
+        message = messages[0]
+        assert isinstance(message, Message) and isinstance(message, LazyMessage)
+        assert not hasattr(message, '__dict__')
+        with pytest.raises(AttributeError):
+            Message.__dict__['content'].__get__(message, Message)  # Not decoded yet
+        assert message.content == "hi @2"
+        assert message.date_sent == datetime(2025, 1, 2, 12)
+        assert message.has_media is True and message.message_type == "text"
+
+        message.content = "edited"
+        assert message.content == "edited"
+        assert [m.message_id for m in db_manager.get_messages(group_id=-100, message_type_filter="mention")] == [2, 1]
+
+    def test_column_projection(self, db_manager):
+        messages = db_manager.get_messages(group_id=-100, columns=['message_id', 'date_sent'])
+
+        assert [m.message_id for m in messages] == [2, 1]
+        assert messages[0].date_sent == datetime(2025, 1, 2, 12)
+        assert messages[0].content is None and messages[0].user_id == 0 and messages[0].id is None
+        with pytest.raises(ValueError):
+            db_manager.get_messages(columns=['password'])
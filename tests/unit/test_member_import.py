@@ -0,0 +1,80 @@
+"""
+Unit tests for batched group member import.
+"""
+
+from types import SimpleNamespace
+import pytest
+from database.models.telegram import TelegramUser
+from services.telegram.member_fetcher import MemberFetcher
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestMemberImport:
+    """Test bulk member upsert and existence lookup."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_deletion_states_single_lookup(self, db_manager):
+        db_manager.save_user(TelegramUser(user_id=1, full_name="Active"))
+        db_manager.save_user(TelegramUser(user_id=2, full_name="Deleted"))
+        db_manager.soft_delete_user(2)
+
+        assert db_manager.get_user_deletion_states([1, 2, 3]) == {1: False, 2: True}
+
+    def test_import_upserts_users_groups_and_restores(self, db_manager):
+        db_manager.save_user(TelegramUser(user_id=2, full_name="Old Name"))
+        db_manager.soft_delete_user(2)
+        users = [TelegramUser(user_id=i, first_name=f"User{i}", full_name=f"User {i}") for i in (1, 2, 3)]
+
+        saved = db_manager.import_group_members(users, group_id=-100, group_name="Group", restore_user_ids=[2])
+
+        assert saved == 3
+        assert db_manager.get_user_deletion_states([1, 2, 3]) == {1: False, 2: False, 3: False}
+        assert db_manager.get_user_by_id(2).full_name == "User 2"
+        assert sorted(db_manager.get_users_by_group(-100)) == [1, 2, 3]
+
+
+class TestImportPage:
+    """Test per-user outcomes of one imported page of participants."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    @staticmethod
+    async def _import(db_manager, page):
+        fetcher = MemberFetcher(db_manager, client_utils=None)
+        group = SimpleNamespace(group_id=-100, group_name="Group", group_username=None)
+        counts = {"fetched": 0, "skipped_exist": 0, "skipped_deleted": 0, "total": len(page)}
+        statuses = {}
+        await fetcher._import_page(
+            page, group, True, counts, None, lambda user, status: statuses.__setitem__(user.id, status)
+        )
+        return counts, statuses
+
+    @pytest.mark.asyncio
+    async def test_reports_saved_and_skipped_users(self, db_manager):
+        db_manager.save_user(TelegramUser(user_id=2, full_name="Existing"))
+        page = [SimpleNamespace(id=i, first_name=f"User{i}") for i in (1, 2)]
+
+        counts, statuses = await self._import(db_manager, page)
+
+        assert statuses == {1: "fetched", 2: "skipped_exist"}
+        assert counts["fetched"] == 1 and counts["skipped_exist"] == 1
+        assert db_manager.get_users_by_group(-100) == [1]
+
+    @pytest.mark.asyncio
+    async def test_failed_save_is_reported_per_user(self, db_manager, monkeypatch):
+        monkeypatch.setattr(db_manager, "import_group_members", lambda *args, **kwargs: 0)
+        page = [SimpleNamespace(id=1, first_name="User1")]
+
+        counts, statuses = await self._import(db_manager, page)
+
+        assert statuses == {1: "failed"}
+        assert counts["fetched"] == 0
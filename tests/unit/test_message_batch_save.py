@@ -0,0 +1,47 @@
+"""
+Unit tests for saving messages together with their tags.
+"""
+
+from datetime import datetime
+import pytest
+from database.models.message import Message
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+def _message(message_id, content, caption=None):
+    return Message(
+        message_id=message_id, group_id=-100, user_id=7,
+        content=content, caption=caption, date_sent=datetime(2025, 1, 1, 12)
+    )
+
+
+class TestMessageBatchSave:
+    """Test single and batched message saves with in-transaction tag extraction."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_save_message_writes_tags(self, db_manager):
+        assert db_manager.save_message(_message(1, "hello #News", caption="#urgent")) is not None
+
+        assert sorted(t.tag for t in db_manager._tag.get_tags_by_message(1, -100)) == ["news", "urgent"]
+
+    def test_batch_save_across_commits(self, db_manager):
+        messages = [_message(i, f"post {i} #tag{i % 2}") for i in range(1, 6)]
+
+        assert db_manager.save_messages_with_tags(messages, batch_size=2) == 5
+
+        assert db_manager.get_message_count(-100) == 5
+        assert db_manager.get_tag_counts_by_group(-100) == {"tag1": 3, "tag0": 2}
+
+    def test_bad_row_falls_back_to_single_saves(self, db_manager):
+        messages = [_message(i, f"post {i} #ok") for i in range(1, 5)]
+        messages[1].content = object()  # not bindable: fails the batch, then only its own save
+
+        assert db_manager.save_messages_with_tags(messages, batch_size=10) == 3
+
+        assert db_manager.get_message_count(-100) == 3
+        assert db_manager.get_tag_counts_by_group(-100) == {"ok": 3}
@@ -0,0 +1,55 @@
+"""
+Unit tests for the group participant cache used by common-group matching.
+"""
+
+import pytest
+from services.telegram.common_groups_fetcher import CommonGroupsFetcher
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestParticipantCache:
+    """Test participant set replacement and local common-group lookup."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_replace_and_find_common_groups(self, db_manager):
+        db_manager.replace_group_participants(10, "Alpha", [1, 2, 3])
+        db_manager.replace_group_participants(20, "Beta", [3, 4], group_username="beta")
+        db_manager.replace_group_participants(10, "Alpha", [2, 5])
+
+        matches = db_manager.find_common_groups([2, 3, 9])
+
+        assert {group_id: sorted(ids) for group_id, ids in matches.items()} == {10: [2], 20: [3]}
+        assert db_manager.find_common_groups([3], group_ids=[10]) == {}
+        info = db_manager.get_participant_cache_info([10, 20])
+        assert info[10]['participant_count'] == 2
+        assert info[20]['group_username'] == "beta"
+        assert info[10]['fetched_at'] is not None
+
+    def test_partial_crawls_merge_and_flag_truncation(self, db_manager):
+        db_manager.replace_group_participants(10, "Alpha", [1, 2, 3])
+        assert db_manager.get_participant_cache_info([10])[10]['is_complete']
+
+        # A truncated crawl keeps the members it didn't reach
+        db_manager.merge_group_participants(10, "Alpha", [3, 4], is_complete=False)
+        assert db_manager.get_group_participant_ids(10) == {1, 2, 3, 4}
+        info = db_manager.get_participant_cache_info([10])[10]
+        assert info['participant_count'] == 4 and not info['is_complete']
+
+        # An incremental refresh keeps the current completeness
+        db_manager.merge_group_participants(20, "Beta", [5])
+        db_manager.replace_group_participants(30, "Gamma", [6])
+        db_manager.merge_group_participants(30, "Gamma", [7])
+        info = db_manager.get_participant_cache_info([20, 30])
+        assert not info[20]['is_complete'] and info[30]['is_complete']
+
+        results = CommonGroupsFetcher(db_manager, client_utils=None).find_common_groups_cached([4, 7])
+        assert {item['group_id']: item['is_complete'] for item in results} == {10: False, 30: True}
+
+    def test_bulk_memberships_saved(self, db_manager):
+        assert db_manager.save_user_group_memberships([1, 2], 10, "Alpha") == 2
+        assert sorted(db_manager.get_users_by_group(10)) == [1, 2]
@@ -0,0 +1,64 @@
+"""
+Unit tests for streamed, chunked PDF report rendering.
+"""
+
+from datetime import datetime
+import os
+import pytest
+from database.models.message import Message
+from database.models.telegram import TelegramUser
+from services.export.exporters.messages_exporter import MessagesExporter
+from services.export.formatters.pdf_report_renderer import ChunkedPDFRenderer
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db, create_temp_db_file
+
+pypdf = pytest.importorskip("pypdf")
+
+
+class TestPDFReport:
+    """Test streaming messages into a multi-section PDF report."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        db_manager.save_user(TelegramUser(user_id=7, first_name="Ann", full_name="Ann Lee"))
+        db_manager.save_messages_with_tags([
+            Message(message_id=i, group_id=-100, user_id=7, content=f"message {i}",
+                    date_sent=datetime(2025, 1, 1, i // 60, i % 60), message_type="text")
+            for i in range(1, 251)
+        ])
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    @pytest.fixture
+    def output_path(self):
+        path = create_temp_db_file().replace('.db', '.pdf')
+        yield path
+        if os.path.exists(path):
+            os.remove(path)
+
+    def test_report_rows_are_streamed_with_sender(self, db_manager):
+        batches = list(db_manager.iter_message_report_rows(group_id=-100, batch_size=100))
+        assert [len(batch) for batch in batches] == [100, 100, 50]
+        full_name, content, _, date_sent, has_media, _, _ = batches[0][0]
+        assert (full_name, content, has_media) == ("Ann Lee", "message 250", False)
+        assert date_sent == datetime(2025, 1, 1, 4, 10)
+
+    def test_sections_render_in_workers_and_merge(self, db_manager, output_path):
+        exporter = MessagesExporter(db_manager)
+        assert exporter.export_report_to_pdf(output_path, include_stats=False, workers=1, group_id=-100)
+        single_pages = len(pypdf.PdfReader(output_path).pages)
+
+        rows = exporter.data_formatter.format_message_rows_for_pdf(
+            (full_name, content, date_sent, has_media)
+            for batch in db_manager.iter_message_report_rows(group_id=-100)
+            for full_name, content, _, date_sent, has_media, _, _ in batch
+        )
+        report = exporter._create_report("Messages Report", include_stats=False)
+        assert ChunkedPDFRenderer(workers=2, section_rows=80).render(output_path, report, [rows]) == 250
+
+        reader = pypdf.PdfReader(output_path)
+        text = "\n".join(page.extract_text() for page in reader.pages)
+        # Sections of 80 rows each start on a new page; numbering runs across sections
+        assert len(reader.pages) >= max(4, single_pages)
+        assert "250" in text and "message 1" in text
+        assert text.index("message 250") < text.index("message 170") < text.index("message 90")
@@ -0,0 +1,71 @@
+"""
+Unit tests for aggregate reaction counts.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from database.models.message import Message
+from services.telegram import reaction_processor as reaction_module
+from services.telegram.reaction_processor import ReactionProcessor
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+def _telegram_msg(message_id, *pairs):
+    results = [
+        SimpleNamespace(reaction=SimpleNamespace(emoticon=emoji), count=count)
+        for emoji, count in pairs
+    ]
+    return SimpleNamespace(id=message_id, reactions=SimpleNamespace(results=results))
+
+
+class TestReactionCounts:
+    """Test reaction extraction, bulk storage and most-reacted queries."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_extract_reaction_counts(self):
+        msg = _telegram_msg(1, ("👍", 3), ("🔥", 2))
+        msg.reactions.results.append(
+            SimpleNamespace(reaction=SimpleNamespace(document_id=42), count=1)
+        )
+
+        assert ReactionProcessor.extract_reaction_counts(msg) == {"👍": 3, "🔥": 2, "custom_42": 1}
+        assert ReactionProcessor.extract_reaction_counts(SimpleNamespace(id=2, reactions=None)) == {}
+
+    def test_most_reacted_messages(self, db_manager):
+        for message_id in (1, 2, 3):
+            db_manager.save_message(Message(
+                message_id=message_id, group_id=-100, user_id=7,
+                content=f"m{message_id}", date_sent=datetime(2025, 1, message_id)
+            ))
+        db_manager.save_reaction_counts(-100, {1: {"👍": 1}, 2: {"👍": 4, "🔥": 2}, 3: {"🔥": 3}})
+        db_manager.save_reaction_counts(-100, {3: {}})
+
+        top = db_manager.get_most_reacted_messages(group_id=-100, limit=5)
+
+        assert [item['message_id'] for item in top] == [2, 1]
+        assert top[0]['total_reactions'] == 6 and top[0]['reactions'] == {"👍": 4, "🔥": 2}
+        assert db_manager.get_top_reaction_emojis(-100)[0] == {'emoji': "👍", 'count': 5, 'message_count': 2}
+
+    def test_message_without_reactions_clears_stored_totals(self, db_manager, monkeypatch):
+        monkeypatch.setattr(
+            reaction_module, "settings", SimpleNamespace(settings=SimpleNamespace(track_reactions=True))
+        )
+        db_manager.save_message(Message(
+            message_id=1, group_id=-100, user_id=7, content="m1", date_sent=datetime(2025, 1, 1)
+        ))
+        db_manager.save_reaction_counts(-100, {1: {"👍": 2}})
+        processor = ReactionProcessor(db_manager, client=None, user_processor=None)
+
+        async def refetch():
+            await processor.process_reactions(_telegram_msg(1), -100, None, "link")
+            return await processor.flush()
+
+        assert asyncio.run(refetch()) == 1
+        assert db_manager.get_reaction_counts(1, -100) == {}
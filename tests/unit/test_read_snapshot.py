@@ -0,0 +1,96 @@
+"""
+Unit tests for WAL read snapshots and per-thread reader connections.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+import pytest
+from database import async_query_executor as executor_module
+from database.async_query_executor import QueryCancelToken
+from database.models.message import Message
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+def _message(message_id):
+    return Message(
+        message_id=message_id, group_id=-100, user_id=7,
+        content=f"post {message_id}", date_sent=datetime(2025, 1, 1, 12)
+    )
+
+
+class TestReadSnapshot:
+    """Test snapshot isolation, ownership and cancellation."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    @staticmethod
+    def _count(conn):
+        return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def test_each_load_gets_its_own_snapshot(self, db_manager):
+        first = db_manager.acquire_read_snapshot()
+        second = db_manager.acquire_read_snapshot()
+        try:
+            assert first is not second
+        finally:
+            first.release()
+            second.release()
+        assert first.is_closed and second.is_closed
+
+    def test_held_snapshot_does_not_see_later_commit(self, db_manager):
+        db_manager.save_message(_message(1))
+        snapshot = db_manager.acquire_read_snapshot()
+        try:
+            db_manager.save_message(_message(2))
+
+            # Reads pinned to the held snapshot stay on the pre-commit state
+            assert snapshot.run(lambda: db_manager.get_message_count(-100)) == 1
+            with snapshot.connection() as conn:
+                assert self._count(conn) == 1
+
+            # New readers get a fresh snapshot that includes the commit
+            with db_manager.read_snapshot() as conn:
+                assert self._count(conn) == 2
+        finally:
+            snapshot.release()
+        assert snapshot.is_closed
+
+    def test_cancel_interrupts_only_its_own_read(self, db_manager):
+        db_manager.save_message(_message(1))
+        snapshot = db_manager.acquire_read_snapshot(readers=2)
+        token = QueryCancelToken()
+        started = threading.Event()
+        errors = []
+        endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+        def cancelled_read():
+            executor_module._current.token = token
+            try:
+                with db_manager.read_snapshot() as conn:
+                    started.set()
+                    conn.execute(endless).fetchone()
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+            finally:
+                executor_module._current.token = None
+                token.finish()
+
+        try:
+            reader = threading.Thread(target=snapshot.run, args=(cancelled_read,))
+            reader.start()
+            assert started.wait(5)
+            token.cancel()
+            reader.join(5)
+            assert not reader.is_alive() and len(errors) == 1
+
+            # The other reader of the snapshot and this thread's own reader are unaffected
+            assert snapshot.run(lambda: db_manager.get_message_count(-100)) == 1
+            with db_manager.read_snapshot() as conn:
+                assert self._count(conn) == 1
+        finally:
+            snapshot.release()
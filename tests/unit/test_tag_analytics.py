@@ -0,0 +1,80 @@
+"""
+Unit tests for incrementally maintained tag analytics.
+"""
+
+import sqlite3
+from datetime import datetime
+import pytest
+from services.tag_analytics_service import TagAnalyticsService
+from tests.fixtures.db_fixtures import create_test_db_manager, cleanup_temp_db
+
+
+class TestTagAnalytics:
+    """Test tag counters, co-occurrence and trending calculations."""
+
+    @pytest.fixture
+    def db_manager(self):
+        db_manager = create_test_db_manager()
+        yield db_manager
+        cleanup_temp_db(db_manager.db_path)
+
+    def test_counters_follow_save_and_delete(self, db_manager):
+        db_manager.save_tags(1, 10, 7, ["a", "b", "c"], datetime(2025, 1, 1, 9))
+        db_manager.save_tags(1, 10, 7, ["a", "d"], datetime(2025, 1, 1, 9))
+        db_manager.save_tags(2, 10, 7, ["a", "b"], datetime(2025, 1, 2, 9))
+
+        assert db_manager.get_tag_counts_by_group(10) == {"a": 2, "b": 2, "c": 1, "d": 1}
+        pairs = {(a, b): n for a, b, n in db_manager.get_tag_cooccurrence(10)}
+        assert pairs[("a", "b")] == 2 and pairs[("c", "d")] == 1 and len(pairs) == 6
+
+        db_manager._tag.delete_tags_for_message(1, 10)
+
+        assert db_manager.get_tag_counts_by_group(10) == {"a": 1, "b": 1}
+        assert db_manager.get_tag_cooccurrence(10) == [("a", "b", 1)]
+        assert db_manager.get_tag_daily_counts(10) == [("2025-01-02", "a", 1), ("2025-01-02", "b", 1)]
+
+    def test_rebuild_matches_incremental(self, db_manager):
+        db_manager.save_tags(1, 10, 7, ["x", "y"], datetime(2025, 3, 1))
+        db_manager.save_tags(2, 10, 7, ["y", "z"], datetime(2025, 3, 2))
+        before = (db_manager.get_tag_daily_counts(10), db_manager.get_tag_cooccurrence(10))
+
+        assert db_manager.rebuild_tag_analytics()
+
+        assert (db_manager.get_tag_daily_counts(10), db_manager.get_tag_cooccurrence(10)) == before
+
+    def test_trending_and_matrix(self, db_manager):
+        message_id = 0
+        for day, tags in [(1, ["old"]), (2, ["old"]), (3, ["old"]), (27, ["new"]), (28, ["new", "old"]), (28, ["new"])]:
+            message_id += 1
+            db_manager.save_tags(message_id, 10, 7, tags, datetime(2025, 2, day))
+        service = TagAnalyticsService(db_manager)
+
+        trending = service.get_trending_tags(10, window_days=7, baseline_days=21, min_count=1, as_of=datetime(2025, 2, 28))
+        matrix = service.get_cooccurrence_matrix(10)
+        series = service.get_tag_timeseries(10, tags=["new"])
+
+        assert trending[0]['tag'] == "new" and trending[0]['recent'] == 3
+        assert matrix.loc["new", "old"] == 1 and matrix.loc["old", "old"] == 4
+        assert len(series) == 2 and series["new"].sum() == 3
+
+    def test_backfill_migration_is_atomic(self, db_manager):
+        db_manager.save_tags(1, 10, 7, ["x", "y"], datetime(2025, 3, 1))
+        conn = sqlite3.connect(db_manager.db_path)
+        try:
+            conn.executescript("""
+                DELETE FROM tag_daily_counts;
+                DELETE FROM tag_cooccurrence;
+                CREATE TRIGGER fail_cooccurrence BEFORE INSERT ON tag_cooccurrence
+                BEGIN SELECT RAISE(ABORT, 'boom'); END;
+            """)
+            # Migration errors are logged, not raised
+            db_manager._run_migrations(conn)
+            # The daily counts inserted before the failure were rolled back too
+            assert conn.execute("SELECT COUNT(*) FROM tag_daily_counts").fetchone()[0] == 0
+
+            conn.execute("DROP TRIGGER fail_cooccurrence")
+            db_manager._run_migrations(conn)
+            conn.commit()
+            assert conn.execute("SELECT COUNT(*) FROM tag_cooccurrence").fetchone()[0] == 1
+        finally:
+            conn.close()
@@ -0,0 +1,100 @@
+"""
+Unit tests for Firestore watch stream resume tokens and reconnect backoff.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import pytest
+from services.firestore import watch_service as watch_module
+from services.firestore.watch_service import FirestoreWatchService
+
+
+def _listener(service: FirestoreWatchService) -> dict:
+    listener = {
+        "target": {"documents": {"documents": ["projects/p/databases/(default)/documents/a/b"]}},
+        "target_id": 3,
+        "resume_token": None,
+        "read_time": None,
+        "on_updated": lambda doc: None,
+        "active": False
+    }
+    service._listeners["l1"] = listener
+    return listener
+
+
+class _FakeResponse:
+    def __init__(self, lines):
+        self.status_code = 200
+        self._lines = lines
+
+    async def aiter_lines(self):
+        for line in self._lines:
+            yield line
+        raise ConnectionError("stream dropped")
+
+
+class _FakeClient:
+    """Records each request body; every stream sends a token, then drops."""
+
+    def __init__(self, service, connects):
+        self.bodies = []
+        self._service = service
+        self._connects = connects
+
+    @asynccontextmanager
+    async def stream(self, method, url, headers=None, json=None):
+        self.bodies.append(json)
+        if len(self.bodies) >= self._connects:
+            self._service._listeners["l1"]["active"] = False
+        token = f"token-{len(self.bodies)}"
+        yield _FakeResponse([_json({"targetChange": {"targetIds": [3], "resumeToken": token}})])
+
+
+def _json(data) -> str:
+    return json.dumps(data)
+
+
+class TestWatchService:
+    """Test resume positions and reconnects."""
+
+    def test_resume_position_tracking(self):
+        service = FirestoreWatchService()
+        listener = _listener(service)
+        assert "resumeToken" not in service._build_resumed_target(listener)
+
+        asyncio.run(service._process_watch_response("l1", {"targetChange": {"targetIds": [9], "resumeToken": "other"}}, ""))
+        assert listener["resume_token"] is None
+
+        asyncio.run(service._process_watch_response(
+            "l1", {"targetChange": {"targetIds": [3], "resumeToken": "abc", "readTime": "2025-01-01T00:00:00Z"}}, ""
+        ))
+        target = service._build_resumed_target(listener)
+        assert target["resumeToken"] == "abc" and target["targetId"] == 3 and "readTime" not in target
+
+        # A rejected resume position starts the next connect fresh
+        asyncio.run(service._process_watch_response(
+            "l1", {"targetChange": {"targetChangeType": "REMOVE", "cause": {"code": 9}}}, ""
+        ))
+        assert "resumeToken" not in service._build_resumed_target(listener)
+
+    def test_backoff_is_jittered_and_capped(self):
+        delay = watch_module.RECONNECT_BACKOFF_INITIAL
+        for _ in range(50):
+            upper = min(watch_module.RECONNECT_BACKOFF_MAX, delay * 2)
+            delay = FirestoreWatchService._next_backoff(delay)
+            assert watch_module.RECONNECT_BACKOFF_INITIAL <= delay <= upper
+
+    def test_reconnect_sends_last_resume_token(self, monkeypatch):
+        monkeypatch.setattr(watch_module, "RECONNECT_BACKOFF_INITIAL", 0.001)
+        monkeypatch.setattr(watch_module, "RECONNECT_BACKOFF_MAX", 0.002)
+        service = FirestoreWatchService()
+        _listener(service)
+        client = _FakeClient(service, connects=3)
+        monkeypatch.setattr(service, "_get_client", lambda: client)
+        monkeypatch.setattr(service, "_get_id_token", lambda: "token")
+
+        asyncio.run(asyncio.wait_for(service._watch_stream("l1", {}, "token"), timeout=5))
+
+        sent = [body["addTarget"].get("resumeToken") for body in client.bodies]
+        assert sent == [None, "token-1", "token-2"]
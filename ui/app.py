@@ -105,6 +105,7 @@ class TelegramUserTrackingApp:
         
         # Initialize update service
         self.update_service = None
+        self.maintenance_service = None
         if self.db_manager:
             self._init_update_service()
             self._init_cache_service()
@@ -417,6 +418,9 @@ class TelegramUserTrackingApp:
         
         self.page.controls = [main_layout]
         self.page.update()
+        
+        # Start background database maintenance
+        self._start_maintenance_service()
     
     def _show_error_ui(self, error_message: str):
         """Show error UI."""
@@ -461,6 +465,12 @@ class TelegramUserTrackingApp:
         # Stop update service
         self._stop_update_service()
         
+        # Stop database maintenance
+        self._stop_maintenance_service()
+        
+        # Close real-time watch streams (they carry the logged-out user's token)
+        self._close_watch_service()
+        
         # Stop device revocation polling
         try:
             from services.device_revocation_handler import device_revocation_handler
@@ -799,6 +809,70 @@ class TelegramUserTrackingApp:
         else:
             asyncio.create_task(stop_async())
     
+    def _start_maintenance_service(self):
+        """Start database maintenance for the current database (synchronous wrapper)."""
+        if not self.db_manager:
+            return
+        if self.maintenance_service:
+            if self.maintenance_service.db_manager is self.db_manager and self.maintenance_service.is_running:
+                return
+            self._stop_maintenance_service()
+        
+        import asyncio
+        from services.polling.database_maintenance_service import DatabaseMaintenanceService
+        
+        service = self.maintenance_service = DatabaseMaintenanceService(self.db_manager)
+        
+        async def start_async():
+            """Start database maintenance (async)."""
+            try:
+                await service.start()
+            except Exception as e:
+                logger.error(f"Error starting database maintenance: {e}")
+        
+        if hasattr(self.page, 'run_task'):
+            self.page.run_task(start_async)
+        else:
+            asyncio.create_task(start_async())
+    
+    def _stop_maintenance_service(self):
+        """Stop database maintenance (synchronous wrapper)."""
+        if not self.maintenance_service:
+            return
+        
+        import asyncio
+        
+        service, self.maintenance_service = self.maintenance_service, None
+        
+        async def stop_async():
+            """Stop database maintenance (async)."""
+            try:
+                await service.stop()
+            except Exception as e:
+                logger.error(f"Error stopping database maintenance: {e}")
+        
+        if hasattr(self.page, 'run_task'):
+            self.page.run_task(stop_async)
+        else:
+            asyncio.create_task(stop_async())
+    
+    def _close_watch_service(self):
+        """Stop watch listeners and close their shared HTTP/2 client (synchronous wrapper)."""
+        import asyncio
+        from services.firestore.watch_service import firestore_watch_service
+        
+        async def close_async():
+            """Close watch service (async)."""
+            try:
+                await firestore_watch_service.close()
+            except Exception as e:
+                logger.error(f"Error closing watch service: {e}")
+        
+        if hasattr(self.page, 'run_task'):
+            self.page.run_task(close_async)
+        else:
+            asyncio.create_task(close_async())
+    
     def _setup_window_close_handler(self):
         """Set up handler for window close event."""
         try:
@@ -843,6 +917,7 @@ class TelegramUserTrackingApp:
             def on_confirm(e):
                 """User confirmed - stop fetch and close."""
                 fetch_state_manager.stop_fetch()
+                self._close_watch_service()
                 # Allow window to close
                 try:
                     if hasattr(self.page.window, 'close'):
@@ -869,6 +944,7 @@ class TelegramUserTrackingApp:
             return False
         else:
             # No fetch in progress, allow close
+            self._close_watch_service()
             return True
 
 
@@ -404,7 +404,7 @@ class AddGroupDialog(ft.AlertDialog):
                 return
             
             # Save group
-            self.db_manager.save_group(self.preview_group)
+            await self.db_manager.execute_write(self.db_manager.save_group, self.preview_group)
             
             # Callback
             if self.on_group_added:
@@ -194,7 +194,7 @@ class MessageDetailDialog(ft.AlertDialog):
         if self.page:
             self.page.update()
     
-    def _save_message(self, e):
+    async def _save_message(self, e):
         """Save message changes."""
         try:
             # Update message content
@@ -203,7 +203,7 @@ class MessageDetailDialog(ft.AlertDialog):
             self.message.updated_at = datetime.now()
             
             # Save to database
-            self.db_manager.save_message(self.message)
+            await self.db_manager.execute_write(self.db_manager.save_message, self.message)
             
             # Show success message
             if self.page:
@@ -229,10 +229,12 @@ class MessageDetailDialog(ft.AlertDialog):
     
     def _delete_message(self, e):
         """Delete (soft delete) the message."""
-        def confirm_delete(confirm_e):
+        async def delete_message(confirm_e):
             try:
                 # Soft delete the message
-                self.db_manager.soft_delete_message(self.message.message_id, self.message.group_id)
+                await self.db_manager.execute_write(
+                    self.db_manager.soft_delete_message, self.message.message_id, self.message.group_id
+                )
                 
                 # Get page for snackbar
                 page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
@@ -260,6 +262,11 @@ class MessageDetailDialog(ft.AlertDialog):
                         bgcolor=ft.Colors.RED
                     )
         
+        def confirm_delete(confirm_e):
+            page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
+            if page:
+                page.run_task(delete_message, confirm_e)
+        
         # Show confirmation dialog using centralized manager
         dialog_manager.show_confirmation_dialog(
             page=getattr(self, 'page', None),
@@ -236,7 +236,7 @@ class UserDetailDialog(ft.AlertDialog):
         if self.page:
             self.page.update()
     
-    def _save_user(self, e):
+    async def _save_user(self, e):
         """Save user changes."""
         try:
             # Update user information
@@ -258,8 +258,8 @@ class UserDetailDialog(ft.AlertDialog):
             self.user.bio = self.bio_field.value or None
             self.user.updated_at = datetime.now()
             
-            # Save to database
-            self.db_manager.save_user(self.user)
+            # Save to database (queued on the writer thread, the UI loop stays free)
+            await self.db_manager.execute_write(self.db_manager.save_user, self.user)
             
             # Show success toast
             if self.page:
@@ -293,7 +293,7 @@ class UserDetailDialog(ft.AlertDialog):
                 )
             return
         
-        def confirm_delete_photo(confirm_e):
+        async def delete_photo(confirm_e):
             try:
                 # Delete the file if it exists
                 if self.user.profile_photo_path and os.path.exists(self.user.profile_photo_path):
@@ -302,7 +302,7 @@ class UserDetailDialog(ft.AlertDialog):
                 # Update user record
                 self.user.profile_photo_path = None
                 self.user.updated_at = datetime.now()
-                self.db_manager.save_user(self.user)
+                await self.db_manager.execute_write(self.db_manager.save_user, self.user)
                 
                 # Get page for toast
                 page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
@@ -327,6 +327,16 @@ class UserDetailDialog(ft.AlertDialog):
                         f"{theme_manager.t('delete_error')}: {str(ex)}"
                     )
         
+        def confirm_delete(confirm_e):
+            page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
+            if page:
+                page.run_task(delete_user, confirm_e)
+        
+        def confirm_delete_photo(confirm_e):
+            page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
+            if page:
+                page.run_task(delete_photo, confirm_e)
+        
         # Show confirmation dialog using centralized manager
         dialog_manager.show_confirmation_dialog(
             page=getattr(self, 'page', None),
@@ -342,10 +352,10 @@ class UserDetailDialog(ft.AlertDialog):
     
     def _delete_user(self, e):
         """Delete (soft delete) the user."""
-        def confirm_delete(confirm_e):
+        async def delete_user(confirm_e):
             try:
                 # Soft delete the user
-                self.db_manager.soft_delete_user(self.user.user_id)
+                await self.db_manager.execute_write(self.db_manager.soft_delete_user, self.user.user_id)
                 
                 # Get page for toast
                 page = dialog_manager._get_page_from_event(confirm_e, getattr(self, 'page', None))
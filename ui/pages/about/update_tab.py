@@ -216,12 +216,22 @@ class UpdateTab:
                 self._show_error("Invalid update info")
                 return
             
-            # Download update
+            def on_progress(downloaded: int, total: int):
+                if total:
+                    self.update_status_text.value = (
+                        f"Downloading update... {downloaded * 100 // total}% "
+                        f"({downloaded / (1024 * 1024):.1f} / {total / (1024 * 1024):.1f} MB)"
+                    )
+                    if self.page:
+                        self.page.update()
+            
+            # Download update (resumes a previously interrupted download)
             download_path = await self.update_service.download_update(
                 download_url,
                 version,
                 checksum,
-                file_size
+                file_size,
+                progress_callback=on_progress
             )
             
             if download_path:
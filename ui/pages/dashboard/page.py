@@ -13,12 +13,14 @@ from ui.components.skeleton_loaders.dashboard_skeleton import DashboardSkeleton
 from ui.components.skeleton_loaders.base import SkeletonRow
 from database.db_manager import DatabaseManager
 from database.async_query_executor import async_query_executor
+from database.change_events import DataChangeEvent, data_change_bus
 from services.page_cache_service import page_cache_service
 from utils.constants import format_bytes
 from ui.pages.dashboard.components.group_selector import GroupSelectorComponent
 from ui.components import DateRangeSelector
 from ui.pages.dashboard.components.active_users_list import ActiveUsersListComponent
 from ui.pages.dashboard.components.recent_messages import RecentMessagesComponent
+from services.dashboard_data_loader import DashboardDataLoader
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,11 @@ logger = logging.getLogger(__name__)
 class DashboardPage(ft.Container):
     """Dashboard page with statistics."""
     
+    # Tables whose changes affect dashboard stats, active users and recent messages
+    STATS_TABLES = ('messages', 'telegram_users', 'telegram_groups', 'media_files')
+    # Coalesce change events arriving during a fetch into one partial reload
+    CHANGE_REFRESH_DEBOUNCE_SECONDS = 2.0
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.page: Optional[ft.Page] = None
@@ -36,6 +43,7 @@ class DashboardPage(ft.Container):
         self.selected_group_names: List[str] = []
         self.stats: dict = {}
         self.is_loading = True
+        self.data_loader = DashboardDataLoader(db_manager)
         
         # Initialize date range (default: 1 month - last 30 days)
         today = datetime.now()
@@ -223,6 +231,10 @@ class DashboardPage(ft.Container):
         )
         
         self._animation_initialized = False
+        self._change_refresh_pending = False
+        
+        # Reload only the affected widgets when fetches commit data for the selected groups
+        data_change_bus.subscribe(self._on_data_change, tables=('messages', 'telegram_users'))
     
     def _create_modern_card(self, content: ft.Control) -> ft.Container:
         """Create a modernized card with shadows, animations, and hover effects."""
@@ -331,9 +343,12 @@ class DashboardPage(ft.Container):
             groups = page_cache_service.get(cache_key_groups)
             
             if not groups:
-                groups = await async_query_executor.execute(self.db_manager.get_all_groups)
+                groups = await async_query_executor.execute(self.db_manager.get_all_groups, dedupe=True)
                 if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key_groups, groups, ttl=600)  # Cache groups for 10 minutes
+                    page_cache_service.set(
+                        cache_key_groups, groups, ttl=600,  # Cache groups for 10 minutes
+                        tables=('telegram_groups',)
+                    )
             
             self.groups = groups
             self.selected_group_ids = [groups[0].group_id] if groups else []
@@ -353,40 +368,15 @@ class DashboardPage(ft.Container):
             header_row = self.content.controls[0]
             header_row.controls[2] = self.group_selector_widget
             
-            # Load stats
-            cache_key_stats = page_cache_service.generate_key(
-                "dashboard",
-                group_ids=str(self.selected_group_ids),
-                start_date=self.start_date.isoformat(),
-                end_date=self.end_date.isoformat()
-            )
-            stats = page_cache_service.get(cache_key_stats)
-            
-            if not stats:
-                stats = await async_query_executor.execute(
-                    self.db_manager.get_dashboard_stats,
-                    group_ids=self.selected_group_ids if self.selected_group_ids else None,
-                    start_date=self.start_date,
-                    end_date=self.end_date
-                )
-                if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key_stats, stats)
-            
-            self.stats = stats
-            
-            # Update UI with loaded data
-            self._update_ui_with_data()
+            # Fade the cards in while their values stream in
+            if self.page and hasattr(self.page, 'run_task'):
+                self.page.run_task(self._animate_dashboard)
             
-            # Load active users and recent messages
-            await self._load_active_users_async()
-            await self._load_recent_messages_async()
+            await self._load_dashboard_async()
             
             self.is_loading = False
             
-            # Trigger animations
             if self.page:
-                await asyncio.sleep(0.3)
-                await self._animate_dashboard()
                 self.page.update()
                 
         except Exception as e:
@@ -395,52 +385,107 @@ class DashboardPage(ft.Container):
             if self.page:
                 self.page.update()
     
-    def _update_ui_with_data(self):
-        """Update UI components with loaded data."""
-        # Update stat cards
-        cards = self.stat_cards.content.controls
-        cards[0].update_value(str(self.stats['total_messages']))
-        cards[1].update_value(str(self.stats['total_users']))
-        cards[2].update_value(str(self.stats['total_groups']))
-        cards[3].update_value(format_bytes(self.stats['total_media_size']))
+    async def _load_dashboard_async(self):
+        """
+        Load stats, active users and recent messages for the current filters.
         
-        # Update monthly stats
-        monthly_content = self.monthly_stats.content
-        monthly_content.controls[2].controls[0].controls[1].value = str(self.stats['messages_today'])
-        monthly_content.controls[2].controls[2].controls[1].value = str(self.stats['messages_this_month'])
-    
-    async def _load_active_users_async(self):
-        """Load active users asynchronously."""
-        if not self.selected_group_ids:
+        Queries run concurrently and each widget is updated as soon as its own
+        result arrives; widgets keep their previous values until then. A newer
+        load (filter change) cancels this one.
+        """
+        group_ids = list(self.selected_group_ids)
+        cache_key = page_cache_service.generate_key(
+            "dashboard",
+            group_ids=str(group_ids),
+            start_date=self.start_date.isoformat(),
+            end_date=self.end_date.isoformat()
+        )
+        
+        if not group_ids:
             self.active_users_component.clear()
+        
+        snapshot = page_cache_service.get(cache_key)
+        if snapshot:
+            self.data_loader.cancel()
+            for key, value in snapshot.items():
+                self._apply_result(key, value)
             return
         
-        users = await async_query_executor.execute(
-            self.db_manager.get_top_active_users_by_group,
-            group_ids=self.selected_group_ids,
-            start_date=self.start_date,
-            end_date=self.end_date,
-            limit=10
-        )
+        results = {}
+        
+        def on_result(key, value):
+            results[key] = value
+            self._apply_result(key, value)
+            if self.page:
+                self.page.update()
         
-        self.active_users_component.update_users(users)
+        completed = await self.data_loader.load(group_ids, self.start_date, self.end_date, on_result)
+        if completed and page_cache_service.is_enabled():
+            page_cache_service.set(
+                cache_key, results,
+                tables=self.STATS_TABLES,
+                group_ids=group_ids
+            )
     
-    async def _load_recent_messages_async(self):
-        """Load recent messages asynchronously."""
-        messages = await async_query_executor.execute(
-            self.db_manager.get_messages,
-            group_ids=self.selected_group_ids if self.selected_group_ids else None,
-            start_date=self.start_date,
-            end_date=self.end_date,
-            limit=10
-        )
+    def _apply_result(self, key: str, value):
+        """Render one dashboard query result into its widget."""
+        if key == 'active_users':
+            self.active_users_component.update_users(value)
+        elif key == 'recent_messages':
+            activity_content = self.recent_activity.content
+            activity_content.controls[2] = self.recent_messages_component.build(
+                value,
+                self.db_manager.get_user_by_id
+            )
+        else:
+            self.stats[key] = value
+            self._update_stat_widget(key)
+    
+    def _on_data_change(self, event: DataChangeEvent):
+        """Hop to the UI loop (events arrive on the writer thread) before reading dashboard state."""
+        if self.page and hasattr(self.page, 'run_task'):
+            self.page.run_task(self._apply_data_change_async, event)
+    
+    async def _apply_data_change_async(self, event: DataChangeEvent):
+        """Reload stats, active users and recent messages without resetting filters."""
+        if self.is_loading or self._change_refresh_pending:
+            return
+        if not event.affects_group(self.selected_group_ids):
+            return
         
-        # Update recent activity
-        activity_content = self.recent_activity.content
-        activity_content.controls[2] = self.recent_messages_component.build(
-            messages,
-            self.db_manager.get_user_by_id
-        )
+        # Changes arriving during the debounce are covered by this reload
+        self._change_refresh_pending = True
+        await asyncio.sleep(self.CHANGE_REFRESH_DEBOUNCE_SECONDS)
+        self._change_refresh_pending = False
+        try:
+            await self._load_dashboard_async()
+            if self.page:
+                self.page.update()
+        except Exception as e:
+            logger.error(f"Error applying data change to dashboard: {e}", exc_info=True)
+    
+    def _update_stat_widget(self, key: str):
+        """Update the stat card or monthly figure showing one statistic."""
+        cards = self.stat_cards.content.controls
+        card_index = {
+            'total_messages': 0,
+            'total_users': 1,
+            'total_groups': 2,
+            'total_media_size': 3,
+        }
+        if key in card_index:
+            value = self.stats[key]
+            cards[card_index[key]].update_value(
+                format_bytes(value) if key == 'total_media_size' else str(value)
+            )
+            return
+        
+        # Update monthly stats
+        monthly_row = self.monthly_stats.content.controls[2]
+        if key == 'messages_today':
+            monthly_row.controls[0].controls[1].value = str(self.stats[key])
+        elif key == 'messages_this_month':
+            monthly_row.controls[2].controls[1].value = str(self.stats[key])
     
     def _on_groups_changed(self, group_ids: List[int], group_names: List[str]):
         """Handle group selection change."""
@@ -464,19 +509,15 @@ class DashboardPage(ft.Container):
         # Invalidate cache for this page
         page_cache_service.invalidate("page:dashboard")
         
-        # Load data asynchronously
+        # Reload for the current filters; this supersedes any load still in flight
         if self.page and hasattr(self.page, 'run_task'):
-            self.page.run_task(self._load_data_async)
+            self.page.run_task(self._load_dashboard_async)
         else:
-            asyncio.create_task(self._load_data_async())
+            asyncio.create_task(self._load_dashboard_async())
     
     def _refresh_active_users(self):
-        """Refresh active users list (deprecated - use async version)."""
-        # This method is kept for backward compatibility but now uses async
-        if self.page and hasattr(self.page, 'run_task'):
-            self.page.run_task(self._load_active_users_async)
-        else:
-            asyncio.create_task(self._load_active_users_async())
+        """Refresh active users list (deprecated - use _load_dashboard_async)."""
+        self._refresh_all_data()
     
     def _navigate_to_reports(self, e):
         """Navigate to reports page."""
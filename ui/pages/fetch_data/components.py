@@ -290,7 +290,7 @@ class MessageCard(ft.Container):
         else:
             self.update()
     
-    def _on_undelete_click(self, e):
+    async def _on_undelete_click(self, e):
         """Handle undelete button click."""
         if self.undelete_timer:
             self.undelete_timer.cancel()
@@ -298,7 +298,8 @@ class MessageCard(ft.Container):
         
         if self.message and self.db_manager and self.on_undelete:
             # Undelete the message
-            success = self.db_manager.undelete_message(
+            success = await self.db_manager.execute_write(
+                self.db_manager.undelete_message,
                 self.message.message_id,
                 self.message.group_id
             )
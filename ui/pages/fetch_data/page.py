@@ -665,7 +665,8 @@ class FetchDataPage(ft.Container):
                     group_id=group_id,
                     start_date=start_date,
                     end_date=end_date,
-                    limit=1000  # Sample up to 1000
+                    limit=1000,  # Sample up to 1000
+                    columns=['id']
                 ))
                 
                 # If we have existing messages, use that as baseline
@@ -79,10 +79,10 @@ class GroupsPage(ft.Container):
             
             if not groups:
                 # Load from database
-                groups = await async_query_executor.execute(self.db_manager.get_all_groups)
+                groups = await async_query_executor.execute(self.db_manager.get_all_groups, dedupe=True)
                 # Cache groups for 10 minutes (they don't change often)
                 if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key, groups, ttl=600)
+                    page_cache_service.set(cache_key, groups, ttl=600, tables=('telegram_groups',))
             
             # Update view model
             self.view_model.groups = groups
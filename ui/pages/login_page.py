@@ -266,7 +266,7 @@ class LoginPage(ft.Container):
                     from config.settings import settings
                     db_manager = settings.db_manager
                     if db_manager:
-                        db_manager.delete_login_credential()
+                        await db_manager.execute_write(db_manager.delete_login_credential)
                         logger.info("Deleted saved credentials due to device revocation during auto-login")
                 except Exception as e:
                     logger.error(f"Error deleting credentials: {e}", exc_info=True)
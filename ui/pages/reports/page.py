@@ -7,7 +7,7 @@ import asyncio
 import logging
 from typing import Optional, Callable
 from database.db_manager import DatabaseManager
-from database.async_query_executor import async_query_executor
+from database.async_query_executor import async_query_executor, QueryPriority
 from services.page_cache_service import page_cache_service
 from ui.theme import theme_manager
 from ui.components import DataTable, ModernTabs
@@ -160,9 +160,9 @@ class ReportsPage(ft.Container):
             groups = page_cache_service.get(cache_key)
             
             if not groups:
-                groups = await async_query_executor.execute(self.db_manager.get_all_groups)
+                groups = await async_query_executor.execute(self.db_manager.get_all_groups, dedupe=True)
                 if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key, groups, ttl=600)  # Cache for 10 minutes
+                    page_cache_service.set(cache_key, groups, ttl=600, tables=('telegram_groups',))  # Cache for 10 minutes
             
             self.groups = groups
             self.default_group_id = groups[0].group_id if groups else None
@@ -212,7 +212,7 @@ class ReportsPage(ft.Container):
             
             if self.page:
                 self.page.update()
-                
+        
         except Exception as e:
             logger.error(f"Error loading reports data: {e}", exc_info=True)
             self.is_loading = False
@@ -221,18 +221,18 @@ class ReportsPage(ft.Container):
     
     async def _refresh_active_users_async(self):
         """Refresh active users table asynchronously."""
-        # Run the synchronous method in executor
-        await async_query_executor.execute(self._refresh_active_users)
+        # Run the synchronous method on the background lane so page queries stay responsive
+        await async_query_executor.execute(self._refresh_active_users, priority=QueryPriority.BACKGROUND)
     
     async def _refresh_group_summary_async(self):
         """Refresh group summary table asynchronously."""
-        # Run the synchronous method in executor
-        await async_query_executor.execute(self._refresh_group_summary)
+        # Run the synchronous method on the background lane so page queries stay responsive
+        await async_query_executor.execute(self._refresh_group_summary, priority=QueryPriority.BACKGROUND)
     
     async def _refresh_certificate_async(self):
         """Refresh certificate asynchronously."""
-        # Run the synchronous method in executor
-        await async_query_executor.execute(self._refresh_certificate)
+        # Run the synchronous method on the background lane so page queries stay responsive
+        await async_query_executor.execute(self._refresh_certificate, priority=QueryPriority.BACKGROUND)
     
     def _on_tab_change(self, index: int):
         """Handle tab change."""
@@ -415,7 +415,8 @@ class ReportsPage(ft.Container):
                     group_id=group_id,
                     user_id=user_id,
                     start_date=start_date,
-                    end_date=end_date
+                    end_date=end_date,
+                    columns=['id']  # Only counted
                 )
                 if messages:
                     user_data['message_count'] = len(messages)
@@ -661,7 +662,8 @@ class ReportsPage(ft.Container):
                     group_id=group_id,
                     user_id=user_id,
                     start_date=start_date,
-                    end_date=end_date
+                    end_date=end_date,
+                    columns=['id']  # Only counted
                 )
                 if messages:
                     user_data['message_count'] = len(messages)
@@ -838,7 +840,8 @@ class ReportsPage(ft.Container):
                         group_id=group_id,
                         user_id=user_id,
                         start_date=start_date,
-                        end_date=end_date
+                        end_date=end_date,
+                        columns=['id']  # Only counted
                     )
                     if messages:
                         user_data['message_count'] = len(messages)
@@ -912,7 +915,8 @@ class ReportsPage(ft.Container):
                         group_id=group_id,
                         user_id=user_id,
                         start_date=start_date,
-                        end_date=end_date
+                        end_date=end_date,
+                        columns=['id']  # Only counted
                     )
                     if messages:
                         user_data['message_count'] = len(messages)
@@ -37,8 +37,8 @@ class AccountHandlerMixin(BaseHandlerMixin):
         phone_number = credential.phone_number
         
         # Show confirmation dialog before deletion
-        def on_confirm(e):
-            """Handle confirmation - proceed with deletion."""
+        async def remove_account(e):
+            """Delete the account; database writes are awaited on the writer queue."""
             logger.info(f"on_confirm called for credential_id: {credential_id}, phone: {phone_number}")
             
             try:
@@ -89,7 +89,9 @@ class AccountHandlerMixin(BaseHandlerMixin):
                 
                 # Delete credential from database
                 logger.info(f"Deleting credential from database: {credential_id}")
-                success = self.db_manager.delete_telegram_credential(credential_id)
+                success = await self.db_manager.execute_write(
+                    self.db_manager.delete_telegram_credential, credential_id
+                )
                 if not success:
                     logger.error(f"Failed to delete credential {credential_id} from database")
                     theme_manager.show_snackbar(
@@ -104,7 +106,8 @@ class AccountHandlerMixin(BaseHandlerMixin):
                 # Log deletion in activity log (only if user is logged in)
                 if user_email:
                     try:
-                        self.db_manager.log_account_action(
+                        await self.db_manager.execute_write(
+                            self.db_manager.log_account_action,
                             user_email=user_email,
                             action='delete',
                             phone_number=phone_number
@@ -140,6 +143,10 @@ class AccountHandlerMixin(BaseHandlerMixin):
                     bgcolor=ft.Colors.RED
                 )
         
+        def on_confirm(e):
+            """Handle confirmation - proceed with deletion."""
+            self.page.run_task(remove_account, e)
+        
         def on_cancel(e):
             """Handle cancellation - do nothing."""
             pass
@@ -264,7 +264,8 @@ class AuthenticationHandlerMixin(DialogHandlerMixin):
                 # Log account addition in activity log
                 if user_email:
                     try:
-                        self.db_manager.log_account_action(
+                        await self.db_manager.execute_write(
+                            self.db_manager.log_account_action,
                             user_email=user_email,
                             action='add',
                             phone_number=phone
@@ -509,7 +510,8 @@ class AuthenticationHandlerMixin(DialogHandlerMixin):
                 # Log account addition in activity log
                 if user_email and phone_number:
                     try:
-                        self.db_manager.log_account_action(
+                        await self.db_manager.execute_write(
+                            self.db_manager.log_account_action,
                             user_email=user_email,
                             action='add',
                             phone_number=phone_number
@@ -345,14 +345,14 @@ class TelegramHandlers:
             return
         
         try:
-            messages = self.view_model.get_messages(
+            # Streamed from the database, so large groups aren't loaded into memory first
+            if self.export_service.export_messages_report_to_pdf(
+                e.path,
                 group_id=self.messages_tab.get_selected_group(),
                 start_date=self.messages_tab.filters_bar.get_start_date(),
                 end_date=self.messages_tab.filters_bar.get_end_date(),
                 message_type_filter=self.messages_tab.filters_bar.get_message_type_filter()
-            )
-            
-            if self.export_service.export_messages_to_pdf(messages, e.path):
+            ):
                 theme_manager.show_snackbar(
                     self.page,
                     f"{theme_manager.t('export_success')}: {e.path}",
@@ -3,8 +3,10 @@ Telegram page - main orchestration file.
 """
 
 import flet as ft
+import asyncio
 from typing import Optional
 from database.db_manager import DatabaseManager
+from database.change_events import DataChangeEvent, data_change_bus
 from ui.theme import theme_manager
 from ui.pages.telegram.view_model import TelegramViewModel
 from ui.pages.telegram.components import MessagesTabComponent, UsersTabComponent
@@ -15,6 +17,11 @@ from services.export import ExportService
 class TelegramPage(ft.Container):
     """Telegram page with tabs for messages and users."""
     
+    MESSAGE_TABLES = ('messages', 'message_tags')
+    USER_TABLES = ('telegram_users', 'user_groups')
+    # Coalesce change events arriving during a fetch into one tab refresh
+    CHANGE_REFRESH_DEBOUNCE_SECONDS = 2.0
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.page: Optional[ft.Page] = None
@@ -188,6 +195,14 @@ class TelegramPage(ft.Container):
             padding=theme_manager.padding_lg,
             expand=True
         )
+        
+        # Tabs whose data changed while they were hidden (refreshed on switch)
+        self._stale_tabs = set()
+        self._pending_tab_refreshes = set()
+        data_change_bus.subscribe(
+            self._on_data_change,
+            tables=self.MESSAGE_TABLES + self.USER_TABLES
+        )
     
     def set_page(self, page: ft.Page):
         """Set page reference and add file pickers to overlay."""
@@ -272,6 +287,45 @@ class TelegramPage(ft.Container):
         logger.debug("_on_import_users called in TelegramPage")
         self.handlers.handle_import_users()
     
+    def _on_data_change(self, event: DataChangeEvent):
+        """Hop to the UI loop (events arrive on the writer thread) before reading filter state."""
+        if self.page and hasattr(self.page, 'run_task'):
+            self.page.run_task(self._apply_data_change_async, event)
+    
+    async def _apply_data_change_async(self, event: DataChangeEvent):
+        """Refresh only the tab whose selected group was touched by a committed change."""
+        if event.table in self.MESSAGE_TABLES:
+            tab_index = 0
+            group_id = self.messages_tab.filters_bar.get_selected_group()
+        else:
+            tab_index = 1
+            group_id = self.users_tab.filters_bar.get_selected_group()
+        
+        if not group_id or not event.affects_group([group_id]):
+            return
+        
+        if tab_index != self.selected_tab_index:
+            self._stale_tabs.add(tab_index)
+            return
+        
+        if tab_index not in self._pending_tab_refreshes:
+            self._pending_tab_refreshes.add(tab_index)
+            self.page.run_task(self._refresh_tab_after_change, tab_index)
+    
+    async def _refresh_tab_after_change(self, tab_index: int):
+        """Debounced refresh of a single tab after data changes."""
+        await asyncio.sleep(self.CHANGE_REFRESH_DEBOUNCE_SECONDS)
+        self._pending_tab_refreshes.discard(tab_index)
+        self._refresh_tab(tab_index)
+    
+    def _refresh_tab(self, tab_index: int):
+        """Refresh the messages (0) or users (1) tab."""
+        self._stale_tabs.discard(tab_index)
+        if tab_index == 0:
+            self.handlers.handle_refresh_messages()
+        else:
+            self.handlers.handle_refresh_users()
+    
     def _switch_tab(self, index: int):
         """Switch to a different tab."""
         self.selected_tab_index = index
@@ -299,6 +353,9 @@ class TelegramPage(ft.Container):
             self.users_tab_btn.update()
             self.messages_group_container.update()
             self.users_group_container.update()
+        
+        if index in self._stale_tabs:
+            self._refresh_tab(index)
     
     # Note: Refresh and export handlers are now called directly from tab components
     
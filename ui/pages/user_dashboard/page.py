@@ -138,9 +138,9 @@ class UserDashboardPage(ft.Container):
             groups = page_cache_service.get(cache_key)
             
             if not groups:
-                groups = await async_query_executor.execute(self.db_manager.get_all_groups)
+                groups = await async_query_executor.execute(self.db_manager.get_all_groups, dedupe=True)
                 if page_cache_service.is_enabled():
-                    page_cache_service.set(cache_key, groups, ttl=600)  # Cache for 10 minutes
+                    page_cache_service.set(cache_key, groups, ttl=600, tables=('telegram_groups',))  # Cache for 10 minutes
             
             self.groups = groups
             self.default_group_id = groups[0].group_id if groups else None
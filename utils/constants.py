@@ -241,6 +241,8 @@ DEFAULT_LICENSE_TIER = "premium"
 # Update System Settings
 UPDATE_CHECK_INTERVAL_SECONDS = 3600  # 1 hour
 UPDATES_DIR_NAME = "updates"
+UPDATE_DOWNLOAD_SEGMENTS = 4  # Parallel HTTP range requests per update download
+UPDATE_DOWNLOAD_MAX_BYTES_PER_SECOND = 4 * 1024 * 1024  # Bandwidth cap for update downloads (0 = unlimited)
 FIREBASE_APP_UPDATES_COLLECTION = "app_updates"
 FIRESTORE_NOTIFICATIONS_COLLECTION = "notifications"
 FIRESTORE_USER_NOTIFICATIONS_COLLECTION = "user_notifications"